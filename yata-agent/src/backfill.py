@@ -0,0 +1,136 @@
+"""Batch backfill: turn leftover recordings into meeting minutes.
+
+Usage::
+
+    python src/backfill.py recordings --parallel 4
+    python src/backfill.py "recordings/**/recording_*.ogg" --guild-id 123
+
+Files named ``recording_<guild_id>_<timestamp>`` (as written by
+``RecordingCog``) are attributed to their guild automatically; other files
+need ``--guild-id``.  Progress is written to stderr, completed files are
+recorded in a resumable manifest and a throughput report is printed at
+the end.  The same environment variables as ``main.py`` configure the
+database, Google and OpenAI clients.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("inputs", nargs="+", help="directories, files or glob patterns")
+    parser.add_argument("--parallel", type=int, default=2, help="files processed at once")
+    parser.add_argument("--guild-id", type=int, help="guild for files without one in the name")
+    parser.add_argument(
+        "--manifest",
+        default="recordings/backfill-manifest.json",
+        help="resumable manifest of processed files",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default="recordings/.transcripts",
+        help="transcript cache shared with the bot (TRANSCRIPT_CACHE_DIR)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="list the files and exit")
+    parser.add_argument("--report-json", help="also write the throughput report to this file")
+    return parser.parse_args(argv)
+
+
+async def _run(args: argparse.Namespace) -> int:
+    from data.database import Database
+    from services.audio_service import AudioService
+    from services.backfill_service import (
+        BackfillManifest,
+        BackfillService,
+        ProgressDisplay,
+        discover,
+    )
+    from services.database_service import DatabaseService
+    from services.google_service import GoogleService
+    from services.processing_service import ProcessingService
+    from services.transcript_cache import CachedTranscriptionService
+    from services.transcription_service import TranscriptionService
+    from utils.executors import ExecutorRegistry
+    from utils.rate_limiter import RateLimiter
+
+    files = discover(args.inputs)
+    if args.dry_run or not files:
+        for path in files:
+            print(path)
+        print(f"{len(files)} file(s) found", file=sys.stderr)
+        return 0
+
+    executors = ExecutorRegistry()
+    db_service = DatabaseService(Database(os.getenv("DB_PATH", "yata_agent.db")))
+    google_service = GoogleService(
+        db_service=db_service,
+        client_secrets_json=os.getenv("CLIENT_SECRETS_JSON", "{}"),
+        redirect_uri=os.getenv("REDIRECT_URI", "http://localhost:8000/oauth2callback"),
+        executors=executors,
+    )
+    transcription_service = CachedTranscriptionService(
+        TranscriptionService(
+            api_key=os.getenv("OPENAI_API_KEY", ""),
+            base_url=os.getenv("OPENAI_BASE_URL") or None,
+            rate_limiter=RateLimiter(
+                "whisper-1",
+                requests_per_minute=float(os.getenv("OPENAI_TRANSCRIPTION_RPM", "500")),
+            ),
+        ),
+        args.cache_dir,
+        max_age_seconds=float(os.getenv("TRANSCRIPT_CACHE_MAX_AGE_DAYS", "30")) * 86400,
+        max_bytes=int(float(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "1024")) * 1024 * 1024),
+    )
+    processing_service = ProcessingService(
+        transcription_service,
+        google_service,
+        db_service,
+        executors=executors,
+        formatting_rate_limiter=RateLimiter(
+            "gpt-4o-mini",
+            requests_per_minute=float(os.getenv("OPENAI_CHAT_RPM", "500")),
+            tokens_per_minute=float(os.getenv("OPENAI_CHAT_TPM", "200000")),
+        ),
+    )
+    backfill = BackfillService(
+        processing_service,
+        BackfillManifest(args.manifest),
+        audio_service=AudioService(executors=executors),
+        transcript_cache=transcription_service,
+        parallel=args.parallel,
+        guild_id=args.guild_id,
+    )
+
+    display = ProgressDisplay()
+    try:
+        report = await backfill.run(files, on_progress=display.update)
+    finally:
+        display.close()
+        executors.shutdown()
+
+    print(report.format())
+    if args.report_json:
+        with open(args.report_json, "w", encoding="utf-8") as f:
+            json.dump(report.as_dict(), f, indent=2)
+    return 1 if report.failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    return asyncio.run(_run(_parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""Micro-benchmarks of the hot service paths with stored baselines.
+
+Run ``python -m benchmarks --help`` from ``src/``.
+"""
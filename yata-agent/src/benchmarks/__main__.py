@@ -0,0 +1,102 @@
+"""Command-line entry point: ``python -m benchmarks`` (run from ``src/``).
+
+Examples::
+
+    python -m benchmarks                      # run all, compare with baseline.json
+    python -m benchmarks database google      # only these groups
+    python -m benchmarks --save               # record a new baseline
+    python -m benchmarks --threshold 0.1 --json results.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+import benchmarks.cases  # noqa: F401  (registers the benchmarks)
+from benchmarks.runner import (
+    REGRESSION,
+    compare,
+    format_report,
+    load_baseline,
+    run_all,
+    save_baseline,
+    select,
+)
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Run the micro-benchmarks and compare them with a stored baseline.",
+    )
+    parser.add_argument("patterns", nargs="*", help="benchmark names or groups (globs)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results to --baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown of the median reported as a regression")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-round-seconds", type=float, default=0.05)
+    parser.add_argument("--quick", action="store_true", help="3 short rounds (smoke test)")
+    parser.add_argument("--json", type=Path, help="also write results and comparison as JSON")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    root = logging.getLogger()
+    previous_level = root.level
+    root.setLevel(logging.ERROR)  # keep service INFO logs out of the timings
+    try:
+        return _run(args)
+    finally:
+        root.setLevel(previous_level)
+
+
+def _run(args: argparse.Namespace) -> int:
+    benchmarks = select(args.patterns)
+    if args.list:
+        for benchmark in benchmarks:
+            print(f"{benchmark.group:<12} {benchmark.name}")
+        return 0
+    if not benchmarks:
+        print("no benchmarks match", file=sys.stderr)
+        return 2
+
+    rounds, min_round = (3, 0.01) if args.quick else (args.rounds, args.min_round_seconds)
+
+    def _progress(benchmark, result, reason):
+        status = f"skipped ({reason})" if result is None else f"{result.median * 1e3:.3f} ms"
+        print(f"  {benchmark.name}: {status}", file=sys.stderr)
+
+    results, skipped = run_all(benchmarks, rounds=rounds, min_round_seconds=min_round, on_result=_progress)
+
+    baseline = load_baseline(args.baseline) if args.baseline.exists() else {}
+    comparisons = compare(results, baseline, args.threshold, skipped)
+    print(format_report(comparisons, args.threshold))
+
+    if args.json:
+        args.json.write_text(
+            json.dumps(
+                {
+                    "results": {name: asdict(result) for name, result in results.items()},
+                    "comparison": [asdict(c) | {"change": c.change} for c in comparisons],
+                },
+                indent=2,
+            )
+        )
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+    return 1 if any(c.status == REGRESSION for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
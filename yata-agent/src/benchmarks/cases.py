@@ -0,0 +1,438 @@
+"""Benchmarks of the hot service paths.
+
+Everything runs offline: the database is a temporary SQLite file, Google
+API requests go to an in-process fake ``http`` object (request
+construction and serialisation still run in ``googleapiclient``) and
+``ProcessingService`` uses the zero-latency fakes from :mod:`loadtest.fakes`.
+``AudioService`` benchmarks need ffmpeg and are skipped without it.
+
+The ``event_loop`` group runs the same gateway-dispatch and ``/health``
+workloads on each loop backend; uvloop cases are skipped when it is not
+installed.
+
+The ``startup`` group times a fresh ``python main.py --check`` per role:
+process start, imports, service wiring and cog loading, i.e. everything
+before the bot connects to the gateway.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import shutil
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+from unittest import mock
+
+import discord
+import httplib2
+import numpy as np
+import uvicorn
+from googleapiclient import discovery
+
+from benchmarks.runner import bench
+from data.database import Database
+from loadtest.fakes import (
+    FakeDatabaseService,
+    FakeFormatter,
+    FakeGoogleService,
+    FakeTranscriptionService,
+    LatencyModel,
+)
+from loadtest.synthetic import build_sink
+from services.audio_service import AudioService
+from services.database_service import DatabaseService
+from services.google_service import GoogleService
+from services.processing_service import ProcessingService
+from services.readiness_service import ReadinessService
+from utils.event_loop import ASYNCIO, UVLOOP, available_backends, new_event_loop
+
+_GUILDS = 1000
+_TOKEN = {
+    "token": "ya29.benchmark",
+    "refresh_token": "1//benchmark",
+    "client_id": "benchmark.apps.googleusercontent.com",
+    "client_secret": "secret",
+    "scopes": ["https://www.googleapis.com/auth/documents"],
+}
+_MINUTES = ("# 議事録\n\n## 記録\n" + "決定事項について議論し、担当者と期限を確認した。\n" * 400)
+_NO_LATENCY = LatencyModel(median=0.0, p95=0.0)
+
+
+def _needs_ffmpeg() -> Optional[str]:
+    return None if shutil.which("ffmpeg") else "ffmpeg not installed"
+
+
+def _temp_database(directory: str, guilds: int = 0) -> Database:
+    db = Database(str(Path(directory) / "bench.db"))
+    for guild_id in range(guilds):
+        db.upsert_server_settings(guild_id, 1, "folder", "ja")
+        db.upsert_credentials(guild_id, _TOKEN)
+    return db
+
+
+# ----------------------------------------------------------------------
+# Database CRUD (file-backed, one commit per write like production)
+# ----------------------------------------------------------------------
+@bench("database.upsert_server_settings", group="database")
+def _db_upsert_settings():
+    with tempfile.TemporaryDirectory() as directory:
+        db = _temp_database(directory, _GUILDS)
+        ids = itertools.count()
+
+        def _upsert() -> None:
+            # Every call changes the row so SQLite really writes and commits
+            i = next(ids)
+            db.upsert_server_settings(i % _GUILDS, 1, f"folder-{i}", "ja")
+
+        yield _upsert
+        db.close()
+
+
+@bench("database.get_server_settings", group="database")
+def _db_get_settings():
+    with tempfile.TemporaryDirectory() as directory:
+        db = _temp_database(directory, _GUILDS)
+        ids = itertools.cycle(range(_GUILDS))
+        yield lambda: db.get_server_settings(next(ids))
+        db.close()
+
+
+@bench("database.upsert_credentials", group="database")
+def _db_upsert_credentials():
+    with tempfile.TemporaryDirectory() as directory:
+        db = _temp_database(directory, _GUILDS)
+        ids = itertools.count()
+
+        def _upsert() -> None:
+            i = next(ids)
+            db.upsert_credentials(i % _GUILDS, dict(_TOKEN, token=f"ya29.{i}"))
+
+        yield _upsert
+        db.close()
+
+
+@bench("database.get_credentials", group="database")
+def _db_get_credentials():
+    with tempfile.TemporaryDirectory() as directory:
+        db = _temp_database(directory, _GUILDS)
+        ids = itertools.cycle(range(_GUILDS))
+        yield lambda: db.get_credentials(next(ids))
+        db.close()
+
+
+@bench("database.crud_cycle", group="database")
+def _db_crud_cycle():
+    """/setup → auth → status → leave: create, read and cascade-delete a guild."""
+    with tempfile.TemporaryDirectory() as directory:
+        db = _temp_database(directory)
+        ids = itertools.count(_GUILDS)
+
+        def _cycle() -> None:
+            guild_id = next(ids)
+            db.upsert_server_settings(guild_id, 1, "folder", "ja")
+            db.upsert_credentials(guild_id, _TOKEN)
+            db.upsert_guild_limits(guild_id, 120, 2)
+            db.get_server_settings(guild_id)
+            db.get_credentials(guild_id)
+            db.delete_server_data(guild_id)
+
+        yield _cycle
+        db.close()
+
+
+# ----------------------------------------------------------------------
+# ReadinessService.check
+# ----------------------------------------------------------------------
+@bench("readiness.check[{state}]", group="readiness", params=[{"state": "ready"}, {"state": "need_setup"}])
+def _readiness_check(state: str):
+    with tempfile.TemporaryDirectory() as directory:
+        db = _temp_database(directory, _GUILDS)
+        service = ReadinessService(DatabaseService(db))
+        offset = 0 if state == "ready" else _GUILDS
+        ids = itertools.cycle(range(offset, offset + _GUILDS))
+        yield lambda: service.check(next(ids))
+        db.close()
+
+
+# ----------------------------------------------------------------------
+# AudioService.mix_and_export
+# ----------------------------------------------------------------------
+@bench(
+    "audio.mix_and_export[{speakers}spk-{seconds}s]",
+    group="audio",
+    params=[
+        {"speakers": 2, "seconds": 60},
+        {"speakers": 4, "seconds": 60},
+        {"speakers": 8, "seconds": 60},
+        {"speakers": 4, "seconds": 300},
+    ],
+    skip_if=_needs_ffmpeg,
+)
+def _audio_mix(speakers: int, seconds: int):
+    sink = build_sink(speakers, seconds, np.random.default_rng(0))
+    service = AudioService()
+    with tempfile.TemporaryDirectory() as directory:
+        base = (Path(directory) / "mix").as_posix()
+
+        async def _mix() -> None:
+            await service.mix_and_export(sink.audio_data, sink.encoding, base, timeline=sink.timeline)
+
+        yield _mix
+
+
+# ----------------------------------------------------------------------
+# GoogleService request construction
+# ----------------------------------------------------------------------
+class _FakeHttp:
+    """``httplib2.Http`` stand-in answering every Docs / Drive call."""
+
+    _BODY = json.dumps({"documentId": "bench-doc", "parents": ["root"]}).encode()
+
+    def request(self, uri: str, method: str = "GET", body: Any = None, headers: Any = None, **_: Any):
+        return httplib2.Response({"status": "200", "content-type": "application/json"}), self._BODY
+
+
+def _offline_build(service_name: str, version: str, credentials: Any = None, **_: Any):
+    return discovery.build(service_name, version, http=_FakeHttp(), static_discovery=True)
+
+
+def _google_service(db: Database) -> GoogleService:
+    return GoogleService(
+        DatabaseService(db),
+        json.dumps({"web": {"client_id": "x", "client_secret": "y"}}),
+        "http://localhost/oauth2callback",
+    )
+
+
+@bench("google.upload_document", group="google")
+def _google_upload():
+    with tempfile.TemporaryDirectory() as directory, mock.patch(
+        "services.google_service.discovery.build", _offline_build
+    ):
+        db = _temp_database(directory, 1)
+        service = _google_service(db)
+
+        async def _upload() -> None:
+            await service.upload_document(0, "Meeting Minutes", _MINUTES)
+
+        yield _upload
+        db.close()
+
+
+@bench("google.update_document", group="google")
+def _google_update():
+    with tempfile.TemporaryDirectory() as directory, mock.patch(
+        "services.google_service.discovery.build", _offline_build
+    ):
+        db = _temp_database(directory, 1)
+        service = _google_service(db)
+        url = "https://docs.google.com/document/d/bench-doc/edit"
+
+        async def _update() -> None:
+            await service.update_document(0, url, _MINUTES, previous_content=_MINUTES[:2000])
+
+        yield _update
+        db.close()
+
+
+# ----------------------------------------------------------------------
+# ProcessingService.process with fake backends
+# ----------------------------------------------------------------------
+@bench("processing.process[{mode}]", group="processing", params=[{"mode": "minutes"}, {"mode": "raw_first"}])
+def _processing(mode: str):
+    with tempfile.TemporaryDirectory() as directory:
+        audio = Path(directory) / "meeting.ogg"
+        audio.write_bytes(b"\0" * 90_000)  # ~60 s of 12 kbit/s Opus
+        service = ProcessingService(
+            FakeTranscriptionService(_NO_LATENCY, seed=0),
+            FakeGoogleService(_NO_LATENCY, seed=0),
+            FakeDatabaseService(),
+            formatter=FakeFormatter(_NO_LATENCY, seed=0),
+            publish_raw_first=mode == "raw_first",
+        )
+
+        async def _process() -> None:
+            await service.process(1, str(audio), "Meeting Minutes")
+            if service._background:
+                await asyncio.gather(*service._background)
+
+        yield _process
+
+
+# ----------------------------------------------------------------------
+# Event loop backends (gateway dispatch and /health throughput)
+# ----------------------------------------------------------------------
+_GATEWAY_EVENTS = 500
+_HEALTH_REQUESTS = 200
+_HEALTH_CONNECTIONS = 8
+
+
+def _needs_backend(backend: str):
+    def _check() -> Optional[str]:
+        return None if backend in available_backends() else f"{backend} not installed"
+
+    return _check
+
+
+def _gateway_payloads(count: int) -> list[str]:
+    return [
+        json.dumps(
+            {
+                "op": 0,
+                "s": seq,
+                "t": "MESSAGE_CREATE",
+                "d": {
+                    "id": str(10**17 + seq),
+                    "channel_id": "1",
+                    "guild_id": str(seq % _GUILDS),
+                    "content": "benchmark message",
+                    "author": {"id": "2", "username": "bench", "discriminator": "0"},
+                },
+            }
+        )
+        for seq in range(count)
+    ]
+
+
+def _loop_bench(backend: str, factory):
+    """Run *factory*'s per-call coroutine on a loop of *backend*."""
+    loop = new_event_loop(backend)
+    try:
+        run_once, teardown = loop.run_until_complete(factory(loop))
+        yield lambda: loop.run_until_complete(run_once())
+        loop.run_until_complete(teardown())
+    finally:
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+
+
+@bench("loop.gateway_dispatch[{backend}]", group="event_loop", params=[{"backend": ASYNCIO}])
+@bench(
+    "loop.gateway_dispatch[{backend}]",
+    group="event_loop",
+    params=[{"backend": UVLOOP}],
+    skip_if=_needs_backend(UVLOOP),
+)
+def _loop_gateway_dispatch(backend: str):
+    """Decode and dispatch a burst of gateway events to a listener."""
+    payloads = _gateway_payloads(_GATEWAY_EVENTS)
+
+    async def _setup(loop):
+        client = discord.Client(loop=loop, intents=discord.Intents.none())
+        state = {"pending": 0, "done": asyncio.Event()}
+
+        async def on_bench_message(data):
+            await asyncio.sleep(0)
+            state["pending"] -= 1
+            if state["pending"] == 0:
+                state["done"].set()
+
+        client.add_listener(on_bench_message, "on_bench_message")
+
+        async def _burst() -> None:
+            state["pending"] = len(payloads)
+            state["done"].clear()
+            for raw in payloads:
+                message = json.loads(raw)
+                client.dispatch("socket_event_type", message["t"])
+                client.dispatch("bench_message", message["d"])
+            await state["done"].wait()
+
+        async def _teardown() -> None:
+            await client.http.close()
+
+        return _burst, _teardown
+
+    yield from _loop_bench(backend, _setup)
+
+
+async def _health_client(port: int, requests: int) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = b"GET /health HTTP/1.1\r\nHost: bench\r\n\r\n"
+    try:
+        for _ in range(requests):
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = next(
+                int(line.split(b":", 1)[1])
+                for line in head.split(b"\r\n")
+                if line.lower().startswith(b"content-length:")
+            )
+            await reader.readexactly(length)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+@bench("loop.http_health[{backend}]", group="event_loop", params=[{"backend": ASYNCIO}])
+@bench(
+    "loop.http_health[{backend}]",
+    group="event_loop",
+    params=[{"backend": UVLOOP}],
+    skip_if=_needs_backend(UVLOOP),
+)
+def _loop_http_health(backend: str):
+    """``GET /health`` over keep-alive connections to the real FastAPI app."""
+    from main import app
+
+    async def _setup(loop):
+        # IPPROTO_TCP so asyncio sets TCP_NODELAY on accepted connections
+        # (as on the socket uvicorn binds itself in production)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        server = uvicorn.Server(
+            uvicorn.Config(app, log_level="error", access_log=False, lifespan="off")
+        )
+        serving = loop.create_task(server.serve(sockets=[sock]))
+        while not server.started:
+            await asyncio.sleep(0.01)
+
+        async def _requests() -> None:
+            per_connection = _HEALTH_REQUESTS // _HEALTH_CONNECTIONS
+            await asyncio.gather(
+                *(_health_client(port, per_connection) for _ in range(_HEALTH_CONNECTIONS))
+            )
+
+        async def _teardown() -> None:
+            server.should_exit = True
+            await serving
+            sock.close()
+
+        return _requests, _teardown
+
+    yield from _loop_bench(backend, _setup)
+
+
+# ----------------------------------------------------------------------
+# Startup (process start until ready to connect)
+# ----------------------------------------------------------------------
+_MAIN = Path(__file__).resolve().parents[1] / "main.py"
+
+
+@bench("startup.cold_start[{role}]", group="startup", params=[{"role": "bot"}, {"role": "worker"}])
+def _startup(role: str):
+    """A new interpreter running ``main.py --role <role> --check``."""
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "DISCORD_TOKEN": "benchmark",
+            "OPENAI_API_KEY": "benchmark",
+            "DB_PATH": str(Path(directory) / "bench.db"),
+            "IPC_SOCKET": str(Path(directory) / "ipc.sock"),
+            "COMMAND_SYNC_CACHE": "",
+            "LOG_LEVEL": "WARNING",
+            "STARTUP_PROFILE_IMPORTS": "false",
+        }
+        command = [sys.executable, str(_MAIN), "--role", role, "--check"]
+
+        def _start() -> None:
+            subprocess.run(command, cwd=directory, env=env, check=True, capture_output=True)
+
+        yield _start
@@ -0,0 +1,339 @@
+"""Micro-benchmark runner, baseline store and regression report.
+
+A benchmark is a generator function registered with :func:`bench`.  It
+performs its setup, yields the callable to time (sync or ``async``) and
+cleans up after the ``yield``::
+
+    @bench("database.get_server_settings", group="database")
+    def _get():
+        db = Database(":memory:")
+        yield lambda: db.get_server_settings(1)
+        db.close()
+
+The runner calibrates how many calls make up one round (at least
+``min_round_seconds``), runs ``rounds`` rounds and records per-call
+statistics.  Results are compared against a stored baseline by median;
+anything slower than ``1 + threshold`` times the baseline is reported as
+a regression.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as _dt
+import fnmatch
+import inspect
+import json
+import os
+import platform
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+BASELINE_VERSION = 1
+
+OK = "ok"
+REGRESSION = "REGRESSION"
+IMPROVED = "improved"
+NEW = "new"
+SKIPPED = "skipped"
+
+
+@dataclass
+class Benchmark:
+    name: str
+    group: str
+    factory: Callable[..., Iterator[Callable[[], Any]]]
+    params: Dict[str, Any] = field(default_factory=dict)
+    # Returns a reason string when the benchmark cannot run here
+    skip_if: Optional[Callable[[], Optional[str]]] = None
+
+
+@dataclass
+class Result:
+    name: str
+    group: str
+    median: float
+    mean: float
+    stdev: float
+    min: float
+    rounds: int
+    number: int
+
+    @property
+    def ops_per_second(self) -> float:
+        return 1.0 / self.median if self.median > 0 else float("inf")
+
+
+_REGISTRY: Dict[str, Benchmark] = {}
+
+
+def bench(
+    name: str,
+    group: str,
+    params: Optional[List[Dict[str, Any]]] = None,
+    skip_if: Optional[Callable[[], Optional[str]]] = None,
+) -> Callable:
+    """Register a benchmark factory, once per entry of *params*.
+
+    *name* may contain ``str.format`` fields filled from each params dict,
+    e.g. ``"audio.mix[{speakers}x{seconds}s]"``.
+    """
+
+    def decorator(factory: Callable[..., Iterator[Callable[[], Any]]]) -> Callable:
+        for case in params or [{}]:
+            full_name = name.format(**case)
+            if full_name in _REGISTRY:
+                raise ValueError(f"duplicate benchmark name: {full_name}")
+            _REGISTRY[full_name] = Benchmark(full_name, group, factory, dict(case), skip_if)
+        return factory
+
+    return decorator
+
+
+def registry() -> Dict[str, Benchmark]:
+    return dict(_REGISTRY)
+
+
+def select(patterns: Optional[List[str]] = None) -> List[Benchmark]:
+    """Benchmarks whose name or group matches any glob in *patterns*."""
+    benchmarks = sorted(_REGISTRY.values(), key=lambda b: b.name)
+    if not patterns:
+        return benchmarks
+    return [
+        b for b in benchmarks
+        if any(fnmatch.fnmatch(b.name, p) or fnmatch.fnmatch(b.group, p) for p in patterns)
+    ]
+
+
+# ----------------------------------------------------------------------
+# Running
+# ----------------------------------------------------------------------
+class _Timer:
+    """Times ``number`` calls of a sync or async callable."""
+
+    def __init__(self, fn: Callable[[], Any], loop: asyncio.AbstractEventLoop) -> None:
+        self._fn = fn
+        self._loop = loop
+        self._is_async = inspect.iscoroutinefunction(fn)
+
+    def __call__(self, number: int) -> float:
+        fn = self._fn
+        if self._is_async:
+            async def _rounds() -> float:
+                started = time.perf_counter()
+                for _ in range(number):
+                    await fn()
+                return time.perf_counter() - started
+
+            return self._loop.run_until_complete(_rounds())
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - started
+
+
+def _calibrate(timer: _Timer, min_round_seconds: float, max_number: int) -> int:
+    number = 1
+    while number < max_number:
+        if timer(number) >= min_round_seconds:
+            break
+        number = min(max_number, number * 4)
+    return number
+
+
+def run_benchmark(
+    benchmark: Benchmark,
+    rounds: int = 7,
+    min_round_seconds: float = 0.05,
+    max_number: int = 100_000,
+) -> Result:
+    """Run one benchmark and return its per-call statistics (seconds)."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    factory = benchmark.factory(**benchmark.params)
+    try:
+        fn = next(factory)
+        timer = _Timer(fn, loop)
+        number = _calibrate(timer, min_round_seconds, max_number)
+        samples = [timer(number) / number for _ in range(rounds)]
+        # Resume the generator so the code after ``yield`` cleans up
+        next(factory, None)
+    finally:
+        factory.close()
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+        asyncio.set_event_loop(None)
+
+    return Result(
+        name=benchmark.name,
+        group=benchmark.group,
+        median=statistics.median(samples),
+        mean=statistics.fmean(samples),
+        stdev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        min=min(samples),
+        rounds=rounds,
+        number=number,
+    )
+
+
+def run_all(
+    benchmarks: List[Benchmark],
+    rounds: int = 7,
+    min_round_seconds: float = 0.05,
+    on_result: Optional[Callable[[Benchmark, Optional[Result], Optional[str]], None]] = None,
+) -> tuple[Dict[str, Result], Dict[str, str]]:
+    """Run *benchmarks*; return ``(results, skipped reasons)``."""
+    results: Dict[str, Result] = {}
+    skipped: Dict[str, str] = {}
+    for benchmark in benchmarks:
+        reason = benchmark.skip_if() if benchmark.skip_if else None
+        if reason:
+            skipped[benchmark.name] = reason
+            if on_result:
+                on_result(benchmark, None, reason)
+            continue
+        result = run_benchmark(benchmark, rounds=rounds, min_round_seconds=min_round_seconds)
+        results[benchmark.name] = result
+        if on_result:
+            on_result(benchmark, result, None)
+    return results, skipped
+
+
+# ----------------------------------------------------------------------
+# Baselines
+# ----------------------------------------------------------------------
+def machine_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_baseline(path: str | Path, results: Dict[str, Result], merge: bool = True) -> None:
+    """Write *results* to *path*, keeping entries of benchmarks not re-run."""
+    path = Path(path)
+    entries: Dict[str, Any] = {}
+    if merge and path.exists():
+        entries = load_baseline(path)
+    for name, result in results.items():
+        entries[name] = {k: v for k, v in asdict(result).items() if k != "name"}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": BASELINE_VERSION,
+                "created": _dt.datetime.now(_dt.timezone.utc).isoformat(timespec="seconds"),
+                "machine": machine_info(),
+                "results": dict(sorted(entries.items())),
+            },
+            f,
+            indent=2,
+        )
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def load_baseline(path: str | Path) -> Dict[str, Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"unsupported baseline version in {path}: {data.get('version')}")
+    return data.get("results", {})
+
+
+# ----------------------------------------------------------------------
+# Comparison
+# ----------------------------------------------------------------------
+@dataclass
+class Comparison:
+    name: str
+    status: str
+    median: Optional[float] = None
+    baseline: Optional[float] = None
+    reason: str = ""
+
+    @property
+    def change(self) -> Optional[float]:
+        """Relative change of the median (+0.25 = 25 % slower)."""
+        if self.median is None or not self.baseline:
+            return None
+        return self.median / self.baseline - 1.0
+
+
+def compare(
+    results: Dict[str, Result],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = 0.25,
+    skipped: Optional[Dict[str, str]] = None,
+) -> List[Comparison]:
+    """Compare medians; slower than ``1 + threshold`` × baseline regresses."""
+    comparisons: List[Comparison] = []
+    for name, result in sorted(results.items()):
+        reference = baseline.get(name, {}).get("median")
+        if not reference:
+            comparisons.append(Comparison(name, NEW, result.median))
+            continue
+        ratio = result.median / reference
+        if ratio > 1.0 + threshold:
+            status = REGRESSION
+        elif ratio < 1.0 / (1.0 + threshold):
+            status = IMPROVED
+        else:
+            status = OK
+        comparisons.append(Comparison(name, status, result.median, reference))
+    for name, reason in sorted((skipped or {}).items()):
+        comparisons.append(Comparison(name, SKIPPED, baseline=baseline.get(name, {}).get("median"), reason=reason))
+    return comparisons
+
+
+def _format_seconds(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if value >= scale:
+            return f"{value / scale:.2f} {unit}"
+    return f"{value / 1e-9:.0f} ns"
+
+
+def format_report(comparisons: List[Comparison], threshold: float) -> str:
+    width = max([len(c.name) for c in comparisons] + [9])
+    lines = [
+        f"{'benchmark':<{width}}  {'median':>10}  {'baseline':>10}  {'change':>8}  status",
+        "-" * (width + 46),
+    ]
+    for c in comparisons:
+        change = f"{c.change * 100:+.1f}%" if c.change is not None else "-"
+        status = c.status if not c.reason else f"{c.status} ({c.reason})"
+        lines.append(
+            f"{c.name:<{width}}  {_format_seconds(c.median):>10}  "
+            f"{_format_seconds(c.baseline):>10}  {change:>8}  {status}"
+        )
+    regressions = [c for c in comparisons if c.status == REGRESSION]
+    lines.append("")
+    lines.append(
+        f"{len(regressions)} regression(s) above {threshold * 100:.0f}%"
+        + (": " + ", ".join(c.name for c in regressions) if regressions else "")
+    )
+    return "\n".join(lines)
+
+
+__all__ = [
+    "Benchmark",
+    "Comparison",
+    "Result",
+    "bench",
+    "compare",
+    "format_report",
+    "load_baseline",
+    "registry",
+    "run_all",
+    "run_benchmark",
+    "save_baseline",
+    "select",
+]
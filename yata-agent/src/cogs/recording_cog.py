@@ -1,18 +1,32 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import datetime as _dt
 import logging
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from types import SimpleNamespace
-from typing import Dict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set
 
 import discord
 from discord.ext import commands
 
-from services.processing_service import ProcessingService
-from services.audio_service import AudioService
+from services.admission_service import AdmissionLevel
+from services.queued_processing import PROCESS, PROCESS_SPEAKERS, reply_channel
 from services.readiness_service import ReadinessLevel
+from utils.executors import DB, run_blocking
+from utils.memory import detach_sink, release_buffers
 from utils.messages import msg
+from utils.timeline_sink import TimelineWaveSink
+from utils.tracing import span, use_span
+
+if TYPE_CHECKING:  # pragma: no cover
+    # Only annotations; main.py builds and injects the services
+    from services.audio_service import AudioService
+    from services.processing_service import ProcessingService
+    from utils.executors import ExecutorRegistry
 
 logger = logging.getLogger(__name__)
 
@@ -20,21 +34,83 @@ logger = logging.getLogger(__name__)
 TEMP_DIR = Path("recordings")
 TEMP_DIR.mkdir(exist_ok=True)
 
+# Transcript modes: one mixed track, or one track per speaker
+MODE_MIXED = "mixed"
+MODE_PER_SPEAKER = "per_speaker"
+
+
+@dataclass(frozen=True)
+class AutoStopPolicy:
+    """When an unattended recording is stopped (and processed) automatically.
+
+    ``idle_timeout_seconds`` and ``max_duration_seconds`` are disabled by 0.
+    The maximum duration can be overridden per guild via ``/recording_limits``.
+    """
+
+    # Stop once no human has been in the voice channel for this long
+    empty_grace_seconds: float = 30.0
+    # Stop after this long without any received audio
+    idle_timeout_seconds: float = 10 * 60
+    # Stop after this long regardless of activity
+    max_duration_seconds: float = 3 * 60 * 60
+    check_interval_seconds: float = 15.0
+
 
 class RecordingCog(commands.Cog):
     """Discord voice recording and meeting minutes generation."""
 
-    def __init__(self, processing_service: ProcessingService, audio_service: AudioService):
+    def __init__(
+        self,
+        processing_service: ProcessingService,
+        audio_service: AudioService,
+        transcript_mode: str = MODE_MIXED,
+        auto_stop: Optional[AutoStopPolicy] = None,
+        db_service: Optional[Any] = None,
+        admission_service: Optional[Any] = None,
+        profiling_service: Optional[Any] = None,
+        memory_tracker: Optional[Any] = None,
+        tracer: Optional[Any] = None,
+        job_delivery: Optional[Any] = None,
+        executors: Optional[ExecutorRegistry] = None,
+    ):
         self.processing_service = processing_service
         self.audio_service = audio_service
-        # guild_id -> {voice_client, file_path}
+        self.transcript_mode = transcript_mode
+        self.auto_stop = auto_stop or AutoStopPolicy()
+        # Used for per-guild limits only; None falls back to the policy
+        self.db_service = db_service
+        # services.admission_service.AdmissionService; None admits everything
+        self.admission_service = admission_service
+        # services.profiling_service.ProfilingService; None never profiles
+        self.profiling_service = profiling_service
+        # utils.memory.MemoryTracker; None releases buffers without tracking
+        self.memory_tracker = memory_tracker
+        # utils.tracing.Tracer; one trace per meeting, None disables tracing
+        self.tracer = tracer
+        # services.job_delivery.JobDeliveryService; meetings interrupted by a
+        # shutdown are handed off to it (None: they are lost)
+        self.job_delivery = job_delivery
+        # Blocking database reads run on the db pool (None: asyncio.to_thread)
+        self.executors = executors
+        # guild_id -> {voice_client, sink, text_channel, started_at, ...}
+        # Only guilds of this process's shards ever reach the cog, so the
+        # state is per shard without coordination (see utils.sharding)
         self._active_recordings: Dict[int, SimpleNamespace] = {}
+        # Graceful shutdown (see utils.graceful_shutdown): stopped sinks whose
+        # callback has not started yet, and the running pipelines
+        self._shutting_down = False
+        self._finishing: Set[int] = set()
+        self._pipelines: Dict[asyncio.Task, SimpleNamespace] = {}
 
     # ---------------------------- record start ----------------------------
     @discord.slash_command(name="record_start", description="ボイスチャンネルの録音を開始します。")
     async def record_start(self, ctx: discord.ApplicationContext):  # type: ignore[override]
         await ctx.defer(ephemeral=True)
 
+        if self._shutting_down:
+            await ctx.followup.send(msg("record_shutting_down"))
+            return
+
         # ---------------- readiness check ----------------
         try:
             readiness_service = ctx.bot.container.readiness_service  # type: ignore[attr-defined]
@@ -57,27 +133,60 @@ class RecordingCog(commands.Cog):
             await ctx.followup.send(msg("record_already"))
             return
 
-        voice_channel: discord.VoiceChannel = voice_state.channel  # type: ignore[assignment]
-        
+        # ---------------- admission control ----------------
+        admission = None
+        if self.admission_service is not None:
+            admission = await self.admission_service.check(guild_id, self._live_bytes())
+            if not admission.admitted:
+                await ctx.followup.send(admission.guidance())
+                return
+        try:
+            started = await self._start_recording(ctx, voice_state.channel, guild_id)
+        finally:
+            # The estimate counted as pending until the sink is registered
+            if admission is not None:
+                self.admission_service.release(admission)
+        if not started:
+            return
+
+        message = msg("record_start")
+        if admission is not None and admission.level == AdmissionLevel.QUEUE:
+            message = f"{message}\n{admission.guidance()}"
+        await ctx.followup.send(message)
+
+    async def _start_recording(self, ctx, voice_channel: discord.VoiceChannel, guild_id: int) -> bool:
+        """Join *voice_channel* and register its recording; False on failure."""
+        max_seconds = await self._max_duration_seconds(guild_id)
         try:
             voice_client: discord.VoiceClient = await voice_channel.connect()
         except Exception as e:  # pragma: no cover
             logger.error("Voice connect failed: %s", e, exc_info=True)
             await ctx.followup.send("❌ ボイスチャンネルへの接続に失敗しました。")
-            return
+            return False
 
         # --------------------- start recording -------------------------
-        from discord import sinks
-
-        sink = sinks.WaveSink()
-        voice_client.start_recording(sink, self._on_record_finished, ctx.channel)
-
-        self._active_recordings[guild_id] = SimpleNamespace(
+        # Compact per-user buffers + sparse timeline instead of zero padding
+        sink = TimelineWaveSink()
+        # The meeting's trace ends once the minutes link has been posted
+        trace = None
+        if self.tracer is not None:
+            trace = self.tracer.start_trace("meeting", guild_id=guild_id, mode=self.transcript_mode)
+        voice_client.start_recording(sink, self._on_record_finished, ctx.channel, trace)
+
+        record = SimpleNamespace(
             voice_client=voice_client,
             sink=sink,
+            text_channel=ctx.channel,
+            shard_id=getattr(ctx.guild, "shard_id", None),
+            started_at=time.monotonic(),
+            max_seconds=max_seconds,
+            watcher=None,
+            empty_task=None,
         )
-
-        await ctx.followup.send(msg("record_start"))
+        if record.max_seconds or self.auto_stop.idle_timeout_seconds:
+            record.watcher = asyncio.create_task(self._watch(guild_id, record))
+        self._active_recordings[guild_id] = record
+        return True
 
     # ---------------------------- record stop -----------------------------
     @discord.slash_command(name="record_stop", description="録音を停止し、議事録作成を開始します。")
@@ -101,87 +210,411 @@ class RecordingCog(commands.Cog):
         except AttributeError:
             pass  # container not available (tests) continue
 
-        record = self._active_recordings.get(guild_id)
-        if not record:
+        if guild_id not in self._active_recordings:
             await ctx.followup.send(msg("record_stop_no_record"))
             return
 
+        await self._stop_recording(guild_id)
+
+        await ctx.followup.send(msg("record_stop_done"))
+
+    # ---------------------------- auto stop -------------------------------
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        """Stop the guild's recording once its voice channel stays empty."""
+        guild = getattr(member, "guild", None)
+        record = self._active_recordings.get(guild.id) if guild else None
+        if record is None:
+            return
+        channel = getattr(record.voice_client, "channel", None)
+        if channel is None:
+            return
+
+        if any(not m.bot for m in channel.members):
+            # Someone (re)joined during the grace period
+            if record.empty_task is not None:
+                record.empty_task.cancel()
+                record.empty_task = None
+        elif record.empty_task is None:
+            record.empty_task = asyncio.create_task(
+                self._stop_when_empty(guild.id, record, channel)
+            )
+
+    async def _stop_when_empty(self, guild_id: int, record: SimpleNamespace, channel) -> None:
+        await asyncio.sleep(self.auto_stop.empty_grace_seconds)
+        if self._active_recordings.get(guild_id) is not record:
+            return
+        if any(not m.bot for m in channel.members):
+            record.empty_task = None
+            return
+        await self._auto_stop(guild_id, "empty")
+
+    async def _watch(self, guild_id: int, record: SimpleNamespace) -> None:
+        """Poll the recording for the idle timeout and maximum duration."""
+        policy = self.auto_stop
+        while True:
+            await asyncio.sleep(policy.check_interval_seconds)
+            if self._active_recordings.get(guild_id) is not record:
+                return
+            now = time.monotonic()
+            if record.max_seconds and now - record.started_at >= record.max_seconds:
+                await self._auto_stop(guild_id, "max")
+                return
+            # TimelineWaveSink stamps every received frame (monotonic clock)
+            last = getattr(record.sink, "last_activity", None) or record.started_at
+            idle_for = now - max(last, record.started_at)
+            if policy.idle_timeout_seconds and idle_for >= policy.idle_timeout_seconds:
+                await self._auto_stop(guild_id, "idle")
+                return
+
+    async def _auto_stop(self, guild_id: int, reason: str) -> None:
+        record = await self._stop_recording(guild_id)
+        if record is None:
+            return
+        logger.info("Recording in guild %s stopped automatically (%s)", guild_id, reason)
+        text_channel = getattr(record, "text_channel", None)
+        if text_channel is None:
+            return
+        try:
+            await text_channel.send(msg(f"record_auto_stop_{reason}"))
+        except Exception:  # pragma: no cover
+            logger.warning("Failed to announce auto stop", exc_info=True)
+
+    # ---------------------------- shutdown --------------------------------
+    # Steps of the graceful shutdown in main.py (see utils.graceful_shutdown)
+
+    def stop_accepting(self) -> None:
+        """Refuse new recordings from now on."""
+        self._shutting_down = True
+
+    async def finalize_recordings(self) -> None:
+        """Stop every active recording; py-cord then starts their pipelines."""
+        for guild_id in list(self._active_recordings):
+            await self._auto_stop(guild_id, "shutdown")
+
+    async def drain(self) -> None:
+        """Wait until every stopped recording has been processed."""
+        while self._finishing or self._pipelines:
+            if self._pipelines:
+                await asyncio.wait(set(self._pipelines), timeout=0.5)
+            else:
+                await asyncio.sleep(0.1)
+
+    async def hand_off_unfinished(self) -> None:
+        """Cancel the pipelines still running; each hands its meeting off."""
+        if self._finishing:
+            logger.error("%d stopped recording(s) never reached processing", len(self._finishing))
+        tasks = list(self._pipelines)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            logger.warning("Handing off %d unfinished meeting(s)", len(tasks))
+            await asyncio.wait(tasks)
+
+    async def _hand_off(self, pipeline: SimpleNamespace) -> None:
+        """Persist a meeting interrupted by the shutdown for after the restart."""
+        guild_id = pipeline.guild_id
+        try:
+            queued = pipeline.job is not None and getattr(self.processing_service, "durable", False)
+            if pipeline.job is None:
+                export = pipeline.export
+                if export is None:
+                    if not getattr(pipeline.sink, "audio_data", None):
+                        return
+                    base_path, title = self._output_names(guild_id)
+                    export = self._export(pipeline.sink, pipeline.channel, guild_id, base_path, title)
+                pipeline.job = await export
+            if not queued:
+                # Already in the shared job queue otherwise; a worker finishes it
+                if self.job_delivery is None:
+                    logger.error("Meeting of guild %s was interrupted by the shutdown", guild_id)
+                    return
+                kind, args = pipeline.job
+                await self.job_delivery.hand_off(
+                    guild_id, getattr(pipeline.channel, "id", None), kind, args
+                )
+            await pipeline.channel.send(msg("record_handed_off"))
+        except Exception:
+            logger.error("Failed to hand off the meeting of guild %s", guild_id, exc_info=True)
+
+    def cog_unload(self):
+        for record in self._active_recordings.values():
+            for task in (getattr(record, "watcher", None), getattr(record, "empty_task", None)):
+                if task is not None:
+                    task.cancel()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    async def _stop_recording(self, guild_id: int) -> Optional[SimpleNamespace]:
+        """Stop the guild's recording; py-cord then calls ``_on_record_finished``."""
+        record = self._active_recordings.pop(guild_id, None)
+        if record is None:
+            return None
+
+        current = asyncio.current_task()
+        for task in (getattr(record, "watcher", None), getattr(record, "empty_task", None)):
+            if task is not None and task is not current:
+                task.cancel()
+
+        sink = getattr(record, "sink", None)
+        if sink is not None:
+            self._finishing.add(id(sink))
         voice_client: discord.VoiceClient = record.voice_client  # type: ignore[attr-defined]
         try:
             voice_client.stop_recording()
+        except Exception:  # pragma: no cover
+            # No callback will come for this sink
+            self._finishing.discard(id(sink))
+            logger.warning("Stopping the recording failed", exc_info=True)
+        try:
             await voice_client.disconnect()
         except Exception:  # pragma: no cover
             logger.warning("Voice disconnect failed", exc_info=True)
+        return record
 
-        # state cleanup
-        self._active_recordings.pop(guild_id, None)
-
-        await ctx.followup.send(msg("record_stop_done"))
-
-    # ------------------------------------------------------------------
-    # Internal helpers
-    # ------------------------------------------------------------------
+    async def _max_duration_seconds(self, guild_id: int) -> float:
+        """Return the guild's maximum recording duration (0 = unlimited)."""
+        default = self.auto_stop.max_duration_seconds
+        if self.db_service is None:
+            return default
+        try:
+            limits = await run_blocking(self.executors, DB, self.db_service.get_guild_limits, guild_id)
+        except Exception:
+            logger.warning("Failed to load recording limits for guild %s", guild_id, exc_info=True)
+            return default
+        minutes = (limits or {}).get("max_recording_minutes")
+        return minutes * 60 if minutes else default
 
     async def _on_record_finished(self, sink, channel, *args):  # noqa: D401
-        """Callback invoked by py-cord when recording is finished."""
-        guild_id = channel.guild.id if hasattr(channel, 'guild') and channel.guild else 0
+        """Callback invoked by py-cord when recording is finished.
 
+        ``args`` carries the meeting's root trace span from ``/record_start``.
+        """
+        trace = args[0] if args else None
+        guild_id = channel.guild.id if hasattr(channel, 'guild') and channel.guild else 0
+        self._finishing.discard(id(sink))
+        task = asyncio.current_task()
+        pipeline = SimpleNamespace(sink=sink, channel=channel, guild_id=guild_id, export=None, job=None)
+        self._pipelines[task] = pipeline
+        # Recorded on queued jobs so that the link survives a bot restart
+        reply_channel.set(getattr(channel, "id", None))
+        if self.memory_tracker is not None:
+            self.memory_tracker.track(self._memory_key(guild_id, sink), guild_id, sink)
+        if trace is not None:
+            self._record_recording_span(trace, sink)
+
+        error: Optional[BaseException] = None
         try:
-            # Disconnect from voice channel as per Pycord guide
-            if hasattr(sink, 'vc') and sink.vc:
-                await sink.vc.disconnect()
+            with use_span(trace):
+                # Disconnect from voice channel as per Pycord guide
+                if hasattr(sink, 'vc') and sink.vc:
+                    await sink.vc.disconnect()
             
-            if not sink.audio_data:
-                await channel.send("⚠️ 録音データがありませんでした。録音中にボイスチャンネルで話されていたか確認してください。")
-                return
-
-            # List recorded users
-            recorded_users = [
-                f"<@{user_id}>"
-                for user_id, audio in sink.audio_data.items()
-            ]
+                if not sink.audio_data:
+                    await channel.send("⚠️ 録音データがありませんでした。録音中にボイスチャンネルで話されていたか確認してください。")
+                    return
+
+                # List recorded users
+                recorded_users = [
+                    f"<@{user_id}>"
+                    for user_id, audio in sink.audio_data.items()
+                ]
             
-            # Check if we have actual audio content
-            total_size = 0
-            for user_id, audio in sink.audio_data.items():
-                if hasattr(audio, 'file'):
-                    audio.file.seek(0, 2)  # Seek to end
-                    size = audio.file.tell()
-                    audio.file.seek(0)  # Reset to beginning
-                    total_size += size
-                else:
-                    logger.warning(f"User {user_id} audio object has no 'file' attribute")
+                # Check if we have actual audio content
+                total_size = 0
+                for user_id, audio in sink.audio_data.items():
+                    if hasattr(audio, 'file'):
+                        audio.file.seek(0, 2)  # Seek to end
+                        size = audio.file.tell()
+                        audio.file.seek(0)  # Reset to beginning
+                        total_size += size
+                    else:
+                        logger.warning(f"User {user_id} audio object has no 'file' attribute")
             
-            if total_size == 0:
-                await channel.send("⚠️ 録音データが空でした。ボイスチャンネルでの音声が検出されませんでした。")
-                return
+                if total_size == 0:
+                    await channel.send("⚠️ 録音データが空でした。ボイスチャンネルでの音声が検出されませんでした。")
+                    return
 
-            await channel.send(f"🎤 録音を検出しました: {', '.join(recorded_users)}. 処理を開始します...")
+                await channel.send(f"🎤 録音を検出しました: {', '.join(recorded_users)}. 処理を開始します...")
 
-            # Generate output path
-            timestamp = _dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-            base_path = TEMP_DIR / f"recording_{guild_id}_{timestamp}"
-            
-            # Delegate to AudioService (runs in thread) – returns .ogg path
-            out_path_str = await self.audio_service.mix_and_export(
+                # Wait for one of the guild's processing slots (admission control)
+                async with contextlib.AsyncExitStack() as stack:
+                    with span("admission.wait"):
+                        await stack.enter_async_context(self._job_slot(guild_id))
+                    url = await self._process_recording(sink, channel, guild_id)
+
+                await channel.send(f"✅ 議事録を作成しました: {url}")
+
+        except asyncio.CancelledError as exc:
+            if self._shutting_down:
+                error = exc
+                await self._hand_off(pipeline)
+            raise
+        except Exception as exc:  # pragma: no cover
+            error = exc
+            logger.error("Processing failed: %s", exc, exc_info=True)
+            await channel.send("❌ 議事録の作成に失敗しました。")
+        finally:
+            self._pipelines.pop(task, None)
+            # Nothing may keep the meeting's PCM alive past this point
+            self._release_buffers(guild_id, sink)
+            detach_sink(sink)
+            if self.memory_tracker is not None:
+                self.memory_tracker.complete(self._memory_key(guild_id, sink))
+            if trace is not None:
+                trace.end(error)
+
+    async def _process_recording(self, sink, channel, guild_id: int) -> str:
+        """Mix / export the recorded audio and return the minutes URL."""
+        base_path, title = self._output_names(guild_id)
+        async with self._profile(guild_id, base_path):
+            return await self._mix_and_process(sink, channel, guild_id, base_path, title)
+
+    @staticmethod
+    def _output_names(guild_id: int) -> tuple[Path, str]:
+        """Return the export base path and the document title of a meeting."""
+        now = _dt.datetime.now()
+        base_path = TEMP_DIR / f"recording_{guild_id}_{now.strftime('%Y%m%d_%H%M%S')}"
+        return base_path, f"Meeting Minutes {now.strftime('%Y-%m-%d %H:%M')}"
+
+    async def _mix_and_process(self, sink, channel, guild_id: int, base_path: Path, title: str) -> str:
+        export = asyncio.ensure_future(self._export(sink, channel, guild_id, base_path, title))
+        pipeline = self._pipelines.get(asyncio.current_task())
+        if pipeline is not None:
+            pipeline.export = export
+        # A shutdown must not interrupt writing the audio (see _hand_off)
+        kind, args = await asyncio.shield(export)
+        if pipeline is not None:
+            # From here on the meeting can be handed off without the sink
+            pipeline.job = (kind, args)
+        if kind == PROCESS_SPEAKERS:
+            return await self.processing_service.process_speakers(
+                guild_id,
+                args["track_paths"],
+                args["speaker_names"],
+                args["title"],
+                timeline=args["timeline"],
+            )
+        return await self.processing_service.process(guild_id, args["audio_file_path"], args["title"])
+
+    async def _export(
+        self, sink, channel, guild_id: int, base_path: Path, title: str
+    ) -> tuple[str, Dict[str, Any]]:
+        """Write the recording to disk; returns the processing job (kind, args)."""
+        timeline = getattr(sink, "timeline", None)
+        if self.transcript_mode == MODE_PER_SPEAKER:
+            # One file per speaker, transcribed concurrently – no mixing
+            track_paths = await self.audio_service.export_tracks(
                 sink.audio_data,
                 sink.encoding,
                 base_path.as_posix(),
             )
+            self._release_buffers(guild_id, sink)
+            speaker_names = {
+                user_id: self._display_name(channel, user_id) for user_id in track_paths
+            }
+            return PROCESS_SPEAKERS, {
+                "track_paths": track_paths,
+                "speaker_names": speaker_names,
+                "title": title,
+                "timeline": timeline,
+            }
+
+        # Delegate to AudioService (runs in thread) – returns .ogg path
+        out_path_str = await self.audio_service.mix_and_export(
+            sink.audio_data,
+            sink.encoding,
+            base_path.as_posix(),
+            timeline=timeline,
+        )
+        # The encoded file is all that is needed from here on
+        self._release_buffers(guild_id, sink)
+        return PROCESS, {"audio_file_path": out_path_str, "title": title}
+
+    @staticmethod
+    def _record_recording_span(trace, sink) -> None:
+        """Add the recording itself (``/record_start`` → stop) to the trace."""
+        recording = trace.tracer.start_span(
+            "discord.recording", trace, speakers=len(getattr(sink, "audio_data", None) or {})
+        )
+        recording.start_ns = trace.start_ns
+        recording.end()
 
-            # Invoke ProcessingService
-            title = f"Meeting Minutes {_dt.datetime.now().strftime('%Y-%m-%d %H:%M')}"
-            url = await self.processing_service.process(guild_id, out_path_str, title)
-
-            await channel.send(f"✅ 議事録を作成しました: {url}")
+    @staticmethod
+    def _memory_key(guild_id: int, sink) -> str:
+        return f"{guild_id}:{id(sink):x}"
 
-        except Exception as exc:  # pragma: no cover
-            logger.error("Processing failed: %s", exc, exc_info=True)
-            await channel.send("❌ 議事録の作成に失敗しました。")
+    def _release_buffers(self, guild_id: int, sink) -> None:
+        """Free the sink's PCM buffers (idempotent)."""
+        if self.memory_tracker is None:
+            release_buffers(sink)
+            return
+        self.memory_tracker.release(self._memory_key(guild_id, sink), sink)
+
+    def _profile(self, guild_id: int, base_path: Path):
+        """Profile this job if an admin armed it (see ProfilingService)."""
+        if self.profiling_service is None:
+            return contextlib.nullcontext()
+        return self.profiling_service.job(guild_id, base_path)
+
+    def _job_slot(self, guild_id: int):
+        if self.admission_service is None:
+            return contextlib.nullcontext()
+        return self.admission_service.job_slot(guild_id)
+
+    def _live_bytes(self) -> int:
+        """Return the PCM bytes currently buffered by all active sinks."""
+        total = 0
+        for record in list(self._active_recordings.values()):
+            audio_data = getattr(record.sink, "audio_data", None) or {}
+            # Sinks keep writing at the end, so tell() is the buffer size
+            total += sum(audio.file.tell() for audio in list(audio_data.values()))
+        return total
+
+    def recordings_by_shard(self) -> Dict[Optional[int], int]:
+        """Return the number of active recordings per gateway shard."""
+        counts: Dict[Optional[int], int] = {}
+        for record in list(self._active_recordings.values()):
+            shard_id = getattr(record, "shard_id", None)
+            counts[shard_id] = counts.get(shard_id, 0) + 1
+        return counts
+
+    @staticmethod
+    def _display_name(channel, user_id: int) -> str:
+        """Return the guild display name of *user_id*, or a fallback label."""
+        guild = getattr(channel, "guild", None)
+        member = guild.get_member(user_id) if guild else None
+        name = getattr(member, "display_name", None)
+        return name if isinstance(name, str) and name else f"User {user_id}"
 
 
 def setup(bot: commands.Bot):  # pragma: no cover
     """Required by bot.load_extension to add the cog."""
     processing_service = bot.container.processing_service
     audio_service = bot.container.audio_service
-    bot.add_cog(RecordingCog(processing_service, audio_service)) 
\ No newline at end of file
+    transcript_mode = getattr(bot.container, "transcript_mode", None) or MODE_MIXED
+    auto_stop = getattr(bot.container, "auto_stop_policy", None)
+    db_service = getattr(bot.container, "db_service", None)
+    admission_service = getattr(bot.container, "admission_service", None)
+    profiling_service = getattr(bot.container, "profiling_service", None)
+    memory_tracker = getattr(bot.container, "memory_tracker", None)
+    tracer = getattr(bot.container, "tracer", None)
+    job_delivery = getattr(bot.container, "job_delivery", None)
+    executors = getattr(bot.container, "executors", None)
+    bot.add_cog(
+        RecordingCog(
+            processing_service,
+            audio_service,
+            transcript_mode,
+            auto_stop,
+            db_service,
+            admission_service,
+            profiling_service,
+            memory_tracker,
+            tracer,
+            job_delivery,
+            executors,
+        )
+    ) 
\ No newline at end of file
@@ -94,6 +94,67 @@ class SetupCog(commands.Cog):
             )
             await ctx.followup.send(content=error_message)
 
+    @discord.slash_command(
+        name="recording_limits",
+        description="このサーバーの録音の最大時間と議事録の同時作成数を設定します。管理者のみが実行できます。",
+        default_member_permissions=discord.Permissions(administrator=True)
+    )
+    async def recording_limits(
+        self,
+        ctx: discord.ApplicationContext,
+        max_minutes: int | None = Option(
+            int,
+            description="1回の録音の最大時間（分）。未入力の場合はボット既定値に戻します",
+            required=False,
+            default=None,
+            min_value=1,
+            max_value=24 * 60,
+        ),  # type: ignore[arg-type]
+        max_jobs: int | None = Option(
+            int,
+            description="同時に作成する議事録の数。未入力の場合はボット既定値に戻します",
+            required=False,
+            default=None,
+            min_value=1,
+            max_value=10,
+        ),  # type: ignore[arg-type]
+    ):
+        """
+        録音の最大時間と議事録の同時作成数をサーバーごとに保存するSlash Command。
+        上限に達した録音は自動で停止され、議事録作成が始まる。
+        同時作成数を超えた議事録は順番待ちになる。
+        """
+        await ctx.defer(ephemeral=True)
+
+        if not ctx.guild:
+            await ctx.followup.send(content=msg("guild_only"))
+            return
+
+        guild_id = ctx.guild.id
+        if not self.db_service.get_server_settings(guild_id):
+            await ctx.followup.send(content=msg("need_setup"))
+            return
+
+        try:
+            self.db_service.upsert_guild_limits(guild_id, max_minutes, max_jobs)
+        except Exception as e:
+            logger.error(f"Failed to save recording limits for guild {guild_id}: {e}", exc_info=True)
+            await ctx.followup.send(content="❌ 録音上限の保存に失敗しました。")
+            return
+
+        minutes = f"{max_minutes} 分" if max_minutes else "ボット既定値"
+        jobs = f"{max_jobs} 件" if max_jobs else "ボット既定値"
+        await ctx.followup.send(
+            content=(
+                "✅ 録音上限を設定しました。\n"
+                f"・録音の最大時間: `{minutes}`\n"
+                f"・議事録の同時作成数: `{jobs}`"
+            )
+        )
+        logger.info(
+            f"Recording limits saved for guild {guild_id}: max_minutes={max_minutes} max_jobs={max_jobs}"
+        )
+
 def setup(bot: commands.Bot):
     """Setup function required by `bot.load_extension`."""
     db_service = bot.container.db_service
@@ -1,8 +1,11 @@
 import logging
+from typing import Optional
 
 import discord
+from discord.commands import Option
 from discord.ext import commands
 
+from services.profiling_service import ProfilingService
 from services.readiness_service import ReadinessService, ReadinessLevel
 from utils.messages import msg
 
@@ -17,10 +20,18 @@ class StatusCog(commands.Cog):
     2. Google OAuth credentials are present
 
     The command responds *ephemerally* so only the invoker sees the result.
+
+    ``/profile_next`` arms profiling of the guild's next N minutes jobs
+    (see :class:`ProfilingService`).
     """
 
-    def __init__(self, readiness_service: ReadinessService):
+    def __init__(
+        self,
+        readiness_service: ReadinessService,
+        profiling_service: Optional[ProfilingService] = None,
+    ):
         self._readiness_service = readiness_service
+        self._profiling_service = profiling_service
 
     # ------------------------------------------------------------------
     @discord.slash_command(
@@ -52,6 +63,40 @@ class StatusCog(commands.Cog):
 
         await ctx.followup.send(content="\n".join(lines))
 
+    # ------------------------------------------------------------------
+    @discord.slash_command(
+        name="profile_next",
+        description="次の N 件の議事録作成の処理時間をプロファイルします (管理者専用)",
+        default_member_permissions=discord.Permissions(administrator=True),
+    )
+    async def profile_next(
+        self,
+        ctx: discord.ApplicationContext,
+        jobs: int = Option(
+            int,
+            description="プロファイルするジョブ数 (0 で取り消し)",
+            default=1,
+            min_value=0,
+            max_value=20,
+        ),  # type: ignore[assignment]
+    ):
+        """Arm profiling for the next *jobs* jobs of this guild."""
+        await ctx.defer(ephemeral=True)
+
+        if not ctx.guild:
+            await ctx.followup.send(content=msg("guild_only"))
+            return
+        if self._profiling_service is None:
+            await ctx.followup.send(content=msg("profile_unavailable"))
+            return
+
+        armed = self._profiling_service.arm(ctx.guild.id, jobs)
+        logger.info("Profiling armed for guild %s: next %d job(s) by user %s", ctx.guild.id, armed, ctx.author.id)
+        if armed:
+            await ctx.followup.send(content=msg("profile_armed").format(jobs=armed))
+        else:
+            await ctx.followup.send(content=msg("profile_disarmed"))
+
 
 # ----------------------------------------------------------------------
 # Extension entry-point
@@ -59,4 +104,5 @@ class StatusCog(commands.Cog):
 
 def setup(bot: commands.Bot):  # pragma: no cover
     readiness_service = bot.container.readiness_service
-    bot.add_cog(StatusCog(readiness_service)) 
\ No newline at end of file
+    profiling_service = getattr(bot.container, "profiling_service", None)
+    bot.add_cog(StatusCog(readiness_service, profiling_service))
@@ -22,6 +22,33 @@ class _Container(SimpleNamespace):
     transcription_service: Optional[Any] = None
     processing_service: Optional[Any] = None
     audio_service: Optional[Any] = None
+    # Workload-isolated thread pools (utils.executors.ExecutorRegistry)
+    executors: Optional[Any] = None
+    # Optional worker processes for audio jobs (utils.audio_process_pool)
+    audio_process_pool: Optional[Any] = None
+    # "mixed" (default) or "per_speaker" – see cogs.recording_cog
+    transcript_mode: Optional[str] = None
+    # cogs.recording_cog.AutoStopPolicy for unattended recordings
+    auto_stop_policy: Optional[Any] = None
+    # services.admission_service.AdmissionService for /record_start
+    admission_service: Optional[Any] = None
+    # services.processing_scheduler.ProcessingScheduler (fair-share queues)
+    processing_scheduler: Optional[Any] = None
+    # name -> utils.rate_limiter.RateLimiter shared by all guilds
+    openai_rate_limiters: Optional[Any] = None
+    # Job queue side of this process for --role bot / worker
+    # (QueuedProcessingService or JobWorker; all-in-one: the JobWorker
+    # resuming meetings handed off by a shutdown) and the shared
+    # data.job_queue.JobQueue itself (every role)
+    jobs: Optional[Any] = None
+    job_queue: Optional[Any] = None
+    # services.job_delivery.JobDeliveryService (meetings handed off across
+    # restarts) and the utils.graceful_shutdown.GracefulShutdown of the bot
+    job_delivery: Optional[Any] = None
+    shutdown: Optional[Any] = None
+    # Running discord Bot / AutoShardedBot and its utils.sharding.ShardConfig
+    bot: Optional[Any] = None
+    shard_config: Optional[Any] = None
 
 
 # Global, import-time singleton – *never* re-assigned, only mutated.
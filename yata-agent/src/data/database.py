@@ -27,10 +27,27 @@ def init_db(connection: sqlite3.Connection):
             FOREIGN KEY (guild_id) REFERENCES servers (guild_id) ON DELETE CASCADE
         );
     """)
+    # サーバーごとの録音上限テーブル（NULL はグローバル既定値を使用）
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS guild_limits (
+            guild_id INTEGER PRIMARY KEY,
+            max_recording_minutes INTEGER,
+            max_concurrent_jobs INTEGER,
+            FOREIGN KEY (guild_id) REFERENCES servers (guild_id) ON DELETE CASCADE
+        );
+    """)
+    _ensure_column(cursor, "guild_limits", "max_concurrent_jobs", "INTEGER")
     connection.commit()
     # この関数は接続を閉じない
 
 
+def _ensure_column(cursor: sqlite3.Cursor, table: str, column: str, decl: str) -> None:
+    """既存DBに後から追加されたカラムが無ければ追加します。"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
 class Database(DatabaseInterface):
     """
     SQLiteデータベースとの対話を担当する具象クラス。
@@ -126,8 +143,27 @@ class Database(DatabaseInterface):
         """
         self._execute_query(query, (guild_id, token_json))
 
+    def get_guild_limits(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        query = "SELECT * FROM guild_limits WHERE guild_id = ?"
+        return self._fetch_one(query, (guild_id,))
+
+    def upsert_guild_limits(
+        self,
+        guild_id: int,
+        max_recording_minutes: Optional[int],
+        max_concurrent_jobs: Optional[int] = None,
+    ) -> None:
+        query = """
+            INSERT INTO guild_limits (guild_id, max_recording_minutes, max_concurrent_jobs)
+            VALUES (?, ?, ?)
+            ON CONFLICT(guild_id) DO UPDATE SET
+                max_recording_minutes = excluded.max_recording_minutes,
+                max_concurrent_jobs = excluded.max_concurrent_jobs
+        """
+        self._execute_query(query, (guild_id, max_recording_minutes, max_concurrent_jobs))
+
     def delete_server_data(self, guild_id: int) -> None:
-        # ON DELETE CASCADEにより、serversから削除すればcredentialsも削除される
+        # ON DELETE CASCADEにより、serversから削除すればcredentials・guild_limitsも削除される
         query = "DELETE FROM servers WHERE guild_id = ?"
         self._execute_query(query, (guild_id,))
 
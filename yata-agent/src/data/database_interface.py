@@ -68,10 +68,43 @@ class DatabaseInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_guild_limits(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        """
+        指定されたサーバーの録音上限設定を取得します。
+
+        Args:
+            guild_id (int): DiscordサーバーのID。
+
+        Returns:
+            Optional[Dict[str, Any]]: ``max_recording_minutes`` / ``max_concurrent_jobs`` を含む辞書。
+                                      未設定の場合はNone。
+        """
+        pass
+
+    @abstractmethod
+    def upsert_guild_limits(
+        self,
+        guild_id: int,
+        max_recording_minutes: Optional[int],
+        max_concurrent_jobs: Optional[int] = None,
+    ) -> None:
+        """
+        サーバーの録音上限設定を登録または更新（Upsert）します。
+
+        Args:
+            guild_id (int): DiscordサーバーのID。
+            max_recording_minutes (Optional[int]): 1回の録音の最大時間（分）。
+                                                   Noneの場合はグローバル既定値を使用。
+            max_concurrent_jobs (Optional[int]): 同時に処理する議事録ジョブ数の上限。
+                                                 Noneの場合はグローバル既定値を使用。
+        """
+        pass
+
     @abstractmethod
     def delete_server_data(self, guild_id: int) -> None:
         """
-        指定されたサーバーに関連するすべてのデータ（設定、認証情報）を削除します。
+        指定されたサーバーに関連するすべてのデータ（設定、認証情報、録音上限）を削除します。
 
         Args:
             guild_id (int): DiscordサーバーのID。
@@ -0,0 +1,309 @@
+"""プロセス間で共有する SQLite のジョブキュー。
+
+``main.py --role bot`` は議事録化ジョブをここに積み、``--role worker`` の
+プロセス (同じホストで N 個) が取り出して処理する。SQLite が唯一の
+正となる状態で、IPC (:mod:`utils.ipc`) は到着・完了を早く知らせるため
+だけに使う。IPC が切れていてもポーリングで処理は進む。
+
+* 取り出し (:meth:`JobQueue.claim`) は ``BEGIN IMMEDIATE`` の中で行うため、
+  複数のワーカーが同じジョブを取ることはない。実行中のジョブが少ない
+  サーバーのジョブを優先し、同数なら古い順に取り出す。
+* ワーカーは定期的にハートビートを書く。途絶えたワーカーの実行中ジョブは
+  :meth:`JobQueue.requeue_stale` でキューに戻る。
+* ``channel_id`` のあるジョブは、結果をそのチャンネルに投稿する。待っていた
+  ボットが先に終了 (デプロイなど) した場合は、次に起動したボットが
+  :class:`services.job_delivery.JobDeliveryService` で投稿する。
+  ``delivered_at`` が投稿済みの印で、:meth:`JobQueue.claim_delivery` で
+  1 回だけ付く。
+* ジョブの引数は pickle で保存する (話者別の処理は ``SparseTimeline`` を
+  含むため)。同じホストの同じユーザーだけが読み書きするローカルの
+  キューであることが前提。
+"""
+from __future__ import annotations
+
+import pickle
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# 完了・失敗したジョブを残しておく秒数
+_RETENTION_SECONDS = 7 * 24 * 3600
+# ワーカーごと落とすジョブを何度まで再試行するか
+_MAX_ATTEMPTS = 3
+
+
+def _init_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            result TEXT,
+            error TEXT,
+            worker TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            enqueued_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            channel_id INTEGER,
+            delivered_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+        CREATE TABLE IF NOT EXISTS workers (
+            worker TEXT PRIMARY KEY,
+            heartbeat_at REAL NOT NULL
+        );
+        """
+    )
+    # 後から追加したカラム (既存のキューファイル向け)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)").fetchall()}
+    for column, decl in (("channel_id", "INTEGER"), ("delivered_at", "REAL")):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {decl}")
+
+
+@dataclass
+class Job:
+    """キューの 1 行。``args`` は処理関数のキーワード引数。"""
+
+    id: int
+    guild_id: int
+    kind: str
+    args: Dict[str, Any]
+    status: str
+    result: Optional[str] = None
+    error: Optional[str] = None
+    worker: Optional[str] = None
+    attempts: int = 0
+    enqueued_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    channel_id: Optional[int] = None
+    delivered_at: Optional[float] = None
+
+    @classmethod
+    def _from_row(cls, row: sqlite3.Row) -> "Job":
+        fields = dict(row)
+        fields["args"] = pickle.loads(fields.pop("payload"))
+        return cls(**fields)
+
+
+class JobQueue:
+    """SQLite ファイル上の永続ジョブキュー (複数プロセスから利用可)。"""
+
+    def __init__(self, db_path: str, busy_timeout: float = 10.0):
+        """
+        Args:
+            db_path (str): SQLite ファイルのパス。``Database`` と同じファイルでよい。
+            busy_timeout (float): 他プロセスの書き込みを待つ最大秒数。
+        """
+        self.db_path = db_path
+        # 接続は 1 本を DB 用スレッドプールから共有するため、ロックで直列化する
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(
+            db_path, timeout=busy_timeout, check_same_thread=False, isolation_level=None
+        )
+        self.conn.row_factory = sqlite3.Row
+        if db_path != ":memory:":
+            # 読み手 (ボット) と書き手 (ワーカー) が互いを待たないようにする
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        _init_schema(self.conn)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    # ------------------------------------------------------------------
+    # 投入側 (bot)
+    # ------------------------------------------------------------------
+    def enqueue(
+        self, guild_id: int, kind: str, args: Dict[str, Any], channel_id: Optional[int] = None
+    ) -> int:
+        """ジョブを積み、その ID を返す。
+
+        ``channel_id`` は結果を投稿する Discord のチャンネル。
+        """
+        with self._lock:
+            cursor = self.conn.execute(
+                "INSERT INTO jobs (guild_id, kind, payload, enqueued_at, channel_id) VALUES (?, ?, ?, ?, ?)",
+                (guild_id, kind, pickle.dumps(args), time.time(), channel_id),
+            )
+            return int(cursor.lastrowid)
+
+    def get(self, job_id: int) -> Optional[Job]:
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job._from_row(row) if row else None
+
+    def finished(self, job_ids: List[int]) -> List[Job]:
+        """指定したジョブのうち完了または失敗したものを返す。"""
+        if not job_ids:
+            return []
+        marks = ",".join("?" * len(job_ids))
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT * FROM jobs WHERE id IN ({marks}) AND status IN (?, ?)",
+                (*job_ids, DONE, FAILED),
+            ).fetchall()
+        return [Job._from_row(row) for row in rows]
+
+    def undelivered(self, limit: int = 50) -> List[Job]:
+        """完了または失敗したが、結果をまだチャンネルに投稿していないジョブ。"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM jobs WHERE channel_id IS NOT NULL AND delivered_at IS NULL "
+                "AND status IN (?, ?) ORDER BY id LIMIT ?",
+                (DONE, FAILED, limit),
+            ).fetchall()
+        return [Job._from_row(row) for row in rows]
+
+    def claim_delivery(self, job_id: int) -> bool:
+        """結果の投稿を引き受ける。すでに誰かが引き受けていれば False。"""
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET delivered_at = ? WHERE id = ? AND delivered_at IS NULL",
+                (time.time(), job_id),
+            )
+        return cursor.rowcount == 1
+
+    # ------------------------------------------------------------------
+    # 処理側 (worker)
+    # ------------------------------------------------------------------
+    def claim(self, worker: str) -> Optional[Job]:
+        """次のジョブを取り出して実行中にする。なければ None。"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    """
+                    SELECT q.id FROM jobs AS q
+                    WHERE q.status = ?
+                    ORDER BY (
+                        SELECT COUNT(*) FROM jobs AS r
+                        WHERE r.guild_id = q.guild_id AND r.status = ?
+                    ), q.id
+                    LIMIT 1
+                    """,
+                    (QUEUED, RUNNING),
+                ).fetchone()
+                if row is None:
+                    self.conn.execute("COMMIT")
+                    return None
+                self.conn.execute(
+                    """
+                    UPDATE jobs SET status = ?, worker = ?, started_at = ?, attempts = attempts + 1
+                    WHERE id = ?
+                    """,
+                    (RUNNING, worker, now, row["id"]),
+                )
+                job = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return Job._from_row(job)
+
+    def complete(self, job_id: int, result: str) -> None:
+        self._finish(job_id, DONE, result=result)
+
+    def fail(self, job_id: int, error: str) -> None:
+        self._finish(job_id, FAILED, error=error)
+
+    def release(self, job_id: int) -> None:
+        """実行中のジョブを処理せずにキューへ戻す (ワーカーの停止時など)。
+
+        正常な停止による中断は再試行回数に数えない。
+        """
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, started_at = NULL, "
+                "attempts = MAX(attempts - 1, 0) WHERE id = ? AND status = ?",
+                (QUEUED, job_id, RUNNING),
+            )
+
+    def _finish(self, job_id: int, status: str, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id),
+            )
+
+    def heartbeat(self, worker: str) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO workers (worker, heartbeat_at) VALUES (?, ?) "
+                "ON CONFLICT(worker) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+                (worker, time.time()),
+            )
+
+    def retire(self, worker: str) -> None:
+        """停止するワーカーを一覧から外す。"""
+        with self._lock:
+            self.conn.execute("DELETE FROM workers WHERE worker = ?", (worker,))
+
+    def requeue_stale(self, timeout: float) -> int:
+        """ハートビートが ``timeout`` 秒以上途絶えたワーカーのジョブを戻す。
+
+        ``_MAX_ATTEMPTS`` 回取り出されたジョブは (処理中にワーカーを落とす
+        入力とみなして) 失敗にする。あわせて保持期間を過ぎた完了済みジョブを
+        削除する。キューに戻した件数を返す。
+        """
+        now = time.time()
+        stale = (
+            "status = ? AND (worker IS NULL OR worker NOT IN "
+            "(SELECT worker FROM workers WHERE heartbeat_at >= ?))"
+        )
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    f"UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE {stale} AND attempts >= ?",
+                    (FAILED, "worker lost", now, RUNNING, now - timeout, _MAX_ATTEMPTS),
+                )
+                cursor = self.conn.execute(
+                    f"UPDATE jobs SET status = ?, worker = NULL, started_at = NULL WHERE {stale}",
+                    (QUEUED, RUNNING, now - timeout),
+                )
+                self.conn.execute("DELETE FROM workers WHERE heartbeat_at < ?", (now - timeout,))
+                self.conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                    (DONE, FAILED, now - _RETENTION_SECONDS),
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount
+
+    # ------------------------------------------------------------------
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(
+                self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+            )
+            oldest = self.conn.execute(
+                "SELECT MIN(enqueued_at) FROM jobs WHERE status = ?", (QUEUED,)
+            ).fetchone()[0]
+            workers = self.conn.execute("SELECT COUNT(*) FROM workers").fetchone()[0]
+        return {
+            "queued": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+            "done": counts.get(DONE, 0),
+            "failed": counts.get(FAILED, 0),
+            "oldest_queued_seconds": round(time.time() - oldest, 1) if oldest else 0.0,
+            "workers": workers,
+        }
+
+
+__all__ = ["DONE", "FAILED", "Job", "JobQueue", "QUEUED", "RUNNING"]
@@ -0,0 +1,4 @@
+"""Load-testing tools: synthetic recordings, fake dependencies and a harness.
+
+Run ``python -m loadtest --help`` from ``src/``.
+"""
@@ -0,0 +1,63 @@
+"""Command-line entry point: ``python -m loadtest`` (run from ``src/``)."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import shutil
+import sys
+
+from cogs.recording_cog import MODE_MIXED, MODE_PER_SPEAKER
+from loadtest.fakes import parse_latency
+from loadtest.harness import LoadTestConfig, format_report, run_load_test
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest",
+        description="Simulate concurrent meetings against fake OpenAI / Google services.",
+    )
+    parser.add_argument("--guilds", type=int, default=10)
+    parser.add_argument("--speakers", type=int, default=4)
+    parser.add_argument("--meeting-seconds", type=float, default=60.0)
+    parser.add_argument("--ramp-seconds", type=float, default=0.0)
+    parser.add_argument("--mode", choices=(MODE_MIXED, MODE_PER_SPEAKER), default=MODE_MIXED)
+    parser.add_argument("--concurrency", type=int, default=2, help="scheduler concurrency")
+    parser.add_argument("--publish-raw-first", action="store_true")
+    parser.add_argument("--transcription", type=parse_latency, default="2,6,0,0.02",
+                        help="median,p95[,error_rate[,per_audio_second]]")
+    parser.add_argument("--formatting", type=parse_latency, default="4,12")
+    parser.add_argument("--google", type=parse_latency, default="0.8,2")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    if shutil.which("ffmpeg") is None:
+        print("ffmpeg is required (AudioService encodes with it)", file=sys.stderr)
+        return 2
+
+    config = LoadTestConfig(
+        guilds=args.guilds,
+        speakers=args.speakers,
+        meeting_seconds=args.meeting_seconds,
+        ramp_seconds=args.ramp_seconds,
+        transcript_mode=args.mode,
+        scheduler_concurrency=args.concurrency,
+        publish_raw_first=args.publish_raw_first,
+        transcription=args.transcription,
+        formatting=args.formatting,
+        google=args.google,
+        seed=args.seed,
+    )
+    report = asyncio.run(run_load_test(config))
+    print(json.dumps(report, indent=2, ensure_ascii=False) if args.json else format_report(report))
+    return 0 if not report["failed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
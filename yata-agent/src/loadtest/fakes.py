@@ -0,0 +1,207 @@
+"""In-process stand-ins for OpenAI and Google used by the load test.
+
+Each stand-in draws its latency from a :class:`LatencyModel` (log-normal,
+parameterised by median and p95) and fails with a configurable
+probability, so the pipeline sees realistic tails and error paths without
+network access or API spend.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from services.google_service_interface import GoogleServiceInterface
+from services.transcription_service_interface import (
+    TranscriptionServiceInterface,
+    TranscriptSegment,
+)
+from utils.audio_duration import estimate_audio_seconds
+
+# z-score of the 95th percentile of a standard normal distribution
+_Z95 = 1.6448536269514722
+
+
+class FakeServiceError(Exception):
+    """Injected failure of a fake dependency."""
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Log-normal latency with the given median / p95 and error rate."""
+
+    median: float = 0.5
+    p95: float = 1.5
+    error_rate: float = 0.0
+    # Additional seconds per second of audio (e.g. Whisper ~ 0.05x realtime)
+    per_audio_second: float = 0.0
+
+    def sample(self, rng: np.random.Generator, audio_seconds: float = 0.0) -> float:
+        base = 0.0
+        if self.median > 0:
+            sigma = max(0.0, math.log(max(self.p95, self.median) / self.median) / _Z95)
+            base = float(rng.lognormal(math.log(self.median), sigma))
+        return base + self.per_audio_second * audio_seconds
+
+    def fails(self, rng: np.random.Generator) -> bool:
+        return self.error_rate > 0 and float(rng.random()) < self.error_rate
+
+
+def parse_latency(spec: str) -> LatencyModel:
+    """Parse ``median,p95[,error_rate[,per_audio_second]]`` (seconds)."""
+    try:
+        parts = [float(p) for p in spec.split(",")]
+    except ValueError:
+        parts = []
+    if not 2 <= len(parts) <= 4:
+        raise argparse.ArgumentTypeError("expected median,p95[,error_rate[,per_audio_second]]")
+    return LatencyModel(*parts)
+
+
+class _Sampler:
+    """Thread-safe access to one RNG (fakes run on the loop and in threads)."""
+
+    def __init__(self, model: LatencyModel, seed: Optional[int]) -> None:
+        self.model = model
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def draw(self, audio_seconds: float = 0.0) -> tuple[float, bool]:
+        with self._lock:
+            self.calls += 1
+            delay = self.model.sample(self._rng, audio_seconds)
+            failed = self.model.fails(self._rng)
+            if failed:
+                self.errors += 1
+            return delay, failed
+
+
+class FakeTranscriptionService(TranscriptionServiceInterface):
+    """Whisper stand-in: sleeps, then returns filler text sized to the audio."""
+
+    def __init__(self, model: LatencyModel, seed: Optional[int] = None) -> None:
+        self._sampler = _Sampler(model, seed)
+
+    async def _simulate(self, audio_file_path: str) -> float:
+        if not os.path.exists(audio_file_path):
+            raise FileNotFoundError(f"Audio file not found at path: {audio_file_path}")
+        audio_seconds = estimate_audio_seconds([audio_file_path])
+        delay, failed = self._sampler.draw(audio_seconds)
+        await asyncio.sleep(delay)
+        if failed:
+            raise FakeServiceError("injected transcription failure")
+        return audio_seconds
+
+    async def transcribe(self, audio_file_path: str, language: str) -> str:
+        audio_seconds = await self._simulate(audio_file_path)
+        return "これはテスト用の書き起こしです。" * max(1, int(audio_seconds / 3))
+
+    async def transcribe_segments(self, audio_file_path: str, language: str) -> List[TranscriptSegment]:
+        audio_seconds = await self._simulate(audio_file_path)
+        step = 5.0
+        return [
+            TranscriptSegment(start, min(start + step, audio_seconds), "テスト発言です。")
+            for start in np.arange(0.0, max(audio_seconds, step), step)
+        ]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"calls": self._sampler.calls, "errors": self._sampler.errors}
+
+
+class FakeFormatter:
+    """Chat-completions stand-in with ``format_meeting_minutes``'s signature.
+
+    Runs in a worker thread like the real formatter, so it blocks with
+    ``time.sleep``; failures return ``None`` (the real formatter's
+    contract), making the pipeline fall back to the raw transcript.
+    """
+
+    def __init__(self, model: LatencyModel, seed: Optional[int] = None) -> None:
+        self._sampler = _Sampler(model, seed)
+
+    def __call__(self, transcript: str, **_: Any) -> Optional[str]:
+        delay, failed = self._sampler.draw()
+        time.sleep(delay)
+        if failed:
+            return None
+        return "# 議事録\n\n" + transcript[:2000]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"calls": self._sampler.calls, "errors": self._sampler.errors}
+
+
+class FakeGoogleService(GoogleServiceInterface):
+    """Google Docs stand-in that keeps created documents in memory."""
+
+    def __init__(self, model: LatencyModel, seed: Optional[int] = None) -> None:
+        self._sampler = _Sampler(model, seed)
+        self.documents: Dict[str, str] = {}
+
+    async def get_authentication_url(self, state: str) -> str:
+        return f"https://accounts.example.invalid/auth?state={state}"
+
+    async def exchange_code_for_credentials(self, guild_id: int, code: str) -> None:
+        return None
+
+    async def _simulate(self) -> None:
+        delay, failed = self._sampler.draw()
+        await asyncio.sleep(delay)
+        if failed:
+            raise FakeServiceError("injected Google API failure")
+
+    async def upload_document(self, guild_id: int, title: str, content: str) -> str:
+        await self._simulate()
+        doc_id = uuid.uuid4().hex
+        self.documents[doc_id] = content
+        return f"https://docs.google.com/document/d/{doc_id}/edit"
+
+    async def update_document(
+        self,
+        guild_id: int,
+        document_url: str,
+        content: str,
+        previous_content: Optional[str] = None,
+    ) -> None:
+        await self._simulate()
+        self.documents[document_url.split("/d/")[-1].split("/")[0]] = content
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "calls": self._sampler.calls,
+            "errors": self._sampler.errors,
+            "documents": len(self.documents),
+        }
+
+
+class FakeDatabaseService:
+    """Returns fixed server settings for every guild."""
+
+    def __init__(self, language: str = "ja") -> None:
+        self._settings = {"language": language, "gdrive_folder_id": None}
+
+    def get_server_settings(self, guild_id: int) -> Dict[str, Any]:
+        return dict(self._settings, guild_id=guild_id)
+
+    def get_guild_limits(self, guild_id: int) -> Dict[str, Any]:
+        return {}
+
+
+__all__ = [
+    "FakeDatabaseService",
+    "FakeFormatter",
+    "FakeGoogleService",
+    "FakeServiceError",
+    "FakeTranscriptionService",
+    "LatencyModel",
+    "parse_latency",
+]
@@ -0,0 +1,257 @@
+"""Drive many concurrent fake meetings through the real processing path.
+
+For each of ``guilds`` fake guilds a synthetic multi-speaker sink is
+generated up front (like recordings held in memory when ``/record_stop``
+fires).  The guilds then "stop" their recordings, spread over
+``ramp_seconds``, and each calls ``RecordingCog._on_record_finished``,
+which runs the real :class:`AudioService` mixing / encoding,
+:class:`ProcessingScheduler` and :class:`ProcessingService` against the
+stand-ins in :mod:`loadtest.fakes`.
+
+While the meetings run, the harness samples the process RSS and the
+event-loop lag (how late a 10 ms timer fires).  :func:`run_load_test`
+returns a report with throughput, end-to-end latency percentiles, peak
+RSS and loop lag.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import resource
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from cogs import recording_cog
+from cogs.recording_cog import MODE_MIXED, RecordingCog
+from loadtest.fakes import (
+    FakeDatabaseService,
+    FakeFormatter,
+    FakeGoogleService,
+    FakeTranscriptionService,
+    LatencyModel,
+)
+from loadtest.synthetic import build_sink, sink_bytes
+from services.audio_service import AudioService
+from services.processing_scheduler import ProcessingScheduler
+from services.processing_service import ProcessingService
+from utils.executors import ExecutorRegistry
+from utils.fair_scheduler import FairScheduler
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+@dataclass
+class LoadTestConfig:
+    """Shape of the simulated load."""
+
+    guilds: int = 10
+    speakers: int = 4
+    meeting_seconds: float = 60.0
+    # Recordings stop evenly spread over this window (0 = all at once)
+    ramp_seconds: float = 0.0
+    transcript_mode: str = MODE_MIXED
+    scheduler_concurrency: int = 2
+    publish_raw_first: bool = False
+    transcription: LatencyModel = field(
+        default_factory=lambda: LatencyModel(median=2.0, p95=6.0, per_audio_second=0.02)
+    )
+    formatting: LatencyModel = field(default_factory=lambda: LatencyModel(median=4.0, p95=12.0))
+    google: LatencyModel = field(default_factory=lambda: LatencyModel(median=0.8, p95=2.0))
+    seed: Optional[int] = 0
+
+
+def percentiles(samples: List[float], points=(50, 90, 95, 99)) -> Dict[str, float]:
+    if not samples:
+        return {f"p{p}": 0.0 for p in points} | {"max": 0.0, "mean": 0.0}
+    values = np.asarray(samples, dtype=np.float64)
+    result = {f"p{p}": round(float(np.percentile(values, p)), 4) for p in points}
+    result["max"] = round(float(values.max()), 4)
+    result["mean"] = round(float(values.mean()), 4)
+    return result
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (0 when unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is KiB on Linux – best effort elsewhere
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _Sampler:
+    """Background task sampling RSS and event-loop lag."""
+
+    def __init__(self, interval: float = 0.01, rss_every: int = 10) -> None:
+        self.interval = interval
+        self.rss_every = rss_every
+        self.lag_ms: List[float] = []
+        self.peak_rss = current_rss_bytes()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        tick = 0
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag_ms.append(max(0.0, (loop.time() - expected) * 1000))
+            tick += 1
+            if tick % self.rss_every == 0:
+                self.peak_rss = max(self.peak_rss, current_rss_bytes())
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        self.peak_rss = max(self.peak_rss, current_rss_bytes())
+
+
+class FakeChannel:
+    """Text channel stand-in that records what the cog sends."""
+
+    def __init__(self, guild_id: int) -> None:
+        self.guild = SimpleNamespace(id=guild_id, get_member=lambda _user_id: None)
+        self.messages: List[str] = []
+
+    async def send(self, content: str, **_: Any) -> None:
+        self.messages.append(content)
+
+    @property
+    def succeeded(self) -> bool:
+        return bool(self.messages) and self.messages[-1].startswith("✅")
+
+
+async def run_load_test(
+    config: LoadTestConfig,
+    audio_service: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """Run the simulated load and return the report."""
+    rng = np.random.default_rng(config.seed)
+    seeds = rng.integers(0, 2**31, size=4)
+    rss_start = current_rss_bytes()
+
+    # Synthetic recordings are generated before the clock starts
+    sinks = await asyncio.gather(
+        *(
+            asyncio.to_thread(
+                build_sink, config.speakers, config.meeting_seconds,
+                np.random.default_rng(int(seeds[0]) + i),
+            )
+            for i in range(config.guilds)
+        )
+    )
+    pcm_bytes = sum(sink_bytes(sink) for sink in sinks)
+
+    executors = ExecutorRegistry()
+    transcription = FakeTranscriptionService(config.transcription, int(seeds[1]))
+    formatter = FakeFormatter(config.formatting, int(seeds[2]))
+    google = FakeGoogleService(config.google, int(seeds[3]))
+    processing = ProcessingService(
+        transcription,
+        google,
+        FakeDatabaseService(),
+        executors=executors,
+        formatter=formatter,
+        publish_raw_first=config.publish_raw_first,
+    )
+    scheduler = ProcessingScheduler(
+        processing, FairScheduler(concurrency=config.scheduler_concurrency)
+    )
+    cog = RecordingCog(
+        scheduler,
+        audio_service or AudioService(executors=executors),
+        transcript_mode=config.transcript_mode,
+    )
+
+    latencies: List[float] = []
+    channels = [FakeChannel(guild_id) for guild_id in range(1, config.guilds + 1)]
+
+    async def _meeting(index: int) -> None:
+        if config.ramp_seconds and config.guilds > 1:
+            await asyncio.sleep(config.ramp_seconds * index / (config.guilds - 1))
+        started = time.perf_counter()
+        await cog._on_record_finished(sinks[index], channels[index])
+        latencies.append(time.perf_counter() - started)
+
+    sampler = _Sampler()
+    original_temp_dir = recording_cog.TEMP_DIR
+    with tempfile.TemporaryDirectory(prefix="yata-loadtest-") as temp_dir:
+        recording_cog.TEMP_DIR = Path(temp_dir)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(_meeting(i) for i in range(config.guilds)))
+            wall = time.perf_counter() - started
+            # Minutes patched in after the link was posted
+            if processing._background:
+                await asyncio.gather(*processing._background, return_exceptions=True)
+            drain = time.perf_counter() - started
+        finally:
+            await sampler.stop()
+            recording_cog.TEMP_DIR = original_temp_dir
+            executors.shutdown()
+
+    succeeded = sum(1 for channel in channels if channel.succeeded)
+    audio_seconds = config.guilds * config.meeting_seconds
+    return {
+        "config": {
+            **{k: v for k, v in asdict(config).items() if k not in ("transcription", "formatting", "google")},
+            "transcription": asdict(config.transcription),
+            "formatting": asdict(config.formatting),
+            "google": asdict(config.google),
+        },
+        "meetings": config.guilds,
+        "succeeded": succeeded,
+        "failed": config.guilds - succeeded,
+        "wall_seconds": round(wall, 3),
+        "drain_seconds": round(drain, 3),
+        "throughput_meetings_per_minute": round(config.guilds / wall * 60, 3),
+        "audio_seconds_per_second": round(audio_seconds / wall, 3),
+        "latency_seconds": percentiles(latencies),
+        "pcm_megabytes": round(pcm_bytes / 1e6, 1),
+        "rss_start_mb": round(rss_start / 1e6, 1),
+        "peak_rss_mb": round(sampler.peak_rss / 1e6, 1),
+        "loop_lag_ms": percentiles(sampler.lag_ms),
+        "scheduler": scheduler.metrics(),
+        "fakes": {
+            "transcription": transcription.metrics(),
+            "formatting": formatter.metrics(),
+            "google": google.metrics(),
+        },
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lat = report["latency_seconds"]
+    lag = report["loop_lag_ms"]
+    return "\n".join(
+        [
+            f"meetings: {report['meetings']} ({report['succeeded']} ok, {report['failed']} failed), "
+            f"{report['pcm_megabytes']} MB PCM",
+            f"wall: {report['wall_seconds']:.1f}s (drain {report['drain_seconds']:.1f}s) | "
+            f"{report['throughput_meetings_per_minute']:.1f} meetings/min | "
+            f"{report['audio_seconds_per_second']:.1f}x realtime",
+            f"latency s: p50 {lat['p50']:.2f} p90 {lat['p90']:.2f} p99 {lat['p99']:.2f} max {lat['max']:.2f}",
+            f"rss MB: start {report['rss_start_mb']} peak {report['peak_rss_mb']}",
+            f"loop lag ms: p50 {lag['p50']:.1f} p99 {lag['p99']:.1f} max {lag['max']:.1f}",
+        ]
+    )
+
+
+__all__ = ["FakeChannel", "LoadTestConfig", "current_rss_bytes", "format_report", "percentiles", "run_load_test"]
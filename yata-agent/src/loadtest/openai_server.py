@@ -0,0 +1,358 @@
+"""Local stand-in for the OpenAI HTTP API.
+
+Serves ``POST /v1/audio/transcriptions`` and ``POST /v1/chat/completions``
+closely enough for the official SDK, so the real clients — connection
+pooling, SDK retries, :class:`~utils.rate_limiter.RateLimiter` header
+handling, timeouts — run against it unchanged.  Point the bot at it with
+``OPENAI_BASE_URL=http://127.0.0.1:8100/v1``.
+
+* Latency is drawn per request from a :class:`~loadtest.fakes.LatencyModel`
+  (transcriptions also scale with the uploaded audio length).
+* ``error_rate`` answers with HTTP 500.
+* With ``requests_per_minute`` / ``tokens_per_minute`` set, requests over
+  budget get HTTP 429.  Every response carries ``x-ratelimit-*`` headers
+  and 429s add ``retry-after`` / ``retry-after-ms``, like the real API.
+* ``stream=true`` chat completions are sent as server-sent events.
+
+Run it standalone with ``python -m loadtest.openai_server`` (from
+``src/``) or in-process with :meth:`FakeOpenAIServer.running`.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from email import policy
+from email.parser import BytesParser
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+
+from loadtest.fakes import LatencyModel, parse_latency
+from utils.rate_limiter import TokenBucket, estimate_tokens
+
+# Matches the bitrate ``AudioService`` encodes with (12 kbit/s Opus)
+_OPUS_BYTES_PER_SECOND = 12_000 / 8
+_SEGMENT_SECONDS = 5.0
+_STREAM_CHUNK_CHARS = 16
+
+
+@dataclass
+class FakeOpenAIConfig:
+    """Behaviour of the fake endpoints."""
+
+    transcription: LatencyModel = field(
+        default_factory=lambda: LatencyModel(median=0.5, p95=1.5, per_audio_second=0.01)
+    )
+    chat: LatencyModel = field(default_factory=lambda: LatencyModel(median=1.0, p95=3.0))
+    # Per endpoint; None disables the limit
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    # Delay between streamed chunks
+    stream_chunk_seconds: float = 0.01
+    seed: Optional[int] = None
+
+
+def parse_multipart(body: bytes, content_type: str) -> Dict[str, bytes]:
+    """Return the fields of a ``multipart/form-data`` body."""
+    message = BytesParser(policy=policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    fields: Dict[str, bytes] = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name:
+            # Array fields arrive as ``name[]``
+            fields.setdefault(name.removesuffix("[]"), part.get_payload(decode=True) or b"")
+    return fields
+
+
+def _error(status: int, message: str, kind: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse(
+        {"error": {"message": message, "type": kind, "param": None, "code": None}},
+        status_code=status,
+        headers=headers,
+    )
+
+
+def _duration(seconds: float) -> str:
+    return f"{max(seconds, 0.0):.3f}s"
+
+
+class _Limits:
+    """Request / token buckets of one endpoint, mirrored into headers."""
+
+    def __init__(self, requests_per_minute: Optional[float], tokens_per_minute: Optional[float]) -> None:
+        self.buckets: Dict[str, TokenBucket] = {}
+        if requests_per_minute:
+            self.buckets["requests"] = TokenBucket(requests_per_minute)
+        if tokens_per_minute:
+            self.buckets["tokens"] = TokenBucket(tokens_per_minute)
+        self._lock = threading.Lock()
+
+    def admit(self, tokens: int) -> tuple[bool, Dict[str, str]]:
+        """Take budget for one request; return ``(allowed, headers)``."""
+        amounts = {"requests": 1, "tokens": tokens}
+        with self._lock:
+            now = time.monotonic()
+            waits = {key: bucket.reserve(amounts[key], now) for key, bucket in self.buckets.items()}
+            allowed = not any(waits.values())
+            if not allowed:
+                # Rejected requests do not consume budget
+                for key, bucket in self.buckets.items():
+                    bucket.refund(amounts[key], now)
+            headers: Dict[str, str] = {}
+            for key, bucket in self.buckets.items():
+                headers[f"x-ratelimit-limit-{key}"] = str(int(bucket.capacity))
+                headers[f"x-ratelimit-remaining-{key}"] = str(max(0, int(bucket.level)))
+                headers[f"x-ratelimit-reset-{key}"] = _duration(
+                    waits[key] or (bucket.capacity - bucket.level) / bucket.rate
+                )
+        if not allowed:
+            retry_after = max(waits.values())
+            headers["retry-after"] = str(max(1, math.ceil(retry_after)))
+            headers["retry-after-ms"] = str(max(1, int(retry_after * 1000)))
+        return allowed, headers
+
+
+class FakeOpenAIServer:
+    """FastAPI app emulating the two OpenAI endpoints the bot uses."""
+
+    def __init__(self, config: Optional[FakeOpenAIConfig] = None) -> None:
+        self.config = config or FakeOpenAIConfig()
+        self._rng = np.random.default_rng(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self._limits = {
+            "transcriptions": _Limits(self.config.requests_per_minute, None),
+            "chat": _Limits(self.config.requests_per_minute, self.config.tokens_per_minute),
+        }
+        self._counts: Dict[str, Dict[str, int]] = {
+            name: {"requests": 0, "ok": 0, "rate_limited": 0, "errors": 0, "streamed": 0}
+            for name in self._limits
+        }
+        self.app = self._build_app()
+
+    # ------------------------------------------------------------------
+    # Request handling
+    # ------------------------------------------------------------------
+    def _draw(self, model: LatencyModel, audio_seconds: float = 0.0) -> tuple[float, bool]:
+        with self._rng_lock:
+            return model.sample(self._rng, audio_seconds), model.fails(self._rng)
+
+    async def _gate(
+        self, endpoint: str, model: LatencyModel, tokens: int = 0, audio_seconds: float = 0.0
+    ) -> tuple[Optional[Response], Dict[str, str]]:
+        """Apply rate limits, latency and injected errors."""
+        counts = self._counts[endpoint]
+        counts["requests"] += 1
+        allowed, headers = self._limits[endpoint].admit(tokens)
+        if not allowed:
+            counts["rate_limited"] += 1
+            return _error(429, "Rate limit reached (fake server)", "requests", headers), headers
+        delay, failed = self._draw(model, audio_seconds)
+        await asyncio.sleep(delay)
+        if failed:
+            counts["errors"] += 1
+            return _error(500, "Injected failure (fake server)", "server_error", headers), headers
+        counts["ok"] += 1
+        return None, headers
+
+    async def transcriptions(self, request: Request) -> Response:
+        fields = parse_multipart(await request.body(), request.headers.get("content-type", ""))
+        audio = fields.get("file")
+        if audio is None:
+            return _error(400, "Missing file", "invalid_request_error")
+        audio_seconds = len(audio) / _OPUS_BYTES_PER_SECOND
+        rejected, headers = await self._gate(
+            "transcriptions", self.config.transcription, audio_seconds=audio_seconds
+        )
+        if rejected is not None:
+            return rejected
+
+        response_format = fields.get("response_format", b"json").decode()
+        language = fields.get("language", b"ja").decode()
+        segments = [
+            {
+                "id": i,
+                "start": round(start, 2),
+                "end": round(min(start + _SEGMENT_SECONDS, audio_seconds), 2),
+                "text": "テスト発言です。",
+            }
+            for i, start in enumerate(np.arange(0.0, max(audio_seconds, _SEGMENT_SECONDS), _SEGMENT_SECONDS))
+        ]
+        text = "".join(segment["text"] for segment in segments)
+        if response_format == "text":
+            return PlainTextResponse(text, headers=headers)
+        body: Dict[str, Any] = {"text": text}
+        if response_format == "verbose_json":
+            body.update(
+                task="transcribe",
+                language=language,
+                duration=round(audio_seconds, 2),
+                segments=segments,
+            )
+        return JSONResponse(body, headers=headers)
+
+    async def chat_completions(self, request: Request) -> Response:
+        payload = await request.json()
+        messages = payload.get("messages") or []
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        prompt_tokens = estimate_tokens(prompt)
+        max_tokens = int(payload.get("max_tokens") or payload.get("max_completion_tokens") or 256)
+        rejected, headers = await self._gate(
+            "chat", self.config.chat, tokens=prompt_tokens + max_tokens
+        )
+        if rejected is not None:
+            return rejected
+
+        user_text = str(messages[-1].get("content", "")) if messages else ""
+        content = "# 議事録\n\n" + user_text[-400:]
+        completion_tokens = min(max_tokens, estimate_tokens(content))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = payload.get("model", "gpt-4o-mini")
+
+        if payload.get("stream"):
+            self._counts["chat"]["streamed"] += 1
+            include_usage = bool((payload.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                self._stream(completion_id, created, model, content, usage if include_usage else None),
+                media_type="text/event-stream",
+                headers=headers,
+            )
+        return JSONResponse(
+            {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            },
+            headers=headers,
+        )
+
+    async def _stream(
+        self, completion_id: str, created: int, model: str, content: str, usage: Optional[Dict[str, int]]
+    ) -> AsyncIterator[bytes]:
+        def _chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra: Any) -> bytes:
+            body = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            }
+            return f"data: {json.dumps(body, ensure_ascii=False)}\n\n".encode()
+
+        yield _chunk({"role": "assistant", "content": ""})
+        for i in range(0, len(content), _STREAM_CHUNK_CHARS):
+            await asyncio.sleep(self.config.stream_chunk_seconds)
+            yield _chunk({"content": content[i : i + _STREAM_CHUNK_CHARS]})
+        yield _chunk({}, "stop")
+        if usage is not None:
+            yield (
+                "data: "
+                + json.dumps(
+                    {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [],
+                        "usage": usage,
+                    }
+                )
+                + "\n\n"
+            ).encode()
+        yield b"data: [DONE]\n\n"
+
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        return {name: dict(counts) for name, counts in self._counts.items()}
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake OpenAI API")
+        app.add_api_route("/v1/audio/transcriptions", self.transcriptions, methods=["POST"])
+        app.add_api_route("/v1/chat/completions", self.chat_completions, methods=["POST"])
+        app.add_api_route("/metrics", self.metrics, methods=["GET"])
+        return app
+
+    # ------------------------------------------------------------------
+    # Serving
+    # ------------------------------------------------------------------
+    @contextlib.contextmanager
+    def running(self, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+        """Serve in a background thread; yield the ``/v1`` base URL."""
+        config = uvicorn.Config(self.app, host=host, port=port, log_level="warning", lifespan="off")
+        server = uvicorn.Server(config)
+        thread = threading.Thread(target=server.run, name="fake-openai", daemon=True)
+        thread.start()
+        try:
+            deadline = time.monotonic() + 10
+            while not server.started:
+                if not thread.is_alive() or time.monotonic() > deadline:
+                    raise RuntimeError("fake OpenAI server failed to start")
+                time.sleep(0.01)
+            bound_port = server.servers[0].sockets[0].getsockname()[1]
+            yield f"http://{host}:{bound_port}/v1"
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m loadtest.openai_server",
+        description="Serve fake /v1/audio/transcriptions and /v1/chat/completions endpoints.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--transcription", type=parse_latency, default="0.5,1.5,0,0.01",
+                        help="median,p95[,error_rate[,per_audio_second]]")
+    parser.add_argument("--chat", type=parse_latency, default="1,3")
+    parser.add_argument("--rpm", type=float, help="requests per minute per endpoint (429 above)")
+    parser.add_argument("--tpm", type=float, help="chat tokens per minute (429 above)")
+    parser.add_argument("--stream-chunk-seconds", type=float, default=0.01)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    server = FakeOpenAIServer(
+        FakeOpenAIConfig(
+            transcription=args.transcription,
+            chat=args.chat,
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+            stream_chunk_seconds=args.stream_chunk_seconds,
+            seed=args.seed,
+        )
+    )
+    print(f"Fake OpenAI API on http://{args.host}:{args.port}/v1")
+    uvicorn.run(server.app, host=args.host, port=args.port, log_level="warning")
+
+
+__all__ = ["FakeOpenAIConfig", "FakeOpenAIServer", "parse_multipart"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Synthetic multi-speaker recordings for load testing.
+
+:func:`build_sink` returns an object shaped like a finished
+:class:`~utils.timeline_sink.TimelineWaveSink`: per-user WAV buffers that
+only contain speech, plus the :class:`~utils.timeline.SparseTimeline`
+placing every utterance on the meeting clock.  Speakers take turns with
+short gaps and occasional overlaps, like a real meeting.
+
+The audio is "speech-like" rather than silent or white noise so that the
+mixer and the Opus encoder do representative work: a voiced harmonic
+series with a wandering pitch, shaped by a ~4 Hz syllable envelope, plus
+a little breath noise.
+"""
+from __future__ import annotations
+
+import io
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+import numpy as np
+
+from utils.timeline import WAV_HEADER_BYTES, SparseTimeline
+from utils.timeline_sink import wav_header
+
+SAMPLE_RATE = 48000
+CHANNELS = 2
+SAMPLE_WIDTH = 2
+_FRAME_SECONDS = 0.02
+
+
+def speech_like_pcm(
+    seconds: float,
+    rng: np.random.Generator,
+    sample_rate: int = SAMPLE_RATE,
+    channels: int = CHANNELS,
+) -> bytes:
+    """Return *seconds* of 16-bit interleaved speech-like PCM."""
+    n = max(1, int(seconds * sample_rate))
+    t = np.arange(n, dtype=np.float64) / sample_rate
+
+    # Pitch wanders slowly around a per-utterance base frequency
+    f0 = rng.uniform(90, 240) * (1 + 0.08 * np.sin(2 * np.pi * rng.uniform(0.2, 0.7) * t))
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    voiced = np.zeros(n)
+    for harmonic in range(1, 9):
+        voiced += np.sin(harmonic * phase) / harmonic
+
+    # Syllables: rectified ~4 Hz envelope with random depth
+    syllable_rate = rng.uniform(3.0, 5.5)
+    envelope = np.clip(np.sin(2 * np.pi * syllable_rate * t + rng.uniform(0, np.pi)), 0, None) ** 0.7
+    signal = voiced * envelope + 0.02 * rng.standard_normal(n)
+
+    peak = np.max(np.abs(signal)) or 1.0
+    pcm = (signal / peak * 0.3 * 32767).astype("<i2")
+    return np.repeat(pcm, channels).tobytes()
+
+
+def build_sink(
+    speakers: int,
+    seconds: float,
+    rng: Optional[np.random.Generator] = None,
+    user_id_base: int = 1000,
+) -> SimpleNamespace:
+    """Build a finished recording sink with *speakers* taking turns.
+
+    Returns a namespace with ``audio_data`` (``user_id -> .file``),
+    ``encoding``, ``timeline`` and ``vc`` like a py-cord sink after
+    ``cleanup()``.
+    """
+    rng = rng or np.random.default_rng()
+    timeline = SparseTimeline(SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH)
+    frame_bytes = timeline.frame_bytes
+    buffers: Dict[int, bytearray] = {}
+
+    clock = 0.0
+    previous: Optional[int] = None
+    while clock < seconds:
+        choices = [s for s in range(speakers) if s != previous] or [0]
+        speaker = int(rng.choice(choices))
+        previous = speaker
+        user_id = user_id_base + speaker
+
+        length = min(float(rng.uniform(1.0, 6.0)), seconds - clock)
+        # Round to whole 20 ms frames like decoded Discord audio
+        length = max(_FRAME_SECONDS, round(length / _FRAME_SECONDS) * _FRAME_SECONDS)
+        pcm = speech_like_pcm(length, rng)
+        pcm = pcm[: len(pcm) - len(pcm) % frame_bytes]
+
+        buffer = buffers.setdefault(user_id, bytearray(WAV_HEADER_BYTES))
+        offset = len(buffer) - WAV_HEADER_BYTES
+        buffer += pcm
+        timeline.append(user_id, clock, offset, len(pcm))
+
+        # Next turn after a short gap, sometimes overlapping
+        clock += length + float(rng.uniform(-0.3, 1.2))
+        clock = max(clock, 0.0)
+
+    audio_data = {}
+    for user_id, buffer in buffers.items():
+        payload = len(buffer) - WAV_HEADER_BYTES
+        buffer[:WAV_HEADER_BYTES] = wav_header(payload, SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH)
+        audio_data[user_id] = SimpleNamespace(file=io.BytesIO(bytes(buffer)))
+    return SimpleNamespace(audio_data=audio_data, encoding="wav", timeline=timeline, vc=None)
+
+
+def sink_bytes(sink: SimpleNamespace) -> int:
+    """Total PCM bytes held by *sink*."""
+    return sum(audio.file.getbuffer().nbytes for audio in sink.audio_data.values())
+
+
+__all__ = ["build_sink", "sink_bytes", "speech_like_pcm"]
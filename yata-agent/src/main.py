@@ -1,6 +1,17 @@
 """Unified entrypoint that hosts both FastAPI (Google OAuth callback) and
 Discord Bot in the **same** Python process & event loop (see plan-2.md).
 
+``--role`` splits the deployment on one host: ``bot`` (Discord gateway and
+recording; meetings are queued for workers), ``api`` (FastAPI only),
+``worker`` (transcription and formatting from the shared SQLite job queue;
+run as many as needed) and ``all`` (the default, everything in-process).
+On SIGTERM the bot stops taking recordings, finishes (or hands off to the
+next start) every meeting in flight and only then exits; see
+:mod:`utils.graceful_shutdown`.
+``SHARD_COUNT`` / ``SHARD_IDS`` (or ``--shard-count`` / ``--shard-ids``) run
+the gateway as an ``AutoShardedBot``; several ``bot`` processes can split the
+shards and share the worker pool (see :mod:`utils.sharding`).
+
 Only the pieces required for automated tests are implemented at the
 moment.  The Discord bot start-up and Uvicorn server execution are kept
 behind the ``__main__`` guard so that importing this module does **not**
@@ -11,11 +22,21 @@ from __future__ import annotations
 import os
 from typing import Any
 
+from utils.startup import ImportProfiler, StartupTimer
+
+# Created before the imports below so that they are timed as well
+startup_timer = StartupTimer()
+import_profiler = ImportProfiler()
+if __name__ == "__main__" and os.getenv("STARTUP_PROFILE_IMPORTS", "false").lower() in {"1", "true", "yes"}:
+    import_profiler.start()
+
 from fastapi import FastAPI, HTTPException
 from starlette.responses import HTMLResponse
 
 # DI container -------------------------------------------------------------
 from container import container  # type: ignore
+from utils.executors import DB, run_blocking
+from utils.sharding import shard_metrics
 
 # -------------------------------------------------------------------------
 # FastAPI application
@@ -35,6 +56,88 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+# ------------------------------- Metrics ----------------------------------
+
+@app.get("/metrics", summary="Runtime metrics")
+async def metrics() -> dict[str, Any]:
+    """Return runtime counters of the components registered in the container.
+
+    Only components that are actually configured are included, so the
+    payload is ``{}`` in unit tests where nothing is wired.
+    """
+    payload: dict[str, Any] = {}
+    executors = getattr(container, "executors", None)
+    if executors is not None:
+        payload["executors"] = executors.metrics()
+    audio_process_pool = getattr(container, "audio_process_pool", None)
+    if audio_process_pool is not None:
+        payload["audio_process_pool"] = audio_process_pool.metrics()
+    admission_service = getattr(container, "admission_service", None)
+    if admission_service is not None:
+        payload["admission"] = admission_service.metrics()
+    processing_scheduler = getattr(container, "processing_scheduler", None)
+    if processing_scheduler is not None:
+        payload["scheduler"] = processing_scheduler.metrics()
+    transcript_cache = getattr(container, "transcript_cache", None)
+    if transcript_cache is not None:
+        payload["transcript_cache"] = transcript_cache.metrics()
+    processing_pipeline = getattr(container, "processing_pipeline", None)
+    if processing_pipeline is not None:
+        payload["processing"] = processing_pipeline.metrics()
+    rate_limiters = getattr(container, "openai_rate_limiters", None)
+    if rate_limiters:
+        payload["openai_rate_limits"] = {
+            name: limiter.metrics() for name, limiter in rate_limiters.items()
+        }
+    profiling_service = getattr(container, "profiling_service", None)
+    if profiling_service is not None:
+        payload["profiling"] = profiling_service.metrics()
+    memory_tracker = getattr(container, "memory_tracker", None)
+    if memory_tracker is not None:
+        payload["memory"] = memory_tracker.metrics()
+    tracer = getattr(container, "tracer", None)
+    if tracer is not None:
+        payload["tracing"] = tracer.metrics()
+    loop_monitor = getattr(container, "loop_monitor", None)
+    if loop_monitor is not None:
+        payload["event_loop"] = {
+            "backend": getattr(container, "loop_backend", None),
+            **loop_monitor.metrics(),
+        }
+    shard_config = getattr(container, "shard_config", None)
+    bot = getattr(container, "bot", None)
+    if shard_config is not None and shard_config.enabled and bot is not None:
+        recording_cog = bot.get_cog("RecordingCog")
+        payload["sharding"] = shard_metrics(
+            bot, recording_cog.recordings_by_shard() if recording_cog is not None else None
+        )
+    jobs = getattr(container, "jobs", None)
+    if jobs is not None:
+        payload["jobs"] = jobs.metrics()
+    job_queue = getattr(container, "job_queue", None)
+    if job_queue is not None:
+        # SQLite counts: read on the db pool, not on the event loop
+        payload["job_queue"] = await run_blocking(executors, DB, job_queue.metrics)
+    job_delivery = getattr(container, "job_delivery", None)
+    if job_delivery is not None:
+        payload["job_delivery"] = job_delivery.metrics()
+    shutdown = getattr(container, "shutdown", None)
+    if shutdown is not None:
+        payload["shutdown"] = shutdown.metrics()
+    startup = getattr(container, "startup_timer", None)
+    if startup is not None:
+        payload["startup"] = startup.metrics()
+        profiler = getattr(container, "import_profiler", None)
+        if profiler is not None:
+            payload["startup"]["imports"] = profiler.metrics()
+    breakers = getattr(container, "circuit_breakers", None)
+    if breakers:
+        payload["circuit_breakers"] = {
+            name: breaker.metrics() for name, breaker in breakers.items()
+        }
+    return payload
+
+
 # ---------------------------- util helpers --------------------------------
 
 def _parse_guild_id_from_state(state: str) -> int:
@@ -92,7 +195,12 @@ async def oauth2callback(code: str, state: str):
 # Discord Bot – started only when executed as a script
 # -------------------------------------------------------------------------
 if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import contextlib
+    import json
     import logging
+    import socket
     import uvicorn
     import discord
     from discord.ext import commands
@@ -100,11 +208,58 @@ if __name__ == "__main__":
 
     # .envファイルから環境変数を読み込む
     load_dotenv()
+
+    ROLES = ("all", "bot", "api", "worker")
+    parser = argparse.ArgumentParser(description="Yata Agent")
+    parser.add_argument(
+        "--role",
+        choices=ROLES,
+        default=os.getenv("YATA_ROLE", "all"),
+        help="bot, api, worker or all (default: all in one process)",
+    )
+    parser.add_argument("--worker-id", help="name of this worker in the job queue")
+    parser.add_argument(
+        "--shard-count",
+        default=os.getenv("SHARD_COUNT", ""),
+        help="total gateway shards: a number or auto (default: unsharded)",
+    )
+    parser.add_argument(
+        "--shard-ids",
+        default=os.getenv("SHARD_IDS", ""),
+        help="shards run by this process, e.g. 0-3 or 0,2 (default: all)",
+    )
+    parser.add_argument(
+        "--sync-commands",
+        action="store_true",
+        help="register the slash commands even if they are unchanged",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="build everything for the role, print the startup timings and exit",
+    )
+    ARGS = parser.parse_args()
+    ROLE = ARGS.role
+
+    from utils.sharding import ShardConfig
+
+    try:
+        SHARDS = ShardConfig.from_settings(ARGS.shard_count, ARGS.shard_ids)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if not SHARDS.primary and ROLE != "bot":
+        # Every other role would duplicate the API server or the worker pool
+        parser.error("running a subset of the shards requires --role bot")
     
-    # Setup logging - only essential logs
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    from utils.structured_logging import configure_logging
+
+    # Setup logging - records are written by a background thread; LOG_FORMAT
+    # is "json" (one object per line) or "text"
+    log_listener = configure_logging(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        fmt=os.getenv("LOG_FORMAT", "json"),
+        sample_burst=int(os.getenv("LOG_SAMPLE_BURST", "20")),
+        sample_interval=float(os.getenv("LOG_SAMPLE_INTERVAL_SECONDS", "60")),
     )
     
     # Reduce Discord.py logging to essential only
@@ -118,68 +273,541 @@ if __name__ == "__main__":
     # --------------------------- setup DI ---------------------------------
     # Lazy imports to avoid heavy deps at import-time in unit tests.
     from data.database import Database
+    from data.job_queue import JobQueue
     from services.database_service import DatabaseService
     from services.google_service import GoogleService
     from services.transcription_service import TranscriptionService
     from services.processing_service import ProcessingService
     from services.audio_service import AudioService
     from services.readiness_service import ReadinessService
+    from services.job_delivery import JobDeliveryService
+    from services.job_worker import JobWorker
+    from services.queued_processing import QueuedProcessingService
+    from cogs.recording_cog import TEMP_DIR, AutoStopPolicy
+    from services.admission_service import AdmissionPolicy, AdmissionService
+    from services.processing_scheduler import ProcessingScheduler
+    from services.profiling_service import ProfilingService
+    from services.transcript_cache import CachedTranscriptionService
+    from utils.fair_scheduler import FairScheduler, parse_weights
+    from utils.hedging import HedgePolicy, Hedger
+    from utils.rate_limiter import RateLimiter
+    from utils.circuit_breaker import (
+        CircuitBreaker,
+        CircuitOpenError,
+        hold_while_open,
+        is_google_outage,
+        is_openai_outage,
+    )
+    from utils.audio_process_pool import AudioProcessPool
+    from utils.command_sync import CommandSyncCache, sync_commands_if_changed
+    from utils.event_loop import DEFAULT_EXECUTOR_WORKERS, install_event_loop, loop_backend
+    from utils.graceful_shutdown import GracefulShutdown
+    from utils.ipc import IPCClient, IPCHub
+    from utils.loop_monitor import LoopMonitor
+    from utils.memory import MemoryTracker
+    from utils.tracing import Tracer, exporters_from_env
+    from utils.executors import (
+        AUDIO_CPU,
+        DB,
+        DEFAULT_SIZES,
+        GOOGLE_IO,
+        OPENAI_IO,
+        ExecutorRegistry,
+    )
+    startup_timer.mark("imports")
 
     # Load environment -----------------------------------------------------
     DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
     CLIENT_SECRETS_JSON = os.getenv("CLIENT_SECRETS_JSON", "{}")
     REDIRECT_URI = os.getenv("REDIRECT_URI", "http://localhost:8000/oauth2callback")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+    # Point OpenAI calls at e.g. the local stand-in (python -m loadtest.openai_server)
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
     DB_PATH = os.getenv("DB_PATH", "yata_agent.db")
 
+    # Per-workload thread pool sizes (see utils/executors.py)
+    EXECUTOR_SIZES = {
+        DB: int(os.getenv("EXECUTOR_DB_WORKERS", DEFAULT_SIZES[DB])),
+        GOOGLE_IO: int(os.getenv("EXECUTOR_GOOGLE_IO_WORKERS", DEFAULT_SIZES[GOOGLE_IO])),
+        OPENAI_IO: int(os.getenv("EXECUTOR_OPENAI_IO_WORKERS", DEFAULT_SIZES[OPENAI_IO])),
+        AUDIO_CPU: int(os.getenv("EXECUTOR_AUDIO_CPU_WORKERS", DEFAULT_SIZES[AUDIO_CPU])),
+    }
+
+    # "thread" (audio-cpu executor) or "process" (shared-memory worker pool)
+    AUDIO_EXECUTION_MODE = os.getenv("AUDIO_EXECUTION_MODE", "thread")
+    AUDIO_PROCESS_WORKERS = int(os.getenv("AUDIO_PROCESS_WORKERS", "2"))
+
+    # "mixed" (one track) or "per_speaker" (speaker-attributed transcript)
+    TRANSCRIPT_MODE = os.getenv("TRANSCRIPT_MODE", "mixed")
+    MAX_PARALLEL_TRANSCRIPTIONS = int(os.getenv("MAX_PARALLEL_TRANSCRIPTIONS", "4"))
+
+    # Auto-stop for unattended recordings (0 disables idle / max duration)
+    AUTO_STOP_POLICY = AutoStopPolicy(
+        empty_grace_seconds=float(os.getenv("RECORDING_EMPTY_GRACE_SECONDS", "30")),
+        idle_timeout_seconds=float(os.getenv("RECORDING_IDLE_TIMEOUT_MINUTES", "10")) * 60,
+        max_duration_seconds=float(os.getenv("RECORDING_MAX_MINUTES", "180")) * 60,
+    )
+
+    # Fair sharing of transcription / formatting capacity between guilds
+    SCHEDULER_CONCURRENCY = int(os.getenv("SCHEDULER_CONCURRENCY", "2"))
+    SCHEDULER_QUANTUM_SECONDS = float(os.getenv("SCHEDULER_QUANTUM_SECONDS", "600"))
+    SCHEDULER_GUILD_WEIGHTS = parse_weights(os.getenv("SCHEDULER_GUILD_WEIGHTS", ""))
+
+    # Shared OpenAI budgets (refined at runtime from x-ratelimit-* headers)
+    OPENAI_TRANSCRIPTION_RPM = float(os.getenv("OPENAI_TRANSCRIPTION_RPM", "500"))
+    OPENAI_TRANSCRIPTION_AUDIO_SECONDS_PER_MINUTE = float(
+        os.getenv("OPENAI_TRANSCRIPTION_AUDIO_SECONDS_PER_MINUTE", "0")
+    )
+    OPENAI_CHAT_RPM = float(os.getenv("OPENAI_CHAT_RPM", "500"))
+    OPENAI_CHAT_TPM = float(os.getenv("OPENAI_CHAT_TPM", "200000"))
+
+    # Transcripts cached by audio content hash (empty = disabled); shared
+    # with the backfill CLI so re-processing never re-transcribes
+    TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", "")
+    # Retention: entries unused for this many days, and the oldest beyond the
+    # size cap, are deleted (0 = keep)
+    TRANSCRIPT_CACHE_MAX_AGE_DAYS = float(os.getenv("TRANSCRIPT_CACHE_MAX_AGE_DAYS", "30"))
+    TRANSCRIPT_CACHE_MAX_MB = float(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "1024"))
+
+    # Latency SLO: seconds from job start to the document link (0 = none).
+    # Formatting that misses it is patched into the document afterwards.
+    PROCESSING_DEADLINE_SECONDS = float(os.getenv("PROCESSING_DEADLINE_SECONDS", "0"))
+    # Opt-in: post the link as soon as the raw transcript is uploaded
+    PUBLISH_RAW_TRANSCRIPT_FIRST = os.getenv("PUBLISH_RAW_TRANSCRIPT_FIRST", "false").lower() in (
+        "1", "true", "yes"
+    )
+    FORMATTING_TIMEOUT_SECONDS = float(os.getenv("FORMATTING_TIMEOUT_SECONDS", "120"))
+    FORMATTING_HEDGE = os.getenv("FORMATTING_HEDGE", "false").lower() in ("1", "true", "yes")
+    FORMATTING_HEDGE_PERCENTILE = float(os.getenv("FORMATTING_HEDGE_PERCENTILE", "95"))
+
+    # Fast-fail for OpenAI / Google outages
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RECOVERY_SECONDS = float(os.getenv("CIRCUIT_RECOVERY_SECONDS", "30"))
+
+    # Per-job profiling: guilds whose every job is profiled (comma list);
+    # admins can also arm the next N jobs with /profile_next
+    PROFILE_GUILD_IDS = [int(g) for g in os.getenv("PROFILE_GUILD_IDS", "").split(",") if g.strip()]
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+
+    # Leak detection: seconds after completion until a recording must be
+    # gone; tracemalloc frames > 0 adds allocation diffs (costly)
+    MEMORY_RETENTION_CHECK_SECONDS = float(os.getenv("MEMORY_RETENTION_CHECK_SECONDS", "30"))
+    MEMORY_TRACEMALLOC_FRAMES = int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "0"))
+    # Full gc + referrer walk per check: names leaks but stalls the loop
+    MEMORY_DEBUG = os.getenv("MEMORY_DEBUG", "false").lower() in ("1", "true", "yes")
+
+    # One trace per meeting; spans go to a JSONL file and/or an OTLP/HTTP
+    # collector (both empty = breakdown in the log and /metrics only)
+    TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "")
+    TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "")
+    TRACE_OTLP_HEADERS = os.getenv("TRACE_OTLP_HEADERS", "")
+
+    # Event-loop lag sampling; LOOP_DEBUG also logs the stack of any call
+    # blocking the loop for longer than the threshold
+    LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "250"))
+    LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+    LOOP_DEBUG = os.getenv("LOOP_DEBUG", "false").lower() in {"1", "true", "yes"}
+    # Loop backend: auto (uvloop when installed), asyncio or uvloop; the
+    # default executor only serves asyncio.to_thread (0 = asyncio's sizing)
+    EVENT_LOOP = os.getenv("EVENT_LOOP", "auto")
+    DEFAULT_EXECUTOR_SIZE = int(os.getenv("DEFAULT_EXECUTOR_WORKERS", DEFAULT_EXECUTOR_WORKERS))
+
+    # Split deployment (--role bot/worker): the shared SQLite job queue and
+    # the Unix socket that wakes workers and reports finished jobs
+    JOB_QUEUE_DB = os.getenv("JOB_QUEUE_DB", DB_PATH)
+    IPC_SOCKET = os.getenv("IPC_SOCKET", "recordings/yata-ipc.sock")
+    JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+    WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", SCHEDULER_CONCURRENCY))
+
+    # SIGTERM: seconds for recordings and running jobs to finish before the
+    # rest is handed off to the next start (keep the orchestrator's grace
+    # period, e.g. docker stop -t, ~20s above it)
+    SHUTDOWN_DEADLINE_SECONDS = float(os.getenv("SHUTDOWN_DEADLINE_SECONDS", "25"))
+    # Writing the unfinished meetings to the job queue after the deadline
+    SHUTDOWN_HANDOFF_SECONDS = 10.0
+
+    # Hash of the last synced slash-command schema; the sync on connect is
+    # skipped while it matches (empty = sync on every start)
+    COMMAND_SYNC_CACHE = os.getenv("COMMAND_SYNC_CACHE", "command_sync.json")
+
+    # Node budgets for /record_start admission control
+    ADMISSION_POLICY = AdmissionPolicy(
+        memory_budget_bytes=int(os.getenv("ADMISSION_MEMORY_BUDGET_MB", "2048")) * 1024 * 1024,
+        disk_reserve_bytes=int(os.getenv("ADMISSION_DISK_RESERVE_MB", "512")) * 1024 * 1024,
+        estimate_seconds=float(os.getenv("ADMISSION_ESTIMATE_MINUTES", "60")) * 60,
+        max_queue_depth=int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "8")),
+        guild_max_jobs=int(os.getenv("ADMISSION_GUILD_MAX_JOBS", "1")),
+    )
+
     # Instantiate services -------------------------------------------------
+    executors = ExecutorRegistry(EXECUTOR_SIZES)
+
     db = Database(DB_PATH)
     db_service = DatabaseService(db)
 
+    circuit_breakers = {
+        name: CircuitBreaker(
+            name,
+            failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+            recovery_timeout=CIRCUIT_RECOVERY_SECONDS,
+            is_failure=is_failure,
+        )
+        for name, is_failure in (
+            ("openai-transcription", is_openai_outage),
+            ("openai-chat", is_openai_outage),
+            ("google-docs", is_google_outage),
+        )
+    }
+
     google_service = GoogleService(
         db_service=db_service,
         client_secrets_json=CLIENT_SECRETS_JSON,
         redirect_uri=REDIRECT_URI,
+        executors=executors,
+        circuit_breaker=circuit_breakers["google-docs"],
     )
     container.google_service = google_service  # type: ignore[attr-defined]
 
-    transcription_service = TranscriptionService(api_key=OPENAI_API_KEY)
-    processing_service = ProcessingService(transcription_service, google_service, db_service)
+    openai_rate_limiters = {
+        "transcription": RateLimiter(
+            "whisper-1",
+            requests_per_minute=OPENAI_TRANSCRIPTION_RPM,
+            audio_seconds_per_minute=OPENAI_TRANSCRIPTION_AUDIO_SECONDS_PER_MINUTE or None,
+        ),
+        "chat": RateLimiter(
+            "gpt-4o-mini",
+            requests_per_minute=OPENAI_CHAT_RPM,
+            tokens_per_minute=OPENAI_CHAT_TPM,
+        ),
+    }
+    transcription_service = TranscriptionService(
+        api_key=OPENAI_API_KEY,
+        rate_limiter=openai_rate_limiters["transcription"],
+        circuit_breaker=circuit_breakers["openai-transcription"],
+        base_url=OPENAI_BASE_URL,
+    )
+    if TRANSCRIPT_CACHE_DIR:
+        transcription_service = CachedTranscriptionService(
+            transcription_service,
+            TRANSCRIPT_CACHE_DIR,
+            max_age_seconds=TRANSCRIPT_CACHE_MAX_AGE_DAYS * 86400,
+            max_bytes=int(TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024),
+        )
+    processing_service = ProcessingService(
+        transcription_service,
+        google_service,
+        db_service,
+        executors=executors,
+        max_parallel_transcriptions=MAX_PARALLEL_TRANSCRIPTIONS,
+        formatting_rate_limiter=openai_rate_limiters["chat"],
+        formatting_circuit_breaker=circuit_breakers["openai-chat"],
+        deadline_seconds=PROCESSING_DEADLINE_SECONDS or None,
+        formatting_timeout=FORMATTING_TIMEOUT_SECONDS or None,
+        formatting_hedger=(
+            Hedger("openai-chat", HedgePolicy(percentile=FORMATTING_HEDGE_PERCENTILE))
+            if FORMATTING_HEDGE
+            else None
+        ),
+        publish_raw_first=PUBLISH_RAW_TRANSCRIPT_FIRST,
+    )
+    processing_scheduler = ProcessingScheduler(
+        processing_service,
+        FairScheduler(
+            concurrency=SCHEDULER_CONCURRENCY,
+            quantum=SCHEDULER_QUANTUM_SECONDS,
+            weights=SCHEDULER_GUILD_WEIGHTS,
+            # Park queued jobs while transcription or upload is failing fast;
+            # an open chat breaker only skips formatting, so it does not hold
+            hold=hold_while_open(
+                [circuit_breakers["openai-transcription"], circuit_breakers["google-docs"]]
+            ),
+            requeue_on=(CircuitOpenError,),
+        ),
+    )
     readiness_service = ReadinessService(db_service)
+    admission_service = AdmissionService(
+        db_service, ADMISSION_POLICY, temp_dir=TEMP_DIR, executors=executors
+    )
+    profiling_service = ProfilingService(
+        PROFILE_GUILD_IDS, interval=PROFILE_SAMPLE_INTERVAL_MS / 1000
+    )
+    tracer = Tracer(
+        exporters_from_env(TRACE_EXPORT_FILE, TRACE_OTLP_ENDPOINT, TRACE_OTLP_HEADERS)
+    )
+    memory_tracker = MemoryTracker(
+        check_delay=MEMORY_RETENTION_CHECK_SECONDS,
+        tracemalloc_frames=MEMORY_TRACEMALLOC_FRAMES,
+        debug=MEMORY_DEBUG,
+    )
+    loop_monitor = LoopMonitor(
+        interval=LOOP_LAG_INTERVAL_MS / 1000,
+        block_threshold=LOOP_BLOCK_THRESHOLD_MS / 1000,
+        capture_stacks=LOOP_DEBUG,
+    )
 
-    audio_service = AudioService()
+    audio_process_pool = None
+    # Recordings are mixed where the sinks live: the bot (or all-in-one) role
+    if AUDIO_EXECUTION_MODE == "process" and ROLE in ("all", "bot"):
+        audio_process_pool = AudioProcessPool(
+            processes=AUDIO_PROCESS_WORKERS,
+            preload=("services.audio_service",),
+        )
+        # Pre-start workers now so the first recording pays no spawn cost
+        audio_process_pool.start()
+
+    audio_service = AudioService(executors=executors, process_pool=audio_process_pool)
 
     # Store all services in the container for DI
+    container.executors = executors
+    container.audio_process_pool = audio_process_pool
+    container.transcript_mode = TRANSCRIPT_MODE
+    container.auto_stop_policy = AUTO_STOP_POLICY
     container.db_service = db_service
     container.google_service = google_service
     container.transcription_service = transcription_service
-    container.processing_service = processing_service
+    container.transcript_cache = transcription_service if TRANSCRIPT_CACHE_DIR else None
+    # Cogs submit through the fair scheduler, which fronts ProcessingService
+    container.processing_service = processing_scheduler
+    container.processing_scheduler = processing_scheduler
+    container.processing_pipeline = processing_service
+    container.openai_rate_limiters = openai_rate_limiters
+    container.circuit_breakers = circuit_breakers
     container.audio_service = audio_service
     container.readiness_service = readiness_service
-
-    # Discord bot setup ----------------------------------------------------
-    intents = discord.Intents.default()
-    intents.message_content = True
-    intents.voice_states = True  # Required for voice recording functionality
-    bot = commands.Bot(command_prefix="/", intents=intents)
-
-    # Inject container into bot so cogs can access shared services
-    bot.container = container  # type: ignore[attr-defined]
-
-    async def _startup():
-        # Load cogs dynamically; in production you might scan a directory.
-        bot.load_extension("cogs.setup_cog")
-        bot.load_extension("cogs.recording_cog")
-        bot.load_extension("cogs.auth_cog")
-        bot.load_extension("cogs.status_cog")
-
-    bot.loop.create_task(_startup())  # type: ignore[attr-defined]
-
-    # Run FastAPI server inside the same loop
-    config = uvicorn.Config(app, host="0.0.0.0", port=8000, log_level="info")
-    server = uvicorn.Server(config)
-    bot.loop.create_task(server.serve())  # type: ignore[attr-defined]
-
-    # Finally, run the Discord bot (blocking until shutdown)
-    print("Starting Yata Agent…")
-    bot.run(DISCORD_TOKEN) 
\ No newline at end of file
+    container.admission_service = admission_service
+    container.profiling_service = profiling_service
+    container.memory_tracker = memory_tracker
+    container.tracer = tracer
+    container.loop_monitor = loop_monitor
+
+    # Role-specific wiring -------------------------------------------------
+    # Every role uses the queue; all-in-one only for meetings handed off by
+    # a shutdown, which it resumes on the next start
+    job_queue = JobQueue(JOB_QUEUE_DB)
+    container.job_queue = job_queue
+    ipc_hub = None
+    worker = None
+    resume_worker = None
+    queued_processing = None
+    ipc_client = None
+    if ROLE == "bot":
+        # Meetings go to the worker processes; the cog awaits the URL as before.
+        # With split shards the primary hosts the hub and the others join it.
+        if SHARDS.primary:
+            ipc_hub = IPCHub(IPC_SOCKET)
+        else:
+            ipc_client = IPCClient(IPC_SOCKET)
+        queued_processing = QueuedProcessingService(
+            job_queue, executors, ipc=ipc_hub or ipc_client, poll_interval=JOB_POLL_SECONDS
+        )
+        (ipc_hub or ipc_client).on_message = queued_processing.on_message
+        container.processing_service = queued_processing
+        container.processing_scheduler = None
+        container.processing_pipeline = None
+        container.jobs = queued_processing
+    elif ROLE == "worker":
+        ipc_client = IPCClient(IPC_SOCKET)
+        worker = JobWorker(
+            job_queue,
+            processing_scheduler,
+            ARGS.worker_id or f"{socket.gethostname()}:{os.getpid()}",
+            concurrency=WORKER_CONCURRENCY,
+            executors=executors,
+            ipc=ipc_client,
+            poll_interval=JOB_POLL_SECONDS,
+            drain_timeout=SHUTDOWN_DEADLINE_SECONDS,
+        )
+        ipc_client.on_message = worker.on_message
+        ipc_client.on_connect = worker.wake
+        container.jobs = worker
+    elif ROLE == "api":
+        # Only the queue counts (container.job_queue)
+        container.jobs = None
+    else:
+        resume_worker = JobWorker(
+            job_queue,
+            processing_scheduler,
+            ARGS.worker_id or f"{socket.gethostname()}:{os.getpid()}",
+            concurrency=SCHEDULER_CONCURRENCY,
+            executors=executors,
+            poll_interval=JOB_POLL_SECONDS,
+            drain_timeout=SHUTDOWN_DEADLINE_SECONDS,
+        )
+        container.jobs = resume_worker
+
+    startup_timer.mark("services")
+    container.startup_timer = startup_timer
+    container.import_profiler = import_profiler if import_profiler.active else None
+
+    def _startup_report(phase: str) -> None:
+        """Mark the role as ready and log where the startup time went."""
+        startup_timer.mark(phase)
+        startup_logger = logging.getLogger("startup")
+        startup_logger.info("Startup (%s): %s", ROLE, startup_timer.summary())
+        if import_profiler.active:
+            import_profiler.stop()
+            startup_logger.info("Slowest imports: %s", import_profiler.metrics(limit=10))
+
+    # The loop must exist before the Bot, which binds to it on construction
+    loop = install_event_loop(EVENT_LOOP, DEFAULT_EXECUTOR_SIZE or None)
+    container.loop_backend = loop_backend(loop)
+
+    class _ManagedServer(uvicorn.Server):
+        """Leaves SIGINT / SIGTERM to the bot's graceful shutdown."""
+
+        def capture_signals(self):
+            return contextlib.nullcontext()
+
+    server = None
+    if ROLE in ("all", "api"):
+        config = uvicorn.Config(app, host="0.0.0.0", port=8000, log_level="info")
+        server = (_ManagedServer if ROLE == "all" else uvicorn.Server)(config)
+
+    async def _serve_without_bot():
+        loop_monitor.start()
+        if worker is None:
+            _startup_report("ready")
+            await server.serve()
+            return
+        # The worker waits for its running jobs itself (drain_timeout); the
+        # formatting patched into posted documents gets the same deadline
+        shutdown = GracefulShutdown(SHUTDOWN_DEADLINE_SECONDS, on_force=loop.stop)
+        shutdown.add_step("stop_worker", worker.stop)
+        shutdown.add_step("drain", processing_service.drain_background)
+        shutdown.install(loop)
+        container.shutdown = shutdown
+        ipc_client.start()
+        _startup_report("ready")
+        try:
+            await worker.run()
+            await shutdown.wait()
+        finally:
+            await ipc_client.close()
+
+    print(f"Starting Yata Agent ({ROLE}, {SHARDS.describe()})…")
+    try:
+        if ROLE in ("api", "worker"):
+            if not ARGS.check:
+                loop.run_until_complete(_serve_without_bot())
+        else:
+            # Discord bot setup ------------------------------------------------
+            intents = discord.Intents.default()
+            intents.message_content = True
+            intents.voice_states = True  # Required for voice recording functionality
+            bot_class = commands.AutoShardedBot if SHARDS.enabled else commands.Bot
+            bot = bot_class(
+                command_prefix="/",
+                intents=intents,
+                loop=loop,
+                # Synced below, only when the command schema has changed
+                auto_sync_commands=False,
+                **SHARDS.bot_kwargs(),
+            )
+
+            # Inject container into bot so cogs can access shared services
+            bot.container = container  # type: ignore[attr-defined]
+            container.bot = bot
+            container.shard_config = SHARDS
+
+            # Posts the links of jobs whose waiting bot has exited
+            job_delivery = JobDeliveryService(
+                job_queue,
+                bot,
+                executors,
+                poll_interval=JOB_POLL_SECONDS,
+                exclude=queued_processing.waiting_job_ids if queued_processing is not None else None,
+            )
+            container.job_delivery = job_delivery
+
+            # Load cogs dynamically; in production you might scan a directory.
+            bot.load_extension("cogs.setup_cog")
+            bot.load_extension("cogs.recording_cog")
+            bot.load_extension("cogs.auth_cog")
+            bot.load_extension("cogs.status_cog")
+            startup_timer.mark("cogs")
+
+            if SHARDS.primary:
+                # Slash commands are global; one process registers them
+                command_sync_cache = CommandSyncCache(COMMAND_SYNC_CACHE) if COMMAND_SYNC_CACHE else None
+
+                @bot.listen("on_connect", once=True)
+                async def _sync_commands():
+                    try:
+                        await sync_commands_if_changed(bot, command_sync_cache, force=ARGS.sync_commands)
+                    except Exception:
+                        logging.getLogger("startup").exception("Slash command sync failed")
+
+            @bot.listen("on_ready", once=True)
+            async def _gateway_ready():
+                _startup_report("gateway_ready")
+
+            # SIGTERM / SIGINT: finish or hand off every meeting, then exit
+            background_tasks: dict[str, asyncio.Task] = {}
+            recording_cog = bot.get_cog("RecordingCog")
+            shutdown = GracefulShutdown(SHUTDOWN_DEADLINE_SECONDS, on_force=loop.stop)
+
+            async def _drain():
+                waits = [recording_cog.drain()]
+                if "resume" in background_tasks:
+                    # Cancelled at the deadline: its jobs go back to the queue
+                    waits.append(background_tasks["resume"])
+                if ROLE == "all":
+                    # Formatting patched into documents after the link was posted
+                    waits.append(processing_service.drain_background())
+                await asyncio.gather(*waits)
+
+            async def _stop_api():
+                server.should_exit = True
+                await background_tasks["api"]
+
+            shutdown.add_step("stop_accepting", recording_cog.stop_accepting)
+            shutdown.add_step("finalize_recordings", recording_cog.finalize_recordings)
+            if resume_worker is not None:
+                shutdown.add_step("stop_worker", resume_worker.stop)
+            shutdown.add_step("drain", _drain)
+            shutdown.add_step("hand_off", recording_cog.hand_off_unfinished, timeout=SHUTDOWN_HANDOFF_SECONDS)
+            shutdown.add_step("stop_delivery", job_delivery.stop)
+            if server is not None:
+                shutdown.add_step("stop_api", _stop_api, timeout=5)
+            shutdown.add_step("close_bot", bot.close, timeout=10)
+            container.shutdown = shutdown
+
+            async def _startup():
+                # Replaces the handlers Client.run installed (loop.stop)
+                shutdown.install(loop)
+                loop_monitor.start()
+                if ipc_hub is not None:
+                    await ipc_hub.start()
+                if ipc_client is not None:
+                    ipc_client.start()
+                background_tasks["delivery"] = loop.create_task(job_delivery.run())
+                if resume_worker is not None:
+                    background_tasks["resume"] = loop.create_task(resume_worker.run())
+
+            if not ARGS.check:
+                bot.loop.create_task(_startup())  # type: ignore[attr-defined]
+
+                # Run FastAPI server inside the same loop
+                if server is not None:
+                    background_tasks["api"] = bot.loop.create_task(server.serve())  # type: ignore[attr-defined]
+
+                # Finally, run the Discord bot (blocking until shutdown)
+                bot.run(DISCORD_TOKEN)
+
+        if ARGS.check:
+            # Everything is built; stop before connecting anywhere
+            startup_timer.mark("ready")
+            report = {"role": ROLE, "startup": startup_timer.metrics()}
+            if import_profiler.active:
+                report["imports"] = import_profiler.metrics()
+            print(json.dumps(report))
+    finally:
+        if ipc_hub is not None:
+            ipc_hub.path.unlink(missing_ok=True)
+        job_queue.close()
+        if audio_process_pool is not None:
+            audio_process_pool.close()
+        executors.shutdown(wait=False)
+        loop_monitor.stop()
+        tracer.shutdown()
+        log_listener.stop()
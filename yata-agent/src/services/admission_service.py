@@ -0,0 +1,232 @@
+"""Capacity-aware admission control for new recordings.
+
+Before ``/record_start`` joins a voice channel, :class:`AdmissionService`
+estimates what the recording will cost this node and compares it with
+what is left:
+
+* **memory** – PCM bytes already held by the active sinks plus the
+  estimate must stay within ``memory_budget_bytes``;
+* **disk** – mixing writes a temporary WAV of roughly the same size into
+  ``TEMP_DIR``, so its free space must cover the live bytes, the estimate
+  and a safety reserve;
+* **processing backlog** – jobs running or waiting for a slot must stay
+  below ``max_queue_depth``.
+
+An admitted recording counts with its estimate as *pending* until its sink
+is registered (:meth:`AdmissionService.release`), so a burst of
+``/record_start`` commands arriving while the first ones are still joining
+their voice channels cannot all be admitted against the same live bytes.
+
+If any budget is exceeded the recording is refused.  A guild that is
+already processing as many meetings as its concurrency limit allows may
+still record; its processing simply waits for a free slot
+(:meth:`AdmissionService.job_slot`), and the user is told so.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import shutil
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import Enum, auto
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+from services.database_service import DatabaseService
+from utils.executors import DB, ExecutorRegistry, run_blocking
+from utils.messages import msg
+
+logger = logging.getLogger(__name__)
+
+# Decoded Discord audio: 48 kHz, stereo, 16-bit.  With the sparse timeline
+# only speech is buffered and speakers mostly take turns, so a meeting
+# holds roughly this many bytes per second of wall-clock time.
+PCM_BYTES_PER_SECOND = 48000 * 2 * 2
+
+_MB = 1024 * 1024
+
+
+class AdmissionLevel(Enum):
+    ADMIT = auto()
+    QUEUE = auto()
+    REJECT = auto()
+
+
+@dataclass(frozen=True)
+class AdmissionPolicy:
+    """Node budgets used by :class:`AdmissionService`."""
+
+    memory_budget_bytes: int = 2048 * _MB
+    disk_reserve_bytes: int = 512 * _MB
+    # Assumed recording length for the cost estimate (capped by the
+    # guild's maximum recording duration when one is configured)
+    estimate_seconds: float = 60 * 60
+    # Processing jobs (running + waiting) beyond which recordings are refused
+    max_queue_depth: int = 8
+    # Concurrent processing jobs per guild unless overridden in guild_limits
+    guild_max_jobs: int = 1
+
+
+class AdmissionDecision:  # value object
+    """Outcome of an admission check."""
+
+    def __init__(self, level: AdmissionLevel, reason: Optional[str] = None, estimate_bytes: int = 0):
+        self.level = level
+        self.reason = reason
+        self.estimate_bytes = estimate_bytes
+        # Bytes counted as pending by the service until released
+        self.pending_bytes = 0
+
+    @property
+    def admitted(self) -> bool:
+        return self.level != AdmissionLevel.REJECT
+
+    def guidance(self) -> str:
+        """Return a user-facing explanation (empty when simply admitted)."""
+        if self.level == AdmissionLevel.ADMIT:
+            return ""
+        if self.level == AdmissionLevel.QUEUE:
+            return msg("admission_queued")
+        return msg(f"admission_reject_{self.reason}")
+
+
+class AdmissionService:
+    """Decide whether this node can take another recording."""
+
+    def __init__(
+        self,
+        db_service: Optional[DatabaseService] = None,
+        policy: Optional[AdmissionPolicy] = None,
+        temp_dir: str | Path = "recordings",
+        executors: Optional[ExecutorRegistry] = None,
+    ):
+        self._db_service = db_service
+        self.policy = policy or AdmissionPolicy()
+        self.temp_dir = Path(temp_dir)
+        self._executors = executors
+        # Estimates of admitted recordings whose sink is not registered yet
+        self._pending_bytes = 0
+
+        # guild_id -> jobs holding a slot / waiting for one
+        self._running: Dict[int, int] = {}
+        self._waiting: Dict[int, int] = {}
+        self._slot_freed = asyncio.Condition()
+        self._counts = {level.name.lower(): 0 for level in AdmissionLevel}
+        self._rejected_by_reason: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------
+    @property
+    def queue_depth(self) -> int:
+        """Processing jobs that are running or waiting for a slot."""
+        return sum(self._running.values()) + sum(self._waiting.values())
+
+    async def check(self, guild_id: int, live_bytes: int = 0) -> AdmissionDecision:
+        """Return the admission decision for a new recording in *guild_id*.
+
+        An admitted decision keeps its estimate pending; pass it to
+        :meth:`release` once the sink is registered or the start failed.
+
+        Args:
+            guild_id: Guild requesting the recording.
+            live_bytes: PCM bytes currently buffered by all active sinks.
+        """
+        policy = self.policy
+        limits = await run_blocking(self._executors, DB, self._guild_limits, guild_id)
+        free_disk = await asyncio.to_thread(self._free_disk)
+        # No await from here on: the decision and the reservation are atomic
+        live_bytes += self._pending_bytes
+
+        estimate_seconds = policy.estimate_seconds
+        if limits.get("max_recording_minutes"):
+            estimate_seconds = min(estimate_seconds, limits["max_recording_minutes"] * 60)
+        estimate = int(estimate_seconds * PCM_BYTES_PER_SECOND)
+
+        reason: Optional[str] = None
+        if live_bytes + estimate > policy.memory_budget_bytes:
+            reason = "memory"
+        elif free_disk < live_bytes + estimate + policy.disk_reserve_bytes:
+            reason = "disk"
+        elif self.queue_depth >= policy.max_queue_depth:
+            reason = "backlog"
+
+        if reason is not None:
+            decision = AdmissionDecision(AdmissionLevel.REJECT, reason, estimate)
+            self._rejected_by_reason[reason] = self._rejected_by_reason.get(reason, 0) + 1
+            logger.warning(
+                "Recording refused for guild %s: %s (live=%d estimate=%d depth=%d)",
+                guild_id, reason, live_bytes, estimate, self.queue_depth,
+            )
+        elif self._guild_jobs(guild_id) >= self._guild_max_jobs(limits):
+            decision = AdmissionDecision(AdmissionLevel.QUEUE, "guild_jobs", estimate)
+        else:
+            decision = AdmissionDecision(AdmissionLevel.ADMIT, None, estimate)
+
+        self._counts[decision.level.name.lower()] += 1
+        if decision.admitted:
+            decision.pending_bytes = estimate
+            self._pending_bytes += estimate
+        return decision
+
+    def release(self, decision: AdmissionDecision) -> None:
+        """Stop counting *decision*'s estimate as pending (idempotent)."""
+        self._pending_bytes -= decision.pending_bytes
+        decision.pending_bytes = 0
+
+    @asynccontextmanager
+    async def job_slot(self, guild_id: int) -> AsyncIterator[None]:
+        """Hold one of *guild_id*'s processing slots, waiting for a free one."""
+        limits = await run_blocking(self._executors, DB, self._guild_limits, guild_id)
+        limit = self._guild_max_jobs(limits)
+        async with self._slot_freed:
+            self._waiting[guild_id] = self._waiting.get(guild_id, 0) + 1
+            try:
+                await self._slot_freed.wait_for(
+                    lambda: self._running.get(guild_id, 0) < limit
+                )
+            finally:
+                self._waiting[guild_id] -= 1
+                if not self._waiting[guild_id]:
+                    del self._waiting[guild_id]
+            self._running[guild_id] = self._running.get(guild_id, 0) + 1
+        try:
+            yield
+        finally:
+            async with self._slot_freed:
+                self._running[guild_id] -= 1
+                if not self._running[guild_id]:
+                    del self._running[guild_id]
+                self._slot_freed.notify_all()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "decisions": dict(self._counts),
+            "rejected_by_reason": dict(self._rejected_by_reason),
+            "running": sum(self._running.values()),
+            "waiting": sum(self._waiting.values()),
+            "pending_bytes": self._pending_bytes,
+            "free_disk_bytes": self._free_disk(),
+        }
+
+    # ------------------------------------------------------------------
+    def _guild_jobs(self, guild_id: int) -> int:
+        return self._running.get(guild_id, 0) + self._waiting.get(guild_id, 0)
+
+    def _guild_limits(self, guild_id: int) -> Dict[str, Any]:
+        if self._db_service is None:
+            return {}
+        try:
+            return self._db_service.get_guild_limits(guild_id) or {}
+        except Exception:
+            logger.warning("Failed to load limits for guild %s", guild_id, exc_info=True)
+            return {}
+
+    def _guild_max_jobs(self, limits: Dict[str, Any]) -> int:
+        return max(1, limits.get("max_concurrent_jobs") or self.policy.guild_max_jobs)
+
+    def _free_disk(self) -> int:
+        try:
+            return shutil.disk_usage(self.temp_dir).free
+        except OSError:
+            logger.warning("Cannot stat %s for free space", self.temp_dir, exc_info=True)
+            return 0
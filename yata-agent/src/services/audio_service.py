@@ -1,106 +1,380 @@
 from __future__ import annotations
 
-import asyncio
+import io
+import logging
+import math
+import struct
 import subprocess
 import tempfile
+import wave
 from pathlib import Path
 from types import SimpleNamespace
-from typing import Dict
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
+import numpy as np
+
+from utils.audio_process_pool import AudioProcessPool
+from utils.executors import AUDIO_CPU, ExecutorRegistry, run_blocking
+from utils.tracing import span
+from utils.timeline import WAV_HEADER_BYTES, SparseTimeline
 from .audio_service_interface import AudioServiceInterface
 
+logger = logging.getLogger(__name__)
+
 # Whisper API が 0.1 秒未満を拒否するための最小長 (ms)
 _MIN_DURATION_MS = 150  # 0.15 秒
 
+# Timeline mixer works through the meeting in windows of this length so
+# that memory stays bounded regardless of meeting duration.
+_MIX_WINDOW_SECONDS = 10.0
+
+
+def _mix_tracks(tracks: Mapping[int, Any], out_path: str) -> str:
+    """Write each user's track to a temp file and mix/encode with ffmpeg.
+
+    *tracks* maps ``user_id`` to a bytes-like object holding that user's
+    WAV data.  Kept at module level so that it can run either in a thread
+    or inside an :class:`AudioProcessPool` worker.
+    """
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    out_path_ogg = Path(out_path).with_suffix(".ogg")
+
+    # Save all audio files to temporary files
+    temp_files = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir_path = Path(temp_dir)
+
+        for user_id, data in tracks.items():
+            temp_file = temp_dir_path / f"user_{user_id}.wav"
+            with open(temp_file, 'wb') as f:
+                f.write(data)
+            temp_files.append(temp_file)
+
+        if len(temp_files) == 1:
+            # Single file - just convert to OGG with proper settings
+            cmd = [
+                'ffmpeg', '-y',
+                '-i', str(temp_files[0]),
+                '-ac', '1',  # mono
+                '-ar', '16000',  # 16kHz sample rate
+                '-c:a', 'libopus',
+                '-b:a', '12k',
+                '-application', 'voip',
+                str(out_path_ogg)
+            ]
+        else:
+            # Multiple files - mix them
+            # Create filter_complex for mixing multiple audio streams
+            filter_inputs = []
+            for i in range(len(temp_files)):
+                filter_inputs.append(f'[{i}:a]')
+
+            filter_complex = f"{''.join(filter_inputs)}amix=inputs={len(temp_files)}:duration=longest:dropout_transition=2[mixed]"
+
+            cmd = ['ffmpeg', '-y']
+            for temp_file in temp_files:
+                cmd.extend(['-i', str(temp_file)])
+
+            cmd.extend([
+                '-filter_complex', filter_complex,
+                '-map', '[mixed]',
+                '-ac', '1',  # mono
+                '-ar', '16000',  # 16kHz sample rate
+                '-c:a', 'libopus',
+                '-b:a', '12k',
+                '-application', 'voip',
+                str(out_path_ogg)
+            ])
+
+        # Execute ffmpeg command
+        try:
+            subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"ffmpeg failed: {e.stderr}") from e
+
+        # Check if output file was created and has reasonable size
+        if not out_path_ogg.exists():
+            raise RuntimeError("ffmpeg did not create output file")
+
+        output_size = out_path_ogg.stat().st_size
+        if output_size < 100:  # Very small file, probably empty
+            raise RuntimeError(f"Output file too small: {output_size} bytes")
+
+        return str(out_path_ogg)
+
+
+def _mix_timeline(tracks: Mapping[int, Any], timeline: SparseTimeline, out_path: str) -> str:
+    """Mix compact per-user tracks at their wall-clock positions.
+
+    Every ``(start_ts, buffer_offset, length)`` run of the
+    :class:`SparseTimeline` is added into a window-sized accumulator at its
+    meeting time, so silence between utterances is never materialised per
+    user – only the current output window is held in memory.  The mixed
+    PCM is streamed to a temporary WAV and encoded to Opus with ffmpeg.
+    """
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    out_path_ogg = Path(out_path).with_suffix(".ogg")
+
+    rate = timeline.sample_rate
+    channels = timeline.channels
+    frame_bytes = timeline.frame_bytes
+    total_frames = int(math.ceil(timeline.end_ts() * rate))
+    if total_frames <= 0:
+        raise ValueError("timeline is empty")
+
+    # (start_frame, user_id, first sample index, frame count) sorted by time
+    placements: List[Tuple[int, int, int, int]] = sorted(
+        (
+            int(round(start * rate)),
+            user_id,
+            (WAV_HEADER_BYTES + offset) // timeline.sample_width,
+            length // frame_bytes,
+        )
+        for user_id in tracks
+        for start, offset, length in timeline.runs(user_id)
+    )
+
+    samples = {
+        user_id: np.frombuffer(data, dtype="<i2") for user_id, data in tracks.items()
+    }
+    window = max(1, int(_MIX_WINDOW_SECONDS * rate))
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            mix_path = Path(temp_dir) / "mix.wav"
+            with span("audio.mix_pcm", frames=total_frames), wave.open(str(mix_path), "wb") as out:
+                out.setnchannels(channels)
+                out.setsampwidth(timeline.sample_width)
+                out.setframerate(rate)
+
+                active: List[Tuple[int, int, int, int]] = []
+                next_idx = 0
+                for w_start in range(0, total_frames, window):
+                    w_end = min(w_start + window, total_frames)
+                    while next_idx < len(placements) and placements[next_idx][0] < w_end:
+                        active.append(placements[next_idx])
+                        next_idx += 1
+
+                    acc = np.zeros((w_end - w_start) * channels, dtype=np.int32)
+                    still_active = []
+                    for placement in active:
+                        start, user_id, first_sample, n_frames = placement
+                        end = start + n_frames
+                        lo, hi = max(start, w_start), min(end, w_end)
+                        if hi > lo:
+                            src = first_sample + (lo - start) * channels
+                            chunk = samples[user_id][src : src + (hi - lo) * channels]
+                            dst = (lo - w_start) * channels
+                            acc[dst : dst + chunk.size] += chunk
+                        if end > w_end:
+                            still_active.append(placement)
+                    active = still_active
+
+                    np.clip(acc, -32768, 32767, out=acc)
+                    out.writeframes(acc.astype("<i2").tobytes())
+
+            with span("audio.encode_opus"):
+                _encode_opus(mix_path, out_path_ogg)
+    finally:
+        # Drop the numpy views so shared-memory segments can be closed
+        samples.clear()
+
+    if not out_path_ogg.exists():
+        raise RuntimeError("ffmpeg did not create output file")
+    output_size = out_path_ogg.stat().st_size
+    if output_size < 100:  # Very small file, probably empty
+        raise RuntimeError(f"Output file too small: {output_size} bytes")
+    return str(out_path_ogg)
+
+
+def _wav_duration_ms(data: Any) -> Optional[float]:
+    """Estimate the duration of canonical 44-byte-header WAV data.
+
+    The py-cord sink header does not carry a reliable frame count, so the
+    duration is derived from the payload length and the header's byte rate.
+    Returns ``None`` when *data* does not look like WAV.
+    """
+    with memoryview(data) as view:
+        if view.nbytes < 44 or view[0:4] != b"RIFF" or view[8:12] != b"WAVE":
+            return None
+        (byte_rate,) = struct.unpack_from("<I", view, 28)
+        if not byte_rate:
+            return None
+        return (view.nbytes - 44) / byte_rate * 1000
+
+
+def _encode_opus(in_path: Path, out_path: Path) -> None:
+    cmd = [
+        'ffmpeg', '-y',
+        '-i', str(in_path),
+        '-ac', '1',  # mono
+        '-ar', '16000',  # 16kHz sample rate
+        '-c:a', 'libopus',
+        '-b:a', '12k',
+        '-application', 'voip',
+        str(out_path)
+    ]
+    try:
+        subprocess.run(cmd, capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg failed: {e.stderr}") from e
+
+
+def _export_tracks(tracks: Mapping[int, Any], out_dir: str) -> Dict[int, str]:
+    """Encode every track to ``<out_dir>/user_<id>.ogg`` individually.
+
+    Tracks shorter than ``_MIN_DURATION_MS`` are skipped because the
+    Whisper API rejects them.
+    """
+    out_dir_path = Path(out_dir)
+    out_dir_path.mkdir(parents=True, exist_ok=True)
+
+    exported: Dict[int, str] = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for user_id, data in tracks.items():
+            duration = _wav_duration_ms(data)
+            if duration is not None and duration < _MIN_DURATION_MS:
+                logger.info("Skipping track of user %s: %.0f ms is too short", user_id, duration)
+                continue
+
+            temp_file = Path(temp_dir) / f"user_{user_id}.wav"
+            with open(temp_file, 'wb') as f:
+                f.write(data)
+
+            out_path = out_dir_path / f"user_{user_id}.ogg"
+            _encode_opus(temp_file, out_path)
+            exported[user_id] = str(out_path)
+    return exported
+
+
 class AudioService(AudioServiceInterface):
-    """Handle heavy audio processing in a background thread using ffmpeg."""
+    """Handle heavy audio processing off the event loop using ffmpeg.
+
+    Two execution modes are supported:
+
+    * **thread** (default) – the job runs on the ``audio-cpu`` executor.
+    * **process** – when an :class:`AudioProcessPool` is injected, the PCM
+      buffers are handed to a pre-started worker process through shared
+      memory so that no Python-side audio work holds this process's GIL.
+    """
+
+    def __init__(
+        self,
+        executors: Optional[ExecutorRegistry] = None,
+        process_pool: Optional[AudioProcessPool] = None,
+    ) -> None:
+        # ``audio-cpu`` pool when injected, otherwise ``asyncio.to_thread``.
+        self._executors = executors
+        self._process_pool = process_pool
 
     async def mix_and_export(
         self,
         sink_audio_data: Dict[int, SimpleNamespace],
         encoding: str,
         out_path: str,
+        timeline: Optional[SparseTimeline] = None,
     ) -> str:
         """Overlay user tracks and write to *out_path* using ffmpeg.
 
-        The heavy ffmpeg work is executed in ``asyncio.to_thread`` so
-        that the event-loop remains responsive.
+        When the sink recorded a :class:`SparseTimeline`, each user's runs
+        are placed at their wall-clock position by the timeline mixer;
+        otherwise the tracks are overlaid from their start with ``amix``.
+
+        The heavy work is executed on the ``audio-cpu`` executor
+        (``asyncio.to_thread`` when none is injected) or in the process
+        pool, so that the event-loop remains responsive.
         """
+        if not sink_audio_data:
+            raise ValueError("sink_audio_data is empty")
+
+        if timeline is not None:
+            job, job_args = _mix_timeline, (timeline, out_path)
+        else:
+            job, job_args = _mix_tracks, (out_path,)
+
+        with span("audio.mix_and_export", tracks=len(sink_audio_data)):
+            if self._process_pool is not None:
+                return await self._run_in_process(job, sink_audio_data, *job_args)
 
-        def _work() -> str:
-            if not sink_audio_data:
-                raise ValueError("sink_audio_data is empty")
+            def _work() -> str:
+                with span("audio.read_buffers"):
+                    tracks = {}
+                    for user_id, audio in sink_audio_data.items():
+                        audio.file.seek(0)
+                        tracks[user_id] = audio.file.read()
+                return job(tracks, *job_args)
 
-            Path(out_path).parent.mkdir(parents=True, exist_ok=True)
-            out_path_ogg = Path(out_path).with_suffix(".ogg")
+            return await run_blocking(self._executors, AUDIO_CPU, _work)
 
-            # Save all audio files to temporary files
-            temp_files = []
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_dir_path = Path(temp_dir)
-                
-                for i, (user_id, audio) in enumerate(sink_audio_data.items()):
-                    temp_file = temp_dir_path / f"user_{user_id}.wav"
+    async def export_tracks(
+        self,
+        sink_audio_data: Dict[int, SimpleNamespace],
+        encoding: str,
+        out_dir: str,
+    ) -> Dict[int, str]:
+        """Encode each user's track separately for per-speaker transcription.
+
+        Used instead of :meth:`mix_and_export` when speaker identity must be
+        preserved; the mixing step is skipped entirely.
+        """
+        if not sink_audio_data:
+            raise ValueError("sink_audio_data is empty")
+
+        with span("audio.export_tracks", tracks=len(sink_audio_data)):
+            if self._process_pool is not None:
+                return await self._run_in_process(_export_tracks, sink_audio_data, out_dir)
+
+            def _work() -> Dict[int, str]:
+                tracks = {}
+                for user_id, audio in sink_audio_data.items():
                     audio.file.seek(0)
-                    with open(temp_file, 'wb') as f:
-                        f.write(audio.file.read())
-                    temp_files.append(temp_file)
-
-                if len(temp_files) == 1:
-                    # Single file - just convert to OGG with proper settings
-                    cmd = [
-                        'ffmpeg', '-y',
-                        '-i', str(temp_files[0]),
-                        '-ac', '1',  # mono
-                        '-ar', '16000',  # 16kHz sample rate
-                        '-c:a', 'libopus',
-                        '-b:a', '12k',
-                        '-application', 'voip',
-                        str(out_path_ogg)
-                    ]
+                    tracks[user_id] = audio.file.read()
+                return _export_tracks(tracks, out_dir)
+
+            return await run_blocking(self._executors, AUDIO_CPU, _work)
+
+    async def encode_file(self, in_path: str, out_path: str) -> str:
+        """Encode an existing audio file (e.g. a leftover WAV) to Opus.
+
+        Returns the path of the ``.ogg`` file.  Used to backfill recordings
+        whose processing failed after mixing.
+        """
+        out = Path(out_path).with_suffix(".ogg")
+        await run_blocking(self._executors, AUDIO_CPU, _encode_opus, Path(in_path), out)
+        return out.as_posix()
+
+    async def _run_in_process(
+        self, fn: Any, sink_audio_data: Dict[int, SimpleNamespace], *args: Any
+    ) -> Any:
+        assert self._process_pool is not None
+        # ``BytesIO.getbuffer`` exposes the recording without a copy; the
+        # pool copies it once into shared memory.
+        views: Dict[int, Any] = {}
+        try:
+            for user_id, audio in sink_audio_data.items():
+                if isinstance(audio.file, io.BytesIO):
+                    views[user_id] = audio.file.getbuffer()
                 else:
-                    # Multiple files - mix them
-                    # Create filter_complex for mixing multiple audio streams
-                    filter_inputs = []
-                    for i in range(len(temp_files)):
-                        filter_inputs.append(f'[{i}:a]')
-                    
-                    filter_complex = f"{''.join(filter_inputs)}amix=inputs={len(temp_files)}:duration=longest:dropout_transition=2[mixed]"
-                    
-                    cmd = ['ffmpeg', '-y']
-                    for temp_file in temp_files:
-                        cmd.extend(['-i', str(temp_file)])
-                    
-                    cmd.extend([
-                        '-filter_complex', filter_complex,
-                        '-map', '[mixed]',
-                        '-ac', '1',  # mono
-                        '-ar', '16000',  # 16kHz sample rate
-                        '-c:a', 'libopus',
-                        '-b:a', '12k',
-                        '-application', 'voip',
-                        str(out_path_ogg)
-                    ])
-
-                # Execute ffmpeg command
-                try:
-                    result = subprocess.run(
-                        cmd,
-                        capture_output=True,
-                        text=True,
-                        check=True
-                    )
-                except subprocess.CalledProcessError as e:
-                    raise RuntimeError(f"ffmpeg failed: {e.stderr}") from e
-
-                # Check if output file was created and has reasonable size
-                if not out_path_ogg.exists():
-                    raise RuntimeError("ffmpeg did not create output file")
-                
-                output_size = out_path_ogg.stat().st_size
-                if output_size < 100:  # Very small file, probably empty
-                    raise RuntimeError(f"Output file too small: {output_size} bytes")
-
-                return str(out_path_ogg)
-
-        return await asyncio.to_thread(_work) 
\ No newline at end of file
+                    audio.file.seek(0)
+                    views[user_id] = audio.file.read()
+
+            result, stats = await self._process_pool.run(fn, views, *args)
+        finally:
+            for view in views.values():
+                if isinstance(view, memoryview):
+                    view.release()
+
+        logger.info(
+            "Audio job %s finished in worker %d: wall=%.2fs cpu=%.2fs (ffmpeg %.2fs) input=%d bytes",
+            getattr(fn, "__name__", fn),
+            stats.pid,
+            stats.wall_seconds,
+            stats.cpu_seconds,
+            stats.child_cpu_seconds,
+            stats.bytes_in,
+        )
+        return result
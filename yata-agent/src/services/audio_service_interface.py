@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Optional
 from types import SimpleNamespace
 
+from utils.timeline import SparseTimeline
+
 class AudioServiceInterface(ABC):
     """Mix per-user audio tracks into a single file and export.
 
@@ -16,9 +18,27 @@ class AudioServiceInterface(ABC):
         sink_audio_data: Dict[int, SimpleNamespace],
         encoding: str,
         out_path: str,
+        timeline: Optional[SparseTimeline] = None,
     ) -> str:
         """Combine tracks, ensure minimal duration, write ``out_path``.
 
+        If *timeline* is given, each user's compact track is placed at the
+        wall-clock positions it records instead of being overlaid from 0.
+
         Returns the absolute path of the created file.
         """
-        raise NotImplementedError 
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod
+    async def export_tracks(
+        self,
+        sink_audio_data: Dict[int, SimpleNamespace],
+        encoding: str,
+        out_dir: str,
+    ) -> Dict[int, str]:
+        """Encode each user's track to its own file without mixing.
+
+        Tracks too short for the transcription API are skipped.  Returns
+        ``user_id -> path`` for the files that were written.
+        """
+        raise NotImplementedError
@@ -0,0 +1,315 @@
+"""録音ファイルのバックフィル (一括再処理)。
+
+失敗した実行の後に ``recordings`` に残った ``.ogg`` / ``.wav`` を
+:class:`ProcessingService` でまとめて議事録化する。CLI は ``src/backfill.py``。
+
+* 並列数は ``parallel`` で指定する。
+* 完了したファイルは内容ハッシュ付きでマニフェスト (JSON) に記録し、
+  再実行時はスキップする。中断しても続きから再開できる。
+* 文字起こしは :class:`CachedTranscriptionService` 経由にすると、
+  アップロードだけ失敗したファイルで Whisper を再度呼ばずに済む。
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime as _dt
+import glob
+import json
+import logging
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from services.audio_service import AudioService
+from services.transcript_cache import CachedTranscriptionService, file_digest
+from utils.audio_duration import estimate_audio_seconds
+
+logger = logging.getLogger(__name__)
+
+AUDIO_SUFFIXES = (".ogg", ".wav")
+
+# RecordingCog が書き出すファイル名: recording_<guild_id>_<YYYYmmdd_HHMMSS>
+_RECORDING_NAME = re.compile(r"recording_(\d+)_(\d{8}_\d{6})")
+
+DONE = "done"
+FAILED = "failed"
+
+
+def discover(inputs: Sequence[str]) -> List[Path]:
+    """ディレクトリ・ファイル・glob から処理対象の音声ファイルを列挙する。
+
+    同じ名前の ``.ogg`` と ``.wav`` がある場合は、エンコード済みの
+    ``.ogg`` だけを対象にする。
+    """
+    found: Dict[Path, None] = {}
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            candidates: Iterable[Path] = path.rglob("*")
+        else:
+            candidates = (Path(p) for p in glob.glob(item, recursive=True))
+        for candidate in candidates:
+            if candidate.is_file() and candidate.suffix.lower() in AUDIO_SUFFIXES:
+                found[candidate.resolve()] = None
+
+    files = sorted(found)
+    stems_with_ogg = {p.with_suffix("") for p in files if p.suffix.lower() == ".ogg"}
+    return [
+        p for p in files
+        if p.suffix.lower() == ".ogg" or p.with_suffix("") not in stems_with_ogg
+    ]
+
+
+def parse_recording_name(path: Path) -> tuple[Optional[int], Optional[_dt.datetime]]:
+    """ファイル名からサーバー ID と録音日時を取り出す (取れなければ None)。"""
+    match = _RECORDING_NAME.search(path.stem)
+    if not match:
+        return None, None
+    recorded_at = _dt.datetime.strptime(match.group(2), "%Y%m%d_%H%M%S")
+    return int(match.group(1)), recorded_at
+
+
+class BackfillManifest:
+    """処理結果を記録する再開可能なマニフェスト。
+
+    ``{"version": 1, "files": {path: {...}}}`` 形式の JSON で、1 件完了する
+    ごとに一時ファイル経由で置き換えるため、途中で強制終了しても壊れない。
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries = data.get("files", {})
+
+    def is_done(self, path: Path, digest: str) -> bool:
+        entry = self.entries.get(str(path))
+        return bool(entry) and entry.get("status") == DONE and entry.get("sha256") == digest
+
+    def record(self, path: Path, **fields: Any) -> None:
+        self.entries[str(path)] = {**fields, "updated_at": _dt.datetime.now().isoformat()}
+        self.save()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "files": self.entries}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class BackfillReport:
+    """バックフィル全体のスループット集計。"""
+
+    total: int = 0
+    done: int = 0
+    skipped: int = 0
+    failed: int = 0
+    cache_hits: int = 0
+    bytes_processed: int = 0
+    audio_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    file_seconds: List[float] = field(default_factory=list)
+
+    @property
+    def finished(self) -> int:
+        return self.done + self.skipped + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def _percentile(self, pct: float) -> float:
+        if not self.file_seconds:
+            return 0.0
+        ordered = sorted(self.file_seconds)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = max(self.elapsed, 1e-9)
+        return {
+            "total": self.total,
+            "done": self.done,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "cache_hits": self.cache_hits,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "files_per_minute": round(self.done / elapsed * 60, 3),
+            "audio_seconds": round(self.audio_seconds, 1),
+            "audio_seconds_per_second": round(self.audio_seconds / elapsed, 3),
+            "megabytes_per_second": round(self.bytes_processed / elapsed / 1e6, 3),
+            "p50_file_seconds": round(self._percentile(50), 3),
+            "p95_file_seconds": round(self._percentile(95), 3),
+        }
+
+    def format(self) -> str:
+        d = self.as_dict()
+        return (
+            f"Backfill finished in {d['elapsed_seconds']:.1f}s: "
+            f"{d['done']} done, {d['skipped']} skipped, {d['failed']} failed "
+            f"(cache hits: {d['cache_hits']})\n"
+            f"  throughput: {d['files_per_minute']:.2f} files/min, "
+            f"{d['audio_seconds_per_second']:.1f}x realtime, {d['megabytes_per_second']:.2f} MB/s\n"
+            f"  per file: p50 {d['p50_file_seconds']:.1f}s, p95 {d['p95_file_seconds']:.1f}s"
+        )
+
+
+class ProgressDisplay:
+    """1 行で上書き表示する進捗表示 (TTY でなければ行ごとに出力)。"""
+
+    def __init__(self, stream: Optional[IO[str]] = None):
+        self.stream = stream or sys.stderr
+        self._tty = getattr(self.stream, "isatty", lambda: False)()
+
+    def update(self, r: BackfillReport, last: str = "") -> None:
+        elapsed = max(r.elapsed, 1e-9)
+        rate = r.finished / elapsed
+        remaining = r.total - r.finished
+        eta = f"{remaining / rate:.0f}s" if rate > 0 and remaining else "-"
+        line = (
+            f"[{r.finished}/{r.total}] done={r.done} skipped={r.skipped} failed={r.failed} "
+            f"| {rate * 60:.1f} files/min | ETA {eta}"
+        )
+        if last:
+            line += f" | {last}"
+        if self._tty:
+            self.stream.write("\r\033[K" + line)
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        if self._tty:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+class BackfillService:
+    """音声ファイル群を `ProcessingService` で並列に処理する。"""
+
+    def __init__(
+        self,
+        processing_service: Any,
+        manifest: BackfillManifest,
+        audio_service: Optional[AudioService] = None,
+        transcript_cache: Optional[CachedTranscriptionService] = None,
+        parallel: int = 2,
+        guild_id: Optional[int] = None,
+        language: str = "ja",
+    ):
+        """コンストラクタ。
+
+        Args:
+            processing_service: ``process(guild_id, path, title)`` を持つサービス。
+            manifest: 進捗を記録するマニフェスト。
+            audio_service: ``.wav`` を Opus にエンコードする場合に使用。
+            transcript_cache: キャッシュ済みかどうかの判定 (レポート用)。
+            parallel: 同時に処理するファイル数。
+            guild_id: ファイル名から ID が取れない場合に使うサーバー ID。
+            language: キャッシュ判定に使う言語。
+        """
+        self._processing_service = processing_service
+        self.manifest = manifest
+        self._audio_service = audio_service
+        self._transcript_cache = transcript_cache
+        self.parallel = max(1, parallel)
+        self._guild_id = guild_id
+        self._language = language
+
+    async def run(
+        self,
+        files: Sequence[Path],
+        on_progress: Optional[Callable[[BackfillReport, str], None]] = None,
+    ) -> BackfillReport:
+        """*files* を処理し、スループットの集計を返す。"""
+        report = BackfillReport(total=len(files))
+        semaphore = asyncio.Semaphore(self.parallel)
+
+        async def _one(path: Path) -> None:
+            async with semaphore:
+                status = await self._process_file(path, report)
+            if on_progress is not None:
+                on_progress(report, f"{path.name}: {status}")
+
+        await asyncio.gather(*(_one(path) for path in files))
+        report.finished_at = time.monotonic()
+        return report
+
+    async def _process_file(self, path: Path, report: BackfillReport) -> str:
+        digest = await asyncio.to_thread(file_digest, str(path))
+        if self.manifest.is_done(path, digest):
+            report.skipped += 1
+            return "skipped"
+
+        guild_id, recorded_at = parse_recording_name(path)
+        guild_id = guild_id or self._guild_id
+        if guild_id is None:
+            report.failed += 1
+            self.manifest.record(path, sha256=digest, status=FAILED, error="unknown guild id")
+            return "failed (unknown guild id; pass --guild-id)"
+
+        started = time.monotonic()
+        try:
+            audio_path = str(path)
+            if path.suffix.lower() == ".wav":
+                if self._audio_service is None:
+                    raise RuntimeError("WAV input requires an AudioService to encode it")
+                audio_path = await self._audio_service.encode_file(audio_path, audio_path)
+            if self._transcript_cache is not None and await self._transcript_cache.contains(
+                audio_path, self._language
+            ):
+                report.cache_hits += 1
+            title = "Meeting Minutes " + (recorded_at or _dt.datetime.now()).strftime("%Y-%m-%d %H:%M")
+            url = await self._processing_service.process(guild_id, audio_path, title)
+        except Exception as exc:
+            logger.error("Backfill failed for %s: %s", path, exc, exc_info=True)
+            report.failed += 1
+            self.manifest.record(path, sha256=digest, status=FAILED, error=str(exc))
+            return "failed"
+
+        seconds = time.monotonic() - started
+        size = os.path.getsize(path)
+        audio_seconds = await asyncio.to_thread(estimate_audio_seconds, [audio_path])
+        report.done += 1
+        report.bytes_processed += size
+        report.audio_seconds += audio_seconds
+        report.file_seconds.append(seconds)
+        self.manifest.record(
+            path,
+            sha256=digest,
+            status=DONE,
+            guild_id=guild_id,
+            url=url,
+            seconds=round(seconds, 3),
+            bytes=size,
+            audio_seconds=round(audio_seconds, 1),
+        )
+        if audio_path != str(path):
+            # 次回の discover() はエンコード済みの .ogg を選ぶため、そちらも完了にする
+            encoded = Path(audio_path).resolve()
+            encoded_digest = await asyncio.to_thread(file_digest, str(encoded))
+            self.manifest.record(
+                encoded, sha256=encoded_digest, status=DONE, guild_id=guild_id, url=url, source=str(path)
+            )
+        return "done"
+
+
+__all__ = [
+    "AUDIO_SUFFIXES",
+    "BackfillManifest",
+    "BackfillReport",
+    "BackfillService",
+    "ProgressDisplay",
+    "discover",
+    "parse_recording_name",
+]
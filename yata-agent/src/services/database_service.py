@@ -46,6 +46,21 @@ class DatabaseService:
         """
         self._db_engine.upsert_credentials(guild_id, token_dict)
 
+    def get_guild_limits(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        """録音上限設定を取得します。"""
+        return self._db_engine.get_guild_limits(guild_id)
+
+    def upsert_guild_limits(
+        self,
+        guild_id: int,
+        max_recording_minutes: Optional[int],
+        max_concurrent_jobs: Optional[int] = None,
+    ) -> None:
+        """録音上限設定を登録または更新します。"""
+        self._db_engine.upsert_guild_limits(
+            guild_id, max_recording_minutes, max_concurrent_jobs
+        )
+
     def delete_server_data(self, guild_id: int) -> None:
         """サーバーに関連するすべてのデータを削除します。"""
         self._db_engine.delete_server_data(guild_id) 
\ No newline at end of file
@@ -1,19 +1,36 @@
 import json
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-import asyncio
+import re
+from typing import TYPE_CHECKING, Optional
 
 from data.database_interface import DatabaseInterface
+from utils.circuit_breaker import CircuitBreaker
+from utils.deadline import call_timeout
+from utils.executors import DB, GOOGLE_IO, ExecutorRegistry, run_blocking
+from utils.lazy_import import lazy_import
+from utils.tracing import span
 from .google_service_interface import GoogleServiceInterface
 
+if TYPE_CHECKING:  # pragma: no cover
+    from google.oauth2.credentials import Credentials
+
+# Google のクライアントライブラリは import に時間がかかるため、最初の
+# 認証やアップロードまで遅らせる
+discovery = lazy_import("googleapiclient.discovery")
+errors = lazy_import("googleapiclient.errors")
+oauth2_credentials = lazy_import("google.oauth2.credentials")
+oauth_flow = lazy_import("google_auth_oauthlib.flow")
+httplib2 = lazy_import("httplib2")
+google_auth_httplib2 = lazy_import("google_auth_httplib2")
+
 # Google APIのスコープ
 SCOPES = [
     "https://www.googleapis.com/auth/documents",
     "https://www.googleapis.com/auth/drive"
 ]
 
+# 処理の期限が迫っていても、1 リクエストにはこの秒数まで待つ
+_MIN_REQUEST_TIMEOUT = 30.0
+
 class GoogleService(GoogleServiceInterface):
     """
     Google APIとの対話を行うサービス。
@@ -24,6 +41,8 @@ class GoogleService(GoogleServiceInterface):
         db_service: DatabaseInterface,
         client_secrets_json: str,
         redirect_uri: str,
+        executors: Optional[ExecutorRegistry] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
     ):
         """
         GoogleServiceのコンストラクタ。
@@ -32,8 +51,15 @@ class GoogleService(GoogleServiceInterface):
             db_service (DatabaseInterface): データベース対話のためのサービス。
             client_secrets_json (str): Google Cloudのクライアントシークレット(JSON形式)。
             redirect_uri (str): Google OAuth 2.0のリダイレクトURI。
+            executors (Optional[ExecutorRegistry]): ブロッキング処理を実行する
+                ワークロード別スレッドプール。未指定時は ``asyncio.to_thread``。
+            circuit_breaker (Optional[CircuitBreaker]): Google API 用の
+                サーキットブレーカー。開いている間はアップロードを試みずに
+                ``CircuitOpenError`` を送出する。
         """
         self.db_service = db_service
+        self._executors = executors
+        self._circuit_breaker = circuit_breaker
         try:
             self.client_config = json.loads(client_secrets_json)
         except json.JSONDecodeError:
@@ -43,7 +69,7 @@ class GoogleService(GoogleServiceInterface):
     async def get_authentication_url(self, state: str) -> str:
         """ユーザー認証用のGoogle OAuth 2.0 URLを生成する。"""
         # この処理は同期的だが、インターフェースに合わせてasyncで定義
-        flow = Flow.from_client_config(
+        flow = oauth_flow.Flow.from_client_config(
             client_config=self.client_config, scopes=SCOPES, redirect_uri=self.redirect_uri
         )
         auth_url, _ = flow.authorization_url(
@@ -56,11 +82,11 @@ class GoogleService(GoogleServiceInterface):
     async def exchange_code_for_credentials(self, guild_id: int, code: str) -> None:
         """認証コードを資格情報に交換し、永続化する。"""
         # from_client_secrets_file は非同期ではないため、同期的に実行
-        flow = Flow.from_client_config(
+        flow = oauth_flow.Flow.from_client_config(
             client_config=self.client_config, scopes=SCOPES, redirect_uri=self.redirect_uri
         )
         # fetch_tokenはブロッキングI/Oのため、別スレッドで実行
-        await asyncio.to_thread(flow.fetch_token, code=code)
+        await run_blocking(self._executors, GOOGLE_IO, flow.fetch_token, code=code)
 
         credentials = flow.credentials
         # DatabaseService is synchronous – run it in a thread to avoid
@@ -68,7 +94,9 @@ class GoogleService(GoogleServiceInterface):
         # string so we parse it back into a dict for storage.
         import json as _json
 
-        await asyncio.to_thread(
+        await run_blocking(
+            self._executors,
+            DB,
             self.db_service.upsert_credentials,
             guild_id,
             _json.loads(credentials.to_json()),
@@ -76,34 +104,23 @@ class GoogleService(GoogleServiceInterface):
 
     async def upload_document(self, guild_id: int, title: str, content: str) -> str:
         """Googleドキュメントを作成し、指定された内容でアップロードする。"""
-        # DatabaseService is *sync* so we must run calls in a thread.
-        credentials_json = await asyncio.to_thread(
-            self.db_service.get_credentials,
-            guild_id,
-        )
-        if not credentials_json:
-            raise ValueError(f"No valid credentials found for guild {guild_id}")
+        creds = await self._load_credentials(guild_id)
 
-        settings = await asyncio.to_thread(
+        settings = await run_blocking(
+            self._executors,
+            DB,
             self.db_service.get_server_settings,
             guild_id,
         )
         folder_id = settings.get("gdrive_folder_id") if settings else None
+        # 期限はスレッドに引き継がれないため、ここで HTTP タイムアウトに変換する
+        timeout = call_timeout(floor=_MIN_REQUEST_TIMEOUT)
 
-        # ``credentials_json`` can be stored as *dict* or JSON str depending on
-        # the database backend.  Accept both formats for robustness.
-        if isinstance(credentials_json, str):
-            creds_dict = json.loads(credentials_json)
-        else:  # already a dict-like object
-            creds_dict = credentials_json
-
-        creds = Credentials.from_authorized_user_info(creds_dict)
-
-        # Google APIのクライアントはブロッキングI/Oのため、to_threadで実行
+        # Google APIのクライアントはブロッキングI/Oのため、google-io プールで実行
         def _execute_api_calls():
             try:
-                docs_service = build("docs", "v1", credentials=creds)
-                drive_service = build("drive", "v3", credentials=creds)
+                docs_service = _build_service("docs", "v1", creds, timeout)
+                drive_service = _build_service("drive", "v3", creds, timeout)
 
                 # 1. ドキュメント作成
                 doc = docs_service.documents().create(body={"title": title}).execute()
@@ -125,8 +142,107 @@ class GoogleService(GoogleServiceInterface):
                 
                 return f"https://docs.google.com/document/d/{doc_id}/edit"
 
-            except HttpError as e:
+            except errors.HttpError as e:
                 # エラーをキャッチして、より具体的な情報とともに再送出
                 raise Exception(f"Google API Error: {e.reason}") from e
 
-        return await asyncio.to_thread(_execute_api_calls) 
\ No newline at end of file
+        if self._circuit_breaker is not None:
+            _unguarded = _execute_api_calls
+
+            def _execute_api_calls():
+                return self._circuit_breaker.call_blocking(_unguarded)
+
+        with span("google.create_document", chars=len(content), folder=bool(folder_id)):
+            return await run_blocking(self._executors, GOOGLE_IO, _execute_api_calls)
+
+    async def update_document(
+        self,
+        guild_id: int,
+        document_url: str,
+        content: str,
+        previous_content: Optional[str] = None,
+    ) -> None:
+        """既存のGoogleドキュメントの本文を *content* で置き換える。
+
+        *previous_content* (`upload_document` で書き込んだ本文) が分かって
+        いれば本文の範囲を計算で求め、``documents.get`` を省いて
+        ``batchUpdate`` 1 回だけで置き換える。
+        """
+        creds = await self._load_credentials(guild_id)
+        doc_id = _document_id(document_url)
+        timeout = call_timeout(floor=_MIN_REQUEST_TIMEOUT)
+
+        def _execute_api_calls():
+            try:
+                docs_service = _build_service("docs", "v1", creds, timeout)
+                if previous_content is not None:
+                    # 本文は index 1 から始まり、末尾の改行の手前で終わる
+                    end_index = 1 + _utf16_len(previous_content) + 1
+                else:
+                    doc = docs_service.documents().get(
+                        documentId=doc_id, fields="body(content(endIndex))"
+                    ).execute()
+                    body = doc.get("body", {}).get("content", [])
+                    end_index = body[-1].get("endIndex", 1) if body else 1
+
+                # 本文の削除と挿入を 1 回の batchUpdate で行う
+                requests = []
+                if end_index > 2:
+                    requests.append(
+                        {"deleteContentRange": {"range": {"startIndex": 1, "endIndex": end_index - 1}}}
+                    )
+                requests.append({"insertText": {"location": {"index": 1}, "text": content}})
+                docs_service.documents().batchUpdate(
+                    documentId=doc_id, body={"requests": requests}
+                ).execute()
+            except errors.HttpError as e:
+                raise Exception(f"Google API Error: {e.reason}") from e
+
+        if self._circuit_breaker is not None:
+            _unguarded = _execute_api_calls
+
+            def _execute_api_calls():
+                return self._circuit_breaker.call_blocking(_unguarded)
+
+        with span("google.update_document", chars=len(content), fetched_range=previous_content is None):
+            await run_blocking(self._executors, GOOGLE_IO, _execute_api_calls)
+
+    async def _load_credentials(self, guild_id: int) -> "Credentials":
+        """サーバーに保存された資格情報を読み込む。"""
+        # DatabaseService is *sync* so we must run calls in a thread.
+        credentials_json = await run_blocking(
+            self._executors,
+            DB,
+            self.db_service.get_credentials,
+            guild_id,
+        )
+        if not credentials_json:
+            raise ValueError(f"No valid credentials found for guild {guild_id}")
+
+        # ``credentials_json`` can be stored as *dict* or JSON str depending on
+        # the database backend.  Accept both formats for robustness.
+        if isinstance(credentials_json, str):
+            creds_dict = json.loads(credentials_json)
+        else:  # already a dict-like object
+            creds_dict = credentials_json
+
+        return oauth2_credentials.Credentials.from_authorized_user_info(creds_dict)
+
+
+def _build_service(api: str, version: str, creds: "Credentials", timeout: Optional[float]):
+    """``discovery.build`` whose HTTP requests time out after *timeout* seconds."""
+    if timeout is None:
+        return discovery.build(api, version, credentials=creds)
+    http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=timeout))
+    return discovery.build(api, version, http=http)
+
+
+def _utf16_len(text: str) -> int:
+    """Google Docs のインデックス単位 (UTF-16 コード単位) での長さ。"""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _document_id(document_url: str) -> str:
+    """``https://docs.google.com/document/d/<id>/edit`` からIDを取り出す。"""
+    match = re.search(r"/document/d/([^/]+)", document_url)
+    return match.group(1) if match else document_url
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 
 class GoogleServiceInterface(ABC):
@@ -50,4 +51,28 @@ class GoogleServiceInterface(ABC):
             ValueError: 有効な資格情報がサーバーに登録されていない場合。
             Exception: ドキュメントの作成やアップロードに失敗した場合。
         """
-        pass 
\ No newline at end of file
+        pass 
+
+    @abstractmethod
+    async def update_document(
+        self,
+        guild_id: int,
+        document_url: str,
+        content: str,
+        previous_content: Optional[str] = None,
+    ) -> None:
+        """
+        既存のGoogleドキュメントの本文を置き換える。
+
+        Args:
+            guild_id (int): 使用する資格情報が紐付いたDiscordサーバーのID。
+            document_url (str): `upload_document` が返したドキュメントのURL。
+            content (str): 新しい本文。
+            previous_content (Optional[str]): 現在の本文。分かっている場合は
+                ドキュメントを読み直さずに置き換える。
+
+        Raises:
+            ValueError: 有効な資格情報がサーバーに登録されていない場合。
+            Exception: ドキュメントの更新に失敗した場合。
+        """
+        pass
@@ -0,0 +1,121 @@
+"""再起動をまたぐ議事録ジョブの引き継ぎと、結果の投稿。
+
+デプロイなどでボットが終了するとき、処理しきれなかった会議は
+:class:`utils.graceful_shutdown.GracefulShutdown` の手順の中で
+``RecordingCog`` が音声をファイルに書き出し、:meth:`JobDeliveryService.hand_off`
+で共有ジョブキュー (:class:`data.job_queue.JobQueue`) に積む。
+
+* ``--role bot`` ではワーカーがそのまま処理する。``all`` では再起動後の
+  プロセス内の :class:`services.job_worker.JobWorker` が処理する。
+* 結果 (URL または失敗) は :meth:`JobDeliveryService.run` が元のチャンネルに
+  投稿する。``channel_id`` のあるジョブのうち、このプロセスで誰も待って
+  いないもの (``exclude`` に含まれないもの) が対象。
+* 投稿は :meth:`JobQueue.claim_delivery` で引き受けてから行うため、複数の
+  ボット (シャード分割) があっても 1 回だけになる。チャンネルが見えない
+  (別のシャードのサーバー) ジョブは、そのシャードのボットに任せる。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from data.job_queue import FAILED, Job, JobQueue
+from utils.executors import DB, ExecutorRegistry, run_blocking
+from utils.messages import msg
+
+logger = logging.getLogger(__name__)
+
+
+class JobDeliveryService:
+    """引き継いだジョブを積み、終わったジョブの結果をチャンネルに投稿する。"""
+
+    def __init__(
+        self,
+        job_queue: JobQueue,
+        bot: Any,
+        executors: Optional[ExecutorRegistry] = None,
+        poll_interval: float = 5.0,
+        exclude: Optional[Callable[[], Iterable[int]]] = None,
+    ) -> None:
+        """コンストラクタ。
+
+        Args:
+            job_queue: ワーカー (または再開用の JobWorker) と共有するジョブキュー。
+            bot: 投稿に使う Discord のボット (``get_channel`` を持つもの)。
+            executors: SQLite の読み書きを行う ``db`` プール。
+            poll_interval: 終わったジョブを確認する間隔 (秒)。
+            exclude: このプロセスで結果を待っているジョブ ID を返す関数
+                (``QueuedProcessingService`` が待つジョブはそちらが投稿する)。
+        """
+        self._queue = job_queue
+        self._bot = bot
+        self._executors = executors
+        self.poll_interval = poll_interval
+        self._exclude = exclude
+        self._stopping = asyncio.Event()
+        self._handed_off = 0
+        self._delivered = 0
+
+    async def _db(self, fn, *args):
+        return await run_blocking(self._executors, DB, fn, *args)
+
+    async def hand_off(
+        self, guild_id: int, channel_id: Optional[int], kind: str, args: Dict[str, Any]
+    ) -> int:
+        """中断した会議をジョブとして積み、その ID を返す。"""
+        job_id = await self._db(self._queue.enqueue, guild_id, kind, args, channel_id)
+        self._handed_off += 1
+        logger.info("Handed off job %d (%s) for guild %s", job_id, kind, guild_id)
+        return job_id
+
+    # ------------------------------------------------------------------
+    async def run(self) -> None:
+        """``stop`` されるまで、終わったジョブの結果を投稿し続ける。"""
+        while not self._stopping.is_set():
+            try:
+                await self.deliver_once()
+            except Exception:
+                logger.exception("Failed to deliver finished jobs")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def deliver_once(self) -> int:
+        """投稿待ちのジョブを 1 回確認し、投稿した件数を返す。"""
+        jobs = await self._db(self._queue.undelivered)
+        waiting = set(self._exclude()) if self._exclude is not None else set()
+        delivered = 0
+        for job in jobs:
+            if job.id in waiting:
+                continue
+            channel = self._bot.get_channel(job.channel_id)
+            if channel is None:
+                continue
+            if not await self._db(self._queue.claim_delivery, job.id):
+                continue
+            await self._post(channel, job)
+            delivered += 1
+        self._delivered += delivered
+        return delivered
+
+    async def _post(self, channel: Any, job: Job) -> None:
+        if job.status == FAILED:
+            logger.warning("Handed-off job %d failed: %s", job.id, job.error)
+            content = msg("record_resumed_failed")
+        else:
+            content = msg("record_resumed_done").format(url=job.result or "")
+        try:
+            await channel.send(content)
+        except Exception:
+            logger.warning("Failed to post the result of job %d", job.id, exc_info=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"handed_off": self._handed_off, "delivered": self._delivered}
+
+
+__all__ = ["JobDeliveryService"]
@@ -0,0 +1,199 @@
+"""共有ジョブキューを処理するワーカー (``main.py --role worker``)。
+
+同じホストで任意の数のワーカープロセスを起動できる。各ワーカーは
+:class:`data.job_queue.JobQueue` から同時に ``concurrency`` 件までジョブを
+取り出し、``ProcessingScheduler`` (または ``ProcessingService``) で処理して
+結果の URL またはエラーをキューに書き戻す。
+
+* 新しいジョブは IPC の ``job_queued`` で起こされるが、IPC がなくても
+  ``poll_interval`` 秒ごとにキューを確認する。
+* 完了は IPC の ``job_finished`` でボットに知らせる。
+* ``heartbeat_interval`` ごとにハートビートを書き、``stale_after`` 秒以上
+  途絶えたワーカー (強制終了したプロセス) のジョブをキューに戻す。
+* 停止時は新しいジョブを取らず、実行中のジョブを ``drain_timeout`` 秒まで
+  待つ (やり直しで文字起こしの API 料金が二重にかからないように)。
+  それでも終わらないジョブは、失敗にせずキューに戻す。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+from data.job_queue import JobQueue, Job
+from services.queued_processing import JOB_KINDS
+from utils.executors import DB, ExecutorRegistry, run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """キューからジョブを取り出して処理するループ。"""
+
+    def __init__(
+        self,
+        job_queue: JobQueue,
+        processing_service: Any,
+        worker_id: str,
+        concurrency: int = 2,
+        executors: Optional[ExecutorRegistry] = None,
+        ipc: Optional[Any] = None,
+        poll_interval: float = 2.0,
+        heartbeat_interval: float = 5.0,
+        stale_after: float = 30.0,
+        drain_timeout: float = 0.0,
+    ) -> None:
+        """コンストラクタ。
+
+        Args:
+            job_queue: ボットと共有するジョブキュー。
+            processing_service: ``process`` / ``process_speakers`` を持つ処理系。
+            worker_id: キューに記録するワーカー名 (ホスト名と PID など)。
+            concurrency: 同時に処理するジョブ数の上限。
+            executors: SQLite の読み書きを行う ``db`` プール。
+            ipc: ボットに完了を知らせる :class:`IPCClient`。
+            poll_interval: IPC の通知がない場合にキューを確認する間隔 (秒)。
+            heartbeat_interval: ハートビートを書く間隔 (秒)。
+            stale_after: これ以上ハートビートのないワーカーのジョブを戻す秒数。
+            drain_timeout: 停止時に実行中のジョブの完了を待つ最大秒数。
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self._queue = job_queue
+        self._processing = processing_service
+        self.worker_id = worker_id
+        self.concurrency = concurrency
+        self._executors = executors
+        self._ipc = ipc
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.drain_timeout = drain_timeout
+        self._running: Set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._completed = 0
+        self._failed = 0
+        self._requeued = 0
+
+    async def _db(self, fn, *args):
+        return await run_blocking(self._executors, DB, fn, *args)
+
+    # ------------------------------------------------------------------
+    async def run(self) -> None:
+        """``stop`` されるまでジョブを処理し続ける。"""
+        await self._db(self._queue.heartbeat, self.worker_id)
+        await self._db(self._queue.requeue_stale, self.stale_after)
+        heartbeat = asyncio.create_task(self._heartbeat())
+        logger.info("Worker %s started (concurrency %d)", self.worker_id, self.concurrency)
+        try:
+            while not self._stopping:
+                # 取り出し中に届いた通知を失わないよう、先にクリアする
+                self._wake.clear()
+                await self._fill()
+                if self._stopping:
+                    break
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            try:
+                await self._drain()
+            finally:
+                heartbeat.cancel()
+                await self._release_running()
+                await self._db(self._queue.retire, self.worker_id)
+                logger.info("Worker %s stopped", self.worker_id)
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._wake.set()
+
+    def wake(self) -> None:
+        """待機をやめてすぐにキューを確認させる。"""
+        self._wake.set()
+
+    def on_message(self, message: Dict[str, Any]) -> None:
+        """IPC のメッセージを受け取る。``job_queued`` ならキューを確認する。"""
+        if message.get("type") == "job_queued":
+            self.wake()
+
+    async def _fill(self) -> None:
+        while len(self._running) < self.concurrency and not self._stopping:
+            job = await self._db(self._queue.claim, self.worker_id)
+            if job is None:
+                return
+            task = asyncio.create_task(self._execute(job))
+            self._running.add(task)
+            task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._wake.set()  # 空いた枠で次のジョブを取る
+
+    async def _execute(self, job: Job) -> None:
+        logger.info("Worker %s processing job %d for guild %s", self.worker_id, job.id, job.guild_id)
+        try:
+            if job.kind not in JOB_KINDS:
+                raise ValueError(f"unknown job kind: {job.kind}")
+            url = await getattr(self._processing, job.kind)(job.guild_id, **job.args)
+        except asyncio.CancelledError:
+            # 停止による中断: 別のワーカーが最初からやり直す
+            await asyncio.shield(self._db(self._queue.release, job.id))
+            self._requeued += 1
+            raise
+        except Exception as exc:
+            logger.error("Job %d failed: %s", job.id, exc, exc_info=True)
+            self._failed += 1
+            await self._db(self._queue.fail, job.id, f"{type(exc).__name__}: {exc}")
+            self._notify(job, "failed")
+        else:
+            self._completed += 1
+            await self._db(self._queue.complete, job.id, url)
+            self._notify(job, "done")
+
+    def _notify(self, job: Job, status: str) -> None:
+        if self._ipc is not None:
+            self._ipc.send({"type": "job_finished", "job_id": job.id, "status": status})
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self._db(self._queue.heartbeat, self.worker_id)
+                requeued = await self._db(self._queue.requeue_stale, self.stale_after)
+            except Exception:
+                logger.exception("Worker heartbeat failed")
+                continue
+            if requeued:
+                logger.warning("Requeued %d job(s) of unresponsive workers", requeued)
+                self._wake.set()
+
+    async def _drain(self) -> None:
+        if not self._running or self.drain_timeout <= 0:
+            return
+        logger.info(
+            "Worker %s waiting up to %.0fs for %d running job(s)",
+            self.worker_id, self.drain_timeout, len(self._running),
+        )
+        await asyncio.wait(set(self._running), timeout=self.drain_timeout)
+
+    async def _release_running(self) -> None:
+        for task in list(self._running):
+            task.cancel()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "running": len(self._running),
+            "concurrency": self.concurrency,
+            "completed": self._completed,
+            "failed": self._failed,
+            "requeued": self._requeued,
+        }
+
+
+__all__ = ["JobWorker"]
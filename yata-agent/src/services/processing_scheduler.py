@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from typing import Mapping, Optional
+
+from services.processing_service import ProcessingService
+from utils.audio_duration import estimate_audio_seconds
+from utils.fair_scheduler import FairScheduler
+from utils.timeline import SparseTimeline
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessingScheduler:
+    """`ProcessingService` の前段に置く、サーバー間で公平なジョブスケジューラ。
+
+    `ProcessingService` と同じ `process` / `process_speakers` を公開し、各ジョブ
+    を音声の長さ (秒) をコストとして :class:`FairScheduler` のサーバー別キュー
+    に積む。文字起こしと議事録フォーマットは同時に ``concurrency`` 件まで実行
+    され、長時間の会議を大量に抱えるサーバーがあっても、他サーバーの短い会議
+    は 1 ラウンド以内に処理が始まる。
+    """
+
+    def __init__(self, processing_service: ProcessingService, scheduler: FairScheduler) -> None:
+        """コンストラクタ。
+
+        Args:
+            processing_service: 実際の処理を行うサービス。
+            scheduler: サーバー別の重み付き DRR スケジューラ。コストの単位は
+                音声の秒数 (``quantum`` も秒で指定する)。
+        """
+        self._processing_service = processing_service
+        self.scheduler = scheduler
+
+    async def process(self, guild_id: int, audio_file_path: str, title: str) -> str:
+        """`ProcessingService.process` をスケジューラ経由で実行する。"""
+        cost = await asyncio.to_thread(estimate_audio_seconds, [audio_file_path])
+        return await self.scheduler.submit(
+            guild_id, cost, self._processing_service.process, guild_id, audio_file_path, title
+        )
+
+    async def process_speakers(
+        self,
+        guild_id: int,
+        track_paths: Mapping[int, str],
+        speaker_names: Mapping[int, str],
+        title: str,
+        timeline: Optional[SparseTimeline] = None,
+    ) -> str:
+        """`ProcessingService.process_speakers` をスケジューラ経由で実行する。
+
+        話者ごとに文字起こしを行うため、コストは全トラックの合計秒数とする。
+        """
+        cost = await asyncio.to_thread(estimate_audio_seconds, list(track_paths.values()))
+        return await self.scheduler.submit(
+            guild_id,
+            cost,
+            self._processing_service.process_speakers,
+            guild_id,
+            track_paths,
+            speaker_names,
+            title,
+            timeline=timeline,
+        )
+
+    def metrics(self):
+        return self.scheduler.metrics()
+
+
+__all__ = ["ProcessingScheduler"]
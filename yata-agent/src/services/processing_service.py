@@ -1,16 +1,60 @@
-from typing import Optional
 import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
 
-from services.transcription_service_interface import TranscriptionServiceInterface
+from services.transcription_service_interface import (
+    TranscriptionServiceInterface,
+    TranscriptSegment,
+)
 from services.google_service_interface import GoogleServiceInterface
 from services.database_service import DatabaseService
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.deadline import current_deadline, deadline_scope
+from utils.executors import DB, OPENAI_IO, ExecutorRegistry, run_blocking
+from utils.hedging import Hedger
+from utils.structured_logging import content_digest, log_context
+from utils.tracing import current_span, span
+from utils.rate_limiter import RateLimiter
+from utils.timeline import SparseTimeline
+from utils.transcript_merge import merge_speaker_segments
+
+logger = logging.getLogger(__name__)
+
+# 文字起こし済みのジョブが Google のブレーカー回復を待つ回数
+_UPLOAD_CIRCUIT_ATTEMPTS = 3
+
+class UploadDeferredError(CircuitOpenError):
+    """整形まで終わったジョブのアップロードが、ブレーカーが開いたままで止まった。
+
+    ``resume`` はアップロード (と、その後の整形結果の反映) だけをやり直す
+    関数。``FairScheduler`` は再キュー時にジョブをこれに置き換えるため、
+    文字起こしと整形はやり直さない。
+    """
+
+    def __init__(self, cause: CircuitOpenError, resume: Callable[[], Awaitable[str]]):
+        super().__init__(cause.name, cause.retry_after)
+        self.resume = resume
+
 
 # utils.meeting_minutes は Yata_legacy にある。互換のため相対 import ではなくパスで使用。
 try:
-    from utils.meeting_minutes import format_meeting_minutes  # type: ignore
+    from utils.meeting_minutes import (  # type: ignore
+        format_meeting_minutes,
+        format_meeting_minutes_async,
+    )
 except ModuleNotFoundError:  # テスト環境など utils パッケージが見つからない場合
     # ダミー関数を用意してテストを通す
-    def format_meeting_minutes(transcript: str) -> Optional[str]:  # noqa: D401
+    def format_meeting_minutes(
+        transcript: str, rate_limiter=None, circuit_breaker=None, timeout=None
+    ) -> Optional[str]:  # noqa: D401
+        """Fallback formatter if utils.meeting_minutes is unavailable."""
+        return None
+
+    async def format_meeting_minutes_async(
+        transcript: str, rate_limiter=None, circuit_breaker=None, timeout=None
+    ) -> Optional[str]:  # noqa: D401
         """Fallback formatter if utils.meeting_minutes is unavailable."""
         return None
 
@@ -22,7 +66,8 @@ class ProcessingService:
     2. 議事録フォーマット
     3. Google ドキュメントへのアップロード
 
-    を 1 つの `process` メソッドで実行する。
+    を 1 つの `process` メソッドで実行する。話者別トラックを並列に文字起こし
+    する場合は `process_speakers` を使用する。
     """
 
     def __init__(
@@ -30,6 +75,15 @@ class ProcessingService:
         transcription_service: TranscriptionServiceInterface,
         google_service: GoogleServiceInterface,
         db_service: DatabaseService,
+        executors: Optional[ExecutorRegistry] = None,
+        max_parallel_transcriptions: int = 4,
+        formatting_rate_limiter: Optional[RateLimiter] = None,
+        formatting_circuit_breaker: Optional[CircuitBreaker] = None,
+        deadline_seconds: Optional[float] = None,
+        formatting_timeout: Optional[float] = None,
+        formatting_hedger: Optional[Hedger] = None,
+        publish_raw_first: bool = False,
+        formatter: Optional[Callable[..., Optional[str]]] = None,
     ) -> None:
         """コンストラクタ。
 
@@ -37,10 +91,45 @@ class ProcessingService:
             transcription_service: 音声 → テキストの変換を担当。
             google_service: テキスト → Google Docs へのアップロードを担当。
             db_service: サーバー設定 (言語) の取得に使用。
+            executors: DB 参照と議事録フォーマットを実行するワークロード別
+                スレッドプール。未指定時は ``asyncio.to_thread`` を使用。
+            max_parallel_transcriptions: 話者別文字起こしで同時に発行する
+                API リクエストの上限。
+            formatting_rate_limiter: 議事録フォーマット (Chat Completions) 用の
+                全サーバー共有レート制限。
+            formatting_circuit_breaker: 議事録フォーマット用のサーキット
+                ブレーカー。開いている間は API を呼ばずに元の書き起こしを使う。
+            deadline_seconds: ジョブ開始からドキュメント URL を返すまでの
+                目標時間 (秒)。各外部呼び出しのタイムアウトに伝搬し、整形が
+                間に合わなければ元の書き起こしを先にアップロードする。
+            formatting_timeout: 議事録フォーマット 1 リクエストのタイムアウト (秒)。
+            formatting_hedger: 指定時、議事録フォーマットが遅い場合に
+                p95 レイテンシを目安に 2 本目のリクエストを送る。キャンセルで
+                リクエストが止まる非同期クライアント版の既定の整形関数にだけ
+                使い、スレッドで実行する ``formatter`` はヘッジしない。
+            publish_raw_first: True の場合、文字起こしが終わった時点で元の
+                書き起こしをアップロードして URL を返し、整形した議事録は
+                完成後に同じドキュメントへ反映する。
+            formatter: 議事録フォーマット関数。未指定時は
+                ``utils.meeting_minutes.format_meeting_minutes`` (負荷試験では
+                レイテンシを模擬した関数に差し替える)。
         """
         self._transcription_service = transcription_service
         self._google_service = google_service
         self._db_service = db_service
+        self._executors = executors
+        self._max_parallel_transcriptions = max(1, max_parallel_transcriptions)
+        self._formatting_rate_limiter = formatting_rate_limiter
+        self._formatting_circuit_breaker = formatting_circuit_breaker
+        self._deadline_seconds = deadline_seconds
+        self._formatting_timeout = formatting_timeout
+        self._formatting_hedger = formatting_hedger
+        self._publish_raw_first = publish_raw_first
+        self._formatter = formatter
+        self._deadline_misses = 0
+        self._late_patches = 0
+        # 締め切り後に議事録を反映するタスク
+        self._background: set[asyncio.Task] = set()
 
     async def process(self, guild_id: int, audio_file_path: str, title: str) -> str:
         """音声ファイルを処理し Google ドキュメント URL を返す。
@@ -57,35 +146,287 @@ class ProcessingService:
             FileNotFoundError: 音声ファイルが存在しない場合。
             Exception: 各種サービスで例外が発生した場合はそのまま上位へ伝搬。
         """
+        with deadline_scope(self._deadline_seconds), log_context(
+            guild_id=guild_id, job_id=_job_id()
+        ), span("processing.process"):
+            return await self._process(guild_id, audio_file_path, title)
+
+    async def _process(self, guild_id: int, audio_file_path: str, title: str) -> str:
         # 1. サーバー設定から言語を取得 (無ければ ja)
-        settings = None
-        if hasattr(self._db_service, "get_server_settings"):
-            settings = self._db_service.get_server_settings(guild_id)
-        language = settings.get("language", "ja") if settings else "ja"
+        language = await self._get_language(guild_id)
 
         # 2. 文字起こし (I/O バウンドなのでそのまま await)
-        transcript: str = await self._transcription_service.transcribe(
-            audio_file_path, language
+        started = time.perf_counter()
+        with span("processing.transcribe"):
+            transcript: str = await self._transcription_service.transcribe(
+                audio_file_path, language
+            )
+        # 書き起こしの本文はログに出さない (長さとハッシュのみ)
+        logger.info(
+            "Transcribed meeting for guild %s: %s",
+            guild_id,
+            content_digest(transcript),
+            extra={"duration_ms": _elapsed_ms(started)},
         )
-        
-        # DEBUG: Log the actual transcription result
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Transcription result for guild {guild_id}: {transcript[:200]}...")
-
-        # 3. 議事録フォーマット
-        formatted: Optional[str] = await asyncio.to_thread(
-            format_meeting_minutes, transcript
+
+        # 3-4. 議事録フォーマット → アップロード
+        return await self._format_and_upload(guild_id, title, transcript)
+
+    async def process_speakers(
+        self,
+        guild_id: int,
+        track_paths: Mapping[int, str],
+        speaker_names: Mapping[int, str],
+        title: str,
+        timeline: Optional[SparseTimeline] = None,
+    ) -> str:
+        """話者ごとの音声ファイルを並列に文字起こしし Google ドキュメント URL を返す。
+
+        各話者のトラックを区間タイムスタンプ付きで同時に文字起こしし、
+        全区間を時刻順に並べた話者ラベル付きの書き起こしを作成してから
+        :meth:`process` と同じフォーマット・アップロード処理を行う。
+        ミックス処理は不要。
+
+        Args:
+            guild_id: Discord サーバー ID。
+            track_paths: ``user_id -> 音声ファイルパス``。
+            speaker_names: ``user_id -> 表示名`` (Discord の display name)。
+            title: 作成する Google ドキュメントのタイトル。
+            timeline: 無音を除いたトラック上の時刻を会議時刻へ写像する
+                :class:`SparseTimeline`。省略時は全トラックが録音開始を共通の
+                時刻原点とみなす。
+
+        Returns:
+            Google ドキュメントの URL。
+
+        Raises:
+            ValueError: トラックが 1 つも無い場合。
+            Exception: 全話者の文字起こしが失敗した場合は最初の例外を伝搬。
+        """
+        if not track_paths:
+            raise ValueError("track_paths is empty")
+        with deadline_scope(self._deadline_seconds), log_context(
+            guild_id=guild_id, job_id=_job_id()
+        ), span("processing.process_speakers"):
+            return await self._process_speakers(
+                guild_id, track_paths, speaker_names, title, timeline
+            )
+
+    async def _process_speakers(
+        self,
+        guild_id: int,
+        track_paths: Mapping[int, str],
+        speaker_names: Mapping[int, str],
+        title: str,
+        timeline: Optional[SparseTimeline],
+    ) -> str:
+        language = await self._get_language(guild_id)
+
+        semaphore = asyncio.Semaphore(self._max_parallel_transcriptions)
+
+        async def _one(path: str) -> List[TranscriptSegment]:
+            async with semaphore:
+                with span("processing.transcribe", track=path):
+                    return await self._transcription_service.transcribe_segments(path, language)
+
+        speakers = list(track_paths)
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(_one(track_paths[uid]) for uid in speakers), return_exceptions=True
         )
-        logger.info(f"Formatted result: {formatted[:200] if formatted else 'None'}...")
-        
+
+        segments_by_speaker: Dict[int, List[TranscriptSegment]] = {}
+        errors: List[BaseException] = []
+        for uid, result in zip(speakers, results):
+            if isinstance(result, BaseException):
+                logger.error("Transcription failed for speaker %s in guild %s: %s", uid, guild_id, result)
+                errors.append(result)
+            else:
+                segments_by_speaker[uid] = result
+        if errors and not segments_by_speaker:
+            raise errors[0]
+
+        transcript = merge_speaker_segments(segments_by_speaker, speaker_names, timeline)
+        logger.info(
+            "Per-speaker transcript for guild %s: %d speakers, %s",
+            guild_id,
+            len(segments_by_speaker),
+            content_digest(transcript),
+            extra={"duration_ms": _elapsed_ms(started)},
+        )
+        return await self._format_and_upload(guild_id, title, transcript)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    async def _get_language(self, guild_id: int) -> str:
+        """サーバー設定から文字起こし言語を取得する (無ければ ja)。"""
+        settings = None
+        if hasattr(self._db_service, "get_server_settings"):
+            settings = await run_blocking(
+                self._executors, DB, self._db_service.get_server_settings, guild_id
+            )
+        return settings.get("language", "ja") if settings else "ja"
+
+    async def _format_and_upload(self, guild_id: int, title: str, transcript: str) -> str:
+        """書き起こしを議事録に整形し Google ドキュメントへアップロードする。
+
+        ジョブの締め切りまでに整形が終わらなければ、元の書き起こしを先に
+        アップロードして URL を返し、整形結果は完了後にバックグラウンドで
+        ドキュメントへ反映する。``publish_raw_first`` の場合は整形を待たずに
+        常にこの流れになる。
+        """
+        if self._publish_raw_first:
+            formatting = asyncio.ensure_future(self._format(transcript))
+            return await self._upload_raw(guild_id, title, transcript, formatting)
+
+        # 議事録フォーマット (締め切りで打ち切られても処理は継続させる)
+        formatting = asyncio.ensure_future(self._format(transcript))
+        deadline = current_deadline()
+        if deadline is not None:
+            done, _ = await asyncio.wait({formatting}, timeout=deadline.remaining())
+            if not done:
+                self._deadline_misses += 1
+                logger.warning(
+                    f"Formatting for guild {guild_id} missed the {deadline.budget:.0f}s deadline; "
+                    "uploading the raw transcript and patching it later"
+                )
+                return await self._upload_raw(guild_id, title, transcript, formatting)
+
+        formatted: Optional[str] = await formatting
         if not formatted:
             logger.warning("Meeting minutes formatting failed, using original transcript")
             formatted = transcript  # フォーマット失敗時は元文を使用
 
-        # 4. Google ドキュメントへアップロード
-        url: str = await self._google_service.upload_document(
-            guild_id, title, formatted
+        return await self._upload(guild_id, title, formatted)
+
+    async def _format(self, transcript: str) -> Optional[str]:
+        """議事録フォーマットを実行する (設定されていればヘッジ付き)。"""
+        extra = {}
+        if self._formatting_rate_limiter is not None:
+            extra["rate_limiter"] = self._formatting_rate_limiter
+        if self._formatting_circuit_breaker is not None:
+            extra["circuit_breaker"] = self._formatting_circuit_breaker
+        if self._formatting_timeout is not None:
+            extra["timeout"] = self._formatting_timeout
+
+        formatter = self._formatter or format_meeting_minutes
+
+        started = time.perf_counter()
+        with span("processing.format", chars=len(transcript)):
+            if self._formatting_hedger is not None and self._formatter is None:
+                # 負けた側はキャンセルで HTTP リクエストごと止まる
+                formatted = await self._formatting_hedger.call(
+                    lambda: format_meeting_minutes_async(transcript, **extra)
+                )
+            else:
+                # スレッド内のリクエストはキャンセルできないため、ヘッジしない
+                formatted = await run_blocking(
+                    self._executors, OPENAI_IO, formatter, transcript, **extra
+                )
+        logger.info(
+            "Formatted meeting minutes: %s",
+            content_digest(formatted),
+            extra={"duration_ms": _elapsed_ms(started)},
         )
+        return formatted
+
+    async def _upload_raw(
+        self,
+        guild_id: int,
+        title: str,
+        transcript: str,
+        formatting: "asyncio.Future[Optional[str]]",
+    ) -> str:
+        """元の書き起こしをアップロードし、整形結果は完了後に反映する。"""
+        try:
+            url = await self._upload(guild_id, title, transcript)
+        except UploadDeferredError as e:
+            e.resume = lambda: self._upload_raw(guild_id, title, transcript, formatting)
+            raise
+        self._patch_later(guild_id, url, formatting, transcript)
+        return url
+
+    async def _upload(self, guild_id: int, title: str, content: str) -> str:
+        """Google ドキュメントへアップロードする。
+
+        ここまでの API 費用を無駄にしないよう、ブレーカーが開いていれば
+        回復を待ってから再試行する。それでも開いていれば
+        :class:`UploadDeferredError` を送出し、アップロードだけを後でやり直す。
+        """
+        for attempt in range(1, _UPLOAD_CIRCUIT_ATTEMPTS + 1):
+            try:
+                started = time.perf_counter()
+                with span("processing.upload", attempt=attempt):
+                    url = await self._google_service.upload_document(guild_id, title, content)
+                logger.info(
+                    "Uploaded meeting minutes for guild %s",
+                    guild_id,
+                    extra={"duration_ms": _elapsed_ms(started), "attempt": attempt},
+                )
+                return url
+            except CircuitOpenError as e:
+                if attempt == _UPLOAD_CIRCUIT_ATTEMPTS:
+                    raise UploadDeferredError(
+                        e, lambda: self._upload(guild_id, title, content)
+                    ) from e
+                logger.warning("Upload for guild %s waiting %.1fs: %s", guild_id, e.retry_after, e)
+                await asyncio.sleep(e.retry_after)
+
+    def _patch_later(
+        self,
+        guild_id: int,
+        url: str,
+        formatting: "asyncio.Future[Optional[str]]",
+        uploaded: str,
+    ) -> None:
+        """整形が終わり次第、アップロード済みドキュメントを議事録で置き換える。"""
+
+        async def _patch() -> None:
+            try:
+                formatted = await formatting
+                if not formatted:
+                    logger.warning("Late formatting for guild %s failed; keeping raw transcript", guild_id)
+                    return
+                with span("processing.patch"):
+                    await self._google_service.update_document(
+                        guild_id, url, formatted, previous_content=uploaded
+                    )
+                self._late_patches += 1
+                logger.info("Patched meeting minutes into %s", url)
+            except Exception as e:
+                logger.error("Failed to patch meeting minutes into %s: %s", url, e)
+
+        task = asyncio.create_task(_patch())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def drain_background(self) -> None:
+        """リンク投稿後の整形反映 (:meth:`_patch_later`) がすべて終わるまで待つ。
+
+        停止時に呼ぶ。待ち時間の上限は呼び出し側 (シャットダウンの締め切り) が決める。
+        """
+        while self._background:
+            await asyncio.gather(*list(self._background), return_exceptions=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "deadline_seconds": self._deadline_seconds,
+            "deadline_misses": self._deadline_misses,
+            "late_patches": self._late_patches,
+            "patches_pending": len(self._background),
+        }
+        if self._formatting_hedger is not None:
+            payload["formatting_hedge"] = self._formatting_hedger.metrics()
+        return payload
+
+
+def _job_id() -> str:
+    """ログ用のジョブ ID (トレース中ならトレース ID の先頭)。"""
+    current = current_span()
+    return current.trace_id[:16] if current is not None else uuid.uuid4().hex[:16]
+
 
-        return url 
\ No newline at end of file
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
@@ -0,0 +1,130 @@
+"""議事録作成ジョブのオプトイン・プロファイリング。
+
+「この会議だけ 10 分かかった」ときに時間の内訳を調べるためのサービス。
+プロファイル対象は次のどちらかで決まる。
+
+* 常時対象のサーバー (``PROFILE_GUILD_IDS``)
+* 管理者コマンド ``/profile_next`` で予約した「次の N 件」のジョブ
+
+対象ジョブは :class:`~utils.profiling.JobProfile` (サンプリング
+プロファイラ + スパン記録) の中で実行され、結果は録音ファイルの隣に
+``<録音名>.folded`` (フレームグラフ用) と ``<録音名>.trace.json``
+(Chrome trace 形式) として保存される。
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, Optional
+
+from utils.profiling import DEFAULT_INTERVAL, JobProfile, profiling
+
+logger = logging.getLogger(__name__)
+
+# /metrics に表示する直近の成果物の数
+_RECENT_ARTIFACTS = 10
+
+
+class ProfilingService:
+    """ジョブ単位のプロファイリングを有効化・実行する。"""
+
+    def __init__(
+        self,
+        guild_ids: Iterable[int] = (),
+        interval: float = DEFAULT_INTERVAL,
+    ) -> None:
+        """コンストラクタ。
+
+        Args:
+            guild_ids: すべてのジョブをプロファイルするサーバー ID。
+            interval: サンプリング間隔 (秒)。
+        """
+        self._always = set(guild_ids)
+        self.interval = interval
+        # guild_id -> プロファイルする残りジョブ数
+        self._armed: Dict[int, int] = {}
+        self._profiled = 0
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=_RECENT_ARTIFACTS)
+
+    def arm(self, guild_id: int, jobs: int) -> int:
+        """*guild_id* の次の *jobs* 件をプロファイル対象にし、残り件数を返す。
+
+        0 を指定すると予約を取り消す。
+        """
+        if jobs <= 0:
+            self._armed.pop(guild_id, None)
+            return 0
+        self._armed[guild_id] = jobs
+        return jobs
+
+    def remaining(self, guild_id: int) -> int:
+        return self._armed.get(guild_id, 0)
+
+    def claim(self, guild_id: int) -> bool:
+        """このジョブをプロファイルするかを判定し、予約を 1 件消費する。"""
+        if guild_id in self._always:
+            return True
+        left = self._armed.get(guild_id, 0)
+        if left <= 0:
+            return False
+        if left == 1:
+            del self._armed[guild_id]
+        else:
+            self._armed[guild_id] = left - 1
+        return True
+
+    @contextlib.asynccontextmanager
+    async def job(self, guild_id: int, base_path: str | Path) -> AsyncIterator[Optional[JobProfile]]:
+        """対象ジョブならプロファイルを有効にしてブロックを実行する。
+
+        成果物は *base_path* (拡張子なしの録音パス) の隣に保存する。
+        対象外のジョブでは何もせず None を渡す。
+        """
+        if not self.claim(guild_id):
+            yield None
+            return
+
+        profile = JobProfile(f"guild {guild_id}: {Path(base_path).name}", self.interval)
+        profile.start()
+        try:
+            with profiling(profile), profile.span("job", guild_id=guild_id):
+                yield profile
+        finally:
+            profile.stop()
+            await self._save(guild_id, profile, base_path)
+
+    async def _save(self, guild_id: int, profile: JobProfile, base_path: str | Path) -> None:
+        try:
+            paths = await asyncio.to_thread(profile.save, base_path)
+        except OSError as e:
+            logger.error("Failed to save profile for guild %s: %s", guild_id, e)
+            return
+        self._profiled += 1
+        spans = profile.recorder.summary()
+        self._recent.append(
+            {
+                "guild_id": guild_id,
+                "wall_seconds": round(profile.wall_seconds, 3),
+                "samples": profile.sampler.sample_count,
+                "spans": spans,
+                "artifacts": [str(p) for p in paths],
+            }
+        )
+        logger.info(
+            f"Profiled job for guild {guild_id} in {profile.wall_seconds:.1f}s "
+            f"({profile.sampler.sample_count} samples): {spans}; saved {', '.join(map(str, paths))}"
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "always_guilds": sorted(self._always),
+            "armed": dict(self._armed),
+            "profiled": self._profiled,
+            "recent": list(self._recent),
+        }
+
+
+__all__ = ["ProfilingService"]
@@ -0,0 +1,176 @@
+"""ワーカープロセスに処理を委ねる ``ProcessingService`` の代替。
+
+``main.py --role bot`` では、文字起こしと議事録の整形をボットのプロセスで
+行わず、共有の SQLite ジョブキュー (:class:`data.job_queue.JobQueue`) に
+積んで ``--role worker`` のプロセスに任せる。:class:`QueuedProcessingService`
+は ``ProcessingScheduler`` と同じ ``process`` / ``process_speakers`` を公開する
+ため、``RecordingCog`` は実行場所を意識せずに結果の URL を待てる。
+
+完了は IPC (:class:`utils.ipc.IPCHub`) の ``job_finished`` で知り、IPC が
+使えない場合も ``poll_interval`` 秒ごとにキューを確認する。
+
+ジョブには :data:`reply_channel` (結果を投稿するチャンネル) も記録する。
+ボットが結果を待たずに終了しても、ジョブはワーカーで最後まで処理され、
+次に起動したボットが :class:`services.job_delivery.JobDeliveryService` で
+投稿する。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, List, Mapping, Optional
+
+from data.job_queue import FAILED, Job, JobQueue
+from utils.executors import DB, ExecutorRegistry, run_blocking
+from utils.timeline import SparseTimeline
+
+logger = logging.getLogger(__name__)
+
+# ワーカーが実行するジョブの種類 (ProcessingService のメソッド名)
+PROCESS = "process"
+PROCESS_SPEAKERS = "process_speakers"
+JOB_KINDS = (PROCESS, PROCESS_SPEAKERS)
+
+# 処理中の会議の結果を投稿するチャンネル ID (RecordingCog がタスクごとに設定)
+reply_channel: ContextVar[Optional[int]] = ContextVar("reply_channel", default=None)
+
+
+class JobFailedError(Exception):
+    """ワーカーでのジョブの処理が失敗した。"""
+
+    def __init__(self, job_id: int, error: Optional[str]):
+        super().__init__(f"Job {job_id} failed: {error or 'unknown error'}")
+        self.job_id = job_id
+        self.error = error
+
+
+class QueuedProcessingService:
+    """ジョブをキューに積み、ワーカーの処理結果を待つ。"""
+
+    # 投入したジョブは待つ側が終了しても失われない (RecordingCog が参照)
+    durable = True
+
+    def __init__(
+        self,
+        job_queue: JobQueue,
+        executors: Optional[ExecutorRegistry] = None,
+        ipc: Optional[Any] = None,
+        poll_interval: float = 2.0,
+    ) -> None:
+        """コンストラクタ。
+
+        Args:
+            job_queue: ワーカーと共有するジョブキュー。
+            executors: SQLite の読み書きを行う ``db`` プール。
+            ipc: ジョブの到着をワーカーに知らせる :class:`IPCHub`
+                (シャードを分割した 2 つ目以降のボットでは :class:`IPCClient`)。
+                ``on_message`` に :meth:`on_message` を登録しておくと、
+                完了をポーリングより早く受け取れる。
+            poll_interval: 完了を確認する間隔 (秒)。
+        """
+        self._queue = job_queue
+        self._executors = executors
+        self._ipc = ipc
+        self.poll_interval = poll_interval
+        self._waiters: Dict[int, asyncio.Future] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self._submitted = 0
+        self._failed = 0
+
+    async def process(self, guild_id: int, audio_file_path: str, title: str) -> str:
+        """`ProcessingService.process` をワーカーで実行する。"""
+        return await self._submit(
+            guild_id, PROCESS, {"audio_file_path": audio_file_path, "title": title}
+        )
+
+    async def process_speakers(
+        self,
+        guild_id: int,
+        track_paths: Mapping[int, str],
+        speaker_names: Mapping[int, str],
+        title: str,
+        timeline: Optional[SparseTimeline] = None,
+    ) -> str:
+        """`ProcessingService.process_speakers` をワーカーで実行する。"""
+        return await self._submit(
+            guild_id,
+            PROCESS_SPEAKERS,
+            {
+                "track_paths": dict(track_paths),
+                "speaker_names": dict(speaker_names),
+                "title": title,
+                "timeline": timeline,
+            },
+        )
+
+    async def _submit(self, guild_id: int, kind: str, args: Dict[str, Any]) -> str:
+        job_id = await run_blocking(
+            self._executors, DB, self._queue.enqueue, guild_id, kind, args, reply_channel.get()
+        )
+        self._submitted += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[job_id] = future
+        if self._ipc is not None:
+            self._ipc.broadcast({"type": "job_queued", "job_id": job_id})
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+        logger.info("Queued job %d (%s) for guild %s", job_id, kind, guild_id)
+        try:
+            job: Job = await future
+        finally:
+            self._waiters.pop(job_id, None)
+        if job.status == FAILED:
+            self._failed += 1
+            raise JobFailedError(job_id, job.error)
+        return job.result or ""
+
+    def waiting_job_ids(self) -> List[int]:
+        """このプロセスで結果を待っているジョブの ID。"""
+        return list(self._waiters)
+
+    def on_message(self, message: Dict[str, Any]) -> Optional[Any]:
+        """IPC のメッセージを受け取る。``job_finished`` なら結果を確認する。"""
+        if message.get("type") == "job_finished" and message.get("job_id") in self._waiters:
+            return self._check([int(message["job_id"])])
+        return None
+
+    async def _poll(self) -> None:
+        while self._waiters:
+            await asyncio.sleep(self.poll_interval)
+            await self._check(list(self._waiters))
+
+    async def _check(self, job_ids: list[int]) -> None:
+        try:
+            jobs = await run_blocking(self._executors, DB, self._queue.finished, job_ids)
+        except Exception:
+            logger.exception("Failed to read job status")
+            return
+        for job in jobs:
+            future = self._waiters.get(job.id)
+            if future is not None and not future.done():
+                # 投稿は待っている RecordingCog が行う
+                if job.channel_id is not None:
+                    try:
+                        await run_blocking(self._executors, DB, self._queue.claim_delivery, job.id)
+                    except Exception:
+                        logger.exception("Failed to mark job %d as delivered", job.id)
+                if not future.done():
+                    future.set_result(job)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "waiting": len(self._waiters),
+            "submitted": self._submitted,
+            "failed": self._failed,
+        }
+
+
+__all__ = [
+    "JOB_KINDS",
+    "JobFailedError",
+    "PROCESS",
+    "PROCESS_SPEAKERS",
+    "QueuedProcessingService",
+    "reply_channel",
+]
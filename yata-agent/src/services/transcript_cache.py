@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .transcription_service_interface import (
+    TranscriptionServiceInterface,
+    TranscriptSegment,
+)
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 1024 * 1024
+
+# 会議の内容そのものなので無期限には残さない (既定: 30 日・1 GiB)
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    """音声ファイルの内容の SHA-256 (16 進) を返す。"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CachedTranscriptionService(TranscriptionServiceInterface):
+    """文字起こし結果を音声の内容ハッシュでディスクにキャッシュするラッパー。
+
+    同じ音声を再処理する場合 (アップロード失敗後の再実行、バックフィルの
+    再開など) は Whisper を呼ばずにキャッシュから返す。キーは
+    ``sha256(音声) + 言語 + 形式`` なので、ファイル名が変わっても再利用される。
+
+    エントリは最後に使われてから ``max_age_seconds`` 秒で期限切れになり、
+    合計が ``max_bytes`` を超えると古く使われたものから削除する。
+    """
+
+    def __init__(
+        self,
+        inner: TranscriptionServiceInterface,
+        cache_dir: str | Path,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """コンストラクタ。
+
+        Args:
+            inner: 実際に文字起こしを行うサービス。
+            cache_dir: キャッシュ (1 件 1 JSON ファイル) を置くディレクトリ。
+            max_age_seconds: 最後に使われてから削除するまでの秒数 (0 = 無期限)。
+            max_bytes: キャッシュ全体の上限バイト数 (0 = 無制限)。
+        """
+        self._inner = inner
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        # 読み書きは to_thread のスレッドから行うため、カウンタと削除を直列化する
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evicted = 0
+        self._evict()
+
+    async def transcribe(self, audio_file_path: str, language: str) -> str:
+        """キャッシュがあればそれを、無ければ ``inner`` の結果を返す。"""
+        key = await self._key(audio_file_path, language, "text")
+        cached = await asyncio.to_thread(self._load, key)
+        if cached is not None:
+            return cached["text"]
+        text = await self._inner.transcribe(audio_file_path, language)
+        await asyncio.to_thread(self._store, key, {"text": text})
+        return text
+
+    async def transcribe_segments(
+        self, audio_file_path: str, language: str
+    ) -> List[TranscriptSegment]:
+        """区間付き文字起こしのキャッシュ版。"""
+        key = await self._key(audio_file_path, language, "segments")
+        cached = await asyncio.to_thread(self._load, key)
+        if cached is not None:
+            return [TranscriptSegment(**seg) for seg in cached["segments"]]
+        segments = await self._inner.transcribe_segments(audio_file_path, language)
+        await asyncio.to_thread(
+            self._store, key, {"segments": [asdict(seg) for seg in segments]}
+        )
+        return segments
+
+    async def contains(self, audio_file_path: str, language: str) -> bool:
+        """全文の文字起こしがキャッシュ済みかどうか。"""
+        key = await self._key(audio_file_path, language, "text")
+        return (self.cache_dir / f"{key}.json").exists()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "evicted": self._evicted}
+
+    # ------------------------------------------------------------------
+    async def _key(self, audio_file_path: str, language: str, kind: str) -> str:
+        if not os.path.exists(audio_file_path):
+            raise FileNotFoundError(f"Audio file not found at path: {audio_file_path}")
+        digest = await asyncio.to_thread(file_digest, audio_file_path)
+        return f"{digest}-{language}-{kind}"
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def _expired(self, mtime: float, now: float) -> bool:
+        return bool(self.max_age_seconds) and now - mtime > self.max_age_seconds
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self.cache_dir / f"{key}.json"
+        try:
+            if self._expired(path.stat().st_mtime, time.time()):
+                path.unlink(missing_ok=True)
+                self._count(hit=False)
+                return None
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            # 最終使用時刻として更新 (期限と削除の順序に使う)
+            os.utime(path)
+        except FileNotFoundError:
+            self._count(hit=False)
+            return None
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable transcript cache entry %s", path, exc_info=True)
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        return data
+
+    def _store(self, key: str, data: Dict[str, Any]) -> None:
+        path = self.cache_dir / f"{key}.json"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        """期限切れのエントリと、上限を超えた分の古いエントリを削除する。"""
+        if not self.max_age_seconds and not self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            for mtime, size, path in entries:
+                if not self._expired(mtime, now) and (not self.max_bytes or total <= self.max_bytes):
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                self._evicted += 1
+
+
+__all__ = ["CachedTranscriptionService", "file_digest"]
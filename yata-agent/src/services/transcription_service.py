@@ -1,8 +1,26 @@
+import asyncio
+import io
 import os
-import openai
 from pathlib import Path
+from typing import IO, Any, List, Optional
 
-from .transcription_service_interface import TranscriptionServiceInterface
+from .transcription_service_interface import (
+    TranscriptionServiceInterface,
+    TranscriptSegment,
+)
+from utils.audio_duration import estimate_audio_seconds
+from utils.circuit_breaker import CircuitBreaker
+from utils.deadline import call_timeout
+from utils.lazy_import import lazy_import
+from utils.rate_limiter import RateLimiter
+from utils.tracing import span
+
+
+# 締め切り間近でも文字起こし 1 リクエストに必ず与える秒数
+_MIN_REQUEST_TIMEOUT = 60.0
+
+# SDK の import には時間がかかるため、最初の文字起こしまで遅らせる
+openai = lazy_import("openai")
 
 
 class TranscriptionService(TranscriptionServiceInterface):
@@ -10,14 +28,51 @@ class TranscriptionService(TranscriptionServiceInterface):
     OpenAIのWhisper APIを使用して音声ファイルの文字起こしを行うサービス。
     """
 
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        base_url: Optional[str] = None,
+    ):
         """
         TranscriptionServiceのコンストラクタ。
 
         Args:
             api_key (str): OpenAI APIキー。
+            rate_limiter (Optional[RateLimiter]): 全サーバーで共有するレート制限。
+                指定時はリクエスト数と音声秒数の予算が空くまで待ってから送信し、
+                429 の場合は SDK の自動リトライではなく制限の解除を待って再送する。
+            circuit_breaker (Optional[CircuitBreaker]): 文字起こし API 用の
+                サーキットブレーカー。API 障害が続いて開いている間は、
+                リクエストを送らずに ``CircuitOpenError`` を送出する。
+            base_url (Optional[str]): OpenAI API のベース URL。ベンチマークや CI で
+                ローカルのスタブサーバー (``loadtest.openai_server``) に向ける場合に
+                指定する。None なら SDK の既定値を使う。
         """
-        self.client = openai.AsyncOpenAI(api_key=api_key)
+        self._rate_limiter = rate_limiter
+        self._circuit_breaker = circuit_breaker
+        self._api_key = api_key
+        self._base_url = base_url
+        self._client: Optional[Any] = None
+
+    @property
+    def client(self) -> Any:
+        """OpenAI の非同期クライアント。最初の呼び出しで作成する。"""
+        if self._client is None:
+            options = {"base_url": self._base_url} if self._base_url else {}
+            if self._rate_limiter is None:
+                self._client = openai.AsyncOpenAI(api_key=self._api_key, **options)
+            else:
+                self._client = openai.AsyncOpenAI(
+                    api_key=self._api_key,
+                    max_retries=0,
+                    http_client=openai.DefaultAsyncHttpxClient(
+                        event_hooks=self._rate_limiter.httpx_event_hooks()
+                    ),
+                    **options,
+                )
+        return self._client
 
     async def transcribe(self, audio_file_path: str, language: str) -> str:
         """
@@ -33,23 +88,121 @@ class TranscriptionService(TranscriptionServiceInterface):
         Raises:
             FileNotFoundError: 音声ファイルが見つからない場合。
             openai.APIError: OpenAI APIとの通信でエラーが発生した場合。
+            CircuitOpenError: サーキットブレーカーが開いている場合。
         """
-        if not os.path.exists(audio_file_path):
-            raise FileNotFoundError(f"Audio file not found at path: {audio_file_path}")
-
-        audio_path = Path(audio_file_path)
-        
-        # 'with open' は同期的だが、テストではmockされているため問題ない。
-        # 実際の非同期アプリケーションでボトルネックになる場合は、
-        # aiofilesなどを使うか、asyncio.to_threadで実行することを検討する。
-        with open(audio_path, "rb") as audio_file:
-            try:
-                transcript = await self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language=language,
-                )
-                return transcript.text
-            except openai.APIError as e:
-                # APIからのエラーはそのまま上位に伝播させる
-                raise e 
\ No newline at end of file
+        # ファイルの読み込みはイベントループを止めないようスレッドで行う
+        audio_file = await asyncio.to_thread(_read_audio, audio_file_path)
+        try:
+            transcript = await self._create(
+                audio_file,
+                audio_file_path,
+                model="whisper-1",
+                language=language,
+            )
+            return transcript.text
+        except openai.APIError as e:
+            # APIからのエラーはそのまま上位に伝播させる
+            raise e
+
+    async def transcribe_segments(
+        self, audio_file_path: str, language: str
+    ) -> List[TranscriptSegment]:
+        """
+        区間タイムスタンプ付きで文字起こしする。
+
+        ``response_format="verbose_json"`` と
+        ``timestamp_granularities=["segment"]`` を指定し、Whisper が返す
+        各区間を :class:`TranscriptSegment` に変換して返す。
+
+        Args:
+            audio_file_path (str): 文字起こし対象の音声ファイルパス。
+            language (str): 文字起こしに使用する言語（例: "ja", "en"）。
+
+        Returns:
+            List[TranscriptSegment]: 開始時刻順の区間リスト。
+
+        Raises:
+            FileNotFoundError: 音声ファイルが見つからない場合。
+            openai.APIError: OpenAI APIとの通信でエラーが発生した場合。
+            CircuitOpenError: サーキットブレーカーが開いている場合。
+        """
+        audio_file = await asyncio.to_thread(_read_audio, audio_file_path)
+        response = await self._create(
+            audio_file,
+            audio_file_path,
+            model="whisper-1",
+            language=language,
+            response_format="verbose_json",
+            timestamp_granularities=["segment"],
+        )
+
+        segments = [
+            TranscriptSegment(
+                start=float(_field(seg, "start")),
+                end=float(_field(seg, "end")),
+                text=str(_field(seg, "text")).strip(),
+            )
+            for seg in (_field(response, "segments") or [])
+        ]
+        return sorted((seg for seg in segments if seg.text), key=lambda seg: seg.start)
+
+    async def _create(self, audio_file: IO[bytes], audio_file_path: str, **kwargs: Any) -> Any:
+        """サーキットブレーカー越しに transcriptions.create を呼び出す。"""
+        with span(
+            "openai.transcribe",
+            model=kwargs.get("model"),
+            response_format=kwargs.get("response_format", "json"),
+        ):
+            if self._circuit_breaker is None:
+                return await self._send(audio_file, audio_file_path, **kwargs)
+            return await self._circuit_breaker.call(
+                self._send, audio_file, audio_file_path, **kwargs
+            )
+
+    async def _send(self, audio_file: IO[bytes], audio_file_path: str, **kwargs: Any) -> Any:
+        """レート制限の予算内で transcriptions.create を呼び出す。
+
+        ジョブの締め切りが設定されていれば、残り時間をリクエストのタイム
+        アウトにする (ただし ``_MIN_REQUEST_TIMEOUT`` 秒以上)。
+        """
+        timeout = call_timeout(floor=_MIN_REQUEST_TIMEOUT)
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        if self._rate_limiter is None:
+            return await self.client.audio.transcriptions.create(file=audio_file, **kwargs)
+
+        def _send():
+            audio_file.seek(0)  # 再送時は先頭から読み直す
+            return self.client.audio.transcriptions.create(file=audio_file, **kwargs)
+
+        # WAV はヘッダーを読むため、スレッドで見積もる
+        audio_seconds = await asyncio.to_thread(estimate_audio_seconds, [audio_file_path])
+        return await self._rate_limiter.call(
+            _send,
+            audio_seconds=audio_seconds,
+            retry_on=(openai.RateLimitError,),
+        )
+
+
+def _read_audio(audio_file_path: str) -> io.BytesIO:
+    """音声ファイルを読み込み、ファイル名付きのメモリ上のバッファとして返す。
+
+    同期的なファイル I/O なので ``asyncio.to_thread`` から呼び出す。
+    SDK はアップロード時の拡張子判定に ``name`` 属性を使う。
+
+    Raises:
+        FileNotFoundError: 音声ファイルが見つからない場合。
+    """
+    if not os.path.exists(audio_file_path):
+        raise FileNotFoundError(f"Audio file not found at path: {audio_file_path}")
+    with open(Path(audio_file_path), "rb") as f:
+        audio_file = io.BytesIO(f.read())
+    audio_file.name = Path(audio_file_path).name
+    return audio_file
+
+
+def _field(obj: Any, name: str) -> Any:
+    """SDK のモデルオブジェクトと dict の両方から属性を取り出す。"""
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
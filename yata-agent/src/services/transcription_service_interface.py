@@ -1,4 +1,15 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass(frozen=True)
+class TranscriptSegment:
+    """タイムスタンプ付きの文字起こし区間 (秒単位、音声ファイル先頭基準)。"""
+
+    start: float
+    end: float
+    text: str
 
 
 class TranscriptionServiceInterface(ABC):
@@ -22,4 +33,24 @@ class TranscriptionServiceInterface(ABC):
             FileNotFoundError: 音声ファイルが見つからない場合。
             Exception: 文字起こし処理中にエラーが発生した場合。
         """
-        pass 
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def transcribe_segments(
+        self, audio_file_path: str, language: str
+    ) -> List[TranscriptSegment]:
+        """
+        指定された音声ファイルを区間タイムスタンプ付きで文字起こしする。
+
+        Args:
+            audio_file_path (str): 文字起こし対象の音声ファイルパス。
+            language (str): 文字起こしに使用する言語（例: "ja", "en"）。
+
+        Returns:
+            List[TranscriptSegment]: 開始時刻順の区間リスト。
+
+        Raises:
+            FileNotFoundError: 音声ファイルが見つからない場合。
+            Exception: 文字起こし処理中にエラーが発生した場合。
+        """
+        pass
@@ -0,0 +1,68 @@
+"""Cheap duration estimates of recorded audio files, used as job costs.
+
+Scheduling costs, audio-second rate budgets and backfill reports only need
+a rough duration, and must not decode the file.
+
+* WAV: the ``fmt `` chunk gives the byte rate and the ``data`` chunk the
+  payload size.  A recording cut short by a crash may carry a zero or
+  oversized ``data`` size; the bytes actually on disk are used then.
+* Anything else is assumed to be the bot's own Opus output at 12 kbit/s,
+  where the file size is proportional to the duration.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import struct
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# AudioService encodes Opus at 12 kbit/s, so file size ≈ audio duration
+OPUS_BYTES_PER_SECOND = 12_000 / 8
+
+# Chunks before ``data`` (``fmt ``, ``LIST``...) are small; stop looking after this
+_WAV_HEADER_LIMIT = 64 * 1024
+
+
+def _wav_seconds(path: str, size: int) -> Optional[float]:
+    """Duration from the RIFF header, or None if *path* is not a WAV file."""
+    with open(path, "rb") as f:
+        head = f.read(_WAV_HEADER_LIMIT)
+    if len(head) < 12 or head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        return None
+    byte_rate = 0
+    offset = 12
+    while offset + 8 <= len(head):
+        chunk_id = head[offset : offset + 4]
+        (chunk_size,) = struct.unpack_from("<I", head, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt " and body + 12 <= len(head):
+            (byte_rate,) = struct.unpack_from("<I", head, body + 8)
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            on_disk = size - body
+            if chunk_size == 0 or chunk_size > on_disk:
+                chunk_size = on_disk
+            return chunk_size / byte_rate
+        # Chunks are padded to an even size
+        offset = body + chunk_size + (chunk_size & 1)
+    return None
+
+
+def estimate_audio_seconds(paths: Iterable[str]) -> float:
+    """Estimate the total duration of audio files without decoding them."""
+    total = 0.0
+    for path in paths:
+        try:
+            size = os.path.getsize(path)
+            seconds = _wav_seconds(path, size)
+        except OSError:
+            logger.debug("Cannot read %s for its duration", path)
+            continue
+        total += seconds if seconds is not None else size / OPUS_BYTES_PER_SECOND
+    return total
+
+
+__all__ = ["OPUS_BYTES_PER_SECOND", "estimate_audio_seconds"]
@@ -0,0 +1,298 @@
+"""Pre-started worker processes for CPU-bound audio work.
+
+Python-side audio handling (mixing, buffer preparation, resampling) holds
+the GIL, so running it in threads competes with the Discord gateway
+heartbeat in the same process.  :class:`AudioProcessPool` runs such jobs in
+separate worker processes instead.
+
+Large PCM buffers are **not** pickled: the parent copies each buffer once
+into a :mod:`multiprocessing.shared_memory` segment and only the segment
+name travels over the pool's pipe.  The worker attaches, hands read-only
+``memoryview`` slices to the job function and detaches again; the parent
+unlinks the segments as soon as the job has finished.
+
+Job functions must be importable top-level callables with the signature
+``fn(buffers: Mapping[key, memoryview], *args, **kwargs)``.  Each job also
+reports the CPU time it consumed (the worker itself plus any child
+processes such as ffmpeg) via :class:`JobStats`.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (segment name, payload size) – name is None for empty buffers
+_Descriptor = Tuple[Optional[str], int]
+
+
+@dataclass(frozen=True)
+class JobStats:
+    """CPU / wall-clock accounting of a single pool job."""
+
+    pid: int
+    wall_seconds: float
+    cpu_seconds: float
+    child_cpu_seconds: float
+    bytes_in: int
+
+    @property
+    def total_cpu_seconds(self) -> float:
+        return self.cpu_seconds + self.child_cpu_seconds
+
+
+# ---------------------------------------------------------------------------
+# Worker-side helpers (must be top-level so that they can be pickled)
+# ---------------------------------------------------------------------------
+
+def _worker_init(preload: Sequence[str], ready: Any) -> None:
+    for module in preload:
+        importlib.import_module(module)
+    ready.release()
+
+
+def _invoke(
+    fn: Callable[..., Any],
+    descriptors: Mapping[Hashable, _Descriptor],
+    args: Tuple[Any, ...],
+    kwargs: Mapping[str, Any],
+) -> Tuple[Any, JobStats]:
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    times_start = os.times()
+
+    segments = []
+    views: Dict[Hashable, memoryview] = {}
+    try:
+        for key, (name, size) in descriptors.items():
+            if name is None:
+                views[key] = memoryview(b"")
+                continue
+            shm = SharedMemory(name=name)
+            segments.append(shm)
+            views[key] = shm.buf[:size].toreadonly()
+        result = fn(views, *args, **kwargs)
+    finally:
+        for view in views.values():
+            view.release()
+        for shm in segments:
+            shm.close()
+
+    times_end = os.times()
+    stats = JobStats(
+        pid=os.getpid(),
+        wall_seconds=time.perf_counter() - wall_start,
+        cpu_seconds=time.process_time() - cpu_start,
+        child_cpu_seconds=(times_end.children_user - times_start.children_user)
+        + (times_end.children_system - times_start.children_system),
+        bytes_in=sum(size for _, size in descriptors.values()),
+    )
+    return result, stats
+
+
+# ---------------------------------------------------------------------------
+# Parent-side pool
+# ---------------------------------------------------------------------------
+
+class AudioProcessPool:
+    """A fixed-size, eagerly started process pool with shared-memory inputs."""
+
+    def __init__(
+        self,
+        processes: int = 2,
+        start_method: str = "spawn",
+        preload: Sequence[str] = (),
+        maxtasksperchild: Optional[int] = None,
+        start_timeout: float = 60.0,
+    ) -> None:
+        if processes < 1:
+            raise ValueError("processes must be >= 1")
+        self.processes = processes
+        self.start_timeout = start_timeout
+        self._ctx = multiprocessing.get_context(start_method)
+        self._preload = tuple(preload)
+        self._maxtasksperchild = maxtasksperchild
+        self._pool: Any = None
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._cpu_seconds = 0.0
+        self._last: Optional[JobStats] = None
+
+    # ------------------------------------------------------------------
+    @property
+    def started(self) -> bool:
+        return self._pool is not None
+
+    def start(self) -> None:
+        """Spawn every worker now and run the preload imports in each.
+
+        Must be called once at start-up, before the event loop needs the
+        pool: it blocks for the process spawn + import latency, and
+        :meth:`run` refuses to start the workers lazily on the loop.
+        """
+        if self._pool is not None:
+            return
+        started_at = time.perf_counter()
+        ready = self._ctx.Semaphore(0)
+        self._pool = self._ctx.Pool(
+            processes=self.processes,
+            initializer=_worker_init,
+            initargs=(self._preload, ready),
+            maxtasksperchild=self._maxtasksperchild,
+        )
+        # ``Pool`` spawns its workers eagerly; wait until every worker has
+        # finished its preload imports before reporting ready.
+        for _ in range(self.processes):
+            if not ready.acquire(timeout=self.start_timeout):
+                raise RuntimeError("Audio process pool workers failed to start")
+        logger.info(
+            "Audio process pool ready: %d workers in %.2fs",
+            self.processes,
+            time.perf_counter() - started_at,
+        )
+
+    def close(self) -> None:
+        """Stop accepting jobs and wait for the workers to exit."""
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+
+    # ------------------------------------------------------------------
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        buffers: Mapping[Hashable, Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Tuple[Any, JobStats]:
+        """Run ``fn(views, *args, **kwargs)`` in a worker process.
+
+        *buffers* values may be any object supporting the buffer protocol
+        (``bytes``, ``bytearray``, ``memoryview`` from ``BytesIO.getbuffer``);
+        each one is copied once into shared memory, in a worker thread so
+        that a long recording does not stall the loop.  Returns the job's
+        result together with its :class:`JobStats`.
+
+        Raises:
+            RuntimeError: :meth:`start` has not been called.
+        """
+        if self._pool is None:
+            raise RuntimeError("AudioProcessPool.start() must be called at start-up")
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+
+        copying = asyncio.ensure_future(asyncio.to_thread(self._share, buffers))
+        try:
+            segments, descriptors = await asyncio.shield(copying)
+        except asyncio.CancelledError:
+            # The copy cannot be interrupted: free its segments once it ends
+            copying.add_done_callback(self._release_copy)
+            raise
+
+        def _settle(setter: Callable[[Any], None], value: Any) -> None:
+            if not future.done():
+                setter(value)
+
+        def _on_success(value: Tuple[Any, JobStats]) -> None:
+            self._release(segments)
+            self._record(value[1])
+            loop.call_soon_threadsafe(_settle, future.set_result, value)
+
+        def _on_error(exc: BaseException) -> None:
+            self._release(segments)
+            with self._lock:
+                self._in_flight -= 1
+                self._failed += 1
+            loop.call_soon_threadsafe(_settle, future.set_exception, exc)
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            self._pool.apply_async(
+                _invoke,
+                (fn, descriptors, args, kwargs),
+                callback=_on_success,
+                error_callback=_on_error,
+            )
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            self._release(segments)
+            raise
+
+        return await future
+
+    # ------------------------------------------------------------------
+    def _share(
+        self, buffers: Mapping[Hashable, Any]
+    ) -> Tuple[list[SharedMemory], Dict[Hashable, _Descriptor]]:
+        """Copy *buffers* into new shared-memory segments."""
+        segments: list[SharedMemory] = []
+        descriptors: Dict[Hashable, _Descriptor] = {}
+        try:
+            for key, buf in buffers.items():
+                view = memoryview(buf).cast("B")
+                try:
+                    if view.nbytes == 0:
+                        descriptors[key] = (None, 0)
+                        continue
+                    shm = SharedMemory(create=True, size=view.nbytes)
+                    segments.append(shm)
+                    shm.buf[: view.nbytes] = view
+                    descriptors[key] = (shm.name, view.nbytes)
+                finally:
+                    view.release()
+        except BaseException:
+            self._release(segments)
+            raise
+        return segments, descriptors
+
+    def _release_copy(self, copying: asyncio.Future) -> None:
+        if not copying.cancelled() and copying.exception() is None:
+            self._release(copying.result()[0])
+
+    def _record(self, stats: JobStats) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+            self._cpu_seconds += stats.total_cpu_seconds
+            self._last = stats
+
+    @staticmethod
+    def _release(segments: Sequence[SharedMemory]) -> None:
+        for shm in segments:
+            try:
+                shm.close()
+                shm.unlink()
+            except FileNotFoundError:  # pragma: no cover - already gone
+                pass
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "started": self.started,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "failed": self._failed,
+                "cpu_seconds_total": round(self._cpu_seconds, 3),
+                "last_job": asdict(self._last) if self._last else None,
+            }
+
+
+__all__ = ["AudioProcessPool", "JobStats"]
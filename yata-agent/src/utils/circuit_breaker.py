@@ -0,0 +1,282 @@
+"""Circuit breakers for external dependencies (OpenAI, Google).
+
+A breaker starts **closed** and lets every call through.  After
+``failure_threshold`` consecutive dependency failures it **opens**: calls
+fail immediately with :class:`CircuitOpenError` instead of waiting for a
+timeout against a dead endpoint.  Once ``recovery_timeout`` has passed the
+breaker becomes **half-open** and admits up to ``half_open_max_calls``
+probe calls; a successful probe closes it again, a failed one re-opens it.
+
+Only failures of the dependency itself should trip a breaker, so each
+breaker takes an ``is_failure`` predicate (e.g. 5xx and connection errors
+count, a 400 caused by our own request does not).
+
+Breakers are shared by all guilds and are thread-safe, because some calls
+(Google API client, chat formatting) run in worker threads.
+:meth:`CircuitBreaker.retry_after` lets a job queue hold back work while a
+dependency is down (see :class:`utils.fair_scheduler.FairScheduler`).
+
+The outage predicates look the client libraries' error classes up in
+``sys.modules`` instead of importing them: an exception can only come from
+a library that has been imported, and the ``api`` role never loads OpenAI.
+"""
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# How long a held-back queue waits before re-checking a half-open breaker
+# whose probe slots are all taken
+_PROBE_RECHECK_SECONDS = 1.0
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def _always(_: BaseException) -> bool:
+    return True
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker around one external dependency."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        is_failure: Callable[[BaseException], bool] = _always,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._is_failure = is_failure
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+        self._calls = 0
+        self._successes = 0
+        self._failures_total = 0
+        self._rejected = 0
+        self._opened_count = 0
+
+    # ------------------------------------------------------------------
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+            logger.info("Circuit '%s' half-open: probing", self.name)
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until a call could be admitted (0 = now)."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == OPEN:
+                return max(0.0, self._opened_at + self.recovery_timeout - now)
+            if state == HALF_OPEN and self._half_open_calls >= self.half_open_max_calls:
+                return _PROBE_RECHECK_SECONDS
+            return 0.0
+
+    # ------------------------------------------------------------------
+    def _before_call(self) -> bool:
+        """Admit a call; returns True if it took a half-open probe slot."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == OPEN or (
+                state == HALF_OPEN and self._half_open_calls >= self.half_open_max_calls
+            ):
+                self._rejected += 1
+                retry = max(0.0, self._opened_at + self.recovery_timeout - now)
+                raise CircuitOpenError(self.name, retry or _PROBE_RECHECK_SECONDS)
+            self._calls += 1
+            if state == HALF_OPEN:
+                self._half_open_calls += 1
+                return True
+            return False
+
+    def _on_success(self) -> None:
+        with self._lock:
+            self._successes += 1
+            if self._state == HALF_OPEN:
+                logger.info("Circuit '%s' closed: probe succeeded", self.name)
+            self._state = CLOSED
+            self._failures = 0
+
+    def _on_error(self, exc: BaseException) -> None:
+        if not self._is_failure(exc):
+            # The dependency answered; the error is ours (e.g. 400).
+            self._on_success()
+            return
+        with self._lock:
+            self._failures_total += 1
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._opened_count += 1
+                    logger.warning(
+                        "Circuit '%s' opened after %d failure(s): %s",
+                        self.name, self._failures, exc,
+                    )
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def _on_abandon(self, probe: bool) -> None:
+        """A call ended without an answer (e.g. cancelled): neutral.
+
+        Its probe slot is handed back so that the next call can probe;
+        otherwise a cancelled probe would keep the breaker half-open and
+        rejecting forever.
+        """
+        if not probe:
+            return
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._half_open_calls = max(0, self._half_open_calls - 1)
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Await ``fn(*args, **kwargs)`` through the breaker."""
+        probe = self._before_call()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as exc:
+            self._on_error(exc)
+            raise
+        except BaseException:
+            self._on_abandon(probe)
+            raise
+        self._on_success()
+        return result
+
+    def call_blocking(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Synchronous variant of :meth:`call` for worker threads."""
+        probe = self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            self._on_error(exc)
+            raise
+        except BaseException:
+            self._on_abandon(probe)
+            raise
+        self._on_success()
+        return result
+
+    # ------------------------------------------------------------------
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "calls": self._calls,
+                "successes": self._successes,
+                "failures": self._failures_total,
+                "rejected": self._rejected,
+                "opened": self._opened_count,
+                "open_for_seconds": round(now - self._opened_at, 3) if state != CLOSED else 0.0,
+            }
+
+
+def _causes(exc: BaseException) -> Iterator[BaseException]:
+    """Yield *exc* and the exceptions it was raised from."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def _loaded_class(module: str, name: str) -> Optional[type]:
+    """Return ``module.name`` if *module* has been imported, else None."""
+    return getattr(sys.modules.get(module), name, None)
+
+
+def _is_outage_status(status: Optional[int]) -> bool:
+    return status is not None and (status >= 500 or status in (408, 429))
+
+
+def is_openai_outage(exc: BaseException) -> bool:
+    """True for OpenAI errors that indicate the API itself is unavailable.
+
+    Connection errors, timeouts, 5xx and 429s that survived the rate
+    limiter's retries count; 4xx caused by the request do not.
+    """
+    connection_error = _loaded_class("openai", "APIConnectionError")
+    if connection_error is None:
+        return False  # openai was never imported, so exc is not one of its errors
+    if isinstance(exc, connection_error):  # includes APITimeoutError
+        return True
+    if isinstance(exc, _loaded_class("openai", "APIStatusError")):
+        return _is_outage_status(exc.status_code)
+    return False
+
+
+def is_google_outage(exc: BaseException) -> bool:
+    """True for Google API errors that indicate the service is unavailable."""
+    http_error = _loaded_class("googleapiclient.errors", "HttpError")
+    transport_errors = (ConnectionError, TimeoutError) + tuple(
+        cls
+        for cls in (
+            _loaded_class("httplib2", "HttpLib2Error"),
+            _loaded_class("google.auth.exceptions", "TransportError"),
+        )
+        if cls is not None
+    )
+    for cause in _causes(exc):
+        if http_error is not None and isinstance(cause, http_error):
+            return _is_outage_status(cause.status_code)
+        if isinstance(cause, transport_errors):
+            return True
+    return False
+
+
+def hold_while_open(breakers: Iterable[Optional[CircuitBreaker]]) -> Callable[[], float]:
+    """Return a callable giving how long a job queue should hold back work."""
+    active = [b for b in breakers if b is not None]
+
+    def _hold() -> float:
+        return max((b.retry_after() for b in active), default=0.0)
+
+    return _hold
+
+
+__all__ = [
+    "CLOSED",
+    "HALF_OPEN",
+    "OPEN",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "hold_while_open",
+    "is_google_outage",
+    "is_openai_outage",
+]
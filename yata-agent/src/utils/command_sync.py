@@ -0,0 +1,97 @@
+"""Skip the slash-command sync when the commands have not changed.
+
+py-cord's ``auto_sync_commands`` fetches and compares the registered
+commands over HTTP on every connect, which costs several requests (and
+rate-limit budget) per start even though the commands only change with a
+deploy.  :func:`sync_commands_if_changed` hashes the schema of the pending
+commands instead and syncs only when the hash differs from the one stored
+after the last successful sync.
+
+Commands that were not synced are still dispatched: py-cord matches an
+interaction against the pending commands by name when it does not know the
+command's ID.  Delete the cache file (or pass ``--sync-commands``) to force
+a sync, e.g. after editing the commands in the developer portal.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sets in py-cord's payloads; their order carries no meaning
+_UNORDERED_KEYS = ("contexts", "integration_types")
+
+
+def _canonical(payload: Any) -> Any:
+    if isinstance(payload, dict):
+        return {
+            key: sorted(value) if key in _UNORDERED_KEYS and isinstance(value, list) else _canonical(value)
+            for key, value in payload.items()
+        }
+    if isinstance(payload, list):
+        return [_canonical(item) for item in payload]
+    return payload
+
+
+def command_schema_hash(commands: Iterable[Any], application_id: Optional[int] = None) -> str:
+    """SHA-256 of the commands' API payloads (and the application they belong to)."""
+    schema = sorted(
+        (
+            {"guild_ids": sorted(command.guild_ids or []), "payload": _canonical(command.to_dict())}
+            for command in commands
+        ),
+        key=lambda entry: (entry["payload"].get("type", 1), entry["payload"]["name"], entry["guild_ids"]),
+    )
+    data = json.dumps(
+        {"application_id": application_id, "commands": schema},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class CommandSyncCache:
+    """The schema hash of the last successful sync, kept in a small file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def load(self) -> Optional[str]:
+        try:
+            return json.loads(self.path.read_text()).get("hash")
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def store(self, digest: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"hash": digest}))
+        os.replace(tmp, self.path)
+
+
+async def sync_commands_if_changed(
+    bot: Any, cache: Optional[CommandSyncCache], force: bool = False
+) -> bool:
+    """Sync *bot*'s slash commands unless the cached hash matches.
+
+    Returns True when a sync was performed.  Without a cache every call
+    syncs, like py-cord's ``auto_sync_commands``.
+    """
+    digest = command_schema_hash(bot.pending_application_commands, bot.application_id)
+    if cache is not None and not force and cache.load() == digest:
+        logger.info("Slash commands unchanged (%s); skipping sync", digest[:12])
+        return False
+    await bot.sync_commands()
+    if cache is not None:
+        cache.store(digest)
+    logger.info("Slash commands synced (%s)", digest[:12])
+    return True
+
+
+__all__ = ["CommandSyncCache", "command_schema_hash", "sync_commands_if_changed"]
@@ -0,0 +1,86 @@
+"""Latency-SLO deadlines propagated through a processing job.
+
+:class:`ProcessingService` opens a :func:`deadline_scope` when a job
+starts.  The deadline lives in a :class:`contextvars.ContextVar`, so every
+coroutine and task spawned by the job (and ``asyncio.to_thread`` calls)
+sees it without threading an extra argument through each interface.
+Callers of external APIs use :func:`call_timeout` to turn the remaining
+budget into a per-request timeout.
+
+Stages that have a degraded mode (meeting-minutes formatting) stop
+*waiting* when the deadline expires and fall back; mandatory stages
+(transcription) still get at least ``floor`` seconds so an almost expired
+deadline cannot make a meeting fail outright.
+"""
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+_current: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar(
+    "processing_deadline", default=None
+)
+
+
+class Deadline:
+    """An absolute point in time (``time.monotonic``) a job should finish by."""
+
+    def __init__(self, seconds: float) -> None:
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.1f}s of {self.budget:.1f}s)"
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the job running in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """Set a deadline *seconds* from now for the enclosed block.
+
+    ``None`` or a non-positive value leaves the current deadline (if any)
+    in place.  A nested scope never extends an outer deadline.
+    """
+    outer = _current.get()
+    if not seconds or seconds <= 0:
+        yield outer
+        return
+    deadline = Deadline(seconds)
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def call_timeout(default: Optional[float] = None, floor: float = 0.0) -> Optional[float]:
+    """Per-request timeout derived from the current deadline.
+
+    Returns *default* when no deadline is set, otherwise the remaining
+    budget (capped by *default*) but never less than *floor*.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return default
+    remaining = deadline.remaining()
+    if default is not None:
+        remaining = min(remaining, default)
+    return max(floor, remaining)
+
+
+__all__ = ["Deadline", "call_timeout", "current_deadline", "deadline_scope"]
@@ -0,0 +1,110 @@
+"""Selection and tuning of the process-wide event loop.
+
+The Discord gateway, voice receive callbacks and the FastAPI server all
+run on one loop, so its per-callback overhead is paid by every gateway
+event and every HTTP request.  :func:`install_event_loop` creates that loop
+before ``commands.Bot`` (which captures the current loop when it is
+constructed) and configures it:
+
+* **Backend** — ``asyncio`` (the stdlib selector loop) or ``uvloop``
+  (libuv based, lower overhead per callback and per socket read).
+  ``auto`` uses uvloop when it is installed.  uvloop is an optional
+  dependency; requesting it when it is missing logs a warning and falls
+  back to asyncio rather than failing startup.
+* **Default executor** — ``asyncio.to_thread`` and
+  ``loop.run_in_executor(None, ...)`` use the loop's default executor.
+  Blocking service work has its own pools (:mod:`utils.executors`), so the
+  default executor only serves short file reads and library internals.  It
+  is sized explicitly instead of Python's ``min(32, cpu + 4)`` and its
+  threads are named ``yata-default`` so they are recognisable in stacks
+  and profiles.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+ASYNCIO = "asyncio"
+UVLOOP = "uvloop"
+AUTO = "auto"
+
+DEFAULT_EXECUTOR_WORKERS = 4
+
+
+def available_backends() -> List[str]:
+    """Loop backends that can be used in this environment."""
+    backends = [ASYNCIO]
+    if importlib.util.find_spec("uvloop") is not None:
+        backends.append(UVLOOP)
+    return backends
+
+
+def resolve_backend(name: str = AUTO) -> str:
+    """Map a configured backend name to one that is available here."""
+    name = (name or AUTO).strip().lower()
+    if name not in (AUTO, ASYNCIO, UVLOOP):
+        raise ValueError(f"unknown event loop backend: {name!r} (expected auto, asyncio or uvloop)")
+    available = available_backends()
+    if name == AUTO:
+        return UVLOOP if UVLOOP in available else ASYNCIO
+    if name not in available:
+        logger.warning("Event loop backend %s is not installed; using asyncio", name)
+        return ASYNCIO
+    return name
+
+
+def new_event_loop(backend: str = AUTO) -> asyncio.AbstractEventLoop:
+    """Create (but do not install) a loop of the given backend."""
+    if resolve_backend(backend) == UVLOOP:
+        import uvloop
+
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+
+def loop_backend(loop: asyncio.AbstractEventLoop) -> str:
+    """Name of the backend a loop was created with."""
+    return UVLOOP if type(loop).__module__.startswith("uvloop") else ASYNCIO
+
+
+def install_event_loop(
+    backend: str = AUTO,
+    default_executor_workers: Optional[int] = DEFAULT_EXECUTOR_WORKERS,
+) -> asyncio.AbstractEventLoop:
+    """Create the process loop, size its default executor and set it current.
+
+    Call before constructing ``commands.Bot``.  ``default_executor_workers``
+    of ``None`` keeps asyncio's own default executor.
+    """
+    loop = new_event_loop(backend)
+    if default_executor_workers is not None:
+        if default_executor_workers < 1:
+            raise ValueError("default_executor_workers must be >= 1")
+        loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=default_executor_workers, thread_name_prefix="yata-default")
+        )
+    asyncio.set_event_loop(loop)
+    logger.info(
+        "Event loop: %s (default executor: %s workers)",
+        loop_backend(loop),
+        default_executor_workers or "asyncio default",
+    )
+    return loop
+
+
+__all__ = [
+    "ASYNCIO",
+    "AUTO",
+    "DEFAULT_EXECUTOR_WORKERS",
+    "UVLOOP",
+    "available_backends",
+    "install_event_loop",
+    "loop_backend",
+    "new_event_loop",
+    "resolve_backend",
+]
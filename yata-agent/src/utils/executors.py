@@ -0,0 +1,176 @@
+"""Named, size-limited thread pools for each class of blocking work.
+
+``asyncio.to_thread`` funnels every blocking call into the loop's single
+default executor.  A burst of slow Google uploads can then occupy every
+worker and starve the short SQLite lookups queued behind them.  This module
+gives each *workload class* its own pool so that they can only exhaust
+their own capacity:
+
+* ``db``        – SQLite reads / writes (short, latency sensitive)
+* ``google-io`` – Google Docs / Drive API calls and OAuth token exchange
+* ``openai-io`` – synchronous OpenAI SDK calls (minutes formatting)
+* ``audio-cpu`` – audio preparation and ffmpeg invocation
+
+Each pool also keeps simple queue metrics (depth, wait time, failures) that
+are surfaced through the ``/metrics`` endpoint.
+
+Services accept an optional :class:`ExecutorRegistry`; when none is injected
+(unit tests, ad-hoc scripts) :func:`run_blocking` falls back to
+``asyncio.to_thread`` so behaviour is unchanged.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Mapping, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Workload class names ------------------------------------------------------
+DB = "db"
+GOOGLE_IO = "google-io"
+OPENAI_IO = "openai-io"
+AUDIO_CPU = "audio-cpu"
+
+DEFAULT_SIZES: Mapping[str, int] = {
+    DB: 4,
+    GOOGLE_IO: 8,
+    OPENAI_IO: 8,
+    AUDIO_CPU: 2,
+}
+
+
+class WorkloadExecutor:
+    """A :class:`ThreadPoolExecutor` wrapper that records queue metrics."""
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        if max_workers < 1:
+            raise ValueError(f"max_workers for '{name}' must be >= 1")
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"yata-{name}"
+        )
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._active = 0
+        self._max_queued = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    # ------------------------------------------------------------------
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` in this pool and await the result.
+
+        Like ``asyncio.to_thread`` the caller's :mod:`contextvars` context is
+        copied into the worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, fn, *args, **kwargs)
+        enqueued_at = time.monotonic()
+
+        with self._lock:
+            self._submitted += 1
+            queued = self._submitted - self._completed - self._failed - self._active
+            self._max_queued = max(self._max_queued, queued)
+
+        def _tracked() -> T:
+            waited = time.monotonic() - enqueued_at
+            with self._lock:
+                self._active += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            ok = False
+            try:
+                result = call()
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    if ok:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+
+        return await loop.run_in_executor(self._pool, _tracked)
+
+    # ------------------------------------------------------------------
+    def metrics(self) -> Dict[str, Any]:
+        """Return a snapshot of the pool's counters."""
+        with self._lock:
+            started = self._completed + self._failed + self._active
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queued": self._submitted - started,
+                "max_queued": self._max_queued,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "avg_wait_ms": round(self._total_wait / started * 1000, 3) if started else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+class ExecutorRegistry:
+    """Collection of :class:`WorkloadExecutor` keyed by workload class."""
+
+    def __init__(self, sizes: Optional[Mapping[str, int]] = None) -> None:
+        merged = dict(DEFAULT_SIZES)
+        if sizes:
+            merged.update(sizes)
+        self._executors: Dict[str, WorkloadExecutor] = {
+            name: WorkloadExecutor(name, size) for name, size in merged.items()
+        }
+
+    def get(self, name: str) -> WorkloadExecutor:
+        try:
+            return self._executors[name]
+        except KeyError:
+            raise KeyError(f"Unknown workload executor: {name}") from None
+
+    async def run(self, name: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self.get(name).run(fn, *args, **kwargs)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {name: ex.metrics() for name, ex in self._executors.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        for ex in self._executors.values():
+            ex.shutdown(wait=wait)
+
+
+async def run_blocking(
+    executors: Optional[ExecutorRegistry],
+    name: str,
+    fn: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """Run *fn* on the *name* pool, or via ``asyncio.to_thread`` if unset."""
+    if executors is None:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    return await executors.run(name, fn, *args, **kwargs)
+
+
+__all__ = [
+    "DB",
+    "GOOGLE_IO",
+    "OPENAI_IO",
+    "AUDIO_CPU",
+    "DEFAULT_SIZES",
+    "WorkloadExecutor",
+    "ExecutorRegistry",
+    "run_blocking",
+]
@@ -0,0 +1,315 @@
+"""Weighted deficit round-robin (DRR) scheduling of jobs across guilds.
+
+Every guild gets its own FIFO queue.  Guilds with pending jobs sit on a
+ring; when a guild's turn comes its *deficit* grows by
+``quantum * weight`` and it may dispatch queued jobs as long as their
+*cost* fits into the deficit.  A guild whose next job does not fit yields
+its turn and keeps the credit for the next round.  As a result
+
+* a guild with a long backlog cannot delay other guilds by more than one
+  round, no matter how many jobs it has queued;
+* cheap jobs (short meetings) are dispatched after a single turn, while an
+  expensive job waits until its guild has accumulated enough credit;
+* weights skew the share of capacity between guilds.
+
+At most ``concurrency`` jobs run at the same time.  Dispatch is
+non-preemptive: a running job is never interrupted by another guild's
+work; it is cancelled only when its own submitter is.  Per-guild wait times
+(enqueue → dispatch) are kept for :meth:`FairScheduler.metrics`.
+
+While a downstream dependency is known to be down, ``hold`` reports how
+long to wait and dispatch pauses, so queued jobs stay parked instead of
+being started only to fail.  A job that fails with one of ``requeue_on``
+(e.g. an open circuit breaker) goes back to the head of its guild's
+queue rather than failing its submitter.  If the exception carries a
+``resume`` coroutine function (e.g. only the upload of an already
+transcribed meeting), the requeued job runs that instead of starting over.
+
+Jobs run in a copy of their submitter's :mod:`contextvars` context, so
+per-job state such as the active profile follows the job even though the
+task is started later, from whichever job happened to free a slot.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Mapping, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+# Wait-time samples kept per guild for the percentile metrics
+_WAIT_SAMPLES = 256
+
+
+@dataclass
+class _Job:
+    cost: float
+    fn: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float
+    context: contextvars.Context = field(default_factory=contextvars.copy_context)
+    # Set once dispatched, so that a cancelled submitter stops the job
+    task: Optional[asyncio.Task] = None
+
+
+@dataclass
+class _GuildQueue:
+    weight: float
+    jobs: Deque[_Job] = field(default_factory=deque)
+    deficit: float = 0.0
+    in_turn: bool = False
+    running: int = 0
+    dispatched: int = 0
+    completed: int = 0
+    failed: int = 0
+    requeued: int = 0
+    waits_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=_WAIT_SAMPLES))
+    max_wait_ms: float = 0.0
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def parse_weights(spec: str) -> Dict[int, float]:
+    """Parse ``"<guild_id>:<weight>,..."`` (e.g. ``"123:2,456:0.5"``)."""
+    weights: Dict[int, float] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        guild_id, _, weight = item.partition(":")
+        try:
+            weights[int(guild_id)] = float(weight)
+        except ValueError as exc:
+            raise ValueError(f"Invalid guild weight entry: {item!r}") from exc
+        if weights[int(guild_id)] <= 0:
+            raise ValueError(f"Guild weight must be > 0: {item!r}")
+    return weights
+
+
+class FairScheduler:
+    """Run coroutine jobs with weighted fair sharing between guilds."""
+
+    def __init__(
+        self,
+        concurrency: int = 2,
+        quantum: float = 1.0,
+        weights: Optional[Mapping[int, float]] = None,
+        default_weight: float = 1.0,
+        hold: Optional[Callable[[], float]] = None,
+        requeue_on: Tuple[Type[BaseException], ...] = (),
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        if quantum <= 0:
+            raise ValueError("quantum must be > 0")
+        self.concurrency = concurrency
+        self.quantum = quantum
+        self.default_weight = default_weight
+        self._weights: Dict[int, float] = dict(weights or {})
+        self._queues: Dict[int, _GuildQueue] = {}
+        # Guilds with queued jobs, in round-robin order
+        self._ring: Deque[int] = deque()
+        self._running = 0
+        # Strong references to dispatched job tasks
+        self._tasks: set[asyncio.Task] = set()
+        # Seconds to hold dispatch (0 = go), e.g. while a breaker is open
+        self._hold = hold
+        self._requeue_on = requeue_on
+        self._resume_handle: Optional[asyncio.TimerHandle] = None
+        self._held = 0
+
+    # ------------------------------------------------------------------
+    def weight(self, guild_id: int) -> float:
+        return self._weights.get(guild_id, self.default_weight)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q.jobs) for q in self._queues.values())
+
+    async def submit(
+        self,
+        guild_id: int,
+        cost: float,
+        fn: Callable[..., Awaitable[Any]],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Queue ``fn(*args, **kwargs)`` for *guild_id* and return its result.
+
+        *cost* is in the same unit as ``quantum`` (e.g. seconds of audio).
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._queues.get(guild_id)
+        if queue is None:
+            queue = self._queues[guild_id] = _GuildQueue(weight=self.weight(guild_id))
+        job = _Job(
+            cost=max(0.0, float(cost)),
+            fn=lambda: fn(*args, **kwargs),
+            future=loop.create_future(),
+            enqueued_at=time.perf_counter(),
+        )
+        if not queue.jobs:
+            self._ring.append(guild_id)
+        queue.jobs.append(job)
+        self._dispatch()
+
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            # Drop the job if it has not been dispatched yet, stop it if it has
+            if job in queue.jobs:
+                queue.jobs.remove(job)
+                if not queue.jobs and guild_id in self._ring:
+                    self._ring.remove(guild_id)
+                    queue.deficit = 0.0
+                    queue.in_turn = False
+            elif job.task is not None and not job.task.done():
+                job.task.cancel()
+                # Return only once the job has stopped (a shutdown hands the
+                # meeting off right after this and must not race the old run)
+                await asyncio.wait({job.task})
+            raise
+
+    # ------------------------------------------------------------------
+    def _next_job(self) -> Optional[tuple[int, _Job]]:
+        """Pick the next job according to deficit round-robin."""
+        while self._ring:
+            guild_id = self._ring[0]
+            queue = self._queues[guild_id]
+            if not queue.in_turn:
+                queue.deficit += self.quantum * queue.weight
+                queue.in_turn = True
+            head = queue.jobs[0]
+            if head.cost <= queue.deficit:
+                queue.jobs.popleft()
+                queue.deficit -= head.cost
+                if not queue.jobs:
+                    # An idle guild does not bank credit
+                    queue.deficit = 0.0
+                    queue.in_turn = False
+                    self._ring.popleft()
+                return guild_id, head
+            # Not enough credit: end this guild's turn, keep its deficit
+            queue.in_turn = False
+            self._ring.rotate(-1)
+        return None
+
+    def _held_for(self) -> float:
+        if self._hold is None or not self._ring:
+            return 0.0
+        try:
+            return max(0.0, float(self._hold()))
+        except Exception:
+            logger.warning("Scheduler hold check failed", exc_info=True)
+            return 0.0
+
+    def _dispatch(self) -> None:
+        while self._running < self.concurrency:
+            delay = self._held_for()
+            if delay > 0:
+                if self._resume_handle is None:
+                    self._held += 1
+                    logger.info("Dispatch held for %.1fs (%d job(s) parked)", delay, self.queued)
+                    self._resume_handle = asyncio.get_running_loop().call_later(
+                        delay, self._resume
+                    )
+                return
+            picked = self._next_job()
+            if picked is None:
+                return
+            guild_id, job = picked
+            if job.future.done():  # cancelled while queued
+                continue
+            queue = self._queues[guild_id]
+            wait_ms = (time.perf_counter() - job.enqueued_at) * 1000
+            queue.waits_ms.append(wait_ms)
+            queue.max_wait_ms = max(queue.max_wait_ms, wait_ms)
+            queue.dispatched += 1
+            queue.running += 1
+            self._running += 1
+            task = asyncio.create_task(self._run(guild_id, job), context=job.context)
+            job.task = task
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _resume(self) -> None:
+        self._resume_handle = None
+        self._dispatch()
+
+    def _requeue(self, guild_id: int, job: _Job) -> None:
+        """Put *job* back at the head of its guild's queue."""
+        queue = self._queues[guild_id]
+        queue.requeued += 1
+        if not queue.jobs:
+            self._ring.appendleft(guild_id)
+        # Refund the cost so the job is dispatched again on the next turn
+        queue.deficit += job.cost
+        queue.jobs.appendleft(job)
+
+    async def _run(self, guild_id: int, job: _Job) -> None:
+        queue = self._queues[guild_id]
+        try:
+            result = await job.fn()
+        except self._requeue_on as exc:
+            if job.future.done():
+                return
+            logger.info("Job for guild %s parked: %s", guild_id, exc)
+            resume = getattr(exc, "resume", None)
+            if resume is not None:
+                job.fn = resume
+            self._requeue(guild_id, job)
+        except asyncio.CancelledError:
+            queue.failed += 1
+            job.future.cancel()
+            raise
+        except Exception as exc:  # propagate to the submitter
+            queue.failed += 1
+            if not job.future.done():
+                job.future.set_exception(exc)
+        else:
+            queue.completed += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            queue.running -= 1
+            self._running -= 1
+            self._dispatch()
+
+    # ------------------------------------------------------------------
+    def metrics(self) -> Dict[str, Any]:
+        guilds = {}
+        for guild_id, q in self._queues.items():
+            waits = list(q.waits_ms)
+            guilds[str(guild_id)] = {
+                "weight": q.weight,
+                "queued": len(q.jobs),
+                "running": q.running,
+                "dispatched": q.dispatched,
+                "completed": q.completed,
+                "failed": q.failed,
+                "requeued": q.requeued,
+                "deficit": round(q.deficit, 3),
+                "avg_wait_ms": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "p50_wait_ms": round(_percentile(waits, 50), 3),
+                "p95_wait_ms": round(_percentile(waits, 95), 3),
+                "max_wait_ms": round(q.max_wait_ms, 3),
+            }
+        return {
+            "concurrency": self.concurrency,
+            "quantum": self.quantum,
+            "running": self._running,
+            "queued": self.queued,
+            "held": self._resume_handle is not None,
+            "hold_count": self._held,
+            "guilds": guilds,
+        }
+
+
+__all__ = ["FairScheduler", "parse_weights"]
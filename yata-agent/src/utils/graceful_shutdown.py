@@ -0,0 +1,141 @@
+"""Ordered, deadline-bounded shutdown on SIGTERM / SIGINT.
+
+py-cord's ``Client.run`` stops the loop on the first signal and then
+cancels every task, so a deploy used to drop the meetings being recorded or
+processed.  :class:`GracefulShutdown` replaces those signal handlers with a
+sequence of named steps (stop accepting recordings, finalize the sinks,
+drain the in-flight pipelines, hand off what is left, stop the servers)::
+
+    shutdown = GracefulShutdown(deadline=25, on_force=loop.stop)
+    shutdown.add_step("stop_accepting", cog.stop_accepting)
+    shutdown.add_step("drain", cog.drain)                    # until the deadline
+    shutdown.add_step("hand_off", cog.hand_off_unfinished, timeout=10)
+    shutdown.install(loop)
+
+A step without a timeout may run until the deadline (counted from the
+signal); a step with its own timeout always gets it, so the clean-up after
+an expired deadline still happens.  A failing or timed-out step is logged
+and the sequence continues.  A second signal skips the remaining steps via
+``on_force``.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import signal
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+StepFn = Callable[[], Union[None, Awaitable[Any]]]
+
+
+@dataclass
+class _Step:
+    name: str
+    fn: StepFn
+    timeout: Optional[float]
+    status: Optional[str] = None
+    seconds: Optional[float] = None
+
+
+class GracefulShutdown:
+    """Run the registered shutdown steps once, within a deadline."""
+
+    def __init__(self, deadline: float, on_force: Optional[Callable[[], None]] = None) -> None:
+        if deadline < 0:
+            raise ValueError("deadline must be >= 0")
+        self.deadline = deadline
+        self._on_force = on_force
+        self._steps: List[_Step] = []
+        self._task: Optional[asyncio.Task] = None
+        self._signal: Optional[str] = None
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def add_step(self, name: str, fn: StepFn, timeout: Optional[float] = None) -> None:
+        """Append a step; *fn* may be a plain function or return an awaitable."""
+        self._steps.append(_Step(name, fn, timeout))
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    def remaining(self) -> float:
+        """Seconds left until the deadline (the full deadline before a signal)."""
+        if self._started is None:
+            return self.deadline
+        return max(0.0, self.deadline - (time.monotonic() - self._started))
+
+    # ------------------------------------------------------------------
+    def install(self, loop: asyncio.AbstractEventLoop, signals=(signal.SIGINT, signal.SIGTERM)) -> None:
+        """Handle *signals* on *loop*, replacing any previous handlers."""
+        for sig in signals:
+            loop.add_signal_handler(sig, self.trigger, sig)
+
+    def trigger(self, sig: Optional[int] = None) -> Optional[asyncio.Task]:
+        """Start the shutdown (first call) or force it (any later call)."""
+        name = signal.Signals(sig).name if sig is not None else "request"
+        if self._task is not None:
+            logger.warning("Second %s: forcing shutdown", name)
+            if self._on_force is not None:
+                self._on_force()
+            return self._task
+        self._signal = name
+        logger.info("%s received: shutting down (deadline %.0fs)", name, self.deadline)
+        self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def wait(self) -> None:
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def run(self) -> None:
+        self._started = time.monotonic()
+        for step in self._steps:
+            timeout = step.timeout if step.timeout is not None else self.remaining()
+            started = time.perf_counter()
+            try:
+                result = step.fn()
+                if inspect.isawaitable(result):
+                    await asyncio.wait_for(result, timeout)
+                step.status = "ok"
+            except asyncio.TimeoutError:
+                step.status = "timeout"
+                logger.warning("Shutdown step %s did not finish within %.1fs", step.name, timeout)
+            except Exception:
+                step.status = "error"
+                logger.exception("Shutdown step %s failed", step.name)
+            step.seconds = time.perf_counter() - started
+        self._finished = time.monotonic()
+        logger.info("Shutdown finished in %.1fs: %s", self._finished - self._started, self.summary())
+
+    # ------------------------------------------------------------------
+    def summary(self) -> str:
+        return ", ".join(
+            f"{step.name} {step.status} {step.seconds:.2f}s" for step in self._steps if step.status
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        if self._started is None:
+            state = "running"
+        elif self._finished is None:
+            state = "draining"
+        else:
+            state = "stopped"
+        return {
+            "state": state,
+            "signal": self._signal,
+            "deadline_seconds": self.deadline,
+            "steps": {
+                step.name: {"status": step.status, "seconds": round(step.seconds, 3)}
+                for step in self._steps
+                if step.status
+            },
+        }
+
+
+__all__ = ["GracefulShutdown"]
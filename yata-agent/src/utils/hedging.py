@@ -0,0 +1,144 @@
+"""Hedged requests for tail-latency-sensitive external calls.
+
+A hedged call starts one attempt and, if it has not finished after a
+delay, starts a second identical attempt.  Whichever returns a usable
+result first wins and the other attempt is cancelled.  The delay comes
+from a :class:`LatencyTracker` of recent call durations (the p95 by
+default), so only the slowest few percent of calls pay for a duplicate
+request.
+
+Cancelling the losing attempt must actually stop its request, so only hedge
+awaitables that honour cancellation (async HTTP client calls).  A call run
+in a worker thread (``run_blocking`` / ``asyncio.to_thread``) keeps going,
+and is billed, after its wrapper is cancelled.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When to send the second request of a hedged call."""
+
+    percentile: float = 95.0
+    # Delay used until ``min_samples`` latencies have been observed
+    initial_delay: float = 20.0
+    min_delay: float = 1.0
+    min_samples: int = 20
+
+
+class LatencyTracker:
+    """Sliding window of call latencies in seconds."""
+
+    def __init__(self, window: int = 256) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def hedge_delay(self, policy: HedgePolicy) -> float:
+        if len(self._samples) < policy.min_samples:
+            return policy.initial_delay
+        return max(policy.min_delay, self.percentile(policy.percentile) or 0.0)
+
+
+class Hedger:
+    """Run an attempt factory as a hedged call and keep latency statistics."""
+
+    def __init__(self, name: str, policy: Optional[HedgePolicy] = None) -> None:
+        self.name = name
+        self.policy = policy or HedgePolicy()
+        self.latencies = LatencyTracker()
+        self._calls = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+
+    async def call(
+        self,
+        attempt: Callable[[], Awaitable[T]],
+        accept: Callable[[T], bool] = lambda result: result is not None,
+    ) -> Optional[T]:
+        """Return the first accepted result of up to two attempts.
+
+        The hedge is only sent while the first attempt is still running; an
+        attempt that finishes early (including with an unaccepted result, such
+        as ``None`` from an open circuit breaker) is returned or raised as is.
+        Once hedged, if neither attempt produces an accepted result the last
+        result is returned; if both raise, the last exception propagates.
+        """
+        self._calls += 1
+        delay = self.latencies.hedge_delay(self.policy)
+        started = time.monotonic()
+        primary = asyncio.ensure_future(attempt())
+        hedge: Optional[asyncio.Future] = None
+        try:
+            await asyncio.wait({primary}, timeout=delay)
+            if primary.done():
+                result = primary.result()
+                if accept(result):
+                    self.latencies.observe(time.monotonic() - started)
+                return result
+
+            self._hedged += 1
+            logger.info(
+                "%s: no response after %.1fs, sending hedged request",
+                self.name, time.monotonic() - started,
+            )
+            hedge = asyncio.ensure_future(attempt())
+            pending = {primary, hedge}
+            result = None
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    result = task.result()
+                    if accept(result):
+                        self.latencies.observe(time.monotonic() - started)
+                        if task is hedge:
+                            self._hedge_wins += 1
+                        return result
+            if error is not None and result is None:
+                raise error
+            return result
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def metrics(self) -> Dict[str, Any]:
+        p50 = self.latencies.percentile(50)
+        p95 = self.latencies.percentile(95)
+        return {
+            "calls": self._calls,
+            "hedged": self._hedged,
+            "hedge_wins": self._hedge_wins,
+            "p50_seconds": round(p50, 3) if p50 is not None else None,
+            "p95_seconds": round(p95, 3) if p95 is not None else None,
+            "hedge_delay_seconds": round(self.latencies.hedge_delay(self.policy), 3),
+        }
+
+
+__all__ = ["HedgePolicy", "Hedger", "LatencyTracker"]
@@ -0,0 +1,211 @@
+"""Local IPC between the bot and worker processes.
+
+A Unix domain socket carrying newline-delimited JSON messages.  The bot
+process hosts an :class:`IPCHub`; each worker connects with an
+:class:`IPCClient`.  Every message a peer sends is delivered to the hub's
+handler and, by default, broadcast to the other peers.
+
+Sharded deployments run several bot processes; only one hosts the hub and
+the others connect with an :class:`IPCClient` like the workers do.
+
+The channel only carries notifications ("job 42 queued", "job 42
+finished").  The SQLite job queue remains the source of truth, so a lost
+message or a restarted peer costs at most one poll interval, never a job.
+Clients reconnect with backoff in the background.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+Message = Dict[str, Any]
+Handler = Callable[[Message], Optional[Awaitable[None]]]
+
+_MAX_LINE = 64 * 1024
+
+
+def _encode(message: Message) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+async def _dispatch(handler: Optional[Handler], message: Message) -> None:
+    if handler is None:
+        return
+    try:
+        result = handler(message)
+        if asyncio.iscoroutine(result):
+            await result
+    except Exception:
+        logger.exception("IPC handler failed for %s", message.get("type"))
+
+
+async def _read_messages(reader: asyncio.StreamReader, handler: Callable[[Message], Awaitable[None]]) -> None:
+    while True:
+        line = await reader.readline()
+        if not line:
+            return
+        try:
+            message = json.loads(line)
+        except ValueError:
+            logger.warning("Dropping malformed IPC message")
+            continue
+        if isinstance(message, dict):
+            await handler(message)
+
+
+class IPCHub:
+    """Unix-socket server that relays messages between local processes."""
+
+    def __init__(self, path: str | Path, on_message: Optional[Handler] = None, relay: bool = True) -> None:
+        self.path = Path(path)
+        self.on_message = on_message
+        self.relay = relay
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._handlers: Set[asyncio.Task] = set()
+        self._sent = 0
+        self._received = 0
+
+    async def start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()  # stale socket of a previous run
+        self._server = await asyncio.start_unix_server(self._serve, path=str(self.path), limit=_MAX_LINE)
+        os.chmod(self.path, 0o600)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in list(self._peers):
+            writer.close()
+        # Let the connection handlers see EOF and finish
+        if self._handlers:
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+        self._peers.clear()
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._peers.add(writer)
+        task = asyncio.current_task()
+        if task is not None:
+            self._handlers.add(task)
+        try:
+            async def _handle(message: Message) -> None:
+                self._received += 1
+                if self.relay:
+                    self._write(message, exclude=writer)
+                await _dispatch(self.on_message, message)
+
+            await _read_messages(reader, _handle)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._peers.discard(writer)
+            self._handlers.discard(task)
+            writer.close()
+
+    def broadcast(self, message: Message) -> None:
+        """Send *message* to every connected peer (best effort)."""
+        self._write(message)
+
+    def _write(self, message: Message, exclude: Optional[asyncio.StreamWriter] = None) -> None:
+        data = _encode(message)
+        for writer in list(self._peers):
+            if writer is exclude or writer.is_closing():
+                continue
+            writer.write(data)
+            self._sent += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"peers": len(self._peers), "sent": self._sent, "received": self._received}
+
+
+class IPCClient:
+    """Connects to an :class:`IPCHub`, reconnecting in the background."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        on_message: Optional[Handler] = None,
+        on_connect: Optional[Callable[[], None]] = None,
+        retry_max: float = 5.0,
+    ) -> None:
+        self.path = Path(path)
+        self.on_message = on_message
+        # Called after each (re)connect, e.g. to poll for anything missed
+        self.on_connect = on_connect
+        self.retry_max = retry_max
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._connects = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def send(self, message: Message) -> bool:
+        """Send *message*; False when not connected (the caller may poll)."""
+        if not self.connected:
+            return False
+        self._writer.write(_encode(message))  # type: ignore[union-attr]
+        return True
+
+    def broadcast(self, message: Message) -> None:
+        """Send *message* to the other peers via the hub (best effort).
+
+        Lets a secondary bot process (see :mod:`utils.sharding`) stand in
+        for an :class:`IPCHub`.
+        """
+        self.send(message)
+
+    async def _run(self) -> None:
+        delay = 0.1
+        while True:
+            try:
+                reader, self._writer = await asyncio.open_unix_connection(str(self.path), limit=_MAX_LINE)
+            except OSError:
+                await asyncio.sleep(delay)
+                delay = min(self.retry_max, delay * 2)
+                continue
+            delay = 0.1
+            self._connects += 1
+            if self.on_connect is not None:
+                self.on_connect()
+            try:
+                await _read_messages(reader, lambda message: _dispatch(self.on_message, message))
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                pass
+            finally:
+                self._writer.close()
+                self._writer = None
+            logger.info("IPC connection to %s lost; reconnecting", self.path)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"connected": self.connected, "connects": self._connects}
+
+
+__all__ = ["IPCClient", "IPCHub"]
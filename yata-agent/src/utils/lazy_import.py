@@ -0,0 +1,52 @@
+"""Defer heavy imports until first use.
+
+``openai`` and the Google client libraries take most of the bot's import
+time, yet a given process may never call them (the ``api`` role never
+transcribes, a worker never runs the OAuth flow).  Modules bind them with
+:func:`lazy_import` instead of ``import``::
+
+    openai = lazy_import("openai")
+
+    def make_client():
+        return openai.OpenAI()  # the real import happens here
+
+The proxy forwards attribute reads to the real module, importing it on the
+first one.  Attributes *set* on the proxy shadow the module's, so
+``unittest.mock.patch("pkg.mod.openai.OpenAI")`` affects only the module
+that holds the proxy.  ``importlib`` serialises concurrent first imports,
+so the proxy is safe to use from executor threads.
+"""
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from typing import Any
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def _load(self) -> types.ModuleType:
+        module = sys.modules.get(self.__name__)
+        if module is None:
+            module = importlib.import_module(self.__name__)
+        return module
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__name__ in sys.modules else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return a :class:`LazyModule` for *name* (nothing is imported yet)."""
+    return LazyModule(name)
+
+
+__all__ = ["LazyModule", "lazy_import"]
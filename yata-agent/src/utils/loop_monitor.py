@@ -0,0 +1,175 @@
+"""Event-loop lag monitor and blocking-call detector.
+
+The Discord gateway, uvicorn and all service code share one event loop, so
+a synchronous call (SQLite, ``open()``, a CPU-heavy loop) delays gateway
+heartbeats and every other guild.  :class:`LoopMonitor` measures this in
+two ways:
+
+* **Lag** — a task sleeps for ``interval`` and records how much later than
+  requested it woke up.  Percentiles over a sliding window are exported
+  via :meth:`LoopMonitor.metrics` (``event_loop`` in ``/metrics``).
+* **Stalls** (``capture_stacks=True``, meant for debugging) — a watchdog
+  thread posts a ping into the loop with ``call_soon_threadsafe``.  If the
+  loop has not answered after ``block_threshold`` seconds, something is
+  blocking it *right now*, and the watchdog snapshots the loop thread's
+  stack (``sys._current_frames``).  The stall is logged with that stack
+  once the loop recovers.
+
+asyncio's own debug mode (``loop.slow_callback_duration``) only names the
+slow callback after the fact; the stack snapshot shows which line inside
+it was blocking.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import statistics
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_WINDOW = 240
+_RECENT_STALLS = 10
+_STACK_LIMIT = 30
+
+
+class LoopMonitor:
+    """Measure event-loop lag and, optionally, capture blocking stacks."""
+
+    def __init__(
+        self,
+        interval: float = 0.25,
+        block_threshold: float = 0.1,
+        capture_stacks: bool = False,
+    ) -> None:
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.capture_stacks = capture_stacks
+        self._lags: Deque[float] = deque(maxlen=_WINDOW)
+        self._max_lag = 0.0
+        self._samples = 0
+        self._over_threshold = 0
+        self._stalls: Deque[Dict[str, Any]] = deque(maxlen=_RECENT_STALLS)
+        self._stall_count = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Start monitoring the running loop (call from the loop thread)."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._measure())
+        if self.capture_stacks:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def stop(self) -> None:
+        """Stop sampling; safe to call after the loop has closed."""
+        self._stop.set()
+        if self._task is not None:
+            if not self._task.get_loop().is_closed():
+                self._task.cancel()
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    # ------------------------------------------------------------------
+    async def _measure(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record_lag(max(0.0, loop.time() - started - self.interval))
+
+    def record_lag(self, lag: float) -> None:
+        self._lags.append(lag)
+        self._samples += 1
+        self._max_lag = max(self._max_lag, lag)
+        if lag >= self.block_threshold:
+            self._over_threshold += 1
+
+    def _watch(self) -> None:
+        assert self._loop is not None
+        while not self._stop.is_set():
+            answered = threading.Event()
+            posted = time.monotonic()
+            try:
+                self._loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                return  # loop closed
+            if not answered.wait(self.block_threshold):
+                stack = self._loop_stack()
+                # Wait for the loop to recover to learn how long it stalled
+                while not answered.wait(0.5):
+                    if self._stop.is_set() or self._loop.is_closed():
+                        return
+                self._record_stall(time.monotonic() - posted, stack)
+            self._stop.wait(self.block_threshold)
+
+    def _loop_stack(self) -> List[str]:
+        frame = sys._current_frames().get(self._loop_thread)  # type: ignore[arg-type]
+        if frame is None:
+            return []
+        return traceback.format_stack(frame, limit=_STACK_LIMIT)
+
+    def _record_stall(self, seconds: float, stack: List[str]) -> None:
+        self._stall_count += 1
+        # Innermost frames last; the last few name the blocking call
+        self._stalls.append(
+            {
+                "at": time.time(),
+                "blocked_ms": round(seconds * 1000, 1),
+                "stack": [line.strip().splitlines()[0] for line in stack[-8:]],
+            }
+        )
+        logger.warning(
+            "Event loop blocked for %.0f ms; loop thread stack while blocked:\n%s",
+            seconds * 1000,
+            "".join(stack),
+            extra={"duration_ms": round(seconds * 1000, 1)},
+        )
+
+    # ------------------------------------------------------------------
+    def metrics(self) -> Dict[str, Any]:
+        lags = sorted(self._lags)
+
+        def _ms(value: float) -> float:
+            return round(value * 1000, 2)
+
+        def _percentile(q: float) -> float:
+            if not lags:
+                return 0.0
+            return lags[min(len(lags) - 1, int(q * len(lags)))]
+
+        return {
+            "interval_ms": _ms(self.interval),
+            "block_threshold_ms": _ms(self.block_threshold),
+            "samples": self._samples,
+            "lag_ms": {
+                "last": _ms(self._lags[-1]) if self._lags else 0.0,
+                "mean": _ms(statistics.fmean(lags)) if lags else 0.0,
+                "p50": _ms(_percentile(0.5)),
+                "p99": _ms(_percentile(0.99)),
+                "max": _ms(self._max_lag),
+            },
+            "over_threshold": self._over_threshold,
+            "capture_stacks": self.capture_stacks,
+            "stalls": self._stall_count,
+            "recent_stalls": list(self._stalls),
+        }
+
+
+__all__ = ["LoopMonitor"]
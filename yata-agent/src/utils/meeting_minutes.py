@@ -1,16 +1,32 @@
 """Generate structured meeting minutes from raw transcript text using OpenAI Chat Completion API.
 
-This utility is intentionally *stateless* so that it can be imported from
-anywhere (Service 層推奨) without introducing additional dependencies.
+This utility is intentionally *stateless* (apart from the reused async
+clients) so that it can be imported from anywhere (Service 層推奨) without
+introducing additional dependencies.
 """
 from __future__ import annotations
 
+import logging
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-import openai
+from utils.circuit_breaker import CircuitOpenError
+from utils.lazy_import import lazy_import
+from utils.rate_limiter import estimate_tokens
+from utils.tracing import span
+
+if TYPE_CHECKING:  # pragma: no cover
+    from utils.circuit_breaker import CircuitBreaker
+    from utils.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Imported on the first formatting call, not at bot startup
+openai = lazy_import("openai")
 
 _OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# e.g. a local stand-in server (loadtest.openai_server) for benchmarks / CI
+_OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
 
 _TEMPLATE = (
     "1.目的\n"
@@ -31,15 +47,104 @@ _SYSTEM_PROMPT = (
 )
 
 _MODEL = "gpt-4o-mini"  # 2025-06 時点の lightweight GPT-4o family
+_MAX_TOKENS = 2048
 
+# Async clients keep their connection pool across calls: one per rate limiter
+_async_clients: Dict[Any, Any] = {}
 
-def format_meeting_minutes(transcript: str) -> Optional[str]:
-    """Return formatted meeting minutes text or *None* on error."""
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    logger.info(f"format_meeting_minutes called with transcript length: {len(transcript)}")
-    logger.info(f"Transcript sample: {transcript[:100]}...")
+
+def _build_messages(transcript: str):
+    prompt = (
+        "以下の会議の書き起こしを、以下のテンプレートに沿って整理してください。\n\n"
+        f"テンプレート:\n{_TEMPLATE}\n\n"
+        f"会議の書き起こし:\n{transcript}"
+    )
+    messages = [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    return prompt, messages
+
+
+def _request(transcript: str, timeout: Optional[float]):
+    """Return the prompt and the ``chat.completions.create`` keyword arguments."""
+    prompt, messages = _build_messages(transcript)
+    kwargs: Dict[str, Any] = {
+        "model": _MODEL,
+        "messages": messages,
+        "temperature": 0.7,
+        "max_tokens": _MAX_TOKENS,
+    }
+    if timeout:
+        kwargs["timeout"] = timeout
+    return prompt, kwargs
+
+
+def _client_options(rate_limiter: Optional["RateLimiter"], asynchronous: bool) -> Dict[str, Any]:
+    """Constructor arguments of ``openai.OpenAI`` / ``openai.AsyncOpenAI``."""
+    options: Dict[str, Any] = {"api_key": _OPENAI_API_KEY}
+    if _OPENAI_BASE_URL:
+        options["base_url"] = _OPENAI_BASE_URL
+    if rate_limiter is not None:
+        # The limiter re-queues 429s itself and learns from the response headers
+        http_client = openai.DefaultAsyncHttpxClient if asynchronous else openai.DefaultHttpxClient
+        options["max_retries"] = 0
+        options["http_client"] = http_client(
+            event_hooks=rate_limiter.httpx_event_hooks(asynchronous=asynchronous)
+        )
+    return options
+
+
+def _async_client(rate_limiter: Optional["RateLimiter"]):
+    client = _async_clients.get(rate_limiter)
+    if client is None:
+        client = openai.AsyncOpenAI(**_client_options(rate_limiter, asynchronous=True))
+        _async_clients[rate_limiter] = client
+    return client
+
+
+def _reserved_tokens(prompt: str) -> int:
+    # TPM counts the prompt plus max_tokens; the unused part is refunded
+    return estimate_tokens(_SYSTEM_PROMPT + prompt) + _MAX_TOKENS
+
+
+def _record_usage(response, rate_limiter: Optional["RateLimiter"], reserved: int, chat_span) -> Optional[str]:
+    """Settle the token reservation and return the minutes text."""
+    total_tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+    if rate_limiter is not None:
+        rate_limiter.settle_tokens(reserved, total_tokens)
+    if chat_span is not None:
+        chat_span.set_attribute("total_tokens", total_tokens)
+    result = response.choices[0].message.content
+    logger.info("OpenAI response received, length: %d", len(result) if result else 0)
+    return result
+
+
+def _failed(caller: str, e: Exception) -> None:
+    """Log a failed formatting call; the caller falls back to the raw transcript."""
+    if isinstance(e, CircuitOpenError):
+        logger.warning("Skipping meeting minutes formatting: %s", e)
+    else:
+        logger.error("Error in %s: %s", caller, e)
+    return None
+
+
+def format_meeting_minutes(
+    transcript: str,
+    rate_limiter: Optional["RateLimiter"] = None,
+    circuit_breaker: Optional["CircuitBreaker"] = None,
+    timeout: Optional[float] = None,
+) -> Optional[str]:
+    """Return formatted meeting minutes text or *None* on error.
+
+    *rate_limiter* (shared across guilds) delays the request until the
+    RPM / TPM budget allows it and re-queues it on HTTP 429.  While
+    *circuit_breaker* is open no request is sent and *None* is returned
+    straight away, so the caller falls back to the raw transcript.
+    *timeout* bounds each HTTP request in seconds.
+    """
+    # Meeting content never goes to the log, only its size
+    logger.info("format_meeting_minutes called with transcript length: %d", len(transcript))
     
     if not _OPENAI_API_KEY:
         logger.warning("OPENAI_API_KEY not found, returning None")
@@ -47,26 +152,71 @@ def format_meeting_minutes(transcript: str) -> Optional[str]:
         return None
 
     try:
-        client = openai.OpenAI(api_key=_OPENAI_API_KEY)
-        prompt = (
-            "以下の会議の書き起こしを、以下のテンプレートに沿って整理してください。\n\n"
-            f"テンプレート:\n{_TEMPLATE}\n\n"
-            f"会議の書き起こし:\n{transcript}"
-        )
-        logger.info("Sending request to OpenAI chat completions API...")
-        response = client.chat.completions.create(
-            model=_MODEL,
-            messages=[
-                {"role": "system", "content": _SYSTEM_PROMPT},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-            max_tokens=2048,
-        )
-        result = response.choices[0].message.content
-        logger.info(f"OpenAI response received, length: {len(result) if result else 0}")
-        logger.info(f"Response sample: {result[:100] if result else 'None'}...")
-        return result
+        prompt, kwargs = _request(transcript, timeout)
+        client = openai.OpenAI(**_client_options(rate_limiter, asynchronous=False))
+
+        def _send():
+            return client.chat.completions.create(**kwargs)
+
+        logger.debug("Sending request to OpenAI chat completions API...")
+        if circuit_breaker is not None:
+            _unguarded = _send
+
+            def _send():
+                return circuit_breaker.call_blocking(_unguarded)
+
+        reserved = _reserved_tokens(prompt)
+        with span("openai.chat", model=_MODEL, prompt_chars=len(prompt)) as chat_span:
+            if rate_limiter is None:
+                response = _send()
+            else:
+                response = rate_limiter.call_blocking(
+                    _send, tokens=reserved, retry_on=(openai.RateLimitError,)
+                )
+            return _record_usage(response, rate_limiter, reserved, chat_span)
+    except Exception as e:
+        return _failed("format_meeting_minutes", e)
+
+
+async def format_meeting_minutes_async(
+    transcript: str,
+    rate_limiter: Optional["RateLimiter"] = None,
+    circuit_breaker: Optional["CircuitBreaker"] = None,
+    timeout: Optional[float] = None,
+) -> Optional[str]:
+    """Async variant of :func:`format_meeting_minutes` on ``openai.AsyncOpenAI``.
+
+    Cancelling the returned coroutine closes the HTTP request, so this is the
+    variant a hedged call may race and cancel.  The client is created on the
+    first call and reused afterwards.
+    """
+    logger.info("format_meeting_minutes_async called with transcript length: %d", len(transcript))
+
+    if not _OPENAI_API_KEY:
+        logger.warning("OPENAI_API_KEY not found, returning None")
+        return None
+
+    try:
+        prompt, kwargs = _request(transcript, timeout)
+        client = _async_client(rate_limiter)
+
+        async def _send():
+            return await client.chat.completions.create(**kwargs)
+
+        if circuit_breaker is not None:
+            _unguarded = _send
+
+            async def _send():
+                return await circuit_breaker.call(_unguarded)
+
+        reserved = _reserved_tokens(prompt)
+        with span("openai.chat", model=_MODEL, prompt_chars=len(prompt)) as chat_span:
+            if rate_limiter is None:
+                response = await _send()
+            else:
+                response = await rate_limiter.call(
+                    _send, tokens=reserved, retry_on=(openai.RateLimitError,)
+                )
+            return _record_usage(response, rate_limiter, reserved, chat_span)
     except Exception as e:
-        logger.error(f"Error in format_meeting_minutes: {e}")
-        return None 
\ No newline at end of file
+        return _failed("format_meeting_minutes_async", e)
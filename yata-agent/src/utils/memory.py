@@ -0,0 +1,315 @@
+"""Memory lifecycle of recordings: explicit release and leak detection.
+
+A finished recording holds its whole meeting as PCM in per-user
+``BytesIO`` buffers.  The sink is referenced from the py-cord voice client
+(``vc.sink`` / ``sink.vc`` form a cycle), from the recording callback and
+from the cog, so nothing guarantees the buffers are freed once the
+minutes are posted.  This module makes the lifecycle explicit:
+
+* :func:`release_buffers` closes the PCM buffers as soon as the audio has
+  been mixed / exported — ``BytesIO.close`` frees the memory even if the
+  object itself is still referenced somewhere.
+* :func:`detach_sink` breaks the voice client ↔ sink cycle and drops the
+  timeline once processing is done.
+* :class:`MemoryTracker` keeps weak references to each recording's sink
+  and buffers.  A while after completion it checks whether any of them is
+  still alive, reports the bytes still held and logs a warning.  With
+  ``debug`` set it first runs a full ``gc.collect()`` and names what refers
+  to the retained objects (``gc.get_referrers``); both walk the whole heap
+  while holding the GIL, stalling the event loop, so they are off by
+  default.  With ``tracemalloc_frames`` set it also diffs tracemalloc
+  snapshots taken when the recording finished and after the release
+  (process-wide, so concurrent jobs show up too).
+* :func:`trim_heap` asks glibc to return freed arenas to the OS
+  (``malloc_trim``); CPython's allocator otherwise keeps the peak RSS of a
+  long meeting for the lifetime of the process.
+"""
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import gc
+import inspect
+import io
+import logging
+import os
+import sys
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Allocation sites attributed to recordings in tracemalloc diffs
+_RECORDING_FILES = ("*/utils/timeline_sink.py", "*/discord/sinks/*", "*/services/audio_service.py")
+_RECENT_ALERTS = 10
+
+
+def _file_bytes(file: Any) -> int:
+    """Size of an open buffer; closed buffers hold no payload."""
+    if file is None or getattr(file, "closed", True):
+        return 0
+    position = file.tell()
+    size = file.seek(0, io.SEEK_END)
+    file.seek(position)
+    return size
+
+
+def buffer_bytes(sink: Any) -> int:
+    """Bytes held by the sink's per-user buffers (0 once released)."""
+    return sum(
+        _file_bytes(getattr(audio, "file", None))
+        for audio in list((getattr(sink, "audio_data", None) or {}).values())
+    )
+
+
+def release_buffers(sink: Any) -> int:
+    """Close and drop the sink's PCM buffers; return the bytes released."""
+    audio_data = getattr(sink, "audio_data", None)
+    if not audio_data:
+        return 0
+    released = buffer_bytes(sink)
+    for audio in list(audio_data.values()):
+        file = getattr(audio, "file", None)
+        try:
+            if file is not None:
+                file.close()
+        except BufferError:
+            # A memoryview export is still alive; dropping the dict entry
+            # below frees the buffer once that view is released.
+            logger.warning("Recording buffer still exported; it is freed when the view is released")
+    audio_data.clear()
+    return released
+
+
+def detach_sink(sink: Any) -> None:
+    """Break the voice client ↔ sink cycle and drop the timeline."""
+    vc = getattr(sink, "vc", None)
+    if vc is not None:
+        if getattr(vc, "sink", None) is sink:
+            vc.sink = None
+        sink.vc = None
+    if getattr(sink, "timeline", None) is not None:
+        sink.timeline = None
+
+
+def _load_malloc_trim():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        return libc.malloc_trim
+    except (OSError, AttributeError):
+        return None  # not glibc (e.g. musl)
+
+
+_malloc_trim = _load_malloc_trim()
+
+
+def trim_heap() -> bool:
+    """Return freed heap memory to the OS; False where unsupported."""
+    if _malloc_trim is None:
+        return False
+    return bool(_malloc_trim(0))
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, if known."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@dataclass
+class _Tracked:
+    key: str
+    guild_id: int
+    refs: List[weakref.ref]
+    finished_at: float
+    peak_bytes: int = 0
+    released_bytes: int = 0
+    stages: Dict[str, float] = field(default_factory=dict)
+    snapshot: Optional[tracemalloc.Snapshot] = None
+
+
+class MemoryTracker:
+    """Track recordings from finish to release and alert on retention."""
+
+    def __init__(
+        self,
+        check_delay: float = 30.0,
+        tracemalloc_frames: int = 0,
+        trim: bool = True,
+        debug: bool = False,
+    ) -> None:
+        self.check_delay = check_delay
+        self.trim = trim
+        self.debug = debug
+        self._tracemalloc = tracemalloc_frames > 0
+        if self._tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start(tracemalloc_frames)
+        self._tracked: Dict[str, _Tracked] = {}
+        self._checks: set[asyncio.Task] = set()
+        self._completed = 0
+        self._retained = 0
+        self._released_bytes = 0
+        self._trims = 0
+        self._alerts: Deque[Dict[str, Any]] = deque(maxlen=_RECENT_ALERTS)
+
+    # ------------------------------------------------------------------
+    def track(self, key: str, guild_id: int, sink: Any) -> None:
+        """Start tracking a finished recording's sink and buffers."""
+        refs: List[weakref.ref] = []
+        objects = [sink] + [
+            getattr(audio, "file", None)
+            for audio in list((getattr(sink, "audio_data", None) or {}).values())
+        ]
+        for obj in objects:
+            try:
+                refs.append(weakref.ref(obj))
+            except TypeError:
+                continue  # not weak-referenceable (test doubles, None)
+        self._tracked[key] = _Tracked(
+            key,
+            guild_id,
+            refs,
+            finished_at=time.monotonic(),
+            peak_bytes=buffer_bytes(sink),
+            stages={"finished": 0.0},
+            snapshot=self._take_snapshot(),
+        )
+
+    def stage(self, key: str, name: str) -> None:
+        """Record the seconds from finish to a lifecycle stage."""
+        tracked = self._tracked.get(key)
+        if tracked is not None:
+            tracked.stages[name] = round(time.monotonic() - tracked.finished_at, 3)
+
+    def release(self, key: str, sink: Any) -> int:
+        """Release the sink's buffers and account for the freed bytes."""
+        released = release_buffers(sink)
+        self._released_bytes += released
+        tracked = self._tracked.get(key)
+        if tracked is not None and released:
+            tracked.released_bytes += released
+            self.stage(key, "released")
+        return released
+
+    def complete(self, key: str) -> None:
+        """Schedule the retention check of a completed recording."""
+        tracked = self._tracked.get(key)
+        if tracked is None:
+            return
+        self.stage(key, "completed")
+        self._completed += 1
+        task = asyncio.create_task(self._check_later(tracked))
+        self._checks.add(task)
+        task.add_done_callback(self._checks.discard)
+
+    async def _check_later(self, tracked: _Tracked) -> None:
+        await asyncio.sleep(self.check_delay)
+        await self.check(tracked.key)
+
+    async def check(self, key: str) -> Optional[Dict[str, Any]]:
+        """Check *key* now; return the alert if anything is still retained."""
+        tracked = self._tracked.pop(key, None)
+        if tracked is None:
+            return None
+        if self.debug:
+            gc.collect()
+        alive = [obj for obj in (ref() for ref in tracked.refs) if obj is not None]
+        alert = None
+        if alive:
+            alert = self._alert(tracked, alive)
+        del alive
+        if self.trim:
+            rss_before = rss_bytes()
+            if await asyncio.to_thread(trim_heap):
+                self._trims += 1
+                rss_after = rss_bytes()
+                if rss_before is not None and rss_after is not None:
+                    logger.debug("malloc_trim returned %d bytes to the OS", rss_before - rss_after)
+        return alert
+
+    def _alert(self, tracked: _Tracked, alive: List[Any]) -> Dict[str, Any]:
+        self._retained += 1
+        # The buffers are tracked themselves, so count them and not the sink
+        retained = sum(_file_bytes(obj) for obj in alive if not hasattr(obj, "audio_data"))
+        holders: List[str] = []
+        if self.debug:
+            holders = sorted(
+                {
+                    type(ref).__name__
+                    for obj in alive
+                    for ref in gc.get_referrers(obj)
+                    if ref is not alive and not inspect.isframe(ref)
+                }
+            )
+        alert: Dict[str, Any] = {
+            "key": tracked.key,
+            "guild_id": tracked.guild_id,
+            "retained_objects": [type(obj).__name__ for obj in alive],
+            "retained_bytes": retained,
+            "referrers": holders,
+            "stages": tracked.stages,
+        }
+        diff = self._snapshot_diff(tracked)
+        if diff is not None:
+            alert["traced_delta_bytes"], alert["traced_top"] = diff
+        self._alerts.append(alert)
+        logger.warning(
+            "Recording %s of guild %s still retained after completion: %s (%d bytes), referenced by %s",
+            tracked.key,
+            tracked.guild_id,
+            ", ".join(alert["retained_objects"]),
+            retained,
+            ", ".join(holders) or "unknown (set debug to find out)",
+        )
+        return alert
+
+    # ------------------------------------------------------------------
+    def _take_snapshot(self) -> Optional[tracemalloc.Snapshot]:
+        if not (self._tracemalloc and tracemalloc.is_tracing()):
+            return None
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, pattern) for pattern in _RECORDING_FILES]
+        )
+
+    def _snapshot_diff(self, tracked: _Tracked) -> Optional[tuple[int, List[str]]]:
+        after = self._take_snapshot()
+        if tracked.snapshot is None or after is None:
+            return None
+        stats = after.compare_to(tracked.snapshot, "lineno")
+        # The buffers existed at the first snapshot: once freed the diff is
+        # about -peak_bytes, so this is what the recording still holds.
+        delta = sum(stat.size_diff for stat in stats) + tracked.peak_bytes
+        top = [str(stat) for stat in stats[:3] if stat.size_diff > 0]
+        return delta, top
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "tracked": len(self._tracked),
+            "completed": self._completed,
+            "retained": self._retained,
+            "released_bytes": self._released_bytes,
+            "heap_trims": self._trims,
+            "rss_bytes": rss_bytes(),
+            "tracemalloc": tracemalloc.is_tracing(),
+            "recent_alerts": list(self._alerts),
+        }
+
+
+__all__ = [
+    "MemoryTracker",
+    "buffer_bytes",
+    "detach_sink",
+    "release_buffers",
+    "rss_bytes",
+    "trim_heap",
+]
@@ -45,6 +45,66 @@ _MESSAGES: Final[Mapping[str, tuple[str, str]]] = {
         "⏹️ 録音を停止しました。録音データを処理します…",
         "⏹️ Recording stopped. Processing the audio…",
     ),
+    "record_auto_stop_empty": (
+        "⏹️ ボイスチャンネルが無人になったため録音を自動停止しました。録音データを処理します…",
+        "⏹️ The voice channel is empty, so recording was stopped automatically. Processing the audio…",
+    ),
+    "record_auto_stop_idle": (
+        "⏹️ しばらく発言がなかったため録音を自動停止しました。録音データを処理します…",
+        "⏹️ No one has spoken for a while, so recording was stopped automatically. Processing the audio…",
+    ),
+    "record_auto_stop_max": (
+        "⏹️ 録音の最大時間に達したため録音を自動停止しました。録音データを処理します…",
+        "⏹️ The maximum recording duration was reached, so recording was stopped automatically. Processing the audio…",
+    ),
+    "record_auto_stop_shutdown": (
+        "⏹️ ボットの再起動のため録音を停止しました。録音データを処理します…",
+        "⏹️ The bot is restarting, so recording was stopped. Processing the audio…",
+    ),
+    "record_shutting_down": (
+        "⏳ ボットの再起動中のため、現在は録音を開始できません。しばらくしてから再度お試しください。",
+        "⏳ The bot is restarting and cannot start a recording right now. Please try again shortly.",
+    ),
+    "record_handed_off": (
+        "🔄 ボットの再起動のため議事録の作成を中断しました。録音は保存済みで、再起動後に議事録を作成してこのチャンネルに投稿します。",
+        "🔄 The bot is restarting, so processing was paused. The recording is saved; the minutes will be posted here after the restart.",
+    ),
+    "record_resumed_done": (
+        "✅ 再起動前に録音した会議の議事録を作成しました: {url}",
+        "✅ The minutes of the meeting recorded before the restart are ready: {url}",
+    ),
+    "record_resumed_failed": (
+        "❌ 再起動前に録音した会議の議事録の作成に失敗しました。",
+        "❌ Failed to create the minutes of the meeting recorded before the restart.",
+    ),
+    "admission_queued": (
+        "⏳ このサーバーの前の議事録を作成中です。録音は続けられますが、議事録の作成は順番待ちになります。",
+        "⏳ This server's previous minutes are still being processed. Recording continues, but processing will wait its turn.",
+    ),
+    "admission_reject_memory": (
+        "❌ ボットのメモリに余裕がないため、現在は録音を開始できません。しばらくしてから再度お試しください。",
+        "❌ The bot is low on memory and cannot start a recording right now. Please try again later.",
+    ),
+    "admission_reject_disk": (
+        "❌ ボットのディスク容量が不足しているため、現在は録音を開始できません。しばらくしてから再度お試しください。",
+        "❌ The bot is low on disk space and cannot start a recording right now. Please try again later.",
+    ),
+    "admission_reject_backlog": (
+        "❌ 議事録の処理待ちが多いため、現在は録音を開始できません。しばらくしてから再度お試しください。",
+        "❌ Too many recordings are waiting to be processed. Please try again later.",
+    ),
+    "profile_armed": (
+        "🔬 このサーバーの次の {jobs} 件の議事録作成をプロファイルします。結果は録音ファイルと同じフォルダに保存されます。",
+        "🔬 The next {jobs} minutes job(s) of this server will be profiled. Results are saved next to the recordings.",
+    ),
+    "profile_disarmed": (
+        "🔬 このサーバーのプロファイル予約を取り消しました。",
+        "🔬 Profiling for this server has been cancelled.",
+    ),
+    "profile_unavailable": (
+        "❌ このボットではプロファイル機能が有効になっていません。",
+        "❌ Profiling is not enabled on this bot.",
+    ),
 }
 
 
@@ -0,0 +1,285 @@
+"""Per-job profiling: a sampling profiler plus a wall-clock span recorder.
+
+A :class:`JobProfile` runs for the duration of one meeting-minutes job.
+
+* :class:`SamplingProfiler` — a daemon thread snapshots the Python stack
+  of every thread (``sys._current_frames``) every few milliseconds.  Audio
+  mixing, Google API calls and formatting run on executor threads, which a
+  deterministic profiler attached to the event-loop thread would miss.
+  Samples are written in the *collapsed stack* format understood by
+  ``flamegraph.pl``, inferno and speedscope.  A job's profile keeps only
+  the samples of threads working for that job: executor threads inside one
+  of its spans, and the event-loop thread while one of its tasks runs, so
+  concurrent jobs do not show up in it.
+* :class:`SpanRecorder` — named wall-clock spans (``transcribe``,
+  ``upload``...) written as a Chrome trace (``chrome://tracing``,
+  Perfetto, speedscope), so waiting on an API shows up even though it
+  burns no CPU.
+
+The active profile lives in a :class:`contextvars.ContextVar`, so
+services add spans with :func:`profile_span` without any plumbing;
+``asyncio`` tasks and ``run_blocking`` copy the context along.  Without an
+active profile :func:`profile_span` costs one ``ContextVar.get``.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import contextlib
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Counter, Dict, Iterator, List, Optional
+
+DEFAULT_INTERVAL = 0.005
+
+_current: contextvars.ContextVar[Optional["JobProfile"]] = contextvars.ContextVar(
+    "job_profile", default=None
+)
+
+
+class SamplingProfiler:
+    """Periodically sample thread stacks into collapsed stacks.
+
+    *include* selects the threads (by ident) to keep at each sample; by
+    default every thread of the process is sampled.
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        max_depth: int = 128,
+        include: Optional[Callable[[int], bool]] = None,
+    ) -> None:
+        self.interval = max(0.0005, interval)
+        self.max_depth = max_depth
+        self.include = include
+        self.samples: Counter[str] = collections.Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self.include is not None and not self.include(ident)):
+                    continue
+                self.samples[self._collapse(names.get(ident, str(ident)), frame)] += 1
+            self.sample_count += 1
+
+    def _collapse(self, thread_name: str, frame: Any) -> str:
+        frames: List[str] = []
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        # Root first; ";" separates frames in the collapsed format
+        return ";".join(f.replace(";", ":") for f in reversed(frames))
+
+    def collapsed(self) -> str:
+        """Return ``stack count`` lines, heaviest first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def _short_path(filename: str) -> str:
+    parts = Path(filename).parts
+    for anchor in ("site-packages", "src", "lib"):
+        if anchor in parts:
+            return "/".join(parts[len(parts) - parts[::-1].index(anchor):])
+    return "/".join(parts[-2:])
+
+
+class SpanRecorder:
+    """Record named wall-clock spans and export them as a Chrome trace."""
+
+    def __init__(self) -> None:
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: List[Dict[str, Any]] = []
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            yield
+        except BaseException as exc:
+            error = type(exc).__name__
+            raise
+        finally:
+            ended = time.perf_counter()
+            record = {
+                "name": name,
+                "start": started - self._origin,
+                "duration": ended - started,
+                "thread": threading.current_thread().name,
+                "tid": threading.get_ident(),
+                "args": dict(args, error=error) if error else args,
+            }
+            with self._lock:
+                self.spans.append(record)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = []
+        threads: Dict[int, str] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            threads[span["tid"]] = span["thread"]
+            events.append(
+                {
+                    "name": span["name"],
+                    "ph": "X",
+                    "ts": round(span["start"] * 1e6, 1),
+                    "dur": round(span["duration"] * 1e6, 1),
+                    "pid": pid,
+                    "tid": span["tid"],
+                    "args": span["args"],
+                }
+            )
+        events.extend(
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def summary(self) -> Dict[str, float]:
+        """Total seconds per span name."""
+        totals: Dict[str, float] = collections.defaultdict(float)
+        with self._lock:
+            for span in self.spans:
+                totals[span["name"]] += span["duration"]
+        return {name: round(seconds, 3) for name, seconds in sorted(totals.items(), key=lambda kv: -kv[1])}
+
+
+class JobProfile:
+    """Sampling profile plus spans of one job."""
+
+    def __init__(self, name: str, interval: float = DEFAULT_INTERVAL) -> None:
+        self.name = name
+        self.sampler = SamplingProfiler(interval, include=self._owns)
+        self.recorder = SpanRecorder()
+        self.started_at: Optional[float] = None
+        self.wall_seconds = 0.0
+        # Threads inside a synchronous span of this job (ident -> depth), and
+        # on event-loop threads the tasks of this job
+        self._lock = threading.Lock()
+        self._threads: Counter[int] = collections.Counter()
+        self._loops: Dict[int, asyncio.AbstractEventLoop] = {}
+        self._tasks: "weakref.WeakSet[asyncio.Task]" = weakref.WeakSet()
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self.sampler.start()
+
+    def stop(self) -> None:
+        self.sampler.stop()
+        if self.started_at is not None:
+            self.wall_seconds = time.perf_counter() - self.started_at
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        ident = threading.get_ident()
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:  # no running loop: an executor thread
+            task = None
+        if task is not None:
+            with self._lock:
+                self._loops[ident] = task.get_loop()
+                self._tasks.add(task)
+            with self.recorder.span(name, **args):
+                yield
+            return
+        with self._lock:
+            self._threads[ident] += 1
+        try:
+            with self.recorder.span(name, **args):
+                yield
+        finally:
+            with self._lock:
+                self._threads[ident] -= 1
+
+    def _owns(self, ident: int) -> bool:
+        """Whether thread *ident* is running code of this job right now."""
+        loop = self._loops.get(ident)
+        if loop is not None:
+            return asyncio.current_task(loop) in self._tasks
+        return self._threads.get(ident, 0) > 0
+
+    def save(self, prefix: str | Path) -> List[Path]:
+        """Write ``<prefix>.folded`` and ``<prefix>.trace.json``; return the paths."""
+        prefix = Path(prefix)
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        folded = prefix.with_name(prefix.name + ".folded")
+        trace = prefix.with_name(prefix.name + ".trace.json")
+        folded.write_text(self.sampler.collapsed(), encoding="utf-8")
+        payload = self.recorder.chrome_trace()
+        payload["metadata"] = {
+            "job": self.name,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "samples": self.sampler.sample_count,
+            "interval_seconds": self.sampler.interval,
+            "sample_scope": "job threads and tasks",
+            "spans": self.recorder.summary(),
+        }
+        trace.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        return [folded, trace]
+
+
+def active_profile() -> Optional[JobProfile]:
+    return _current.get()
+
+
+@contextlib.contextmanager
+def profiling(profile: Optional[JobProfile]) -> Iterator[Optional[JobProfile]]:
+    """Make *profile* the active profile of this context (None is a no-op)."""
+    if profile is None:
+        yield None
+        return
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+def profile_span(name: str, **args: Any):
+    """Context manager recording a span on the active profile, if any."""
+    profile = _current.get()
+    if profile is None:
+        return contextlib.nullcontext()
+    return profile.span(name, **args)
+
+
+__all__ = [
+    "DEFAULT_INTERVAL",
+    "JobProfile",
+    "SamplingProfiler",
+    "SpanRecorder",
+    "active_profile",
+    "profile_span",
+    "profiling",
+]
@@ -0,0 +1,301 @@
+"""Process-wide token-bucket rate limiting for OpenAI API calls.
+
+All guilds share one OpenAI organisation, so requests from concurrent
+jobs must share its per-model budgets.  A :class:`RateLimiter` keeps one
+token bucket per budget:
+
+* ``requests`` – requests per minute (RPM);
+* ``tokens`` – tokens per minute (TPM; chat completions);
+* ``audio_seconds`` – seconds of audio per minute (transcriptions).
+
+Callers *reserve* what they are about to spend before sending a request.
+Buckets may go into debt; a reservation then waits until the debt has been
+refilled.  Because every reservation is taken immediately, waiters are
+served in arrival order and a large request cannot be starved by a stream
+of small ones.
+
+The limiter also listens to the API's own view of the budget.  The
+``x-ratelimit-{limit,remaining,reset}-{requests,tokens}`` headers of every
+response adjust the buckets, and a 429's ``retry-after`` /
+``x-ratelimit-reset-*`` pauses all callers until the window resets.
+:meth:`RateLimiter.httpx_event_hooks` returns hooks for the OpenAI
+client's HTTP transport so this happens for every call without touching
+the call sites.
+
+:meth:`RateLimiter.call` combines both: it waits for budget, runs the
+request and, on a rate-limit error, waits for the advertised reset and
+retries instead of failing.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+REQUESTS = "requests"
+TOKENS = "tokens"
+AUDIO_SECONDS = "audio_seconds"
+
+# "1s", "6m0s", "20ms", "1h2m3.5s" → seconds
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parse an ``x-ratelimit-reset-*`` / ``retry-after`` value into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(num) * _UNIT_SECONDS[unit] for num, unit in parts)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate that errs on the high side for Japanese text."""
+    return max(1, len(text.encode("utf-8")) // 3)
+
+
+class TokenBucket:
+    """A lazily refilled token bucket that allows reservations into debt."""
+
+    def __init__(self, per_minute: float) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be > 0")
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._updated = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        """Refill rate in units per second."""
+        return self.capacity / 60.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._updated)
+        self.level = min(self.capacity, self.level + elapsed * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take *amount* and return how long the caller must wait."""
+        self._refill(now)
+        self.level -= amount
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def refund(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def observe(self, limit: Optional[float], remaining: Optional[float], now: float) -> None:
+        """Align the bucket with the server-reported limit / remaining budget."""
+        self._refill(now)
+        if limit and limit > 0:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.level = min(self.level, float(remaining))
+
+
+class RateLimiter:
+    """RPM / TPM / audio-seconds budgets for one OpenAI model."""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float,
+        tokens_per_minute: Optional[float] = None,
+        audio_seconds_per_minute: Optional[float] = None,
+        max_retries: int = 5,
+    ) -> None:
+        self.name = name
+        self.max_retries = max_retries
+        self._buckets: Dict[str, TokenBucket] = {REQUESTS: TokenBucket(requests_per_minute)}
+        if tokens_per_minute:
+            self._buckets[TOKENS] = TokenBucket(tokens_per_minute)
+        if audio_seconds_per_minute:
+            self._buckets[AUDIO_SECONDS] = TokenBucket(audio_seconds_per_minute)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+        self._acquired = 0
+        self._waited = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._rate_limited = 0
+
+    # ------------------------------------------------------------------
+    # Reservations
+    # ------------------------------------------------------------------
+    def reserve(self, requests: float = 1, tokens: float = 0, audio_seconds: float = 0) -> float:
+        """Reserve budget now and return the delay before it may be spent."""
+        amounts = {REQUESTS: requests, TOKENS: tokens, AUDIO_SECONDS: audio_seconds}
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._paused_until - now)
+            for key, bucket in self._buckets.items():
+                if amounts[key]:
+                    delay = max(delay, bucket.reserve(amounts[key], now))
+            self._acquired += 1
+            if delay > 0:
+                self._waited += 1
+                self._wait_seconds += delay
+                self._max_wait_seconds = max(self._max_wait_seconds, delay)
+        if delay > 0:
+            logger.debug("%s rate limit: waiting %.2fs", self.name, delay)
+        return delay
+
+    async def acquire(self, requests: float = 1, tokens: float = 0, audio_seconds: float = 0) -> None:
+        delay = self.reserve(requests, tokens, audio_seconds)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self, requests: float = 1, tokens: float = 0, audio_seconds: float = 0) -> None:
+        """Blocking variant for synchronous clients running in worker threads."""
+        delay = self.reserve(requests, tokens, audio_seconds)
+        if delay > 0:
+            time.sleep(delay)
+
+    def refund(self, requests: float = 1, tokens: float = 0, audio_seconds: float = 0) -> None:
+        """Return a reservation whose request was rejected by the API."""
+        amounts = {REQUESTS: requests, TOKENS: tokens, AUDIO_SECONDS: audio_seconds}
+        with self._lock:
+            now = time.monotonic()
+            for key, bucket in self._buckets.items():
+                if amounts[key]:
+                    bucket.refund(amounts[key], now)
+
+    def settle_tokens(self, reserved: float, actual: Optional[float]) -> None:
+        """Return over-reserved tokens once the real usage is known."""
+        if actual is None or actual >= reserved:
+            return
+        self.refund(requests=0, tokens=reserved - actual)
+
+    # ------------------------------------------------------------------
+    # Server feedback
+    # ------------------------------------------------------------------
+    def observe_headers(self, headers: Mapping[str, str], status_code: int = 200) -> None:
+        """Update the buckets from ``x-ratelimit-*`` response headers."""
+        with self._lock:
+            now = time.monotonic()
+            for key in (REQUESTS, TOKENS):
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    continue
+                bucket.observe(
+                    _number(headers.get(f"x-ratelimit-limit-{key}")),
+                    _number(headers.get(f"x-ratelimit-remaining-{key}")),
+                    now,
+                )
+            if status_code == 429:
+                self._rate_limited += 1
+                resets = [
+                    parse_reset(headers.get("retry-after")),
+                    parse_reset(headers.get("x-ratelimit-reset-requests")),
+                    parse_reset(headers.get("x-ratelimit-reset-tokens")),
+                ]
+                pause = max((r for r in resets if r is not None), default=1.0)
+                self._paused_until = max(self._paused_until, now + pause)
+                logger.warning("%s rate limited by API; pausing %.2fs", self.name, pause)
+
+    def httpx_event_hooks(self, asynchronous: bool = True) -> Dict[str, list]:
+        """Return ``event_hooks`` for an httpx client used by the OpenAI SDK."""
+        if asynchronous:
+            async def _on_response(response: Any) -> None:
+                self.observe_headers(response.headers, response.status_code)
+        else:
+            def _on_response(response: Any) -> None:  # type: ignore[misc]
+                self.observe_headers(response.headers, response.status_code)
+        return {"response": [_on_response]}
+
+    # ------------------------------------------------------------------
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        *,
+        tokens: float = 0,
+        audio_seconds: float = 0,
+        retry_on: Tuple[Type[BaseException], ...] = (),
+    ) -> Any:
+        """Run ``await fn()`` within budget, re-queueing on rate-limit errors."""
+        attempt = 0
+        while True:
+            await self.acquire(1, tokens, audio_seconds)
+            try:
+                return await fn()
+            except retry_on:
+                # The rejected attempt must not also be charged to the budget
+                self.refund(1, tokens, audio_seconds)
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                logger.info("%s: rate limited, re-queueing (attempt %d)", self.name, attempt)
+
+    def call_blocking(
+        self,
+        fn: Callable[[], Any],
+        *,
+        tokens: float = 0,
+        audio_seconds: float = 0,
+        retry_on: Tuple[Type[BaseException], ...] = (),
+    ) -> Any:
+        """Synchronous variant of :meth:`call`."""
+        attempt = 0
+        while True:
+            self.acquire_blocking(1, tokens, audio_seconds)
+            try:
+                return fn()
+            except retry_on:
+                self.refund(1, tokens, audio_seconds)
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                logger.info("%s: rate limited, re-queueing (attempt %d)", self.name, attempt)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            buckets = {}
+            for key, bucket in self._buckets.items():
+                bucket._refill(now)
+                buckets[key] = {
+                    "per_minute": bucket.capacity,
+                    "available": round(bucket.level, 3),
+                }
+            return {
+                "buckets": buckets,
+                "acquired": self._acquired,
+                "waited": self._waited,
+                "wait_seconds_total": round(self._wait_seconds, 3),
+                "max_wait_seconds": round(self._max_wait_seconds, 3),
+                "rate_limited": self._rate_limited,
+                "paused_for_seconds": round(max(0.0, self._paused_until - now), 3),
+            }
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+__all__ = [
+    "AUDIO_SECONDS",
+    "REQUESTS",
+    "TOKENS",
+    "RateLimiter",
+    "TokenBucket",
+    "estimate_tokens",
+    "parse_reset",
+]
@@ -0,0 +1,117 @@
+"""Gateway sharding for large guild counts.
+
+``SHARD_COUNT`` / ``SHARD_IDS`` switch the bot to py-cord's
+``AutoShardedBot`` and let several ``--role bot`` processes split the
+shards between them, e.g. ``SHARD_COUNT=8`` with ``SHARD_IDS=0-3`` in one
+process and ``SHARD_IDS=4-7`` in another.  A guild always lives on shard
+``(guild_id >> 22) % shard_count``, so each process only ever sees (and
+records) the guilds of its own shards; recording state needs no
+coordination between processes.
+
+Meetings of every shard go through the same SQLite job queue and worker
+pool.  Exactly one bot process, the *primary* (the one running shard 0),
+hosts the IPC hub and syncs the slash commands; the other bot processes
+connect to its hub like workers do.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+AUTO = "auto"
+
+
+def parse_shard_ids(text: str) -> Optional[Tuple[int, ...]]:
+    """Parse ``"0,1,4-7"`` into sorted shard ids (``None`` when empty)."""
+    ids = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, sep, last = part.partition("-")
+        try:
+            start = int(first)
+            end = int(last) if sep else start
+        except ValueError:
+            raise ValueError(f"invalid shard ids: {text!r}") from None
+        if start < 0 or end < start:
+            raise ValueError(f"invalid shard range: {part!r}")
+        ids.update(range(start, end + 1))
+    return tuple(sorted(ids)) or None
+
+
+@dataclass(frozen=True)
+class ShardConfig:
+    """Which shards this process runs.
+
+    ``count`` is the total number of shards (``None`` lets Discord recommend
+    one); ``ids`` the shards of this process (``None`` = all of them).
+    """
+
+    enabled: bool = False
+    count: Optional[int] = None
+    ids: Optional[Tuple[int, ...]] = None
+
+    @classmethod
+    def from_settings(cls, count: str = "", ids: str = "") -> "ShardConfig":
+        """Build from ``SHARD_COUNT`` (int, ``auto`` or empty) and ``SHARD_IDS``."""
+        count = (count or "").strip().lower()
+        shard_ids = parse_shard_ids(ids or "")
+        if not count and shard_ids is None:
+            return cls()
+        if count in ("", AUTO):
+            if shard_ids is not None:
+                raise ValueError("SHARD_IDS requires an explicit SHARD_COUNT")
+            return cls(enabled=True)
+        try:
+            total = int(count)
+        except ValueError:
+            raise ValueError(f"invalid shard count: {count!r}") from None
+        if total < 1:
+            raise ValueError("shard count must be >= 1")
+        if shard_ids is not None and shard_ids[-1] >= total:
+            raise ValueError(f"shard id {shard_ids[-1]} is out of range for {total} shard(s)")
+        return cls(enabled=True, count=total, ids=shard_ids)
+
+    @property
+    def primary(self) -> bool:
+        """True for the process that hosts the IPC hub and syncs commands."""
+        return self.ids is None or 0 in self.ids
+
+    def bot_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for ``commands.AutoShardedBot``."""
+        if not self.enabled:
+            return {}
+        return {
+            "shard_count": self.count,
+            "shard_ids": list(self.ids) if self.ids is not None else None,
+        }
+
+    def describe(self) -> str:
+        if not self.enabled:
+            return "unsharded"
+        total = self.count if self.count is not None else AUTO
+        shards = ",".join(map(str, self.ids)) if self.ids is not None else "all"
+        return f"shards {shards} of {total}"
+
+
+def shard_metrics(bot: Any, recordings: Optional[Dict[Optional[int], int]] = None) -> Dict[str, Any]:
+    """Per-shard gateway latency and active recordings of a running bot."""
+    recordings = recordings or {}
+    shards: Dict[str, Any] = {}
+    for shard_id, latency in getattr(bot, "latencies", None) or []:
+        info = bot.get_shard(shard_id)
+        shards[str(shard_id)] = {
+            # inf until the shard's first heartbeat is acknowledged
+            "latency_ms": round(latency * 1000, 1) if math.isfinite(latency) else None,
+            "closed": info.is_closed() if info is not None else None,
+            "recordings": recordings.get(shard_id, 0),
+        }
+    return {
+        "shard_count": getattr(bot, "shard_count", None),
+        "shard_ids": sorted(int(shard_id) for shard_id in shards),
+        "shards": shards,
+    }
+
+
+__all__ = ["AUTO", "ShardConfig", "parse_shard_ids", "shard_metrics"]
@@ -0,0 +1,176 @@
+"""Startup timing: where the seconds before the bot is ready go.
+
+:class:`StartupTimer` records named phases (``imports``, ``services``,
+``cogs``, ``gateway_ready``...) as seconds since the *process* started, so
+the interpreter's own start-up is included.  The result is logged once
+the gateway is ready and served under ``startup`` in ``/metrics``.
+
+:class:`ImportProfiler` (``STARTUP_PROFILE_IMPORTS``) times every module
+imported after it is started, like ``python -X importtime`` but collected
+in-process so the slowest imports can be logged and served as well.  It
+wraps each module's loader and is meant for diagnosing startup, not for
+normal operation.
+"""
+from __future__ import annotations
+
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+def process_uptime() -> Optional[float]:
+    """Seconds since this process was started (None where unsupported)."""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            # The command name may contain spaces; fields resume after ")"
+            fields = f.read().rsplit(b")", 1)[1].split()
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupTimer:
+    """Named startup phases as seconds since process start."""
+
+    def __init__(self) -> None:
+        # Anchor the monotonic clock at the process start (falls back to now)
+        self._origin = time.monotonic() - (process_uptime() or 0.0)
+        self._phases: Dict[str, float] = {}
+
+    def mark(self, phase: str) -> float:
+        """Record that *phase* finished now; returns the elapsed seconds.
+
+        Only the first mark of a phase counts (e.g. the first gateway ready,
+        not the ones after reconnecting).
+        """
+        return self._phases.setdefault(phase, time.monotonic() - self._origin)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self._origin
+
+    def metrics(self) -> Dict[str, Any]:
+        return {phase: round(seconds, 3) for phase, seconds in self._phases.items()}
+
+    def summary(self) -> str:
+        return ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self._phases.items())
+
+
+class _TimedLoader:
+    """Delegates to the real loader and times ``exec_module``."""
+
+    def __init__(self, loader: Any, name: str, profiler: "ImportProfiler") -> None:
+        self._loader = loader
+        self._name = name
+        self._profiler = profiler
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._profiler._enter()
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(self._name, time.perf_counter() - started)
+            # Later code (e.g. importlib.resources) expects the real loader
+            module.__loader__ = self._loader
+            if module.__spec__ is not None:
+                module.__spec__.loader = self._loader
+
+
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """Per-module import times (inclusive and self) collected in-process."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # name -> (inclusive seconds, self seconds)
+        self._times: Dict[str, tuple[float, float]] = {}
+        self._finding = threading.local()
+
+    @property
+    def active(self) -> bool:
+        return self in sys.meta_path
+
+    def start(self) -> None:
+        if not self.active:
+            sys.meta_path.insert(0, self)
+
+    def stop(self) -> None:
+        if self.active:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._finding, "busy", False):
+            return None
+        self._finding.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.busy = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, fullname, self)
+        return spec
+
+    # Nested imports: a module's self time excludes the imports it triggers
+    def _enter(self) -> None:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+
+    def _exit(self, name: str, inclusive: float) -> None:
+        stack = self._local.stack
+        children = stack.pop()
+        if stack:
+            stack[-1] += inclusive
+        with self._lock:
+            self._times[name] = (inclusive, inclusive - children)
+
+    def slowest(self, limit: int = 15) -> List[Dict[str, Any]]:
+        """The *limit* imports with the largest self time."""
+        with self._lock:
+            items = sorted(self._times.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            {"module": name, "self_ms": round(own * 1000, 1), "inclusive_ms": round(total * 1000, 1)}
+            for name, (total, own) in items[:limit]
+        ]
+
+    def packages(self, limit: int = 15) -> Dict[str, float]:
+        """Self time summed per top-level package (ms), largest first."""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for name, (_, own) in self._times.items():
+                package = name.partition(".")[0]
+                totals[package] = totals.get(package, 0.0) + own
+        ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return {package: round(seconds * 1000, 1) for package, seconds in ranked}
+
+    def metrics(self, limit: int = 15) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(own for _, own in self._times.values())
+            modules = len(self._times)
+        return {
+            "modules": modules,
+            "total_ms": round(total * 1000, 1),
+            "packages": self.packages(limit),
+            "slowest": self.slowest(limit),
+        }
+
+
+__all__ = ["ImportProfiler", "StartupTimer", "process_uptime"]
@@ -0,0 +1,268 @@
+"""Non-blocking, structured application logging.
+
+:func:`configure_logging` replaces the root handlers with a
+:class:`logging.handlers.QueueHandler`; a :class:`QueueListener` thread
+formats and writes the records, so a slow stderr or log collector never
+stalls the event loop.
+
+Records are enriched and filtered by the handler in the thread that
+logs them, before they are queued:
+
+* :class:`ContextFilter` adds ``guild_id`` / ``job_id`` set with
+  :func:`log_context` and the current trace span (``stage``, ``trace_id``).
+  These are ContextVars, so the fields follow a job across tasks and
+  executor threads.
+* :class:`RedactionFilter` masks credentials (OpenAI keys, Google OAuth
+  tokens, Discord bot tokens, bearer tokens, OAuth codes).  Meeting content
+  must not be logged at all; log :func:`content_digest` instead.
+* :class:`SamplingFilter` lets a burst of each message template through
+  per interval and counts the rest.  The next record that passes carries
+  ``suppressed=<n>``.
+
+:class:`JsonFormatter` writes one JSON object per line.  Extra fields
+passed via ``extra=`` (e.g. ``duration_ms``) become top-level keys.
+"""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import datetime as _dt
+import hashlib
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from utils.tracing import current_span
+
+_fields: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("log_fields", default={})
+
+# Attributes every LogRecord has; anything else came from ``extra=``
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys() | {"message", "asctime", "taskName"}
+)
+
+_SECRETS = [
+    (re.compile(r"sk-[A-Za-z0-9_-]{16,}"), "sk-***"),
+    (re.compile(r"ya29\.[\w.-]+"), "ya29.***"),
+    (re.compile(r"1//[\w.-]{10,}"), "1//***"),
+    (re.compile(r"\b[MN][A-Za-z\d_-]{23,25}\.[\w-]{6}\.[\w-]{27,}\b"), "<discord-token>"),
+    (re.compile(r"(?i)(bearer\s+)[\w.~+/-]+=*"), r"\1***"),
+    (
+        re.compile(r"(?i)([\"']?(?:client_secret|refresh_token|access_token|api_key|token)[\"']?\s*[:=]\s*[\"']?)[^\s\"'&,}]+"),
+        r"\1***",
+    ),
+    # OAuth authorization codes in callback URLs
+    (re.compile(r"([?&]code=)[^&\s]+"), r"\1***"),
+]
+
+
+# ----------------------------------------------------------------------
+# Context
+# ----------------------------------------------------------------------
+@contextlib.contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Add *fields* to every record logged in this context."""
+    token = _fields.set({**_fields.get(), **fields})
+    try:
+        yield
+    finally:
+        _fields.reset(token)
+
+
+def content_digest(text: Optional[str]) -> str:
+    """Loggable stand-in for meeting content: length and short hash."""
+    if text is None:
+        return "<none>"
+    digest = hashlib.sha256(text.encode("utf-8", "replace")).hexdigest()[:12]
+    return f"<{len(text)} chars sha256:{digest}>"
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in _SECRETS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+# ----------------------------------------------------------------------
+# Filters
+# ----------------------------------------------------------------------
+class ContextFilter(logging.Filter):
+    """Attach log_context fields and the current trace span to records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _fields.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        span = current_span()
+        if span is not None:
+            if not hasattr(record, "stage"):
+                record.stage = span.name
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return True
+
+
+class RedactionFilter(logging.Filter):
+    """Mask credentials in the rendered message and exception text."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        redacted = redact(message)
+        if redacted != message:
+            record.msg, record.args = redacted, None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        if record.exc_text:
+            record.exc_text = redact(record.exc_text)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Allow *burst* records per message template and *interval* seconds.
+
+    Only records below *max_level* are sampled; warnings and errors always
+    pass.
+    """
+
+    def __init__(self, burst: int = 20, interval: float = 60.0, max_level: int = logging.WARNING) -> None:
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_level = max_level
+        self._lock = threading.Lock()
+        # (logger, template) -> [window start, passed, suppressed]
+        self._windows: Dict[Tuple[str, str], list] = {}
+        self.suppressed_total = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0 or record.levelno >= self.max_level:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                if len(self._windows) > 10_000:
+                    self._prune(now)
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            self.suppressed_total += 1
+            return False
+
+    def _prune(self, now: float) -> None:
+        for key in [k for k, w in self._windows.items() if now - w[0] >= self.interval and not w[2]]:
+            del self._windows[key]
+
+
+# ----------------------------------------------------------------------
+# Formatting
+# ----------------------------------------------------------------------
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, extras as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": _dt.datetime.fromtimestamp(record.created, _dt.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The classic one-line format, followed by the structured fields."""
+
+    def __init__(self) -> None:
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = " ".join(
+            f"{key}={value}"
+            for key, value in vars(record).items()
+            if key not in _RECORD_ATTRS and not key.startswith("_")
+        )
+        if not extras:
+            return line
+        head, sep, tail = line.partition("\n")
+        return f"{head} [{extras}]{sep}{tail}"
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Keeps exception text apart from the message for the formatters."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(
+    level: int | str = logging.INFO,
+    fmt: str = "json",
+    sample_burst: int = 20,
+    sample_interval: float = 60.0,
+    stream: Any = None,
+) -> logging.handlers.QueueListener:
+    """Route the root logger through a queue; return the started listener.
+
+    Call ``listener.stop()`` at shutdown to flush the remaining records.
+    """
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    # Sample before redacting: dropped records are never rendered
+    handler.addFilter(SamplingFilter(sample_burst, sample_interval))
+    handler.addFilter(RedactionFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+__all__ = [
+    "ContextFilter",
+    "JsonFormatter",
+    "RedactionFilter",
+    "SamplingFilter",
+    "TextFormatter",
+    "configure_logging",
+    "content_digest",
+    "log_context",
+    "redact",
+]
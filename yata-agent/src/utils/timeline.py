@@ -0,0 +1,158 @@
+"""Sparse wall-clock timeline for per-user recording buffers.
+
+Discord only sends audio while somebody is speaking, so each user's PCM
+buffer is a concatenation of utterances with the gaps removed.  Padding the
+buffers with zeros to keep them aligned would cost 192 kB per second of
+silence per user (48 kHz, stereo, 16-bit).  Instead the recording sink keeps
+the buffers compact and records where every *run* of contiguous audio
+belongs in time:
+
+    (start_ts, buffer_offset, length)
+
+``start_ts`` is seconds since the recording origin, ``buffer_offset`` and
+``length`` are byte positions in the user's PCM payload (excluding the WAV
+header).  Runs are stored per user in three parallel :mod:`array` columns,
+so a one-hour meeting with a few thousand utterances costs tens of
+kilobytes.  Consumers:
+
+* the timeline mixer in :mod:`services.audio_service` places each run at
+  its wall-clock position without materialising per-user silence;
+* :meth:`SparseTimeline.to_timeline_seconds` maps a timestamp inside a
+  compacted per-speaker track (e.g. a Whisper segment start) back to the
+  meeting clock for the interleaved transcript.
+"""
+from __future__ import annotations
+
+import threading
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Tuple
+
+# Size of the canonical WAV header that precedes each user's PCM payload in
+# the recording buffers; run offsets are relative to the end of it.
+WAV_HEADER_BYTES = 44
+
+# Runs closer than this (seconds) to the previous run's end are treated as
+# contiguous and merged, absorbing packet arrival jitter.
+_MERGE_TOLERANCE = 0.01
+
+
+class _Runs:
+    __slots__ = ("starts", "offsets", "lengths")
+
+    def __init__(self) -> None:
+        self.starts = array("d")
+        self.offsets = array("Q")
+        self.lengths = array("Q")
+
+
+class SparseTimeline:
+    """Per-user ``(start_ts, buffer_offset, length)`` runs in compact arrays."""
+
+    def __init__(
+        self,
+        sample_rate: int = 48000,
+        channels: int = 2,
+        sample_width: int = 2,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self._runs: Dict[int, _Runs] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    @property
+    def frame_bytes(self) -> int:
+        return self.channels * self.sample_width
+
+    @property
+    def byte_rate(self) -> int:
+        return self.sample_rate * self.frame_bytes
+
+    def users(self) -> List[int]:
+        with self._lock:
+            return list(self._runs)
+
+    def append(self, user_id: int, start_ts: float, offset: int, length: int) -> None:
+        """Record that ``length`` bytes at ``offset`` were heard at ``start_ts``.
+
+        Extends the user's last run instead of adding a new one when the
+        audio continues both in time and in the buffer.
+        """
+        if length <= 0:
+            return
+        with self._lock:
+            runs = self._runs.get(user_id)
+            if runs is None:
+                runs = self._runs[user_id] = _Runs()
+            if runs.starts:
+                last_start = runs.starts[-1]
+                last_offset = runs.offsets[-1]
+                last_length = runs.lengths[-1]
+                last_end = last_start + last_length / self.byte_rate
+                if (
+                    offset == last_offset + last_length
+                    and abs(start_ts - last_end) <= _MERGE_TOLERANCE
+                ):
+                    runs.lengths[-1] = last_length + length
+                    return
+            runs.starts.append(start_ts)
+            runs.offsets.append(offset)
+            runs.lengths.append(length)
+
+    def runs(self, user_id: int) -> Iterator[Tuple[float, int, int]]:
+        """Yield ``(start_ts, buffer_offset, length)`` runs of *user_id*."""
+        with self._lock:
+            runs = self._runs.get(user_id)
+            if runs is None:
+                return iter(())
+            snapshot = list(zip(runs.starts, runs.offsets, runs.lengths))
+        return iter(snapshot)
+
+    def run_count(self, user_id: int | None = None) -> int:
+        with self._lock:
+            if user_id is not None:
+                runs = self._runs.get(user_id)
+                return len(runs.starts) if runs else 0
+            return sum(len(r.starts) for r in self._runs.values())
+
+    def end_ts(self) -> float:
+        """Return the wall-clock end of the latest run (0.0 when empty)."""
+        with self._lock:
+            end = 0.0
+            for runs in self._runs.values():
+                for start, length in zip(runs.starts, runs.lengths):
+                    end = max(end, start + length / self.byte_rate)
+            return end
+
+    def to_timeline_seconds(self, user_id: int, track_seconds: float) -> float:
+        """Map a position in the user's compacted track to meeting time.
+
+        ``track_seconds`` is measured from the start of the user's PCM
+        payload (silence removed); the result is seconds since the
+        recording origin.  Positions past the last run are extrapolated
+        from it.  Users without runs map to themselves.
+        """
+        with self._lock:
+            runs = self._runs.get(user_id)
+            if runs is None or not runs.offsets:
+                return track_seconds
+            pos = max(0.0, track_seconds) * self.byte_rate
+            idx = max(0, bisect_right(runs.offsets, int(pos)) - 1)
+            return runs.starts[idx] + (pos - runs.offsets[idx]) / self.byte_rate
+
+    # ------------------------------------------------------------------
+    # Pickling (for the audio process pool) – the lock is not picklable
+    # ------------------------------------------------------------------
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+__all__ = ["SparseTimeline", "WAV_HEADER_BYTES"]
@@ -0,0 +1,115 @@
+"""A py-cord ``WaveSink`` that keeps per-user buffers compact.
+
+py-cord (2.6) aligns users by prefixing each decoded frame with zero samples
+for the time since that user's previous packet.  Those zeros are pure
+padding: this sink strips them before writing and instead records the
+frame's position in a :class:`~utils.timeline.SparseTimeline`.
+
+Each user's buffer starts with a 44-byte placeholder that
+:meth:`TimelineWaveSink.format_audio` fills with a correct WAV header once
+recording has finished, so the buffers stay valid WAV files for the
+existing ffmpeg pipeline while timeline offsets refer to the PCM payload.
+"""
+from __future__ import annotations
+
+import io
+import struct
+import time
+
+from discord.opus import _OpusStruct
+from discord.sinks import AudioData, WaveSink
+from discord.sinks.core import Filters
+
+from utils.timeline import WAV_HEADER_BYTES, SparseTimeline
+
+# Decoded 20 ms Opus frame: 960 samples * 2 channels * 2 bytes
+_FRAME_BYTES = _OpusStruct.FRAME_SIZE
+# If the padding-derived position drifts this far from the arrival clock,
+# trust the arrival clock (py-cord's silence estimate is heuristic).
+_RESYNC_SECONDS = 1.0
+
+
+def wav_header(payload_bytes: int, sample_rate: int, channels: int, sample_width: int) -> bytes:
+    """Return a canonical 44-byte PCM WAV header."""
+    byte_rate = sample_rate * channels * sample_width
+    return (
+        b"RIFF"
+        + struct.pack("<I", 36 + payload_bytes)
+        + b"WAVEfmt "
+        + struct.pack(
+            "<IHHIIHH",
+            16,
+            1,
+            channels,
+            sample_rate,
+            byte_rate,
+            channels * sample_width,
+            sample_width * 8,
+        )
+        + b"data"
+        + struct.pack("<I", payload_bytes)
+    )
+
+
+class TimelineWaveSink(WaveSink):
+    """WaveSink that records a sparse timeline instead of zero padding."""
+
+    def __init__(self, *, filters=None):
+        super().__init__(filters=filters)
+        self.timeline = SparseTimeline(
+            sample_rate=_OpusStruct.SAMPLING_RATE,
+            channels=_OpusStruct.CHANNELS,
+            sample_width=_OpusStruct.SAMPLE_SIZE // _OpusStruct.CHANNELS,
+        )
+        self.origin = time.perf_counter()
+        # Monotonic time of the last received audio frame (None = none yet)
+        self.last_activity: float | None = None
+        self._cursor: dict[int, float] = {}
+
+    @Filters.container
+    def write(self, data, user):
+        now = time.perf_counter() - self.origin
+        frame = memoryview(data)
+        padding = 0
+        if frame.nbytes > _FRAME_BYTES:
+            padding = frame.nbytes - _FRAME_BYTES
+            frame = frame[padding:]
+
+        byte_rate = self.timeline.byte_rate
+        arrival_start = max(0.0, now - frame.nbytes / byte_rate)
+        if user not in self.audio_data:
+            file = io.BytesIO()
+            file.write(b"\x00" * WAV_HEADER_BYTES)
+            self.audio_data[user] = AudioData(file)
+            start = arrival_start
+        else:
+            start = self._cursor[user] + padding / byte_rate
+            if abs(start - arrival_start) > _RESYNC_SECONDS:
+                start = arrival_start
+
+        audio = self.audio_data[user]
+        offset = audio.file.tell() - WAV_HEADER_BYTES
+        audio.write(frame)
+        self.timeline.append(user, start, offset, frame.nbytes)
+        self._cursor[user] = start + frame.nbytes / byte_rate
+        self.last_activity = time.monotonic()
+
+    def format_audio(self, audio):
+        """Fill the reserved header with the final WAV parameters."""
+        data = audio.file
+        data.seek(0, io.SEEK_END)
+        payload = max(0, data.tell() - WAV_HEADER_BYTES)
+        data.seek(0)
+        data.write(
+            wav_header(
+                payload,
+                self.timeline.sample_rate,
+                self.timeline.channels,
+                self.timeline.sample_width,
+            )
+        )
+        data.seek(0)
+        audio.on_format(self.encoding)
+
+
+__all__ = ["TimelineWaveSink", "WAV_HEADER_BYTES", "wav_header"]
@@ -0,0 +1,385 @@
+"""End-to-end tracing of a meeting, from ``/record_start`` to the document.
+
+One meeting crosses the recording cog, the audio service, transcription,
+formatting and the Google Docs upload, partly on executor threads.  A
+:class:`Tracer` gives each meeting a trace (W3C-style 128-bit trace id)
+whose root span is opened by ``/record_start`` and closed once the
+document link is posted.  Services open child spans with :func:`span`.
+
+The current span lives in a :class:`contextvars.ContextVar`; asyncio
+tasks, ``asyncio.to_thread``, ``run_blocking`` and the fair scheduler
+copy the context, so spans opened on a worker thread still get the right
+parent.  Without an active trace :func:`span` is a no-op apart from the
+per-job profile (see :mod:`utils.profiling`), which it also feeds, so
+instrumented code needs a single context manager.
+
+Finished spans are handed to a background thread that writes them to the
+configured exporters:
+
+* :class:`FileExporter` — one JSON object per line.
+* :class:`OTLPHttpExporter` — OTLP/HTTP JSON (``POST /v1/traces``),
+  accepted by the OpenTelemetry Collector, Jaeger and Tempo.
+
+When a root span ends, the tracer logs a one-line breakdown of the trace
+and keeps it for ``/metrics``.
+"""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence
+
+from utils.profiling import profile_span
+
+logger = logging.getLogger(__name__)
+
+_RECENT_TRACES = 20
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "trace_span", default=None
+)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    tracer: "Tracer" = field(repr=False)
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    error: Optional[str] = None
+    thread: str = field(default_factory=lambda: threading.current_thread().name)
+
+    @property
+    def duration(self) -> float:
+        """Seconds; up to now while the span is still open."""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        """Finish the span (idempotent) and hand it to the exporters."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.tracer._finish(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+            "thread": self.thread,
+            "service": self.tracer.service_name,
+        }
+
+
+# ----------------------------------------------------------------------
+# Exporters
+# ----------------------------------------------------------------------
+class FileExporter:
+    """Append spans as JSON lines to *path*."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: Sequence[Dict[str, Any]]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span, ensure_ascii=False, default=str) + "\n")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+class OTLPHttpExporter:
+    """Send spans to an OTLP/HTTP collector as JSON."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 5.0,
+    ) -> None:
+        endpoint = endpoint.rstrip("/")
+        self.url = endpoint if endpoint.endswith("/v1/traces") else endpoint + "/v1/traces"
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+
+    def payload(self, spans: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        by_service: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for span in spans:
+            by_service[span["service"]].append(
+                {
+                    "traceId": span["trace_id"],
+                    "spanId": span["span_id"],
+                    "parentSpanId": span["parent_id"] or "",
+                    "name": span["name"],
+                    "kind": 1,  # SPAN_KIND_INTERNAL
+                    "startTimeUnixNano": str(span["start_ns"]),
+                    "endTimeUnixNano": str(span["end_ns"]),
+                    "attributes": _otlp_attributes(dict(span["attributes"], thread=span["thread"])),
+                    "status": (
+                        {"code": 2, "message": span["error"]} if span["error"] else {"code": 1}
+                    ),
+                }
+            )
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _otlp_attributes({"service.name": service})},
+                    "scopeSpans": [{"scope": {"name": "yata-agent"}, "spans": otlp_spans}],
+                }
+                for service, otlp_spans in by_service.items()
+            ]
+        }
+
+    def export(self, spans: Sequence[Dict[str, Any]]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(self.payload(spans)).encode(),
+            headers=self.headers,
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+# ----------------------------------------------------------------------
+# Tracer
+# ----------------------------------------------------------------------
+class Tracer:
+    """Create traces and export their spans from a background thread."""
+
+    def __init__(
+        self,
+        exporters: Sequence[Any] = (),
+        service_name: str = "yata-agent",
+        flush_interval: float = 1.0,
+        max_batch: int = 512,
+    ) -> None:
+        self.exporters = list(exporters)
+        self.service_name = service_name
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # trace_id -> finished spans, until the root span ends
+        self._open: Dict[str, List[Span]] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=_RECENT_TRACES)
+        self._exported = 0
+        self._export_errors = 0
+
+    # -- span creation -------------------------------------------------
+    def start_trace(self, name: str, **attributes: Any) -> Span:
+        """Start a new trace; the caller must :meth:`Span.end` the root."""
+        root = Span(name, secrets.token_hex(16), secrets.token_hex(8), None, self, attributes)
+        with self._lock:
+            self._open[root.trace_id] = []
+        return root
+
+    def start_span(self, name: str, parent: Span, **attributes: Any) -> Span:
+        return Span(name, parent.trace_id, secrets.token_hex(8), parent.span_id, self, attributes)
+
+    # -- export --------------------------------------------------------
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            if span.parent_id is None:
+                spans = self._open.pop(span.trace_id, [])
+                spans.append(span)
+                self._recent.append(breakdown(spans))
+                logger.info("Trace %s %s", span.trace_id, format_breakdown(spans))
+            elif span.trace_id in self._open:
+                # Spans ending after the root (background work) are only exported
+                self._open[span.trace_id].append(span)
+        if self.exporters:
+            self._ensure_thread()
+            self._queue.put(span.to_dict())
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Dict[str, Any]] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                while True:
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.max_batch:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            if batch:
+                self._export(batch)
+
+    def _export(self, batch: List[Dict[str, Any]]) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(batch)
+            except Exception as exc:
+                self._export_errors += 1
+                logger.warning("Exporting %d span(s) via %s failed: %s", len(batch), type(exporter).__name__, exc)
+        self._exported += len(batch)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Flush queued spans and stop the export thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            open_traces = len(self._open)
+            recent = list(self._recent)
+        return {
+            "exporters": [type(e).__name__ for e in self.exporters],
+            "open_traces": open_traces,
+            "exported_spans": self._exported,
+            "export_errors": self._export_errors,
+            "recent": recent,
+        }
+
+
+# ----------------------------------------------------------------------
+# Breakdown
+# ----------------------------------------------------------------------
+def breakdown(spans: Sequence[Span]) -> Dict[str, Any]:
+    """Summarise a trace: total seconds and seconds per span name."""
+    root = next((s for s in spans if s.parent_id is None), None)
+    per_name: Dict[str, float] = defaultdict(float)
+    for s in spans:
+        if s is not root:
+            per_name[s.name] += s.duration
+    return {
+        "trace_id": root.trace_id if root else (spans[0].trace_id if spans else None),
+        "name": root.name if root else None,
+        "total_seconds": round(root.duration, 3) if root else None,
+        "error": root.error if root else None,
+        "attributes": dict(root.attributes) if root else {},
+        "spans": {k: round(v, 3) for k, v in sorted(per_name.items(), key=lambda kv: -kv[1])},
+    }
+
+
+def format_breakdown(spans: Sequence[Span]) -> str:
+    summary = breakdown(spans)
+    parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in summary["spans"].items())
+    status = f" error={summary['error']}" if summary["error"] else ""
+    return f"{summary['name']}: total {summary['total_seconds']:.2f}s{status} ({parts})"
+
+
+# ----------------------------------------------------------------------
+# Context helpers
+# ----------------------------------------------------------------------
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextlib.contextmanager
+def use_span(span: Optional[Span]) -> Iterator[Optional[Span]]:
+    """Make *span* the current span of this context without ending it."""
+    if span is None:
+        yield None
+        return
+    token = _current.set(span)
+    try:
+        yield span
+    finally:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Child span of the current span (if any), also recorded on the job profile."""
+    parent = _current.get()
+    with profile_span(name, **attributes):
+        if parent is None:
+            yield None
+            return
+        child = parent.tracer.start_span(name, parent, **attributes)
+        token = _current.set(child)
+        try:
+            yield child
+        except BaseException as exc:
+            child.end(exc)
+            raise
+        finally:
+            _current.reset(token)
+            child.end()
+
+
+def exporters_from_env(file_path: str = "", otlp_endpoint: str = "", otlp_headers: str = "") -> List[Any]:
+    """Build exporters from ``TRACE_EXPORT_FILE`` / ``TRACE_OTLP_*`` style settings.
+
+    *otlp_headers* is a comma list of ``key=value`` pairs.
+    """
+    exporters: List[Any] = []
+    if file_path:
+        exporters.append(FileExporter(os.path.expanduser(file_path)))
+    if otlp_endpoint:
+        headers = dict(
+            pair.split("=", 1) for pair in otlp_headers.split(",") if "=" in pair
+        )
+        exporters.append(OTLPHttpExporter(otlp_endpoint, {k.strip(): v.strip() for k, v in headers.items()}))
+    return exporters
+
+
+__all__ = [
+    "FileExporter",
+    "OTLPHttpExporter",
+    "Span",
+    "Tracer",
+    "breakdown",
+    "current_span",
+    "exporters_from_env",
+    "format_breakdown",
+    "span",
+    "use_span",
+]
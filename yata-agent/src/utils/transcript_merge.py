@@ -0,0 +1,103 @@
+"""Merge per-speaker transcript segments into one interleaved transcript.
+
+Each speaker's track is transcribed separately, so the segment timestamps
+are relative to that speaker's own audio file.  Recording sinks keep those
+tracks compact (silence removed) and record a :class:`SparseTimeline`; when
+it is supplied, every segment is mapped back to meeting time through it.
+Without a timeline the tracks are assumed to share the recording's time
+origin.  All segments of all speakers are then sorted on one timeline and
+labelled with the speaker's Discord display name::
+
+    [00:00:03] Alice: 今日の議題は…
+    [00:00:09] Bob: 先に予算の話をしましょう。
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from services.transcription_service_interface import TranscriptSegment
+from utils.timeline import SparseTimeline
+
+# Consecutive segments of the same speaker closer than this are joined
+_JOIN_GAP_SECONDS = 1.5
+
+
+def _timestamp(seconds: float) -> str:
+    total = max(0, int(seconds))
+    return f"{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}"
+
+
+def _to_meeting_time(
+    timeline: SparseTimeline, speaker_id: int, seg: TranscriptSegment
+) -> TranscriptSegment:
+    start = timeline.to_timeline_seconds(speaker_id, seg.start)
+    end = timeline.to_timeline_seconds(speaker_id, seg.end)
+    return TranscriptSegment(start=start, end=max(start, end), text=seg.text)
+
+
+def interleave(
+    segments_by_speaker: Mapping[int, Sequence[TranscriptSegment]],
+    timeline: Optional[SparseTimeline] = None,
+) -> List[Tuple[int, TranscriptSegment]]:
+    """Return ``(speaker_id, segment)`` pairs in chronological order.
+
+    If *timeline* is given, segment times are first mapped from track time
+    to meeting time.  Ties are broken by speaker id so that the output is
+    deterministic.  Consecutive segments of the same speaker separated by
+    less than ``_JOIN_GAP_SECONDS`` are joined into a single segment.
+    """
+    if timeline is not None:
+        segments_by_speaker = {
+            speaker_id: [_to_meeting_time(timeline, speaker_id, seg) for seg in segments]
+            for speaker_id, segments in segments_by_speaker.items()
+        }
+    flat = sorted(
+        (
+            (seg.start, speaker_id, seg)
+            for speaker_id, segments in segments_by_speaker.items()
+            for seg in segments
+            if seg.text
+        ),
+        key=lambda item: (item[0], item[1]),
+    )
+
+    merged: List[Tuple[int, TranscriptSegment]] = []
+    for _, speaker_id, seg in flat:
+        if merged:
+            last_speaker, last = merged[-1]
+            if last_speaker == speaker_id and seg.start - last.end < _JOIN_GAP_SECONDS:
+                merged[-1] = (
+                    speaker_id,
+                    TranscriptSegment(
+                        start=last.start,
+                        end=max(last.end, seg.end),
+                        text=f"{last.text} {seg.text}",
+                    ),
+                )
+                continue
+        merged.append((speaker_id, seg))
+    return merged
+
+
+def format_transcript(
+    lines: Iterable[Tuple[int, TranscriptSegment]],
+    speaker_names: Mapping[int, str],
+) -> str:
+    """Render interleaved segments as ``[hh:mm:ss] Name: text`` lines."""
+    names: Dict[int, str] = dict(speaker_names)
+    return "\n".join(
+        f"[{_timestamp(seg.start)}] {names.get(speaker_id, f'User {speaker_id}')}: {seg.text}"
+        for speaker_id, seg in lines
+    )
+
+
+def merge_speaker_segments(
+    segments_by_speaker: Mapping[int, Sequence[TranscriptSegment]],
+    speaker_names: Mapping[int, str],
+    timeline: Optional[SparseTimeline] = None,
+) -> str:
+    """Interleave all speakers' segments and render them as one transcript."""
+    return format_transcript(interleave(segments_by_speaker, timeline), speaker_names)
+
+
+__all__ = ["interleave", "format_transcript", "merge_speaker_segments"]
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from benchmarks import runner
+from benchmarks.__main__ import main
+from benchmarks.runner import (
+    IMPROVED,
+    NEW,
+    OK,
+    REGRESSION,
+    SKIPPED,
+    Benchmark,
+    Result,
+    compare,
+    format_report,
+    load_baseline,
+    run_benchmark,
+    save_baseline,
+)
+
+
+def _result(name, median):
+    return Result(name, "g", median, median, 0.0, median, 3, 10)
+
+
+def test_run_benchmark_times_sync_and_async_and_tears_down():
+    events = []
+
+    def _sync_factory():
+        events.append("setup")
+        yield lambda: sum(range(100))
+        events.append("teardown")
+
+    async def _noop():
+        return None
+
+    def _async_factory():
+        yield _noop
+        events.append("async teardown")
+
+    sync = run_benchmark(Benchmark("s", "g", _sync_factory), rounds=3, min_round_seconds=0.001)
+    async_ = run_benchmark(Benchmark("a", "g", _async_factory), rounds=3, min_round_seconds=0.001)
+
+    assert events == ["setup", "teardown", "async teardown"]
+    for result in (sync, async_):
+        assert result.rounds == 3 and result.number >= 1
+        assert 0 < result.min <= result.median
+
+
+def test_bench_registers_one_benchmark_per_param(monkeypatch):
+    monkeypatch.setattr(runner, "_REGISTRY", {})
+
+    @runner.bench("x.case[{n}]", group="x", params=[{"n": 1}, {"n": 2}])
+    def _case(n):
+        yield lambda: n
+
+    assert [b.name for b in runner.select(["x"])] == ["x.case[1]", "x.case[2]"]
+    assert [b.params for b in runner.select(["x.case[[]2]"])] == [{"n": 2}]
+    with pytest.raises(ValueError):
+        runner.bench("x.case[{n}]", group="x", params=[{"n": 1}])(_case)
+
+
+def test_compare_flags_changes_beyond_threshold():
+    results = {
+        "fast": _result("fast", 0.5),
+        "same": _result("same", 1.1),
+        "slow": _result("slow", 1.5),
+        "new": _result("new", 1.0),
+    }
+    baseline = {name: {"median": 1.0} for name in ("fast", "same", "slow", "gone")}
+
+    comparisons = compare(results, baseline, threshold=0.2, skipped={"gone": "ffmpeg not installed"})
+    statuses = {c.name: c.status for c in comparisons}
+
+    assert statuses == {"fast": IMPROVED, "same": OK, "slow": REGRESSION, "new": NEW, "gone": SKIPPED}
+    slow = next(c for c in comparisons if c.name == "slow")
+    assert slow.change == pytest.approx(0.5)
+    report = format_report(comparisons, 0.2)
+    assert "+50.0%" in report
+    assert "1 regression(s) above 20%: slow" in report
+
+
+def test_save_baseline_merges_with_existing(tmp_path):
+    path = tmp_path / "baseline.json"
+    save_baseline(path, {"a": _result("a", 1.0), "b": _result("b", 2.0)})
+    save_baseline(path, {"b": _result("b", 3.0)})
+
+    baseline = load_baseline(path)
+    assert baseline["a"]["median"] == 1.0
+    assert baseline["b"]["median"] == 3.0
+    assert json.loads(path.read_text())["machine"]["python"]
+
+
+def test_cli_exits_non_zero_on_regression(tmp_path, capsys):
+    path = tmp_path / "baseline.json"
+    save_baseline(path, {"readiness.check[ready]": _result("readiness.check[ready]", 1e-9)})
+
+    code = main(["readiness.check[[]ready[]]", "--quick", "--baseline", str(path)])
+
+    assert code == 1
+    assert REGRESSION in capsys.readouterr().out
@@ -62,6 +62,7 @@ class TestRecordingCog:
         mock_ctx.followup.send = AsyncMock()
         mock_ctx.author.voice = _MockVoiceState(channel=voice_channel)
         mock_ctx.guild.id = 1
+        mock_ctx.guild.shard_id = 3
 
         # Act
         await recording_cog.record_start.callback(recording_cog, mock_ctx)
@@ -71,6 +72,7 @@ class TestRecordingCog:
         voice_client.start_recording.assert_called_once()
         mock_ctx.followup.send.assert_awaited_once()
         assert 1 in recording_cog._active_recordings  # type: ignore[attr-defined]
+        assert recording_cog.recordings_by_shard() == {3: 1}
 
     async def test_record_start_no_voice(self, recording_cog: RecordingCog):
         """VC に接続していない場合にエラーメッセージが返る。"""
@@ -192,4 +194,316 @@ class TestRecordingCog:
         ctx.followup.send.assert_awaited_once()
         args, kwargs = ctx.followup.send.call_args
         content = kwargs.get("content", args[0] if args else "")
-        assert "❌" in content 
\ No newline at end of file
+        assert "❌" in content 
+
+@pytest.mark.asyncio
+async def test_finished_callback_per_speaker_mode(mock_processing_service: AsyncMock, mock_audio_service: AsyncMock):
+    """per_speaker モードではミックスせず話者別に処理し、表示名を渡す。"""
+    from cogs.recording_cog import MODE_PER_SPEAKER
+
+    cog = RecordingCog(mock_processing_service, mock_audio_service, transcript_mode=MODE_PER_SPEAKER)
+    mock_audio_service.export_tracks.return_value = {111: "/tmp/u111.ogg", 222: "/tmp/u222.ogg"}
+    mock_processing_service.process_speakers.return_value = "https://docs"
+
+    sink = SimpleNamespace(
+        audio_data={
+            111: SimpleNamespace(file=io.BytesIO(b"\x01\x00")),
+            222: SimpleNamespace(file=io.BytesIO(b"\x02\x00")),
+        },
+        encoding="wav",
+    )
+    channel = MagicMock()
+    channel.send = AsyncMock()
+    channel.guild.id = 5
+    channel.guild.get_member.side_effect = lambda uid: SimpleNamespace(display_name="Alice") if uid == 111 else None
+
+    await cog._on_record_finished(sink, channel)
+
+    mock_audio_service.mix_and_export.assert_not_awaited()
+    args = mock_processing_service.process_speakers.await_args.args
+    assert args[0] == 5
+    assert args[1] == {111: "/tmp/u111.ogg", 222: "/tmp/u222.ogg"}
+    assert args[2] == {111: "Alice", 222: "User 222"}
+
+
+# --- auto stop ---------------------------------------------------------------
+
+def _auto_stop_record(members, sink=None):
+    from time import monotonic
+
+    voice_client = AsyncMock(spec=discord.VoiceClient)
+    voice_client.stop_recording = MagicMock()
+    voice_client.channel = SimpleNamespace(members=members)
+    text_channel = MagicMock()
+    text_channel.send = AsyncMock()
+    return SimpleNamespace(
+        voice_client=voice_client,
+        sink=sink,
+        text_channel=text_channel,
+        started_at=monotonic(),
+        max_seconds=0,
+        watcher=None,
+        empty_task=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_empty_channel_stops_recording_after_grace(mock_processing_service, mock_audio_service):
+    from cogs.recording_cog import AutoStopPolicy
+
+    cog = RecordingCog(mock_processing_service, mock_audio_service, auto_stop=AutoStopPolicy(empty_grace_seconds=0))
+    record = _auto_stop_record(members=[SimpleNamespace(bot=True)])
+    cog._active_recordings[7] = record
+
+    await cog.on_voice_state_update(SimpleNamespace(guild=SimpleNamespace(id=7)), None, None)
+    await record.empty_task
+
+    assert 7 not in cog._active_recordings
+    record.voice_client.stop_recording.assert_called_once()
+    assert "無人" in record.text_channel.send.await_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_rejoin_during_grace_keeps_recording(mock_processing_service, mock_audio_service):
+    from cogs.recording_cog import AutoStopPolicy
+
+    cog = RecordingCog(mock_processing_service, mock_audio_service, auto_stop=AutoStopPolicy(empty_grace_seconds=60))
+    record = _auto_stop_record(members=[])
+    cog._active_recordings[7] = record
+    member = SimpleNamespace(guild=SimpleNamespace(id=7))
+
+    await cog.on_voice_state_update(member, None, None)
+    pending = record.empty_task
+    record.voice_client.channel.members.append(SimpleNamespace(bot=False))
+    await cog.on_voice_state_update(member, None, None)
+    await asyncio.sleep(0)
+
+    assert pending.cancelled()
+    assert record.empty_task is None
+    assert cog._active_recordings[7] is record
+
+
+@pytest.mark.asyncio
+async def test_idle_recording_is_stopped_by_watcher(mock_processing_service, mock_audio_service):
+    from time import monotonic
+
+    from cogs.recording_cog import AutoStopPolicy
+
+    policy = AutoStopPolicy(idle_timeout_seconds=60, check_interval_seconds=0.01)
+    cog = RecordingCog(mock_processing_service, mock_audio_service, auto_stop=policy)
+    record = _auto_stop_record(members=[SimpleNamespace(bot=False)], sink=SimpleNamespace(last_activity=None))
+    record.started_at = monotonic() - 120  # nobody has spoken for two minutes
+    cog._active_recordings[7] = record
+
+    await asyncio.wait_for(cog._watch(7, record), timeout=1)
+
+    assert 7 not in cog._active_recordings
+    assert "発言がなかった" in record.text_channel.send.await_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_guild_limit_overrides_default_max_duration(mock_processing_service, mock_audio_service):
+    db_service = MagicMock()
+    db_service.get_guild_limits.side_effect = lambda gid: {"max_recording_minutes": 5} if gid == 1 else None
+    cog = RecordingCog(mock_processing_service, mock_audio_service, db_service=db_service)
+
+    assert await cog._max_duration_seconds(1) == 300
+    assert await cog._max_duration_seconds(2) == cog.auto_stop.max_duration_seconds
+
+
+@pytest.mark.asyncio
+async def test_record_start_refused_by_admission_control(mock_processing_service, mock_audio_service):
+    from services.admission_service import AdmissionDecision, AdmissionLevel
+
+    admission_service = MagicMock()
+    admission_service.check = AsyncMock(return_value=AdmissionDecision(AdmissionLevel.REJECT, "disk"))
+    cog = RecordingCog(mock_processing_service, mock_audio_service, admission_service=admission_service)
+
+    voice_channel = AsyncMock(spec=discord.VoiceChannel)
+    ctx = AsyncMock(spec=discord.ApplicationContext)
+    ctx.defer = AsyncMock()
+    ctx.followup.send = AsyncMock()
+    ctx.author.voice = _MockVoiceState(channel=voice_channel)
+    ctx.guild.id = 1
+
+    await cog.record_start.callback(cog, ctx)
+
+    voice_channel.connect.assert_not_awaited()
+    assert "ディスク" in ctx.followup.send.await_args.args[0]
+    assert cog._active_recordings == {}
+
+
+@pytest.mark.asyncio
+async def test_record_start_releases_admission_when_connect_fails(mock_processing_service, mock_audio_service):
+    from services.admission_service import AdmissionService
+
+    admission_service = AdmissionService()
+    cog = RecordingCog(mock_processing_service, mock_audio_service, admission_service=admission_service)
+
+    voice_channel = AsyncMock(spec=discord.VoiceChannel)
+    voice_channel.connect.side_effect = discord.ClientException("boom")
+    ctx = AsyncMock(spec=discord.ApplicationContext)
+    ctx.defer = AsyncMock()
+    ctx.followup.send = AsyncMock()
+    ctx.author.voice = _MockVoiceState(channel=voice_channel)
+    ctx.guild.id = 1
+
+    await cog.record_start.callback(cog, ctx)
+
+    voice_channel.connect.assert_awaited_once()
+    assert admission_service.metrics()["pending_bytes"] == 0
+    assert cog._active_recordings == {}
+
+
+@pytest.mark.asyncio
+async def test_finished_callback_releases_buffers(mock_processing_service: AsyncMock, mock_audio_service: AsyncMock):
+    """処理後に PCM バッファを閉じ、voice client との循環参照を切る。"""
+    from utils.memory import MemoryTracker
+
+    tracker = MemoryTracker(check_delay=60, trim=False)
+    cog = RecordingCog(mock_processing_service, mock_audio_service, memory_tracker=tracker)
+    mock_audio_service.mix_and_export.return_value = "/tmp/mix.ogg"
+    mock_processing_service.process.return_value = "https://docs"
+
+    buffer = io.BytesIO(b"\x01\x00" * 1000)
+    vc = SimpleNamespace(disconnect=AsyncMock())
+    sink = SimpleNamespace(audio_data={111: SimpleNamespace(file=buffer)}, encoding="wav", vc=vc)
+    vc.sink = sink
+    channel = MagicMock()
+    channel.send = AsyncMock()
+    channel.guild.id = 5
+
+    await cog._on_record_finished(sink, channel)
+
+    assert buffer.closed
+    assert sink.audio_data == {}
+    assert vc.sink is None and sink.vc is None
+    metrics = tracker.metrics()
+    assert metrics["completed"] == 1
+    assert metrics["released_bytes"] >= 2000
+    for task in list(tracker._checks):
+        task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_meeting_trace_spans_record_start_to_link(mock_processing_service: AsyncMock, mock_audio_service: AsyncMock):
+    """/record_start で作ったトレースがリンク投稿まで続き、各段階がスパンになる。"""
+    from utils.tracing import Tracer
+
+    tracer = Tracer()
+    cog = RecordingCog(mock_processing_service, mock_audio_service, tracer=tracer)
+    voice_channel = AsyncMock(spec=discord.VoiceChannel)
+    voice_client = AsyncMock(spec=discord.VoiceClient)
+    voice_client.start_recording = MagicMock()
+    voice_channel.connect.return_value = voice_client
+    ctx = AsyncMock(spec=discord.ApplicationContext)
+    ctx.defer = AsyncMock()
+    ctx.followup.send = AsyncMock()
+    ctx.author.voice = _MockVoiceState(channel=voice_channel)
+    ctx.guild.id = 5
+
+    await cog.record_start.callback(cog, ctx)
+    trace = voice_client.start_recording.call_args.args[3]
+    assert trace.attributes["guild_id"] == 5
+    cog._active_recordings[5].watcher.cancel()
+
+    mock_audio_service.mix_and_export.return_value = "/tmp/mix.ogg"
+    mock_processing_service.process.return_value = "https://docs"
+    sink = SimpleNamespace(audio_data={111: SimpleNamespace(file=io.BytesIO(b"\x01\x00"))}, encoding="wav")
+    channel = MagicMock()
+    channel.send = AsyncMock()
+    channel.guild.id = 5
+
+    await cog._on_record_finished(sink, channel, trace)
+
+    assert trace.end_ns is not None and trace.error is None
+    recent = tracer.metrics()["recent"][0]
+    assert recent["trace_id"] == trace.trace_id
+    assert {"discord.recording", "admission.wait"} <= set(recent["spans"])
+
+
+# --- graceful shutdown -------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_shutdown_refuses_recordings_and_hands_off_unfinished_meetings(
+    mock_processing_service: AsyncMock, mock_audio_service: AsyncMock
+):
+    """停止中は録音を受け付けず、終わらない処理は書き出した音声ごと引き継ぐ。"""
+    job_delivery = MagicMock()
+    job_delivery.hand_off = AsyncMock()
+    cog = RecordingCog(mock_processing_service, mock_audio_service, job_delivery=job_delivery)
+    mock_audio_service.mix_and_export.return_value = "/tmp/meeting.ogg"
+
+    async def slow_process(*args):
+        await asyncio.sleep(60)
+
+    mock_processing_service.process.side_effect = slow_process
+
+    sink = SimpleNamespace(audio_data={111: SimpleNamespace(file=io.BytesIO(b"\x01\x00"))}, encoding="wav")
+    channel = MagicMock()
+    channel.id = 42
+    channel.send = AsyncMock()
+    channel.guild.id = 5
+    pipeline = asyncio.create_task(cog._on_record_finished(sink, channel))
+    while not mock_processing_service.process.await_count:
+        await asyncio.sleep(0.01)
+
+    cog.stop_accepting()
+    ctx = AsyncMock(spec=discord.ApplicationContext)
+    ctx.defer = AsyncMock()
+    ctx.followup.send = AsyncMock()
+    await cog.record_start.callback(cog, ctx)
+    assert "再起動中" in ctx.followup.send.await_args.args[0]
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(cog.drain(), timeout=0.05)
+    await cog.hand_off_unfinished()
+
+    assert pipeline.cancelled()
+    guild_id, channel_id, kind, args = job_delivery.hand_off.await_args.args
+    assert (guild_id, channel_id, kind) == (5, 42, "process")
+    assert args["audio_file_path"] == "/tmp/meeting.ogg"
+    assert "保存済み" in channel.send.await_args.args[0]
+    await asyncio.wait_for(cog.drain(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_handed_off_meeting_is_not_also_finished_by_the_scheduler(mock_audio_service: AsyncMock):
+    """引き継いだ会議の元の処理はキャンセルされ、ドキュメントを二重に作らない。"""
+    from services.processing_scheduler import ProcessingScheduler
+    from utils.fair_scheduler import FairScheduler
+
+    events = []
+
+    class _Processing:
+        async def process(self, guild_id, audio_file_path, title):
+            events.append("started")
+            try:
+                await asyncio.sleep(0.2)
+            except asyncio.CancelledError:
+                events.append("cancelled")
+                raise
+            events.append("uploaded")
+            return "https://docs/1"
+
+    scheduler = ProcessingScheduler(_Processing(), FairScheduler(concurrency=1))
+    job_delivery = MagicMock()
+    job_delivery.hand_off = AsyncMock()
+    cog = RecordingCog(scheduler, mock_audio_service, job_delivery=job_delivery)
+    mock_audio_service.mix_and_export.return_value = "/tmp/meeting.ogg"
+
+    sink = SimpleNamespace(audio_data={111: SimpleNamespace(file=io.BytesIO(b"\x01\x00"))}, encoding="wav")
+    channel = MagicMock()
+    channel.send = AsyncMock()
+    channel.guild.id = 5
+    asyncio.create_task(cog._on_record_finished(sink, channel))
+    while not events:
+        await asyncio.sleep(0.01)
+
+    cog.stop_accepting()
+    await cog.hand_off_unfinished()
+    await asyncio.sleep(0.3)
+
+    job_delivery.hand_off.assert_awaited_once()
+    assert events == ["started", "cancelled"]
+    assert scheduler.metrics()["running"] == 0
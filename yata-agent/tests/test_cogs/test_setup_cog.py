@@ -131,4 +131,31 @@ class TestSetupCog:
         mock_ctx.followup.send.assert_awaited_once()
         args, kwargs = mock_ctx.followup.send.call_args
         content = kwargs.get("content", args[0] if args else "")
-        assert "サーバー内でのみ実行" in content
\ No newline at end of file
+        assert "サーバー内でのみ実行" in content
+    async def test_recording_limits_saved(self, setup_cog: SetupCog, mock_db_service: MagicMock):
+        """/recording_limits が録音上限を保存する"""
+        mock_db_service.get_server_settings.return_value = {"guild_id": 1}
+        mock_ctx = AsyncMock(spec=discord.ApplicationContext)
+        mock_ctx.defer = AsyncMock()
+        mock_ctx.followup.send = AsyncMock()
+        mock_ctx.guild.id = 1
+
+        await setup_cog.recording_limits.callback(setup_cog, mock_ctx, max_minutes=90, max_jobs=2)
+
+        mock_db_service.upsert_guild_limits.assert_called_once_with(1, 90, 2)
+        _, kwargs = mock_ctx.followup.send.call_args
+        assert "90 分" in kwargs.get("content", "")
+
+    async def test_recording_limits_requires_setup(self, setup_cog: SetupCog, mock_db_service: MagicMock):
+        """未設定のサーバーでは /setup を案内する"""
+        mock_db_service.get_server_settings.return_value = None
+        mock_ctx = AsyncMock(spec=discord.ApplicationContext)
+        mock_ctx.defer = AsyncMock()
+        mock_ctx.followup.send = AsyncMock()
+        mock_ctx.guild.id = 1
+
+        await setup_cog.recording_limits.callback(setup_cog, mock_ctx, max_minutes=90, max_jobs=None)
+
+        mock_db_service.upsert_guild_limits.assert_not_called()
+        _, kwargs = mock_ctx.followup.send.call_args
+        assert "/setup" in kwargs.get("content", "")
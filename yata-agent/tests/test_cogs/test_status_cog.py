@@ -70,4 +70,46 @@ class TestStatusCog:
         ctx.followup.send.assert_awaited_once()
         content = ctx.followup.send.call_args.kwargs["content"]
         assert "サーバー内でのみ実行" in content
-        assert "This command can only be used" in content 
\ No newline at end of file
+        assert "This command can only be used" in content 
+
+@pytest.mark.asyncio
+class TestProfileNext:
+    def _ctx(self, guild_id=1):
+        ctx = AsyncMock(spec=discord.ApplicationContext)
+        ctx.defer = AsyncMock()
+        ctx.followup.send = AsyncMock()
+        ctx.guild.id = guild_id
+        ctx.author.id = 7
+        return ctx
+
+    async def test_arms_next_jobs(self, mock_readiness: MagicMock):
+        from services.profiling_service import ProfilingService
+
+        profiling = ProfilingService()
+        cog = StatusCog(mock_readiness, profiling)
+        ctx = self._ctx()
+
+        await cog.profile_next.callback(cog, ctx, 3)  # type: ignore[attr-defined]
+
+        assert profiling.remaining(1) == 3
+        assert "3" in ctx.followup.send.call_args.kwargs["content"]
+
+    async def test_zero_cancels(self, mock_readiness: MagicMock):
+        from services.profiling_service import ProfilingService
+
+        profiling = ProfilingService()
+        profiling.arm(1, 2)
+        cog = StatusCog(mock_readiness, profiling)
+        ctx = self._ctx()
+
+        await cog.profile_next.callback(cog, ctx, 0)  # type: ignore[attr-defined]
+
+        assert profiling.remaining(1) == 0
+        assert "cancelled" in ctx.followup.send.call_args.kwargs["content"]
+
+    async def test_unavailable_without_service(self, status_cog: StatusCog):
+        ctx = self._ctx()
+
+        await status_cog.profile_next.callback(status_cog, ctx, 1)  # type: ignore[attr-defined]
+
+        assert "not enabled" in ctx.followup.send.call_args.kwargs["content"]
@@ -83,11 +83,41 @@ class TestDatabaseImplementation:
         with pytest.raises(sqlite3.IntegrityError):
             db.upsert_credentials(guild_id=999, token_dict={"token": "abc"})
 
+    def test_upsert_and_get_guild_limits(self, db: Database):
+        """録音上限設定の登録・更新と取得をテストする。"""
+        db.upsert_server_settings(guild_id=1, owner_id=100, gdrive_folder_id="f", language="en")
+        assert db.get_guild_limits(guild_id=1) is None
+
+        db.upsert_guild_limits(guild_id=1, max_recording_minutes=120)
+        assert db.get_guild_limits(guild_id=1)["max_recording_minutes"] == 120
+
+        db.upsert_guild_limits(guild_id=1, max_recording_minutes=120, max_concurrent_jobs=2)
+        assert db.get_guild_limits(guild_id=1)["max_concurrent_jobs"] == 2
+
+        # None に戻すとグローバル既定値を使う
+        db.upsert_guild_limits(guild_id=1, max_recording_minutes=None)
+        limits = db.get_guild_limits(guild_id=1)
+        assert limits["max_recording_minutes"] is None
+        assert limits["max_concurrent_jobs"] is None
+
+    def test_guild_limits_migration_adds_missing_column(self):
+        """旧スキーマの guild_limits に新しいカラムが追加されることをテストする。"""
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute("CREATE TABLE servers (guild_id INTEGER PRIMARY KEY, owner_id INTEGER NOT NULL, gdrive_folder_id TEXT, language TEXT NOT NULL DEFAULT 'ja')")
+        conn.execute("CREATE TABLE guild_limits (guild_id INTEGER PRIMARY KEY, max_recording_minutes INTEGER)")
+
+        init_db(connection=conn)
+
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(guild_limits)")}
+        assert "max_concurrent_jobs" in columns
+        conn.close()
+
     def test_delete_server_data(self, db: Database):
         """サーバーデータ削除（カスケード削除）をテストする。"""
         # データを作成
         db.upsert_server_settings(guild_id=1, owner_id=100, gdrive_folder_id="f", language="en")
         db.upsert_credentials(guild_id=1, token_dict={"token": "abc"})
+        db.upsert_guild_limits(guild_id=1, max_recording_minutes=60)
 
         # 存在する事を確認
         assert db.get_server_settings(guild_id=1) is not None
@@ -99,4 +129,5 @@ class TestDatabaseImplementation:
         # 削除された事を確認
         assert db.get_server_settings(guild_id=1) is None
         # 外部キーのカスケード削除により、こちらもNoneになるはず
-        assert db.get_credentials(guild_id=1) is None 
\ No newline at end of file
+        assert db.get_credentials(guild_id=1) is None
+        assert db.get_guild_limits(guild_id=1) is None
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+from data.job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+def test_enqueue_claim_complete(db_path):
+    """積んだジョブを取り出し、結果を書き戻せる。"""
+    queue = JobQueue(db_path)
+    job_id = queue.enqueue(1, "process", {"audio_file_path": "a.ogg", "title": "t"})
+
+    job = queue.claim("w1")
+    assert job.id == job_id and job.status == RUNNING and job.attempts == 1
+    assert job.args == {"audio_file_path": "a.ogg", "title": "t"}
+    assert queue.claim("w1") is None
+
+    queue.complete(job_id, "https://docs/1")
+    (finished,) = queue.finished([job_id])
+    assert finished.status == DONE and finished.result == "https://docs/1"
+    assert queue.metrics()["done"] == 1
+
+
+def test_two_processes_never_claim_the_same_job(db_path):
+    """別々の接続 (= 別プロセス) が同じジョブを取ることはない。"""
+    first, second = JobQueue(db_path), JobQueue(db_path)
+    ids = {first.enqueue(g, "process", {}) for g in range(4)}
+
+    claimed = [first.claim("w1"), second.claim("w2"), first.claim("w1"), second.claim("w2")]
+
+    assert {job.id for job in claimed} == ids
+    assert first.claim("w1") is None and second.claim("w2") is None
+
+
+def test_claim_prefers_guilds_without_running_jobs(db_path):
+    """実行中のジョブがあるサーバーより、他のサーバーのジョブを先に取る。"""
+    queue = JobQueue(db_path)
+    busy = [queue.enqueue(1, "process", {}) for _ in range(3)]
+    other = queue.enqueue(2, "process", {})
+
+    assert queue.claim("w").id == busy[0]
+    assert queue.claim("w").id == other
+    assert queue.claim("w").id == busy[1]
+
+
+def test_requeue_stale_and_release(db_path):
+    """ハートビートの途絶えたワーカーのジョブは戻り、再試行の上限で失敗になる。"""
+    queue = JobQueue(db_path)
+    job_id = queue.enqueue(1, "process", {})
+
+    queue.heartbeat("alive")
+    queue.claim("alive")
+    assert queue.requeue_stale(timeout=30) == 0
+
+    queue.release(job_id)  # 正常停止は再試行回数に数えない
+    assert queue.get(job_id).status == QUEUED and queue.get(job_id).attempts == 0
+
+    for attempt in range(3):
+        queue.claim("dead")
+        time.sleep(0.01)
+        queue.requeue_stale(timeout=0.001)
+    job = queue.get(job_id)
+    assert job.status == FAILED and job.error == "worker lost"
+
+
+def test_existing_queue_gains_the_delivery_columns(db_path):
+    """以前のスキーマのキューファイルにも投稿先のカラムが追加される。"""
+    import sqlite3
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, guild_id INTEGER NOT NULL, "
+        "kind TEXT NOT NULL, payload BLOB NOT NULL, status TEXT NOT NULL DEFAULT 'queued', "
+        "result TEXT, error TEXT, worker TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+        "enqueued_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+    )
+    conn.close()
+
+    queue = JobQueue(db_path)
+    job_id = queue.enqueue(1, "process", {}, channel_id=42)
+    queue.claim("w")
+    queue.complete(job_id, "https://docs/1")
+
+    assert [job.id for job in queue.undelivered()] == [job_id]
+    assert queue.claim_delivery(job_id) is True
+    assert queue.claim_delivery(job_id) is False
+    assert queue.undelivered() == []
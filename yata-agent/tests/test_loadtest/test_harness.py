@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pytest
+
+from cogs.recording_cog import MODE_PER_SPEAKER
+from loadtest.fakes import LatencyModel
+from loadtest.harness import LoadTestConfig, format_report, run_load_test
+from loadtest.synthetic import build_sink, sink_bytes
+from utils.timeline import WAV_HEADER_BYTES
+
+
+class _FileAudioService:
+    """Writes placeholder files instead of encoding with ffmpeg."""
+
+    async def mix_and_export(self, audio_data, encoding, base_path, timeline=None):
+        out_path = f"{base_path}.ogg"
+        with open(out_path, "wb") as f:
+            f.write(b"\0" * 4000)
+        return out_path
+
+    async def export_tracks(self, audio_data, encoding, base_path):
+        paths = {}
+        for user_id in audio_data:
+            paths[user_id] = f"{base_path}_{user_id}.ogg"
+            with open(paths[user_id], "wb") as f:
+                f.write(b"\0" * 4000)
+        return paths
+
+
+def test_build_sink_timeline_matches_buffers():
+    sink = build_sink(speakers=3, seconds=10, rng=np.random.default_rng(1))
+
+    assert 1 <= len(sink.audio_data) <= 3
+    assert sink.encoding == "wav"
+    for user_id, audio in sink.audio_data.items():
+        data = audio.file.getvalue()
+        assert data[:4] == b"RIFF"
+        runs = list(sink.timeline.runs(user_id))
+        assert sum(length for _, _, length in runs) == len(data) - WAV_HEADER_BYTES
+    assert sink_bytes(sink) > 10 * 48000 * 2 * 2 * 0.5
+
+
+def test_latency_model_matches_median_and_p95():
+    model = LatencyModel(median=1.0, p95=3.0)
+    rng = np.random.default_rng(0)
+    samples = [model.sample(rng) for _ in range(20000)]
+
+    assert np.percentile(samples, 50) == pytest.approx(1.0, rel=0.05)
+    assert np.percentile(samples, 95) == pytest.approx(3.0, rel=0.08)
+    assert model.sample(rng, audio_seconds=100) > 0
+    assert LatencyModel(median=0.0, p95=0.0, per_audio_second=0.5).sample(rng, 4) == 2.0
+
+
+@pytest.mark.parametrize("mode", ["mixed", MODE_PER_SPEAKER])
+async def test_run_load_test_reports_every_meeting(mode):
+    fast = LatencyModel(median=0.001, p95=0.005)
+    config = LoadTestConfig(
+        guilds=4,
+        speakers=2,
+        meeting_seconds=2,
+        transcript_mode=mode,
+        transcription=fast,
+        formatting=fast,
+        google=fast,
+    )
+
+    report = await run_load_test(config, audio_service=_FileAudioService())
+
+    assert report["meetings"] == 4
+    assert report["succeeded"] == 4
+    assert report["failed"] == 0
+    assert report["fakes"]["google"]["documents"] == 4
+    assert report["latency_seconds"]["p50"] > 0
+    assert report["peak_rss_mb"] >= report["rss_start_mb"] > 0
+    assert "loop lag ms" in format_report(report)
+
+
+async def test_run_load_test_counts_injected_failures():
+    config = LoadTestConfig(
+        guilds=3,
+        speakers=2,
+        meeting_seconds=1,
+        transcription=LatencyModel(median=0.001, p95=0.002, error_rate=1.0),
+        formatting=LatencyModel(median=0.001, p95=0.002),
+        google=LatencyModel(median=0.001, p95=0.002),
+    )
+
+    report = await run_load_test(config, audio_service=_FileAudioService())
+
+    assert report["failed"] == 3
+    assert report["fakes"]["transcription"]["errors"] >= 3
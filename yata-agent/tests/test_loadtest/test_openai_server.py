@@ -0,0 +1,96 @@
+import httpx
+import openai
+import pytest
+
+from loadtest.fakes import LatencyModel
+from loadtest.openai_server import FakeOpenAIConfig, FakeOpenAIServer
+from services.transcription_service import TranscriptionService
+from utils import meeting_minutes
+from utils.rate_limiter import RateLimiter
+
+_FAST = LatencyModel(median=0.001, p95=0.002)
+
+
+@pytest.fixture
+def base_url():
+    server = FakeOpenAIServer(FakeOpenAIConfig(transcription=_FAST, chat=_FAST, stream_chunk_seconds=0))
+    with server.running() as url:
+        yield url
+
+
+async def test_transcription_service_against_fake_server(base_url, tmp_path):
+    audio = tmp_path / "meeting.ogg"
+    audio.write_bytes(b"\0" * 15_000)  # ~10 s at 12 kbit/s
+    limiter = RateLimiter("whisper-1", requests_per_minute=100)
+    service = TranscriptionService(api_key="test", base_url=base_url, rate_limiter=limiter)
+
+    text = await service.transcribe(str(audio), "ja")
+    segments = await service.transcribe_segments(str(audio), "ja")
+
+    assert text.startswith("テスト発言です。")
+    assert [seg.start for seg in segments] == [0.0, 5.0]
+    assert segments[-1].end == pytest.approx(10.0)
+
+
+def test_chat_completions_plain_and_streamed(base_url):
+    client = openai.OpenAI(api_key="test", base_url=base_url, max_retries=0)
+    messages = [{"role": "user", "content": "議題の書き起こし"}]
+
+    response = client.chat.completions.create(model="gpt-4o-mini", messages=messages)
+    stream = client.chat.completions.create(
+        model="gpt-4o-mini", messages=messages, stream=True, stream_options={"include_usage": True}
+    )
+    chunks = list(stream)
+    streamed = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+
+    assert response.choices[0].message.content.startswith("# 議事録")
+    assert streamed == response.choices[0].message.content
+    assert chunks[-1].usage.total_tokens == response.usage.total_tokens
+
+
+def test_format_meeting_minutes_uses_base_url(base_url, monkeypatch):
+    monkeypatch.setattr(meeting_minutes, "_OPENAI_API_KEY", "test")
+    monkeypatch.setattr(meeting_minutes, "_OPENAI_BASE_URL", base_url)
+
+    assert meeting_minutes.format_meeting_minutes("こんにちは").startswith("# 議事録")
+
+
+async def test_format_meeting_minutes_async_reuses_its_client(base_url, monkeypatch):
+    monkeypatch.setattr(meeting_minutes, "_OPENAI_API_KEY", "test")
+    monkeypatch.setattr(meeting_minutes, "_OPENAI_BASE_URL", base_url)
+    monkeypatch.setattr(meeting_minutes, "_async_clients", {})
+    limiter = RateLimiter("gpt-4o-mini", requests_per_minute=100, tokens_per_minute=100_000)
+
+    first = await meeting_minutes.format_meeting_minutes_async("こんにちは", rate_limiter=limiter)
+    second = await meeting_minutes.format_meeting_minutes_async("こんばんは", rate_limiter=limiter)
+
+    assert first.startswith("# 議事録") and second.startswith("# 議事録")
+    assert list(meeting_minutes._async_clients) == [limiter]
+    await meeting_minutes._async_clients[limiter].close()
+
+
+def test_rate_limit_returns_429_with_headers():
+    server = FakeOpenAIServer(FakeOpenAIConfig(chat=_FAST, requests_per_minute=2))
+    limiter = RateLimiter("gpt-4o-mini", requests_per_minute=100)
+    body = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "x"}]}
+
+    with server.running() as url, httpx.Client(base_url=url) as client:
+        statuses = [client.post("/chat/completions", json=body) for _ in range(3)]
+        metrics = client.get(url.removesuffix("/v1") + "/metrics").json()
+
+    assert [r.status_code for r in statuses] == [200, 200, 429]
+    limited = statuses[-1]
+    assert limited.headers["x-ratelimit-remaining-requests"] == "0"
+    assert int(limited.headers["retry-after"]) >= 1
+    assert limited.json()["error"]["message"]
+    limiter.observe_headers(limited.headers, limited.status_code)
+    assert limiter.metrics()["rate_limited"] == 1
+    assert metrics["chat"] == {"requests": 3, "ok": 2, "rate_limited": 1, "errors": 0, "streamed": 0}
+
+
+def test_injected_errors_return_500():
+    server = FakeOpenAIServer(FakeOpenAIConfig(chat=LatencyModel(0.001, 0.002, error_rate=1.0)))
+    with server.running() as url:
+        client = openai.OpenAI(api_key="test", base_url=url, max_retries=0)
+        with pytest.raises(openai.InternalServerError):
+            client.chat.completions.create(model="gpt-4o-mini", messages=[])
@@ -0,0 +1,33 @@
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+
+from main import app, container  # type: ignore
+
+
+def test_metrics_includes_executor_stats():
+    executors = MagicMock()
+    executors.metrics.return_value = {"db": {"queued": 0}}
+    container.executors = executors  # type: ignore[attr-defined]
+    try:
+        response = TestClient(app).get("/metrics")
+    finally:
+        container.executors = None  # type: ignore[attr-defined]
+
+    assert response.status_code == 200
+    assert response.json() == {"executors": {"db": {"queued": 0}}}
+
+
+def test_metrics_includes_job_queue_of_split_roles(tmp_path):
+    from data.job_queue import JobQueue
+
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    queue.enqueue(1, "process", {})
+    container.job_queue = queue  # type: ignore[attr-defined]
+    try:
+        response = TestClient(app).get("/metrics")
+    finally:
+        container.job_queue = None  # type: ignore[attr-defined]
+        queue.close()
+
+    assert response.json()["job_queue"]["queued"] == 1
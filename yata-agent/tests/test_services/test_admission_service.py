@@ -0,0 +1,122 @@
+import asyncio
+from collections import namedtuple
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.admission_service import (
+    PCM_BYTES_PER_SECOND,
+    AdmissionLevel,
+    AdmissionPolicy,
+    AdmissionService,
+)
+from services.database_service import DatabaseService
+
+_Usage = namedtuple("_Usage", "total used free")
+_GB = 1024 ** 3
+
+
+@pytest.fixture
+def policy() -> AdmissionPolicy:
+    return AdmissionPolicy(
+        memory_budget_bytes=2 * _GB,
+        disk_reserve_bytes=0,
+        estimate_seconds=600,
+        max_queue_depth=2,
+        guild_max_jobs=1,
+    )
+
+
+@pytest.fixture(autouse=True)
+def plenty_of_disk():
+    with patch("services.admission_service.shutil.disk_usage", return_value=_Usage(0, 0, 100 * _GB)) as usage:
+        yield usage
+
+
+@pytest.mark.asyncio
+async def test_admits_when_within_budget(policy):
+    decision = await AdmissionService(policy=policy).check(1, live_bytes=0)
+
+    assert decision.level == AdmissionLevel.ADMIT
+    assert decision.estimate_bytes == 600 * PCM_BYTES_PER_SECOND
+    assert decision.guidance() == ""
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_live_sinks_exhaust_memory_budget(policy):
+    svc = AdmissionService(policy=policy)
+
+    decision = await svc.check(1, live_bytes=2 * _GB)
+
+    assert decision.level == AdmissionLevel.REJECT
+    assert decision.reason == "memory"
+    assert "メモリ" in decision.guidance()
+    assert svc.metrics()["rejected_by_reason"] == {"memory": 1}
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_temp_dir_is_full(policy, plenty_of_disk):
+    plenty_of_disk.return_value = _Usage(0, 0, 10 * 1024 * 1024)
+
+    decision = await AdmissionService(policy=policy).check(1)
+
+    assert decision.reason == "disk"
+
+
+@pytest.mark.asyncio
+async def test_guild_limit_caps_the_estimate():
+    db_service = MagicMock(spec=DatabaseService)
+    db_service.get_guild_limits.return_value = {"max_recording_minutes": 1, "max_concurrent_jobs": None}
+
+    decision = await AdmissionService(db_service, AdmissionPolicy(estimate_seconds=3600)).check(1)
+
+    assert decision.estimate_bytes == 60 * PCM_BYTES_PER_SECOND
+
+
+@pytest.mark.asyncio
+async def test_admitted_estimate_is_pending_until_released():
+    budget = 8 * 1200 * PCM_BYTES_PER_SECOND  # fits eight 20-minute recordings
+    svc = AdmissionService(policy=AdmissionPolicy(memory_budget_bytes=budget, disk_reserve_bytes=0, estimate_seconds=1200))
+
+    decisions = await asyncio.gather(*(svc.check(gid) for gid in range(10)))
+
+    assert [d.admitted for d in decisions] == [True] * 8 + [False] * 2
+    assert decisions[-1].reason == "memory"
+    assert svc.metrics()["pending_bytes"] == budget
+
+    svc.release(decisions[0])
+    svc.release(decisions[0])  # idempotent
+    assert svc.metrics()["pending_bytes"] == 7 * 1200 * PCM_BYTES_PER_SECOND
+    assert (await svc.check(11)).admitted
+
+
+@pytest.mark.asyncio
+async def test_busy_guild_is_queued_and_waits_for_its_slot(policy):
+    svc = AdmissionService(policy=policy)
+    release = asyncio.Event()
+    order = []
+
+    async def job(name):
+        async with svc.job_slot(1):
+            order.append(name)
+            if name == "first":
+                await release.wait()
+
+    first = asyncio.create_task(job("first"))
+    while not order:
+        await asyncio.sleep(0.01)
+    assert (await svc.check(1)).level == AdmissionLevel.QUEUE
+    assert (await svc.check(2)).level == AdmissionLevel.ADMIT  # other guilds are unaffected
+
+    second = asyncio.create_task(job("second"))
+    while not svc.metrics()["waiting"]:  # job_slot reads the limits off the loop
+        await asyncio.sleep(0.01)
+    assert order == ["first"]
+    assert svc.metrics()["waiting"] == 1
+    # running + waiting reached max_queue_depth
+    assert (await svc.check(3)).reason == "backlog"
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert order == ["first", "second"]
+    assert svc.queue_depth == 0
@@ -167,4 +167,90 @@ async def test_mix_and_export_empty_data_raises_error():
     svc = AudioService()
     
     with pytest.raises(ValueError, match="sink_audio_data is empty"):
-        await svc.mix_and_export({}, "wav", "output.wav") 
\ No newline at end of file
+        await svc.mix_and_export({}, "wav", "output.wav") 
+
+@pytest.mark.asyncio
+async def test_mix_and_export_process_mode_uses_pool(tmp_path):
+    """With a process pool injected the raw buffers are handed to the pool."""
+    from unittest.mock import AsyncMock
+
+    from services.audio_service import _mix_tracks
+    from utils.audio_process_pool import JobStats
+
+    pool = MagicMock()
+    stats = JobStats(pid=1, wall_seconds=0.1, cpu_seconds=0.05, child_cpu_seconds=0.2, bytes_in=4)
+    pool.run = AsyncMock(return_value=(str(tmp_path / "mix.ogg"), stats))
+
+    sink_data = {7: SimpleNamespace(file=io.BytesIO(b"\x01\x02\x03\x04"))}
+    svc = AudioService(process_pool=pool)
+    result = await svc.mix_and_export(sink_data, "wav", (tmp_path / "mix").as_posix())
+
+    assert result.endswith("mix.ogg")
+    fn, buffers, out = pool.run.await_args.args
+    assert fn is _mix_tracks
+    assert list(buffers) == [7]
+    assert out == (tmp_path / "mix").as_posix()
+    # the BytesIO view must have been released so the buffer can be closed
+    sink_data[7].file.close()
+
+
+@pytest.mark.asyncio
+async def test_export_tracks_encodes_each_user_and_skips_short_tracks(tmp_path):
+    """Per-speaker export: one ffmpeg run per user, no amix, short tracks skipped."""
+    import struct
+
+    def _wav(payload_bytes: int) -> bytes:
+        header = b"RIFF" + struct.pack("<I", 36 + payload_bytes) + b"WAVEfmt "
+        header += struct.pack("<IHHIIHH", 16, 1, 2, 48000, 192000, 4, 16)
+        header += b"data" + struct.pack("<I", payload_bytes)
+        return header + b"\x00" * payload_bytes
+
+    sink_data = {
+        1: SimpleNamespace(file=io.BytesIO(_wav(192000))),  # 1 s
+        2: SimpleNamespace(file=io.BytesIO(_wav(1920))),  # 10 ms
+    }
+
+    with patch("services.audio_service.subprocess.run") as mock_run:
+        svc = AudioService()
+        paths = await svc.export_tracks(sink_data, "wav", (tmp_path / "rec").as_posix())
+
+    assert list(paths) == [1]
+    assert paths[1].endswith("user_1.ogg")
+    mock_run.assert_called_once()
+    assert "-filter_complex" not in mock_run.call_args[0][0]
+
+
+def test_mix_timeline_places_runs_at_their_wall_clock_position(tmp_path):
+    import wave
+
+    import numpy as np
+
+    from services.audio_service import _mix_timeline
+    from utils.timeline import WAV_HEADER_BYTES, SparseTimeline
+
+    timeline = SparseTimeline(sample_rate=1000, channels=1, sample_width=2)
+    header = b"\x00" * WAV_HEADER_BYTES
+    # user 1 speaks 0.0-0.1 s, user 2 speaks 0.05-0.15 s and again at 0.3 s
+    tracks = {
+        1: header + np.full(100, 1000, "<i2").tobytes(),
+        2: header + np.full(150, 10, "<i2").tobytes(),
+    }
+    timeline.append(1, 0.0, 0, 200)
+    timeline.append(2, 0.05, 0, 200)
+    timeline.append(2, 0.3, 200, 100)
+
+    captured = {}
+
+    def fake_encode(in_path, out_path):
+        with wave.open(str(in_path)) as wav:
+            captured["pcm"] = np.frombuffer(wav.readframes(wav.getnframes()), "<i2")
+        out_path.write_bytes(b"\x00" * 2048)
+
+    with patch("services.audio_service._encode_opus", side_effect=fake_encode):
+        result = _mix_timeline(tracks, timeline, (tmp_path / "mix.wav").as_posix())
+
+    assert result.endswith(".ogg")
+    pcm = captured["pcm"]
+    assert len(pcm) == 350
+    assert pcm[0] == 1000 and pcm[60] == 1010 and pcm[120] == 10
+    assert pcm[200] == 0 and pcm[320] == 10
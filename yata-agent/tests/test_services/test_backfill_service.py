@@ -0,0 +1,93 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from unittest.mock import AsyncMock
+
+from services.backfill_service import (
+    BackfillManifest,
+    BackfillService,
+    ProgressDisplay,
+    discover,
+    parse_recording_name,
+)
+
+
+def _touch(path, data=b"x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_discover_prefers_encoded_ogg(tmp_path):
+    ogg = _touch(tmp_path / "recording_1_20250101_100000.ogg")
+    _touch(tmp_path / "recording_1_20250101_100000.wav")
+    wav = _touch(tmp_path / "sub" / "recording_2_20250102_100000.wav")
+    _touch(tmp_path / "notes.txt")
+
+    assert discover([str(tmp_path)]) == sorted([ogg.resolve(), wav.resolve()])
+    assert discover([str(tmp_path / "sub" / "*.wav")]) == [wav.resolve()]
+
+
+def test_parse_recording_name():
+    guild_id, recorded_at = parse_recording_name(
+        Path("recording_42_20250301_093000.ogg")
+    )
+    assert guild_id == 42
+    assert recorded_at.strftime("%Y-%m-%d %H:%M") == "2025-03-01 09:30"
+    assert parse_recording_name(Path("meeting.ogg")) == (None, None)
+
+
+@pytest.mark.asyncio
+async def test_run_processes_resumes_and_reports(tmp_path):
+    first = _touch(tmp_path / "recording_1_20250101_100000.ogg", b"a" * 1500)
+    second = _touch(tmp_path / "other.ogg", b"b" * 3000)
+    processing = AsyncMock()
+    processing.process.return_value = "https://docs.google.com/document/d/x/edit"
+    manifest_path = tmp_path / "manifest.json"
+
+    service = BackfillService(processing, BackfillManifest(manifest_path), parallel=2, guild_id=9)
+    stream = io.StringIO()
+    display = ProgressDisplay(stream)
+    report = await service.run([first, second], on_progress=display.update)
+
+    assert report.done == 2 and report.failed == 0
+    processing.process.assert_any_await(1, str(first), "Meeting Minutes 2025-01-01 10:00")
+    assert sorted(call.args[0] for call in processing.process.await_args_list) == [1, 9]
+    assert "[2/2]" in stream.getvalue()
+    assert report.as_dict()["audio_seconds"] == pytest.approx(3.0)
+
+    entries = json.loads(manifest_path.read_text())["files"]
+    assert entries[str(first)]["status"] == "done"
+
+    # A re-run skips finished files; changed content is processed again
+    second.write_bytes(b"c" * 3000)
+    rerun = await BackfillService(processing, BackfillManifest(manifest_path)).run([first, second])
+    assert (rerun.skipped, rerun.done) == (1, 0)
+    assert rerun.failed == 1  # other.ogg has no guild id without --guild-id
+
+
+async def test_wav_is_not_processed_again_after_encoding(tmp_path):
+    """WAV は隣に .ogg を書き出すが、次回の実行でその .ogg を再処理しない。"""
+    wav = _touch(tmp_path / "recording_1_20250101_100000.wav", b"w" * 2000)
+
+    async def encode_file(in_path, out_path):
+        return _touch(Path(out_path).with_suffix(".ogg"), b"o" * 500).as_posix()
+
+    audio_service = AsyncMock()
+    audio_service.encode_file.side_effect = encode_file
+    processing = AsyncMock()
+    processing.process.return_value = "https://docs.google.com/document/d/x/edit"
+    manifest_path = tmp_path / "manifest.json"
+
+    first = await BackfillService(processing, BackfillManifest(manifest_path), audio_service).run(
+        discover([str(tmp_path)])
+    )
+    second = await BackfillService(processing, BackfillManifest(manifest_path), audio_service).run(
+        discover([str(tmp_path)])
+    )
+
+    assert discover([str(tmp_path)]) == [wav.with_suffix(".ogg").resolve()]
+    assert (first.done, second.done, second.skipped) == (1, 0, 1)
+    processing.process.assert_awaited_once()
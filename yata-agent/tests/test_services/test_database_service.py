@@ -19,6 +19,7 @@ class MockDatabase(DatabaseInterface):
     def __init__(self):
         self._servers: Dict[int, Dict[str, Any]] = {}
         self._credentials: Dict[int, Dict[str, Any]] = {}
+        self._limits: Dict[int, Dict[str, Any]] = {}
 
     def get_server_settings(self, guild_id: int) -> Optional[Dict[str, Any]]:
         return self._servers.get(guild_id)
@@ -41,11 +42,24 @@ class MockDatabase(DatabaseInterface):
             raise ValueError("Foreign key constraint failed")
         self._credentials[guild_id] = token_dict
 
+    def get_guild_limits(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        return self._limits.get(guild_id)
+
+    def upsert_guild_limits(self, guild_id: int, max_recording_minutes: Optional[int], max_concurrent_jobs: Optional[int] = None):
+        if guild_id not in self._servers:
+            raise ValueError("Foreign key constraint failed")
+        self._limits[guild_id] = {
+            "guild_id": guild_id,
+            "max_recording_minutes": max_recording_minutes,
+            "max_concurrent_jobs": max_concurrent_jobs,
+        }
+
     def delete_server_data(self, guild_id: int):
         if guild_id in self._servers:
             del self._servers[guild_id]
         if guild_id in self._credentials:
             del self._credentials[guild_id]
+        self._limits.pop(guild_id, None)
 
 # --- テスト本体 ---
 @pytest.fixture
@@ -117,3 +131,15 @@ class TestDatabaseService:
         # 削除されたことを確認
         assert db_service.get_server_settings(guild_id) is None
         assert db_service.get_credentials(guild_id) is None
+
+    def test_get_and_upsert_guild_limits(self, db_service: DatabaseService):
+        """録音上限設定の登録と取得をテストする。"""
+        guild_id = 123
+        db_service.upsert_server_settings(guild_id, 456, "folder_abc", "en")
+        assert db_service.get_guild_limits(guild_id) is None
+
+        db_service.upsert_guild_limits(guild_id, 90)
+
+        limits = db_service.get_guild_limits(guild_id)
+        assert limits is not None
+        assert limits["max_recording_minutes"] == 90
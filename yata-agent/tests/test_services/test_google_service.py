@@ -43,7 +43,7 @@ class TestGoogleService:
         mock_flow = MagicMock()
         mock_flow.authorization_url.return_value = ("https://example.com/auth", "test_state")
         
-        with patch(f"{SERVICE_PATH}.Flow.from_client_config", return_value=mock_flow) as mock_from_config:
+        with patch(f"{SERVICE_PATH}.oauth_flow.Flow.from_client_config", return_value=mock_flow) as mock_from_config:
             client_secrets_dict = {"web": {"client_id": "test"}}
             service = GoogleService(
                 db_service=mock_db_interface,
@@ -89,7 +89,7 @@ class TestGoogleService:
         mock_flow.credentials = mock_creds
 
         # from_client_secrets_file がモックフローを返すように設定
-        with patch(f"{SERVICE_PATH}.Flow.from_client_config", return_value=mock_flow) as mock_from_config:
+        with patch(f"{SERVICE_PATH}.oauth_flow.Flow.from_client_config", return_value=mock_flow) as mock_from_config:
             service = GoogleService(
                 db_service=mock_db_interface,
                 client_secrets_json='{"web": {}}',
@@ -169,8 +169,8 @@ class TestGoogleService:
             return MagicMock()
         
         # build自体は関数なので、MagicMockでパッチする
-        with patch(f"{SERVICE_PATH}.Credentials.from_authorized_user_info", return_value=mock_creds), \
-             patch(f"{SERVICE_PATH}.build", side_effect=build_side_effect) as mock_build:
+        with patch(f"{SERVICE_PATH}.oauth2_credentials.Credentials.from_authorized_user_info", return_value=mock_creds), \
+             patch(f"{SERVICE_PATH}.discovery.build", side_effect=build_side_effect) as mock_build:
             
             service = GoogleService(db_service=mock_db_interface, client_secrets_json='{}', redirect_uri='')
             
@@ -187,4 +187,50 @@ class TestGoogleService:
                 fileId=doc_id, addParents=folder_id, removeParents="old_parent_id"
             )
             # 戻り値が正しいか
-            assert result_url == doc_url 
\ No newline at end of file
+            assert result_url == doc_url 
+
+    @pytest.mark.asyncio
+    async def test_update_document_replaces_body_in_one_batch_update(self, mock_db_interface: MagicMock):
+        """既知の本文を置き換える場合は documents.get を呼ばず batchUpdate 1 回で済む。"""
+        mock_db_interface.get_credentials.return_value = '{"token": "dummy"}'
+        mock_docs_service = MagicMock()
+        docs_resource = mock_docs_service.documents.return_value
+
+        with patch(f"{SERVICE_PATH}.oauth2_credentials.Credentials.from_authorized_user_info", return_value=MagicMock()), \
+             patch(f"{SERVICE_PATH}.discovery.build", return_value=mock_docs_service):
+            service = GoogleService(db_service=mock_db_interface, client_secrets_json='{}', redirect_uri='')
+            await service.update_document(
+                123,
+                "https://docs.google.com/document/d/doc123/edit",
+                "# 議事録",
+                previous_content="raw 😀",  # 絵文字は UTF-16 で 2 単位
+            )
+
+        docs_resource.get.assert_not_called()
+        docs_resource.batchUpdate.assert_called_once_with(
+            documentId="doc123",
+            body={
+                "requests": [
+                    {"deleteContentRange": {"range": {"startIndex": 1, "endIndex": 7}}},
+                    {"insertText": {"location": {"index": 1}, "text": "# 議事録"}},
+                ]
+            },
+        )
+
+    @pytest.mark.asyncio
+    async def test_update_document_times_out_with_the_job_deadline(self, mock_db_interface: MagicMock):
+        """処理の期限が残り時間として Google API の HTTP タイムアウトになる。"""
+        from utils.deadline import deadline_scope
+
+        mock_db_interface.get_credentials.return_value = '{"token": "dummy"}'
+
+        with patch(f"{SERVICE_PATH}.oauth2_credentials.Credentials.from_authorized_user_info", return_value=MagicMock()), \
+             patch(f"{SERVICE_PATH}.discovery.build", return_value=MagicMock()) as mock_build:
+            service = GoogleService(db_service=mock_db_interface, client_secrets_json='{}', redirect_uri='')
+            with deadline_scope(600):
+                await service.update_document(
+                    123, "https://docs.google.com/document/d/doc123/edit", "# 議事録", previous_content=""
+                )
+
+        http = mock_build.call_args.kwargs["http"]
+        assert 590 < http.http.timeout <= 600
@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from data.job_queue import JobQueue
+from services.job_delivery import JobDeliveryService
+from services.job_worker import JobWorker
+from services.queued_processing import QueuedProcessingService, reply_channel
+
+
+class _FakeProcessing:
+    async def process(self, guild_id, audio_file_path, title):
+        return f"https://docs/{guild_id}"
+
+
+def _bot(channel):
+    """``get_channel`` が指定のチャンネル (ID 42) だけを返すボット。"""
+    return SimpleNamespace(get_channel=lambda channel_id: channel if channel_id == 42 else None)
+
+
+async def _run_worker(db):
+    worker = JobWorker(JobQueue(db), _FakeProcessing(), "w1", poll_interval=0.05)
+    running = asyncio.create_task(worker.run())
+    while worker.metrics()["completed"] == 0:
+        await asyncio.sleep(0.01)
+    worker.stop()
+    await running
+
+
+async def test_handed_off_meeting_is_processed_and_posted_once(tmp_path):
+    """シャードごとのボットが 2 つあっても、結果の投稿は 1 回だけ。"""
+    db = str(tmp_path / "jobs.db")
+    channel = SimpleNamespace(send=AsyncMock())
+    first = JobDeliveryService(JobQueue(db), _bot(channel))
+    second = JobDeliveryService(JobQueue(db), _bot(channel))
+
+    await first.hand_off(7, 42, "process", {"audio_file_path": "m.ogg", "title": "t"})
+    await _run_worker(db)
+
+    assert await first.deliver_once() + await second.deliver_once() == 1
+    (content,) = channel.send.await_args.args
+    assert "https://docs/7" in content
+    assert await first.deliver_once() == 0
+
+
+async def test_result_of_an_exited_bot_is_posted_by_the_next_one(tmp_path):
+    """待っていたボットが終了しても、ジョブの結果は元のチャンネルに届く。"""
+    db = str(tmp_path / "jobs.db")
+    bot_side = QueuedProcessingService(JobQueue(db), poll_interval=5)
+
+    async def meeting():
+        reply_channel.set(42)
+        return await bot_side.process(7, "m.ogg", "t")
+
+    waiting = asyncio.create_task(meeting())
+    while not bot_side.waiting_job_ids():
+        await asyncio.sleep(0.01)
+    channel = SimpleNamespace(send=AsyncMock())
+    delivery = JobDeliveryService(JobQueue(db), _bot(channel), exclude=bot_side.waiting_job_ids)
+    await _run_worker(db)
+
+    # Still awaited in this process: the cog posts it
+    assert await delivery.deliver_once() == 0
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+
+    assert await delivery.deliver_once() == 1
+    assert "https://docs/7" in channel.send.await_args.args[0]
@@ -0,0 +1,24 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from services.processing_scheduler import ProcessingScheduler
+from services.processing_service import ProcessingService
+from utils.fair_scheduler import FairScheduler
+
+
+@pytest.mark.asyncio
+async def test_process_is_submitted_with_audio_length_as_cost(tmp_path):
+    path = tmp_path / "a.ogg"
+    path.write_bytes(b"\x00" * 1500 * 10)
+    processing_service = AsyncMock(spec=ProcessingService)
+    processing_service.process.return_value = "https://docs"
+    scheduler = FairScheduler(concurrency=1, quantum=600)
+    scheduler.submit = AsyncMock(wraps=scheduler.submit)
+
+    url = await ProcessingScheduler(processing_service, scheduler).process(1, str(path), "t")
+
+    assert url == "https://docs"
+    processing_service.process.assert_awaited_once_with(1, str(path), "t")
+    assert scheduler.submit.await_args.args[:2] == (1, 10)
+    assert scheduler.metrics()["guilds"]["1"]["completed"] == 1
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -68,6 +69,29 @@ class TestProcessingService:
             guild_id, title, formatted_text
         )
 
+    @pytest.mark.asyncio
+    async def test_process_does_not_log_meeting_content(
+        self, mock_transcription_service, mock_google_service, mock_db_service, caplog
+    ):
+        """書き起こしや議事録の本文はログに出さず、所要時間を構造化フィールドで残す。"""
+        mock_db_service.get_server_settings.return_value = {"language": "ja"}
+        mock_transcription_service.transcribe.return_value = "社外秘の買収計画について議論した"
+        mock_google_service.upload_document.return_value = "https://docs"
+
+        with patch(
+            "services.processing_service.format_meeting_minutes", return_value="# 議事録 社外秘の買収計画"
+        ), caplog.at_level("INFO"):
+            service = ProcessingService(
+                transcription_service=mock_transcription_service,
+                google_service=mock_google_service,
+                db_service=mock_db_service,
+            )
+            await service.process(guild_id=1, audio_file_path="/tmp/audio.wav", title="t")
+
+        assert "社外秘" not in caplog.text
+        timed = [r for r in caplog.records if hasattr(r, "duration_ms")]
+        assert {r.getMessage().split(" ")[0] for r in timed} >= {"Transcribed", "Formatted", "Uploaded"}
+
     @pytest.mark.asyncio
     async def test_process_formatter_returns_none(self, mock_transcription_service, mock_google_service, mock_db_service):
         """フォーマッタが None を返した場合は元の書き起こしを使用する。"""
@@ -93,4 +117,184 @@ class TestProcessingService:
         assert url == expected_url
         mock_google_service.upload_document.assert_awaited_once_with(
             guild_id, title, transcript_text
-        ) 
\ No newline at end of file
+        ) 
+    @pytest.mark.asyncio
+    async def test_process_speakers_interleaves_and_uploads(self, mock_transcription_service, mock_google_service, mock_db_service):
+        """話者別トラックを並列に文字起こしし、話者ラベル付きで時系列に並べる。"""
+        from services.transcription_service_interface import TranscriptSegment
+
+        mock_db_service.get_server_settings.return_value = {"language": "ja"}
+        by_path = {
+            "/a.ogg": [TranscriptSegment(0.0, 1.0, "hello"), TranscriptSegment(9.0, 10.0, "bye")],
+            "/b.ogg": [TranscriptSegment(4.0, 5.0, "hi")],
+        }
+        mock_transcription_service.transcribe_segments.side_effect = lambda path, lang: by_path[path]
+        mock_google_service.upload_document.return_value = "https://docs"
+
+        with patch("services.processing_service.format_meeting_minutes", return_value=None) as mock_formatter:
+            service = ProcessingService(mock_transcription_service, mock_google_service, mock_db_service)
+            url = await service.process_speakers(
+                7, {1: "/a.ogg", 2: "/b.ogg"}, {1: "Alice", 2: "Bob"}, "title"
+            )
+
+        assert url == "https://docs"
+        mock_transcription_service.transcribe.assert_not_awaited()
+        assert mock_transcription_service.transcribe_segments.await_count == 2
+        transcript = mock_formatter.call_args.args[0]
+        assert transcript.splitlines() == [
+            "[00:00:00] Alice: hello",
+            "[00:00:04] Bob: hi",
+            "[00:00:09] Alice: bye",
+        ]
+        mock_google_service.upload_document.assert_awaited_once_with(7, "title", transcript)
+
+    @pytest.mark.asyncio
+    async def test_process_speakers_tolerates_partial_failure(self, mock_transcription_service, mock_google_service, mock_db_service):
+        """一部話者の文字起こし失敗は無視し、全員失敗時のみ例外を伝搬する。"""
+        from services.transcription_service_interface import TranscriptSegment
+
+        mock_db_service.get_server_settings.return_value = None
+
+        async def _segments(path, lang):
+            if path == "/bad.ogg":
+                raise RuntimeError("api down")
+            return [TranscriptSegment(0.0, 1.0, "ok")]
+
+        mock_transcription_service.transcribe_segments.side_effect = _segments
+        mock_google_service.upload_document.return_value = "https://docs"
+
+        with patch("services.processing_service.format_meeting_minutes", return_value=None):
+            service = ProcessingService(mock_transcription_service, mock_google_service, mock_db_service)
+            await service.process_speakers(1, {1: "/ok.ogg", 2: "/bad.ogg"}, {1: "A"}, "t")
+            with pytest.raises(RuntimeError, match="api down"):
+                await service.process_speakers(1, {2: "/bad.ogg"}, {}, "t")
+
+    @pytest.mark.asyncio
+    async def test_deadline_uploads_raw_transcript_and_patches_later(self, mock_transcription_service, mock_google_service, mock_db_service):
+        """締め切りまでに整形が終わらなければ元文を先にアップロードし、後で置き換える。"""
+        import threading
+
+        url = "https://docs.google.com/document/d/abc/edit"
+        mock_db_service.get_server_settings.return_value = {"language": "ja"}
+        mock_transcription_service.transcribe.return_value = "raw transcript"
+        mock_google_service.upload_document.return_value = url
+        release = threading.Event()
+
+        def slow_formatter(transcript, **kwargs):
+            release.wait(5)
+            return "formatted minutes"
+
+        with patch("services.processing_service.format_meeting_minutes", side_effect=slow_formatter):
+            service = ProcessingService(
+                transcription_service=mock_transcription_service,
+                google_service=mock_google_service,
+                db_service=mock_db_service,
+                deadline_seconds=0.05,
+            )
+            result_url = await service.process(123, "/tmp/audio.wav", "Title")
+
+            assert result_url == url
+            mock_google_service.upload_document.assert_awaited_once_with(123, "Title", "raw transcript")
+            assert service.metrics()["deadline_misses"] == 1
+
+            release.set()
+            await asyncio.gather(*service._background)
+
+        mock_google_service.update_document.assert_awaited_once_with(
+            123, url, "formatted minutes", previous_content="raw transcript"
+        )
+        assert service.metrics()["late_patches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_publish_raw_first_returns_link_before_formatting(self, mock_transcription_service, mock_google_service, mock_db_service):
+        """publish_raw_first では整形を待たずに元文の URL を返し、後で議事録に置き換える。"""
+        url = "https://docs.google.com/document/d/abc/edit"
+        mock_db_service.get_server_settings.return_value = {"language": "ja"}
+        mock_transcription_service.transcribe.return_value = "raw transcript"
+        mock_google_service.upload_document.return_value = url
+
+        with patch("services.processing_service.format_meeting_minutes", return_value="formatted minutes"):
+            service = ProcessingService(
+                transcription_service=mock_transcription_service,
+                google_service=mock_google_service,
+                db_service=mock_db_service,
+                publish_raw_first=True,
+            )
+            assert await service.process(123, "/tmp/audio.wav", "Title") == url
+            mock_google_service.upload_document.assert_awaited_once_with(123, "Title", "raw transcript")
+            # Shutdown waits for the late patch instead of dropping it
+            await asyncio.wait_for(service.drain_background(), timeout=1)
+            assert service.metrics()["patches_pending"] == 0
+
+        mock_google_service.update_document.assert_awaited_once_with(
+            123, url, "formatted minutes", previous_content="raw transcript"
+        )
+
+    @pytest.mark.asyncio
+    async def test_hedged_formatting_uses_the_cancellable_async_client(self, mock_transcription_service, mock_google_service, mock_db_service):
+        """ヘッジは非同期版の整形関数で行い、遅い 1 本目はキャンセルされる。"""
+        from utils.hedging import HedgePolicy, Hedger
+
+        mock_db_service.get_server_settings.return_value = {"language": "ja"}
+        mock_transcription_service.transcribe.return_value = "raw transcript"
+        mock_google_service.upload_document.return_value = "https://docs/1"
+        cancelled = []
+
+        async def formatter(transcript, **kwargs):
+            first = formatter.calls == 0
+            formatter.calls += 1
+            try:
+                await asyncio.sleep(5 if first else 0)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return "formatted minutes"
+
+        formatter.calls = 0
+        with patch("services.processing_service.format_meeting_minutes") as blocking, patch(
+            "services.processing_service.format_meeting_minutes_async", side_effect=formatter
+        ):
+            service = ProcessingService(
+                transcription_service=mock_transcription_service,
+                google_service=mock_google_service,
+                db_service=mock_db_service,
+                formatting_hedger=Hedger("test", HedgePolicy(initial_delay=0.02)),
+            )
+            assert await service.process(123, "/tmp/audio.wav", "Title") == "https://docs/1"
+            await asyncio.sleep(0)
+
+        blocking.assert_not_called()
+        assert cancelled == [True]
+        mock_google_service.upload_document.assert_awaited_once_with(123, "Title", "formatted minutes")
+
+    @pytest.mark.asyncio
+    async def test_requeued_upload_does_not_transcribe_again(self, mock_transcription_service, mock_google_service, mock_db_service):
+        """ブレーカーで止まったアップロードは、再キュー後にアップロードだけやり直す。"""
+        from utils.circuit_breaker import CircuitOpenError
+        from utils.fair_scheduler import FairScheduler
+
+        mock_db_service.get_server_settings.return_value = {"language": "ja"}
+        mock_transcription_service.transcribe.return_value = "raw transcript"
+        mock_google_service.upload_document.side_effect = [
+            CircuitOpenError("google-docs", 0),
+            CircuitOpenError("google-docs", 0),
+            CircuitOpenError("google-docs", 0),
+            "https://docs/1",
+        ]
+        scheduler = FairScheduler(concurrency=1, requeue_on=(CircuitOpenError,))
+
+        with patch("services.processing_service.format_meeting_minutes", return_value="formatted minutes") as formatter:
+            service = ProcessingService(
+                transcription_service=mock_transcription_service,
+                google_service=mock_google_service,
+                db_service=mock_db_service,
+            )
+            url = await asyncio.wait_for(
+                scheduler.submit(123, 1, lambda: service.process(123, "/tmp/audio.wav", "Title")), 1
+            )
+
+        assert url == "https://docs/1"
+        assert scheduler.metrics()["guilds"]["123"]["requeued"] == 1
+        mock_transcription_service.transcribe.assert_awaited_once()
+        formatter.assert_called_once()
+        mock_google_service.upload_document.assert_awaited_with(123, "Title", "formatted minutes")
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from loadtest.fakes import FakeDatabaseService, FakeFormatter, FakeGoogleService, FakeTranscriptionService, LatencyModel
+from services.processing_service import ProcessingService
+from services.profiling_service import ProfilingService
+
+
+def test_arm_and_claim_count_down():
+    """予約した件数だけ claim が True を返す。"""
+    service = ProfilingService(guild_ids=[5])
+
+    assert service.arm(1, 2) == 2
+    assert service.claim(1) is True
+    assert service.remaining(1) == 1
+    assert service.claim(1) is True
+    assert service.claim(1) is False
+    # 常時対象のサーバーは予約を消費しない
+    assert service.claim(5) is True
+    assert service.metrics()["armed"] == {}
+
+    service.arm(2, 3)
+    assert service.arm(2, 0) == 0
+    assert service.claim(2) is False
+
+
+@pytest.mark.asyncio
+async def test_unclaimed_job_is_not_profiled(tmp_path):
+    service = ProfilingService()
+
+    async with service.job(1, tmp_path / "meeting") as profile:
+        assert profile is None
+
+    assert list(tmp_path.iterdir()) == []
+    assert service.metrics()["profiled"] == 0
+
+
+@pytest.mark.asyncio
+async def test_job_saves_artifacts_with_processing_spans(tmp_path):
+    """プロファイル対象ジョブでは処理の各段階がスパンとして保存される。"""
+    audio = tmp_path / "meeting.ogg"
+    audio.write_bytes(b"\0" * 4000)
+    no_latency = LatencyModel(median=0.0, p95=0.0)
+    processing = ProcessingService(
+        FakeTranscriptionService(no_latency, seed=0),
+        FakeGoogleService(no_latency, seed=0),
+        FakeDatabaseService(),
+        formatter=FakeFormatter(no_latency, seed=0),
+        publish_raw_first=False,
+    )
+    service = ProfilingService(interval=0.001)
+    service.arm(1, 1)
+
+    async with service.job(1, tmp_path / "meeting") as profile:
+        assert profile is not None
+        await processing.process(1, str(audio), "Meeting Minutes")
+
+    assert (tmp_path / "meeting.folded").exists()
+    trace = json.loads((tmp_path / "meeting.trace.json").read_text(encoding="utf-8"))
+    names = {e["name"] for e in trace["traceEvents"] if e["ph"] == "X"}
+    assert {"job", "processing.process", "processing.transcribe", "processing.format", "processing.upload"} <= names
+    metrics = service.metrics()
+    assert metrics["profiled"] == 1
+    assert metrics["recent"][0]["guild_id"] == 1
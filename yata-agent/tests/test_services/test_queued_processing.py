@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from data.job_queue import JobQueue
+from services.job_worker import JobWorker
+from services.queued_processing import JobFailedError, QueuedProcessingService
+from utils.ipc import IPCClient, IPCHub
+from utils.timeline import SparseTimeline
+
+
+class _FakeProcessing:
+    """ProcessingService の代わり。呼び出しを記録して URL を返す。"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def process(self, guild_id, audio_file_path, title):
+        self.calls.append(("process", guild_id, audio_file_path, title))
+        if audio_file_path == "broken.ogg":
+            raise RuntimeError("transcription failed")
+        return f"https://docs/{guild_id}"
+
+    async def process_speakers(self, guild_id, track_paths, speaker_names, title, timeline=None):
+        self.calls.append(("process_speakers", guild_id, track_paths, speaker_names, timeline))
+        return "https://docs/speakers"
+
+
+@pytest.fixture
+async def split_roles(tmp_path):
+    """ボット側とワーカー側を、別々の接続と IPC で同じループ上に組み立てる。"""
+    db = str(tmp_path / "jobs.db")
+    hub = IPCHub(tmp_path / "ipc.sock")
+    bot_side = QueuedProcessingService(JobQueue(db), ipc=hub, poll_interval=5)
+    hub.on_message = bot_side.on_message
+    await hub.start()
+
+    processing = _FakeProcessing()
+    client = IPCClient(hub.path)
+    worker = JobWorker(JobQueue(db), processing, "w1", ipc=client, poll_interval=5)
+    client.on_message = worker.on_message
+    client.on_connect = worker.wake
+    client.start()
+    running = asyncio.create_task(worker.run())
+    while hub.metrics()["peers"] == 0:
+        await asyncio.sleep(0.01)
+
+    yield bot_side, worker, processing
+
+    worker.stop()
+    await running
+    await client.close()
+    await hub.close()
+
+
+async def test_bot_receives_the_workers_result_over_ipc(split_roles):
+    """ジョブは IPC で通知され、ポーリング間隔 (5 秒) を待たずに結果が返る。"""
+    bot_side, worker, processing = split_roles
+
+    url = await asyncio.wait_for(bot_side.process(7, "meeting.ogg", "Minutes"), timeout=2)
+
+    assert url == "https://docs/7"
+    assert processing.calls == [("process", 7, "meeting.ogg", "Minutes")]
+    assert worker.metrics()["completed"] == 1
+
+
+async def test_speaker_jobs_carry_the_timeline(split_roles):
+    bot_side, _, processing = split_roles
+    timeline = SparseTimeline()
+    timeline.append(1, 0.0, 0, 3840)
+
+    url = await asyncio.wait_for(
+        bot_side.process_speakers(7, {1: "a.ogg"}, {1: "Alice"}, "Minutes", timeline=timeline),
+        timeout=2,
+    )
+
+    assert url == "https://docs/speakers"
+    _, _, tracks, names, sent_timeline = processing.calls[0]
+    assert tracks == {1: "a.ogg"} and names == {1: "Alice"}
+    assert sent_timeline.users() == [1]
+
+
+async def test_worker_failure_is_raised_to_the_bot(split_roles):
+    bot_side, worker, _ = split_roles
+
+    with pytest.raises(JobFailedError, match="RuntimeError: transcription failed"):
+        await asyncio.wait_for(bot_side.process(7, "broken.ogg", "Minutes"), timeout=2)
+    assert bot_side.metrics()["failed"] == 1
+    assert worker.metrics()["failed"] == 1
+
+
+async def test_polling_works_without_ipc(tmp_path):
+    """IPC がなくても、ワーカーとボットはキューのポーリングで進む。"""
+    db = str(tmp_path / "jobs.db")
+    bot_side = QueuedProcessingService(JobQueue(db), poll_interval=0.05)
+    worker = JobWorker(JobQueue(db), _FakeProcessing(), "w1", poll_interval=0.05)
+    running = asyncio.create_task(worker.run())
+    try:
+        assert await asyncio.wait_for(bot_side.process(3, "m.ogg", "t"), timeout=2) == "https://docs/3"
+    finally:
+        worker.stop()
+        await running
+
+
+async def test_secondary_shard_process_joins_the_primary_hub(split_roles, tmp_path):
+    """シャードを分割した 2 つ目のボットも、ハブ経由でワーカーと通知をやり取りする。"""
+    primary, worker, processing = split_roles
+    client = IPCClient(tmp_path / "ipc.sock")
+    secondary = QueuedProcessingService(JobQueue(str(tmp_path / "jobs.db")), ipc=client, poll_interval=5)
+    client.on_message = secondary.on_message
+    client.start()
+    try:
+        while not client.connected:
+            await asyncio.sleep(0.01)
+
+        urls = await asyncio.wait_for(
+            asyncio.gather(primary.process(1, "a.ogg", "A"), secondary.process(2, "b.ogg", "B")),
+            timeout=2,
+        )
+    finally:
+        await client.close()
+
+    assert urls == ["https://docs/1", "https://docs/2"]
+    assert worker.metrics()["completed"] == 2
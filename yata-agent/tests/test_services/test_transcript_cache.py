@@ -0,0 +1,71 @@
+import os
+import time
+
+import pytest
+from unittest.mock import AsyncMock
+
+from services.transcript_cache import CachedTranscriptionService
+from services.transcription_service_interface import (
+    TranscriptionServiceInterface,
+    TranscriptSegment,
+)
+
+
+@pytest.mark.asyncio
+async def test_transcripts_are_cached_by_content(tmp_path):
+    inner = AsyncMock(spec=TranscriptionServiceInterface)
+    inner.transcribe.return_value = "こんにちは"
+    inner.transcribe_segments.return_value = [TranscriptSegment(0.0, 1.5, "hi")]
+    audio = tmp_path / "a.ogg"
+    audio.write_bytes(b"audio")
+    copy = tmp_path / "b.ogg"
+    copy.write_bytes(b"audio")
+
+    service = CachedTranscriptionService(inner, tmp_path / "cache")
+    assert not await service.contains(str(audio), "ja")
+    assert await service.transcribe(str(audio), "ja") == "こんにちは"
+    # Same content under another name is a hit; another language is not
+    assert await service.transcribe(str(copy), "ja") == "こんにちは"
+    assert await service.contains(str(copy), "ja")
+    await service.transcribe(str(audio), "en")
+    assert inner.transcribe.await_count == 2
+
+    assert await service.transcribe_segments(str(audio), "ja") == [TranscriptSegment(0.0, 1.5, "hi")]
+    assert await service.transcribe_segments(str(copy), "ja") == [TranscriptSegment(0.0, 1.5, "hi")]
+    inner.transcribe_segments.assert_awaited_once()
+    assert service.metrics() == {"hits": 2, "misses": 3, "evicted": 0}
+
+
+@pytest.mark.asyncio
+async def test_missing_file_raises(tmp_path):
+    service = CachedTranscriptionService(AsyncMock(spec=TranscriptionServiceInterface), tmp_path)
+    with pytest.raises(FileNotFoundError):
+        await service.transcribe(str(tmp_path / "missing.ogg"), "ja")
+
+
+@pytest.mark.asyncio
+async def test_old_and_excess_entries_are_evicted(tmp_path):
+    inner = AsyncMock(spec=TranscriptionServiceInterface)
+    inner.transcribe.return_value = "x" * 100
+    cache = tmp_path / "cache"
+    service = CachedTranscriptionService(inner, cache, max_age_seconds=3600, max_bytes=250)
+    paths = []
+    for i in range(3):
+        audio = tmp_path / f"{i}.ogg"
+        audio.write_bytes(bytes([i]))
+        paths.append(str(audio))
+        await service.transcribe(str(audio), "ja")
+        # Make the entries distinguishable by last use
+        for n, entry in enumerate(sorted(cache.glob("*.json"), key=os.path.getmtime)):
+            os.utime(entry, (1_000 + n, time.time() - 60 + n))
+
+    # Over 250 bytes: the least recently used entry went first
+    assert len(list(cache.glob("*.json"))) == 2
+    assert not await service.contains(paths[0], "ja")
+    assert await service.contains(paths[2], "ja")
+
+    for entry in cache.glob("*.json"):
+        os.utime(entry, (0, time.time() - 7200))
+    CachedTranscriptionService(inner, cache, max_age_seconds=3600)
+    assert list(cache.glob("*.json")) == []
+    assert service.metrics()["evicted"] == 1
@@ -102,4 +102,75 @@ class TestTranscriptionService:
             
             # APIErrorがそのまま送出されることを確認
             with pytest.raises(APIError):
-                await service.transcribe(audio_path, "ja") 
\ No newline at end of file
+                await service.transcribe(audio_path, "ja") 
+    @pytest.mark.asyncio
+    async def test_transcribe_segments_requests_timestamps(self, mock_openai_client: MagicMock):
+        """区間タイムスタンプを要求し、TranscriptSegment のリストに変換する。"""
+        from services.transcription_service_interface import TranscriptSegment
+
+        response = MagicMock()
+        response.segments = [
+            MagicMock(start=3.0, end=4.0, text=" second "),
+            {"start": 0.0, "end": 1.5, "text": "first"},
+            {"start": 5.0, "end": 5.1, "text": "  "},
+        ]
+        mock_openai_client.audio.transcriptions.create.return_value = response
+
+        with patch(f"{SERVICE_PATH}.openai.AsyncOpenAI", return_value=mock_openai_client), \
+             patch("os.path.exists", return_value=True), \
+             patch("builtins.open", mock_open(read_data=b"dummy_audio_data")):
+            service = TranscriptionService(api_key="k")
+            segments = await service.transcribe_segments("/a.ogg", "en")
+
+        kwargs = mock_openai_client.audio.transcriptions.create.call_args.kwargs
+        assert kwargs["response_format"] == "verbose_json"
+        assert kwargs["timestamp_granularities"] == ["segment"]
+        assert segments == [
+            TranscriptSegment(0.0, 1.5, "first"),
+            TranscriptSegment(3.0, 4.0, "second"),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_transcribe_goes_through_shared_rate_limiter(mock_openai_client: MagicMock):
+    """レート制限指定時は SDK の自動リトライを無効にし、制限経由で送信する。"""
+    from utils.rate_limiter import RateLimiter
+
+    limiter = RateLimiter("whisper-1", requests_per_minute=500)
+    mock_openai_client.audio.transcriptions.create.return_value = MagicMock(text="ok")
+
+    with patch(f"{SERVICE_PATH}.openai.AsyncOpenAI", return_value=mock_openai_client) as mock_constructor, \
+         patch("os.path.exists", return_value=True), \
+         patch("builtins.open", mock_open(read_data=b"dummy_audio_data")):
+        service = TranscriptionService(api_key="key", rate_limiter=limiter)
+        assert await service.transcribe("/fake.ogg", "ja") == "ok"
+
+    assert mock_constructor.call_args.kwargs["max_retries"] == 0
+    assert limiter.metrics()["acquired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_transcribe_reads_audio_off_the_event_loop(mock_openai_client: MagicMock, tmp_path):
+    """音声ファイルはワーカースレッドで読み込み、ファイル名付きで送信する。"""
+    import threading
+
+    audio_path = tmp_path / "meeting.ogg"
+    audio_path.write_bytes(b"dummy_audio_data")
+    loop_thread = threading.get_ident()
+    read_threads = []
+    real_open = open
+
+    def _recording_open(*args, **kwargs):
+        read_threads.append(threading.get_ident())
+        return real_open(*args, **kwargs)
+
+    mock_openai_client.audio.transcriptions.create.return_value = MagicMock(text="ok")
+    with patch(f"{SERVICE_PATH}.openai.AsyncOpenAI", return_value=mock_openai_client), \
+         patch(f"{SERVICE_PATH}.open", _recording_open, create=True):
+        service = TranscriptionService(api_key="k")
+        assert await service.transcribe(str(audio_path), "ja") == "ok"
+
+    sent = mock_openai_client.audio.transcriptions.create.call_args.kwargs["file"]
+    assert sent.name == "meeting.ogg"
+    assert sent.getvalue() == b"dummy_audio_data"
+    assert read_threads and loop_thread not in read_threads
@@ -0,0 +1,38 @@
+import struct
+import wave
+
+from utils.audio_duration import estimate_audio_seconds
+
+
+def _wav(path, seconds, rate=48_000, channels=2):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b"\x00" * int(seconds * rate) * channels * 2)
+
+
+def test_opus_duration_comes_from_the_bitrate(tmp_path):
+    path = tmp_path / "a.ogg"
+    path.write_bytes(b"\x00" * 1500 * 60)  # one minute at 12 kbit/s
+
+    assert estimate_audio_seconds([str(path), str(tmp_path / "missing.ogg")]) == 60
+
+
+def test_wav_duration_comes_from_its_header(tmp_path):
+    path = tmp_path / "a.wav"
+    _wav(path, 2.5)
+
+    assert estimate_audio_seconds([str(path)]) == 2.5
+
+
+def test_truncated_wav_uses_the_bytes_on_disk(tmp_path):
+    path = tmp_path / "crashed.wav"
+    _wav(path, 2)
+    data = bytearray(path.read_bytes())
+    # A crashed writer never patched the data size
+    offset = data.index(b"data")
+    struct.pack_into("<I", data, offset + 4, 0)
+    path.write_bytes(bytes(data[: offset + 8 + 48_000 * 4]))
+
+    assert estimate_audio_seconds([str(path)]) == 1
@@ -0,0 +1,73 @@
+import os
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from utils.audio_process_pool import AudioProcessPool
+
+
+def _describe(views, suffix):
+    """Job run in the worker: report buffer sizes, content and pid."""
+    return {k: (bytes(v[:4]), len(v)) for k, v in views.items()}, os.getpid(), suffix
+
+
+def _fail(views):
+    raise RuntimeError("worker failure")
+
+
+@pytest.fixture(scope="module")
+def pool():
+    p = AudioProcessPool(processes=1, preload=("utils.audio_process_pool",))
+    p.start()
+    yield p
+    p.close()
+
+
+class TestAudioProcessPool:
+    @pytest.mark.asyncio
+    async def test_runs_in_worker_with_shared_buffers(self, pool: AudioProcessPool):
+        payload = bytearray(b"PCM!" + b"\x00" * 4096)
+        (sizes, pid, suffix), stats = await pool.run(
+            _describe, {1: payload, 2: memoryview(b"abcd"), 3: b""}, "x"
+        )
+
+        assert pid != os.getpid()
+        assert suffix == "x"
+        assert sizes == {1: (b"PCM!", len(payload)), 2: (b"abcd", 4), 3: (b"", 0)}
+        assert stats.pid == pid
+        assert stats.bytes_in == len(payload) + 4
+        assert stats.cpu_seconds >= 0 and stats.wall_seconds >= 0
+
+    @pytest.mark.asyncio
+    async def test_segments_are_unlinked(self, pool: AudioProcessPool, monkeypatch):
+        created = []
+        original = SharedMemory.__init__
+
+        def _spy(self, *args, **kwargs):
+            original(self, *args, **kwargs)
+            created.append(self.name)
+
+        monkeypatch.setattr(SharedMemory, "__init__", _spy)
+        await pool.run(_describe, {1: b"data"}, "y")
+        monkeypatch.undo()
+
+        assert created
+        for name in created:
+            with pytest.raises(FileNotFoundError):
+                SharedMemory(name=name)
+
+    @pytest.mark.asyncio
+    async def test_worker_exception_propagates(self, pool: AudioProcessPool):
+        with pytest.raises(RuntimeError, match="worker failure"):
+            await pool.run(_fail, {1: b"data"})
+        assert pool.metrics()["failed"] >= 1
+
+    def test_metrics_shape(self, pool: AudioProcessPool):
+        m = pool.metrics()
+        assert m["processes"] == 1 and m["started"] is True
+
+
+@pytest.mark.asyncio
+async def test_run_requires_a_started_pool():
+    with pytest.raises(RuntimeError, match="start"):
+        await AudioProcessPool(processes=1).run(_describe, {1: b"data"}, "z")
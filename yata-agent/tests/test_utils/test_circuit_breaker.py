@@ -0,0 +1,146 @@
+import httpx
+import openai
+import pytest
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+
+from utils import circuit_breaker as cb
+from utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    hold_while_open,
+    is_google_outage,
+    is_openai_outage,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(cb.time, "monotonic", fake)
+    return fake
+
+
+def _fail():
+    raise ConnectionError("down")
+
+
+def test_opens_after_threshold_and_fails_fast(clock):
+    breaker = CircuitBreaker("dep", failure_threshold=2, recovery_timeout=30)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        _fail()
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call_blocking(flaky)
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.call_blocking(flaky)
+    assert len(calls) == 2  # not called while open
+    assert info.value.retry_after == pytest.approx(30)
+    assert breaker.metrics()["rejected"] == 1
+
+
+def test_half_open_probe_closes_or_reopens(clock):
+    breaker = CircuitBreaker("dep", failure_threshold=1, recovery_timeout=10)
+    with pytest.raises(ConnectionError):
+        breaker.call_blocking(_fail)
+
+    clock.now += 10
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(ConnectionError):
+        breaker.call_blocking(_fail)
+    assert breaker.state == OPEN
+
+    clock.now += 10
+    assert breaker.call_blocking(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+    assert breaker.metrics()["opened"] == 2
+
+
+def test_errors_that_are_not_outages_do_not_trip(clock):
+    breaker = CircuitBreaker("dep", failure_threshold=1, is_failure=lambda e: False)
+    with pytest.raises(ValueError):
+        breaker.call_blocking(lambda: (_ for _ in ()).throw(ValueError("bad request")))
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_async_call_and_hold(clock):
+    breaker = CircuitBreaker("dep", failure_threshold=1, recovery_timeout=5)
+    hold = hold_while_open([breaker, None])
+
+    async def down():
+        raise TimeoutError()
+
+    assert hold() == 0
+    with pytest.raises(TimeoutError):
+        await breaker.call(down)
+    assert hold() == pytest.approx(5)
+    clock.now += 5
+    assert hold() == 0
+
+
+async def test_cancelled_probe_gives_its_slot_back(clock):
+    """A probe cancelled while half-open must not wedge the breaker."""
+    import asyncio
+
+    breaker = CircuitBreaker("dep", failure_threshold=1, recovery_timeout=5)
+    with pytest.raises(ConnectionError):
+        breaker.call_blocking(_fail)
+    clock.now += 5
+
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.sleep(60)
+
+    probe = asyncio.create_task(breaker.call(hang))
+    await started.wait()
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.call_blocking(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_outage_classification():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+    def status_error(code):
+        response = httpx.Response(code, request=request)
+        return openai.APIStatusError("err", response=response, body=None)
+
+    assert is_openai_outage(openai.APIConnectionError(request=request))
+    assert is_openai_outage(status_error(503))
+    assert is_openai_outage(status_error(429))
+    assert not is_openai_outage(status_error(400))
+    assert not is_openai_outage(FileNotFoundError())
+
+    def http_error(code):
+        return HttpError(Response({"status": code}), b"{}")
+
+    wrapped = Exception("Google API Error")
+    wrapped.__cause__ = http_error(500)
+    assert is_google_outage(wrapped)
+    assert not is_google_outage(http_error(403))
+    assert is_google_outage(ConnectionResetError())
+    assert not is_google_outage(ValueError("no credentials"))
@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from utils.command_sync import CommandSyncCache, command_schema_hash, sync_commands_if_changed
+
+
+def _command(name, description="d", contexts=(0, 1, 2)):
+    payload = {"name": name, "description": description, "options": [], "contexts": list(contexts)}
+    return SimpleNamespace(guild_ids=None, to_dict=lambda: dict(payload))
+
+
+def _bot(*commands):
+    return SimpleNamespace(
+        pending_application_commands=list(commands),
+        application_id=1234,
+        sync_commands=AsyncMock(),
+    )
+
+
+def test_schema_hash_ignores_order_but_not_content():
+    base = command_schema_hash([_command("a"), _command("b")], 1)
+
+    assert command_schema_hash([_command("b"), _command("a", contexts=(2, 1, 0))], 1) == base
+    assert command_schema_hash([_command("a", "changed"), _command("b")], 1) != base
+    assert command_schema_hash([_command("a"), _command("b")], 2) != base
+
+
+async def test_sync_is_skipped_while_the_schema_is_unchanged(tmp_path):
+    cache = CommandSyncCache(tmp_path / "command_sync.json")
+    bot = _bot(_command("record_start"))
+
+    assert await sync_commands_if_changed(bot, cache) is True
+    assert await sync_commands_if_changed(bot, cache) is False
+    assert await sync_commands_if_changed(bot, cache, force=True) is True
+
+    bot.pending_application_commands.append(_command("record_stop"))
+    assert await sync_commands_if_changed(bot, cache) is True
+    assert bot.sync_commands.await_count == 3
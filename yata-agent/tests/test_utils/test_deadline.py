@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from utils.deadline import call_timeout, current_deadline, deadline_scope
+
+
+def test_no_deadline_returns_default():
+    assert current_deadline() is None
+    assert call_timeout(30) == 30
+    assert call_timeout() is None
+
+
+def test_timeout_is_remaining_budget_with_floor():
+    with deadline_scope(10):
+        assert call_timeout() == pytest.approx(10, abs=0.1)
+        assert call_timeout(5) == 5
+        assert call_timeout(floor=60) == 60
+    assert current_deadline() is None
+
+
+def test_nested_scope_does_not_extend_outer_deadline():
+    with deadline_scope(5) as outer:
+        with deadline_scope(100) as inner:
+            assert inner is outer
+        with deadline_scope(None) as same:
+            assert same is outer
+
+
+@pytest.mark.asyncio
+async def test_deadline_propagates_to_tasks_and_threads():
+    with deadline_scope(10) as deadline:
+        in_task = await asyncio.create_task(asyncio.sleep(0, result=current_deadline()))
+        in_thread = await asyncio.to_thread(current_deadline)
+    assert in_task is deadline
+    assert in_thread is deadline
@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils import event_loop
+from utils.event_loop import ASYNCIO, UVLOOP, install_event_loop, loop_backend, resolve_backend
+
+
+def test_resolve_backend_falls_back_without_uvloop(monkeypatch, caplog):
+    monkeypatch.setattr(event_loop, "available_backends", lambda: [ASYNCIO])
+
+    assert resolve_backend("auto") == ASYNCIO
+    assert resolve_backend("uvloop") == ASYNCIO
+    assert "not installed" in caplog.text
+
+    monkeypatch.setattr(event_loop, "available_backends", lambda: [ASYNCIO, UVLOOP])
+    assert resolve_backend("auto") == UVLOOP
+    assert resolve_backend(" AsyncIO ") == ASYNCIO
+
+    with pytest.raises(ValueError):
+        resolve_backend("trio")
+
+
+def test_install_event_loop_sizes_the_default_executor():
+    loop = install_event_loop(ASYNCIO, default_executor_workers=2)
+    try:
+        assert asyncio.get_event_loop() is loop
+        assert loop_backend(loop) == ASYNCIO
+        thread_name = loop.run_until_complete(
+            asyncio.to_thread(lambda: threading.current_thread().name)
+        )
+        assert thread_name.startswith("yata-default")
+    finally:
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+        asyncio.set_event_loop(None)
@@ -0,0 +1,104 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from utils.executors import (
+    DB,
+    GOOGLE_IO,
+    ExecutorRegistry,
+    WorkloadExecutor,
+    run_blocking,
+)
+
+
+class TestWorkloadExecutor:
+    @pytest.mark.asyncio
+    async def test_run_returns_result_and_counts(self):
+        ex = WorkloadExecutor("db", max_workers=2)
+        try:
+            assert await ex.run(lambda a, b: a + b, 1, b=2) == 3
+            m = ex.metrics()
+            assert m["submitted"] == 1
+            assert m["completed"] == 1
+            assert m["queued"] == 0 and m["active"] == 0
+        finally:
+            ex.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_failure_is_counted_and_propagated(self):
+        ex = WorkloadExecutor("db", max_workers=1)
+
+        def boom():
+            raise RuntimeError("x")
+
+        try:
+            with pytest.raises(RuntimeError):
+                await ex.run(boom)
+            assert ex.metrics()["failed"] == 1
+        finally:
+            ex.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_is_tracked(self):
+        ex = WorkloadExecutor("google-io", max_workers=1)
+        gate = threading.Event()
+        try:
+            tasks = [asyncio.create_task(ex.run(gate.wait, 5)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            m = ex.metrics()
+            assert m["active"] == 1
+            assert m["queued"] == 2
+            gate.set()
+            await asyncio.gather(*tasks)
+            assert ex.metrics()["max_queued"] >= 2
+        finally:
+            ex.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_context_is_propagated(self):
+        var: contextvars.ContextVar[str] = contextvars.ContextVar("var", default="unset")
+        var.set("job-1")
+        ex = WorkloadExecutor("db", max_workers=1)
+        try:
+            assert await ex.run(var.get) == "job-1"
+        finally:
+            ex.shutdown()
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            WorkloadExecutor("db", max_workers=0)
+
+
+class TestExecutorRegistry:
+    @pytest.mark.asyncio
+    async def test_pools_are_isolated(self):
+        """A saturated google-io pool must not delay db work."""
+        registry = ExecutorRegistry({DB: 1, GOOGLE_IO: 1})
+        gate = threading.Event()
+        try:
+            slow = asyncio.create_task(registry.run(GOOGLE_IO, gate.wait, 5))
+            await asyncio.sleep(0.01)
+            result = await asyncio.wait_for(registry.run(DB, lambda: "fast"), timeout=1)
+            assert result == "fast"
+            gate.set()
+            await slow
+            metrics = registry.metrics()
+            assert metrics[DB]["completed"] == 1
+            assert metrics[GOOGLE_IO]["completed"] == 1
+        finally:
+            registry.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_unknown_name(self):
+        registry = ExecutorRegistry()
+        try:
+            with pytest.raises(KeyError):
+                registry.get("nope")
+        finally:
+            registry.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_run_blocking_falls_back_to_to_thread(self):
+        assert await run_blocking(None, DB, lambda: threading.current_thread().name) != threading.current_thread().name
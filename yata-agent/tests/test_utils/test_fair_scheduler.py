@@ -0,0 +1,178 @@
+import asyncio
+
+import pytest
+
+from utils.fair_scheduler import FairScheduler, parse_weights
+
+
+class _Recorder:
+    """Jobs that record their start order and block until released."""
+
+    def __init__(self):
+        self.started = []
+        self.gates = {}
+
+    async def job(self, name):
+        self.started.append(name)
+        gate = self.gates.setdefault(name, asyncio.Event())
+        await gate.wait()
+        return name
+
+    def release(self, name):
+        self.gates.setdefault(name, asyncio.Event()).set()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_small_guild_is_not_stuck_behind_large_backlog():
+    scheduler = FairScheduler(concurrency=1, quantum=600)
+    rec = _Recorder()
+
+    big = [asyncio.create_task(scheduler.submit(1, 3600, rec.job, f"big{i}")) for i in range(4)]
+    await _settle()
+    small = asyncio.create_task(scheduler.submit(2, 120, rec.job, "small"))
+    await _settle()
+
+    # big0 was already running; the small meeting goes next
+    rec.release("big0")
+    await _settle()
+    assert rec.started == ["big0", "small"]
+
+    for name in ["small", "big1", "big2", "big3"]:
+        rec.release(name)
+    assert await small == "small"
+    await asyncio.gather(*big)
+
+    metrics = scheduler.metrics()
+    assert metrics["guilds"]["1"]["completed"] == 4
+    assert metrics["guilds"]["2"]["completed"] == 1
+    assert metrics["guilds"]["1"]["max_wait_ms"] >= metrics["guilds"]["2"]["max_wait_ms"]
+
+
+@pytest.mark.asyncio
+async def test_weights_skew_share_between_guilds():
+    scheduler = FairScheduler(concurrency=1, quantum=1, weights={1: 2})
+    order = []
+
+    async def job(name):
+        order.append(name)
+
+    # Hold the worker so that both backlogs are queued before dispatch
+    gate = asyncio.Event()
+    blocker = asyncio.create_task(scheduler.submit(3, 0, gate.wait))
+    await _settle()
+    tasks = [asyncio.create_task(scheduler.submit(1, 1, job, f"a{i}")) for i in range(4)]
+    tasks += [asyncio.create_task(scheduler.submit(2, 1, job, f"b{i}")) for i in range(2)]
+    await _settle()
+    gate.set()
+    await asyncio.gather(blocker, *tasks)
+
+    assert order == ["a0", "a1", "b0", "a2", "a3", "b1"]
+
+
+@pytest.mark.asyncio
+async def test_job_errors_propagate_and_free_the_worker():
+    scheduler = FairScheduler(concurrency=1)
+
+    async def boom():
+        raise RuntimeError("boom")
+
+    async def ok():
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        await scheduler.submit(1, 1, boom)
+    assert await scheduler.submit(1, 1, ok) == "ok"
+    assert scheduler.metrics()["guilds"]["1"]["failed"] == 1
+
+
+def test_parse_weights():
+    assert parse_weights("123:2, 456:0.5,") == {123: 2.0, 456: 0.5}
+    with pytest.raises(ValueError):
+        parse_weights("123:0")
+
+
+@pytest.mark.asyncio
+async def test_hold_parks_jobs_and_requeues_circuit_errors():
+    class _Open(Exception):
+        pass
+
+    held = {"for": 0.0}
+    scheduler = FairScheduler(concurrency=1, hold=lambda: held["for"], requeue_on=(_Open,))
+    attempts = []
+
+    async def job():
+        attempts.append(1)
+        if len(attempts) == 1:
+            held["for"] = 0.05  # dependency went down mid-job
+            raise _Open()
+        return "done"
+
+    task = asyncio.create_task(scheduler.submit(1, 1, job))
+    await _settle()
+    # Requeued, and not re-dispatched while the hold is active
+    assert attempts == [1]
+    metrics = scheduler.metrics()
+    assert metrics["held"] and metrics["guilds"]["1"]["requeued"] == 1
+    assert metrics["guilds"]["1"]["failed"] == 0
+
+    held["for"] = 0.0
+    assert await asyncio.wait_for(task, 1) == "done"
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_in_the_submitters_context():
+    import contextvars
+
+    var = contextvars.ContextVar("request", default=None)
+    scheduler = FairScheduler(concurrency=1, quantum=600)
+    rec = _Recorder()
+
+    async def job():
+        return var.get()
+
+    blocker = asyncio.create_task(scheduler.submit(1, 60, rec.job, "blocker"))
+    await _settle()
+
+    async def submit(value):
+        var.set(value)
+        return await scheduler.submit(2, 60, job)
+
+    # The job is dispatched later, from the blocker's completion
+    queued = asyncio.create_task(submit("guild-2"))
+    await _settle()
+    rec.release("blocker")
+
+    assert await queued == "guild-2"
+    await blocker
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_submitter_cancels_a_started_job():
+    scheduler = FairScheduler(concurrency=1)
+    events = []
+
+    async def job():
+        events.append("started")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        events.append("finished")
+
+    submitter = asyncio.create_task(scheduler.submit(1, 1, job))
+    await _settle()
+    assert events == ["started"]
+
+    submitter.cancel()
+    await asyncio.gather(submitter, return_exceptions=True)
+    await _settle()
+
+    assert events == ["started", "cancelled"]
+    assert scheduler.metrics()["running"] == 0
@@ -0,0 +1,51 @@
+import asyncio
+import signal
+
+from utils.graceful_shutdown import GracefulShutdown
+
+
+async def test_steps_run_in_order_and_cleanup_survives_the_deadline():
+    calls = []
+    shutdown = GracefulShutdown(deadline=0.1)
+
+    async def drain():
+        calls.append("drain")
+        await asyncio.sleep(10)
+
+    async def hand_off():
+        calls.append("hand_off")
+
+    def broken():
+        raise RuntimeError("boom")
+
+    shutdown.add_step("stop_accepting", lambda: calls.append("stop_accepting"))
+    shutdown.add_step("drain", drain)
+    shutdown.add_step("broken", broken)
+    shutdown.add_step("hand_off", hand_off, timeout=1)
+
+    await asyncio.wait_for(shutdown.trigger(signal.SIGTERM), timeout=2)
+
+    assert calls == ["stop_accepting", "drain", "hand_off"]
+    metrics = shutdown.metrics()
+    assert metrics["state"] == "stopped" and metrics["signal"] == "SIGTERM"
+    assert {name: step["status"] for name, step in metrics["steps"].items()} == {
+        "stop_accepting": "ok",
+        "drain": "timeout",
+        "broken": "error",
+        "hand_off": "ok",
+    }
+
+
+async def test_second_signal_forces_the_exit():
+    forced = []
+    shutdown = GracefulShutdown(deadline=5, on_force=lambda: forced.append(True))
+    release = asyncio.Event()
+    shutdown.add_step("drain", release.wait)
+
+    task = shutdown.trigger(signal.SIGTERM)
+    assert shutdown.trigger(signal.SIGINT) is task
+    assert forced == [True]
+    assert shutdown.metrics()["state"] in ("running", "draining")
+
+    release.set()
+    await task
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from utils.hedging import HedgePolicy, Hedger, LatencyTracker
+
+
+def test_hedge_delay_uses_percentile_after_warmup():
+    tracker = LatencyTracker()
+    policy = HedgePolicy(percentile=95, initial_delay=7, min_delay=0.5, min_samples=3)
+    assert tracker.hedge_delay(policy) == 7
+    for seconds in (1, 2, 10):
+        tracker.observe(seconds)
+    assert tracker.hedge_delay(policy) == 10
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled():
+    hedger = Hedger("test", HedgePolicy(initial_delay=0.02))
+    started, cancelled = [], []
+
+    async def attempt():
+        index = len(started)
+        started.append(index)
+        try:
+            await asyncio.sleep(1 if index == 0 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        return f"attempt{index}"
+
+    assert await hedger.call(attempt) == "attempt1"
+    await asyncio.sleep(0)
+    assert cancelled == [0]
+    assert hedger.metrics()["hedged"] == 1
+    assert hedger.metrics()["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    hedger = Hedger("test", HedgePolicy(initial_delay=1))
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        return "ok"
+
+    assert await hedger.call(attempt) == "ok"
+    assert len(calls) == 1
+    assert hedger.metrics()["hedged"] == 0
+
+
+@pytest.mark.asyncio
+async def test_fast_unusable_result_is_not_hedged():
+    """An attempt that already finished (e.g. circuit open) is not repeated."""
+    hedger = Hedger("test", HedgePolicy(initial_delay=1))
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        return None
+
+    assert await hedger.call(attempt) is None
+    assert len(calls) == 1
+    assert hedger.metrics()["hedged"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_failed_primary_falls_back_to_hedge():
+    hedger = Hedger("test", HedgePolicy(initial_delay=0.02))
+    results = iter([None, "second"])
+
+    async def attempt():
+        result = next(results)
+        await asyncio.sleep(0.05)
+        return result
+
+    assert await hedger.call(attempt) == "second"
+    assert hedger.metrics()["hedge_wins"] == 1
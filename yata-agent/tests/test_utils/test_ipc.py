@@ -0,0 +1,55 @@
+import asyncio
+
+from utils.ipc import IPCClient, IPCHub
+
+
+async def _until(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def test_hub_relays_between_clients_and_broadcasts(tmp_path):
+    received_by_hub, received_a, received_b = [], [], []
+    hub = IPCHub(tmp_path / "ipc.sock", on_message=received_by_hub.append)
+    await hub.start()
+    a = IPCClient(hub.path, on_message=received_a.append)
+    b = IPCClient(hub.path, on_message=received_b.append)
+    a.start()
+    b.start()
+    try:
+        await _until(lambda: hub.metrics()["peers"] == 2)
+
+        assert a.send({"type": "job_finished", "job_id": 1})
+        await _until(lambda: received_by_hub and received_b)
+        assert received_b == [{"type": "job_finished", "job_id": 1}]
+        assert received_a == []  # not echoed to the sender
+
+        hub.broadcast({"type": "job_queued", "job_id": 2})
+        await _until(lambda: received_a and len(received_b) == 2)
+    finally:
+        await a.close()
+        await b.close()
+        await hub.close()
+    assert not hub.path.exists()
+
+
+async def test_client_reconnects_when_the_hub_restarts(tmp_path):
+    connects = []
+    client = IPCClient(tmp_path / "ipc.sock", on_connect=lambda: connects.append(1), retry_max=0.05)
+    client.start()
+    try:
+        assert not client.send({"type": "ping"})  # nobody listening yet
+        hub = IPCHub(client.path)
+        await hub.start()
+        await _until(lambda: client.connected)
+        await hub.close()
+        await _until(lambda: not client.connected)
+
+        hub = IPCHub(client.path)
+        await hub.start()
+        await _until(lambda: len(connects) == 2)
+        await hub.close()
+    finally:
+        await client.close()
@@ -0,0 +1,23 @@
+import sys
+from unittest import mock
+
+from utils.lazy_import import LazyModule, lazy_import
+
+
+def test_module_is_imported_on_first_attribute_access(tmp_path, monkeypatch):
+    (tmp_path / "yata_lazy_target.py").write_text("VALUE = 42\ndef answer():\n    return VALUE\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "yata_lazy_target", raising=False)
+
+    module = lazy_import("yata_lazy_target")
+    assert isinstance(module, LazyModule)
+    assert "yata_lazy_target" not in sys.modules
+
+    assert module.answer() == 42
+    assert "yata_lazy_target" in sys.modules
+
+    # Patching through the proxy shadows the attribute for its holder only
+    with mock.patch.object(module, "answer", return_value=7):
+        assert module.answer() == 7
+        assert sys.modules["yata_lazy_target"].answer() == 42
+    assert module.answer() == 42
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from utils.loop_monitor import LoopMonitor
+
+
+def _block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+async def test_lag_is_measured_after_a_blocking_call():
+    monitor = LoopMonitor(interval=0.01, block_threshold=0.05)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.03)
+        _block_the_loop(0.15)
+        await asyncio.sleep(0.05)
+    finally:
+        monitor.stop()
+
+    metrics = monitor.metrics()
+    assert metrics["samples"] >= 2
+    assert metrics["lag_ms"]["max"] >= 100
+    assert metrics["over_threshold"] >= 1
+    assert metrics["stalls"] == 0  # stacks are only captured in debug mode
+
+
+async def test_debug_mode_captures_the_blocking_stack(caplog):
+    monitor = LoopMonitor(interval=0.05, block_threshold=0.05, capture_stacks=True)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        _block_the_loop(0.3)
+        await asyncio.sleep(0.2)
+    finally:
+        monitor.stop()
+
+    stalls = monitor.metrics()["recent_stalls"]
+    assert len(stalls) == 1
+    assert stalls[0]["blocked_ms"] >= 200
+    assert any("_block_the_loop" in line for line in stalls[0]["stack"])
+    assert "Event loop blocked" in caplog.text
+    assert "_block_the_loop" in caplog.text
+
+
+def test_metrics_before_start():
+    metrics = LoopMonitor().metrics()
+
+    assert metrics["samples"] == 0
+    assert metrics["lag_ms"]["p99"] == 0.0
+    assert metrics["recent_stalls"] == []
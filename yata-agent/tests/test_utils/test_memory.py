@@ -0,0 +1,107 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from utils.memory import MemoryTracker, buffer_bytes, detach_sink, release_buffers, trim_heap
+
+
+class _Sink:
+    """Weak-referenceable stand-in for a py-cord sink."""
+
+    def __init__(self, size=100_000):
+        self.audio_data = {
+            1: SimpleNamespace(file=io.BytesIO(b"\0" * size)),
+            2: SimpleNamespace(file=io.BytesIO(b"\0" * size)),
+        }
+        self.timeline = object()
+        self.vc = SimpleNamespace(sink=self)
+
+
+def test_release_buffers_closes_and_clears():
+    sink = _Sink()
+    files = [audio.file for audio in sink.audio_data.values()]
+
+    released = release_buffers(sink)
+
+    assert released >= 200_000
+    assert sink.audio_data == {}
+    assert all(f.closed for f in files)
+    assert buffer_bytes(sink) == 0
+    assert release_buffers(sink) == 0
+
+
+def test_release_buffers_survives_exported_view():
+    sink = _Sink()
+    view = sink.audio_data[1].file.getbuffer()
+
+    release_buffers(sink)
+
+    assert sink.audio_data == {}
+    view.release()
+
+
+def test_detach_sink_breaks_voice_client_cycle():
+    sink = _Sink()
+    vc = sink.vc
+
+    detach_sink(sink)
+
+    assert vc.sink is None
+    assert sink.vc is None
+    assert sink.timeline is None
+
+
+def test_trim_heap_returns_bool():
+    assert trim_heap() in (True, False)
+
+
+@pytest.mark.asyncio
+async def test_released_recording_raises_no_alert():
+    tracker = MemoryTracker(check_delay=0, trim=False)
+    sink = _Sink()
+    tracker.track("1:a", 1, sink)
+    tracker.release("1:a", sink)
+    detach_sink(sink)
+    del sink
+
+    assert await tracker.check("1:a") is None
+    assert tracker.metrics()["retained"] == 0
+    assert tracker.metrics()["released_bytes"] >= 200_000
+
+
+@pytest.mark.asyncio
+async def test_retained_recording_is_reported(caplog):
+    tracker = MemoryTracker(check_delay=0, trim=False, debug=True)
+    sink = _Sink()
+    leak = {"sink": sink}
+    tracker.track("1:b", 1, sink)
+    tracker.complete("1:b")
+    del sink
+
+    with caplog.at_level("WARNING"):
+        alert = await tracker.check("1:b")
+
+    assert alert is not None
+    assert alert["retained_bytes"] >= 200_000
+    assert "dict" in alert["referrers"]
+    assert "still retained" in caplog.text
+    assert tracker.metrics()["recent_alerts"][0]["key"] == "1:b"
+    assert leak
+
+
+@pytest.mark.asyncio
+async def test_check_does_not_walk_the_heap_by_default(monkeypatch):
+    import gc
+
+    monkeypatch.setattr(gc, "collect", lambda *a: pytest.fail("gc.collect on the loop"))
+    monkeypatch.setattr(gc, "get_referrers", lambda *a: pytest.fail("gc.get_referrers on the loop"))
+    tracker = MemoryTracker(check_delay=0, trim=False)
+    sink = _Sink()
+    leak = [sink]
+    tracker.track("1:c", 1, sink)
+
+    alert = await tracker.check("1:c")
+
+    assert alert is not None and alert["referrers"] == []
+    assert leak
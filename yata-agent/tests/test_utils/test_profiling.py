@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+
+from utils.profiling import JobProfile, SamplingProfiler, SpanRecorder, active_profile, profile_span, profiling
+
+
+def _busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_captures_busy_thread():
+    sampler = SamplingProfiler(interval=0.001)
+    worker = threading.Thread(target=_busy_wait, args=(0.2,), name="busy-worker")
+    sampler.start()
+    worker.start()
+    worker.join()
+    sampler.stop()
+
+    assert sampler.sample_count > 0
+    busy = [line for line in sampler.collapsed().splitlines() if "_busy_wait" in line]
+    assert busy
+    stack, count = busy[0].rsplit(" ", 1)
+    assert stack.startswith("busy-worker;")
+    assert int(count) > 0
+
+
+def test_chrome_trace_contains_spans_and_errors():
+    recorder = SpanRecorder()
+    with recorder.span("outer", guild_id=1):
+        try:
+            with recorder.span("inner"):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+
+    events = recorder.chrome_trace()["traceEvents"]
+    spans = {e["name"]: e for e in events if e["ph"] == "X"}
+    assert set(spans) == {"outer", "inner"}
+    assert spans["outer"]["args"] == {"guild_id": 1}
+    assert spans["inner"]["args"] == {"error": "ValueError"}
+    assert spans["outer"]["dur"] >= spans["inner"]["dur"]
+    assert any(e["ph"] == "M" for e in events)
+
+
+def test_profile_span_is_noop_without_active_profile():
+    assert active_profile() is None
+    with profile_span("ignored"):
+        pass
+
+
+def test_profile_save_writes_artifacts(tmp_path):
+    profile = JobProfile("job", interval=0.001)
+    profile.start()
+    with profiling(profile):
+        with profile_span("work", items=2):
+            _busy_wait(0.05)
+    profile.stop()
+
+    folded, trace = profile.save(tmp_path / "meeting")
+
+    assert folded.name == "meeting.folded"
+    assert "_busy_wait" in folded.read_text(encoding="utf-8")
+    payload = json.loads(trace.read_text(encoding="utf-8"))
+    assert payload["metadata"]["job"] == "job"
+    assert "work" in payload["metadata"]["spans"]
+
+
+def test_job_profile_skips_threads_of_other_work():
+    profile = JobProfile("job", interval=0.001)
+    other = threading.Thread(target=_busy_wait, args=(0.1,), name="other-job")
+    profile.start()
+    other.start()
+    with profiling(profile):
+        with profile_span("work"):
+            _busy_wait(0.1)
+    other.join()
+    profile.stop()
+
+    collapsed = profile.sampler.collapsed()
+    assert "_busy_wait" in collapsed
+    assert "other-job" not in collapsed
+
+
+async def test_job_profile_samples_the_loop_only_while_its_task_runs():
+    import asyncio
+
+    profile = JobProfile("job", interval=0.001)
+
+    async def job():
+        with profiling(profile), profile_span("job"):
+            await asyncio.sleep(0.05)
+
+    async def neighbour():
+        await asyncio.sleep(0.01)
+        _busy_wait(0.05)  # another guild's work blocking the loop
+
+    profile.start()
+    await asyncio.gather(job(), neighbour())
+    profile.stop()
+
+    assert "neighbour" not in profile.sampler.collapsed()
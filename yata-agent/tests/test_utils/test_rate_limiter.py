@@ -0,0 +1,93 @@
+import pytest
+
+from utils.rate_limiter import RateLimiter, TokenBucket, parse_reset
+
+
+def test_parse_reset_understands_openai_durations():
+    assert parse_reset("1s") == 1
+    assert parse_reset("6m0s") == 360
+    assert parse_reset("20ms") == pytest.approx(0.02)
+    assert parse_reset("2") == 2
+    assert parse_reset(None) is None
+
+
+def test_reservations_queue_in_arrival_order():
+    bucket = TokenBucket(per_minute=60)  # one unit per second
+    now = 100.0
+    bucket._updated = now
+
+    assert bucket.reserve(60, now) == 0  # full burst available
+    assert bucket.reserve(1, now) == pytest.approx(1)
+    assert bucket.reserve(1, now) == pytest.approx(2)  # waits behind the previous one
+
+
+def test_headers_lower_budget_and_429_pauses_everyone():
+    limiter = RateLimiter("chat", requests_per_minute=500, tokens_per_minute=1000)
+    limiter.observe_headers({"x-ratelimit-limit-tokens": "1000", "x-ratelimit-remaining-tokens": "10"})
+
+    assert limiter.reserve(tokens=10) == 0
+    assert limiter.reserve(tokens=100) > 5  # debt of 100 tokens at ~16.7/s
+
+    limiter.observe_headers({"retry-after": "3"}, status_code=429)
+    assert limiter.reserve() >= 2.9
+    assert limiter.metrics()["rate_limited"] == 1
+
+
+def test_settle_tokens_refunds_unused_reservation():
+    limiter = RateLimiter("chat", requests_per_minute=500, tokens_per_minute=1000)
+    limiter.reserve(tokens=900)
+
+    limiter.settle_tokens(900, 100)
+
+    assert limiter.metrics()["buckets"]["tokens"]["available"] >= 900
+
+
+class _Throttled(Exception):
+    pass
+
+
+@pytest.mark.asyncio
+async def test_call_requeues_on_rate_limit_errors():
+    limiter = RateLimiter("whisper", requests_per_minute=600, audio_seconds_per_minute=600)
+    attempts = []
+
+    async def request():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _Throttled()
+        return "ok"
+
+    result = await limiter.call(request, audio_seconds=10, retry_on=(_Throttled,))
+
+    assert result == "ok"
+    assert len(attempts) == 3
+    assert limiter.metrics()["acquired"] == 3
+
+
+def test_call_blocking_refunds_rejected_attempts():
+    limiter = RateLimiter("chat", requests_per_minute=2, tokens_per_minute=1000)
+    attempts = []
+
+    def request():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise _Throttled()
+        return "ok"
+
+    assert limiter.call_blocking(request, tokens=600, retry_on=(_Throttled,)) == "ok"
+
+    buckets = limiter.metrics()["buckets"]
+    # Only the successful attempt is charged
+    assert buckets["requests"]["available"] == pytest.approx(1, abs=0.01)
+    assert buckets["tokens"]["available"] == pytest.approx(400, abs=1)
+
+
+@pytest.mark.asyncio
+async def test_call_gives_up_after_max_retries():
+    limiter = RateLimiter("whisper", requests_per_minute=6000, max_retries=1)
+
+    async def request():
+        raise _Throttled()
+
+    with pytest.raises(_Throttled):
+        await limiter.call(request, retry_on=(_Throttled,))
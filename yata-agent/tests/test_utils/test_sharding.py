@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils.sharding import ShardConfig, parse_shard_ids, shard_metrics
+
+
+def test_shard_config_from_settings():
+    assert parse_shard_ids("4-5, 0,1") == (0, 1, 4, 5)
+    assert not ShardConfig.from_settings("", "").enabled
+
+    auto = ShardConfig.from_settings("auto", "")
+    assert auto.enabled and auto.primary
+    assert auto.bot_kwargs() == {"shard_count": None, "shard_ids": None}
+
+    first = ShardConfig.from_settings("8", "0-3")
+    second = ShardConfig.from_settings("8", "4-7")
+    assert first.primary and not second.primary
+    assert second.bot_kwargs() == {"shard_count": 8, "shard_ids": [4, 5, 6, 7]}
+    assert second.describe() == "shards 4,5,6,7 of 8"
+
+    for count, ids in (("", "0-1"), ("2", "0-2"), ("0", ""), ("two", ""), ("2", "1-0")):
+        with pytest.raises(ValueError):
+            ShardConfig.from_settings(count, ids)
+
+
+def test_shard_metrics_reports_latency_and_recordings_per_shard():
+    shard = SimpleNamespace(is_closed=lambda: False)
+    bot = SimpleNamespace(
+        shard_count=8,
+        latencies=[(4, 0.0421), (5, float("inf"))],
+        get_shard=lambda shard_id: shard,
+    )
+
+    metrics = shard_metrics(bot, {4: 2})
+
+    assert metrics["shard_ids"] == [4, 5]
+    assert metrics["shards"]["4"] == {"latency_ms": 42.1, "closed": False, "recordings": 2}
+    assert metrics["shards"]["5"]["latency_ms"] is None
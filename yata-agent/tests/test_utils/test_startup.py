@@ -0,0 +1,35 @@
+import sys
+
+from utils.startup import ImportProfiler, StartupTimer
+
+
+def test_startup_timer_keeps_the_first_mark_of_each_phase():
+    timer = StartupTimer()
+    first = timer.mark("gateway_ready")
+
+    assert timer.mark("gateway_ready") == first
+    assert 0 < first <= timer.elapsed()
+    assert list(timer.metrics()) == ["gateway_ready"]
+
+
+def test_import_profiler_separates_self_and_inclusive_time(tmp_path, monkeypatch):
+    (tmp_path / "yata_outer.py").write_text("import time\nimport yata_inner\ntime.sleep(0.01)\n")
+    (tmp_path / "yata_inner.py").write_text("import time\ntime.sleep(0.05)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in ("yata_outer", "yata_inner"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    profiler = ImportProfiler()
+    profiler.start()
+    try:
+        import yata_outer  # noqa: F401
+    finally:
+        profiler.stop()
+
+    slowest = {entry["module"]: entry for entry in profiler.slowest()}
+    assert slowest["yata_inner"]["self_ms"] >= 50
+    assert slowest["yata_outer"]["inclusive_ms"] >= slowest["yata_inner"]["inclusive_ms"]
+    assert slowest["yata_outer"]["self_ms"] < 50
+    # Modules keep their real loader once imported
+    assert not type(sys.modules["yata_outer"].__loader__).__name__.startswith("_Timed")
+    assert profiler not in sys.meta_path
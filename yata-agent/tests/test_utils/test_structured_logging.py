@@ -0,0 +1,104 @@
+import io
+import json
+import logging
+
+import pytest
+
+from utils.structured_logging import (
+    SamplingFilter,
+    configure_logging,
+    content_digest,
+    log_context,
+    redact,
+)
+from utils.tracing import Tracer, use_span
+
+
+@pytest.fixture
+def json_log():
+    """Route the root logger through the queue pipeline into a buffer."""
+    root = logging.getLogger()
+    saved = (list(root.handlers), root.level)
+    stream = io.StringIO()
+    listener = configure_logging(logging.INFO, "json", sample_burst=3, sample_interval=60, stream=stream)
+
+    def _records():
+        # Stopping the listener drains the queue
+        listener.stop()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield _records
+    if listener._thread is not None:
+        listener.stop()
+    root.handlers[:] = saved[0]
+    root.setLevel(saved[1])
+
+
+def test_records_carry_context_and_span_fields(json_log):
+    logger = logging.getLogger("test.structured")
+    root = Tracer().start_trace("meeting")
+
+    with log_context(guild_id=42, job_id="job-1"), use_span(root):
+        logger.info("Uploaded minutes", extra={"duration_ms": 12.5})
+    logger.info("outside")
+
+    inside, outside = json_log()
+    assert inside["message"] == "Uploaded minutes"
+    assert inside["guild_id"] == 42
+    assert inside["job_id"] == "job-1"
+    assert inside["stage"] == "meeting"
+    assert inside["trace_id"] == root.trace_id
+    assert inside["duration_ms"] == 12.5
+    assert "guild_id" not in outside
+
+
+def test_secrets_are_redacted(json_log):
+    logger = logging.getLogger("test.structured")
+    logger.warning("key %s token ya29.a0AfH6SMBx refresh=1//0gAbCdEfGhIjKl", "sk-proj-abcdefghijklmnopqrstuv")
+    try:
+        raise RuntimeError("callback /oauth2callback?code=4/0AX4XfWj&state=1")
+    except RuntimeError:
+        logger.exception("OAuth failed")
+
+    warning, error = json_log()
+    assert "sk-proj" not in warning["message"]
+    assert "ya29.a0" not in warning["message"]
+    assert "1//0gAb" not in warning["message"]
+    assert "4/0AX4XfWj" not in error["exc"]
+    assert "state=1" in error["exc"]
+
+
+def test_high_volume_messages_are_sampled(json_log):
+    logger = logging.getLogger("test.structured")
+    for i in range(10):
+        logger.info("frame %d received", i)
+    logger.warning("always kept")
+
+    records = json_log()
+    assert [r["message"] for r in records] == [
+        "frame 0 received",
+        "frame 1 received",
+        "frame 2 received",
+        "always kept",
+    ]
+
+
+def test_sampling_reports_suppressed_count_in_next_window():
+    sampler = SamplingFilter(burst=1, interval=0)
+    sampler.interval = 60
+    first = logging.makeLogRecord({"name": "x", "msg": "tick", "levelno": logging.INFO})
+    dropped = logging.makeLogRecord({"name": "x", "msg": "tick", "levelno": logging.INFO})
+    assert sampler.filter(first)
+    assert not sampler.filter(dropped)
+
+    sampler.interval = 0  # next record opens a new window
+    later = logging.makeLogRecord({"name": "x", "msg": "tick", "levelno": logging.INFO})
+    assert sampler.filter(later)
+    assert later.suppressed == 1
+
+
+def test_content_digest_hides_text():
+    digest = content_digest("秘密の議題について話した")
+    assert "秘密" not in digest
+    assert digest.startswith("<12 chars sha256:")
+    assert redact("nothing secret here") == "nothing secret here"
@@ -0,0 +1,44 @@
+import pickle
+
+from utils.timeline import SparseTimeline
+
+# 1 kHz mono 16-bit keeps the arithmetic readable: 2000 bytes per second
+RATE = 1000
+BPS = 2000
+
+
+def _timeline():
+    return SparseTimeline(sample_rate=RATE, channels=1, sample_width=2)
+
+
+def test_contiguous_appends_merge_into_one_run():
+    tl = _timeline()
+    tl.append(1, 0.0, 0, 20)
+    tl.append(1, 0.01, 20, 20)  # continues in time and in the buffer
+    tl.append(1, 5.0, 40, 20)   # new utterance after a gap
+
+    assert list(tl.runs(1)) == [(0.0, 0, 40), (5.0, 40, 20)]
+    assert tl.run_count() == 2
+    assert tl.end_ts() == 5.0 + 20 / BPS
+
+
+def test_to_timeline_seconds_maps_compact_track_time_to_meeting_time():
+    tl = _timeline()
+    tl.append(1, 2.0, 0, BPS)        # track 0s..1s heard at 2s..3s
+    tl.append(1, 10.0, BPS, BPS)     # track 1s..2s heard at 10s..11s
+
+    assert tl.to_timeline_seconds(1, 0.5) == 2.5
+    assert tl.to_timeline_seconds(1, 1.25) == 10.25
+    # Unknown users are left untouched
+    assert tl.to_timeline_seconds(2, 7.0) == 7.0
+
+
+def test_timeline_survives_pickling():
+    tl = _timeline()
+    tl.append(3, 1.0, 0, 40)
+
+    clone = pickle.loads(pickle.dumps(tl))
+
+    assert list(clone.runs(3)) == [(1.0, 0, 40)]
+    clone.append(3, 9.0, 40, 40)  # lock was recreated
+    assert clone.run_count(3) == 2
@@ -0,0 +1,36 @@
+import wave
+
+from utils.timeline import WAV_HEADER_BYTES
+from utils.timeline_sink import TimelineWaveSink
+
+FRAME = 3840  # one decoded 20 ms frame (48 kHz, stereo, 16-bit)
+
+
+def test_write_strips_padding_and_records_runs():
+    sink = TimelineWaveSink()
+    sink.init(None)
+
+    sink.write(b"\x01" * FRAME, 7)
+    # py-cord prefixes 0.5 s of silence for the gap before the next packet
+    sink.write(b"\x00" * 96000 + b"\x02" * FRAME, 7)
+
+    payload = sink.audio_data[7].file.getvalue()[WAV_HEADER_BYTES:]
+    assert payload == b"\x01" * FRAME + b"\x02" * FRAME
+
+    runs = list(sink.timeline.runs(7))
+    assert [(offset, length) for _, offset, length in runs] == [(0, FRAME), (FRAME, FRAME)]
+    assert runs[1][0] - runs[0][0] >= 0.5
+    assert sink.last_activity is not None
+
+
+def test_format_audio_writes_a_valid_header():
+    sink = TimelineWaveSink()
+    sink.init(None)
+    sink.write(b"\x01" * FRAME, 7)
+
+    sink.cleanup()  # finishes each AudioData and calls format_audio
+
+    with wave.open(sink.audio_data[7].file) as wav:
+        assert wav.getframerate() == 48000
+        assert wav.getnchannels() == 2
+        assert wav.getnframes() == FRAME // 4
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from utils.executors import ExecutorRegistry, GOOGLE_IO, run_blocking
+from utils.tracing import FileExporter, OTLPHttpExporter, Tracer, current_span, span, use_span
+
+
+class _Collect:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+def test_span_is_noop_without_trace():
+    with span("ignored") as s:
+        assert s is None
+    assert current_span() is None
+
+
+@pytest.mark.asyncio
+async def test_spans_follow_to_thread_and_executors():
+    exporter = _Collect()
+    tracer = Tracer([exporter], flush_interval=0.01)
+    executors = ExecutorRegistry({GOOGLE_IO: 1})
+    root = tracer.start_trace("meeting", guild_id=1)
+
+    def _blocking(name):
+        with span(name) as s:
+            return s.parent_id, s.thread
+
+    with use_span(root):
+        with span("stage") as stage:
+            parent_a, _ = await asyncio.to_thread(_blocking, "thread")
+            parent_b, thread_b = await run_blocking(executors, GOOGLE_IO, _blocking, "executor")
+    root.end()
+    tracer.shutdown()
+    executors.shutdown()
+
+    assert parent_a == parent_b == stage.span_id
+    assert thread_b != threading.current_thread().name
+    by_name = {s["name"]: s for s in exporter.spans}
+    assert set(by_name) == {"meeting", "stage", "thread", "executor"}
+    assert {s["trace_id"] for s in exporter.spans} == {root.trace_id}
+    assert by_name["stage"]["parent_id"] == root.span_id
+    recent = tracer.metrics()["recent"][0]
+    assert recent["name"] == "meeting"
+    assert set(recent["spans"]) == {"stage", "thread", "executor"}
+
+
+def test_errors_are_recorded(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer([FileExporter(path)], flush_interval=0.01)
+    root = tracer.start_trace("meeting")
+    with use_span(root):
+        with pytest.raises(ValueError):
+            with span("upload", attempt=1):
+                raise ValueError("boom")
+    root.end()
+    tracer.shutdown()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    upload = next(s for s in lines if s["name"] == "upload")
+    assert upload["error"] == "ValueError: boom"
+    assert upload["attributes"] == {"attempt": 1}
+
+
+def test_otlp_exporter_posts_resource_spans():
+    received = []
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append((self.path, json.loads(self.rfile.read(int(self.headers["Content-Length"])))))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        tracer = Tracer([OTLPHttpExporter(f"http://127.0.0.1:{server.server_port}")], flush_interval=0.01)
+        root = tracer.start_trace("meeting", guild_id=7)
+        root.end()
+        tracer.shutdown()
+    finally:
+        server.shutdown()
+
+    path, payload = received[0]
+    assert path == "/v1/traces"
+    otlp = payload["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert otlp["traceId"] == root.trace_id
+    assert otlp["status"] == {"code": 1}
+    assert {"key": "guild_id", "value": {"intValue": "7"}} in otlp["attributes"]
@@ -0,0 +1,48 @@
+from services.transcription_service_interface import TranscriptSegment
+from utils.transcript_merge import interleave, merge_speaker_segments
+
+
+def test_segments_are_interleaved_chronologically():
+    segments = {
+        1: [TranscriptSegment(0.0, 2.0, "おはよう"), TranscriptSegment(10.0, 12.0, "では始めます")],
+        2: [TranscriptSegment(4.0, 6.0, "よろしく")],
+    }
+    text = merge_speaker_segments(segments, {1: "Alice", 2: "Bob"})
+    assert text.splitlines() == [
+        "[00:00:00] Alice: おはよう",
+        "[00:00:04] Bob: よろしく",
+        "[00:00:10] Alice: では始めます",
+    ]
+
+
+def test_adjacent_segments_of_same_speaker_are_joined():
+    segments = {1: [TranscriptSegment(0.0, 2.0, "a"), TranscriptSegment(2.5, 3.0, "b")]}
+    merged = interleave(segments)
+    assert len(merged) == 1
+    assert merged[0][1].text == "a b"
+    assert merged[0][1].end == 3.0
+
+
+def test_unknown_speaker_gets_fallback_label_and_hours_are_rendered():
+    text = merge_speaker_segments({42: [TranscriptSegment(3725.0, 3726.0, "x")]}, {})
+    assert text == "[01:02:05] User 42: x"
+
+
+def test_timeline_maps_compact_track_times_to_meeting_time():
+    from utils.timeline import SparseTimeline
+
+    timeline = SparseTimeline(sample_rate=1000, channels=1, sample_width=2)
+    timeline.append(1, 60.0, 0, 2000)  # Alice's first second was heard at 1:00
+    timeline.append(2, 5.0, 0, 2000)
+
+    segments = {
+        1: [TranscriptSegment(0.2, 0.8, "later")],
+        2: [TranscriptSegment(0.5, 0.9, "earlier")],
+    }
+
+    transcript = merge_speaker_segments(segments, {1: "Alice", 2: "Bob"}, timeline)
+
+    assert transcript.splitlines() == [
+        "[00:00:05] Bob: earlier",
+        "[00:01:00] Alice: later",
+    ]